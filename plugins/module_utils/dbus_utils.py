@@ -0,0 +1,556 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import dataclasses
+import os
+import socket
+import struct
+import threading
+import typing
+
+
+class DBusCallException(Exception):
+    def __init__(
+        self, *args, name=None, error=None, destination=None, path=None, member=None
+    ) -> None:
+        super().__init__(*args)
+        self.name = name
+        self.error = error
+        self.destination = destination
+        self.path = path
+        self.member = member
+
+    def __str__(self) -> str:
+        message = f"{super().__str__()} {self.error or ''}".rstrip()
+        return f"[{self.path} {self.member} ({self.name})] {message}"
+
+
+@dataclasses.dataclass(frozen=True)
+class DBusVariant:
+    """
+    D-Bus variant value. Variants received keep their signature, so they
+    can be sent back as they are, i.e. to update a settings dictionary.
+    """
+
+    signature: str
+    value: typing.Any
+
+
+DBUS_MESSAGE_TYPE_METHOD_CALL = 1
+DBUS_MESSAGE_TYPE_METHOD_RETURN = 2
+DBUS_MESSAGE_TYPE_ERROR = 3
+DBUS_MESSAGE_TYPE_SIGNAL = 4
+
+DBUS_MESSAGE_FLAG_NO_REPLY_EXPECTED = 0x1
+
+_ALIGNMENTS = {
+    "y": 1,
+    "b": 4,
+    "n": 2,
+    "q": 2,
+    "i": 4,
+    "u": 4,
+    "x": 8,
+    "t": 8,
+    "d": 8,
+    "h": 4,
+    "s": 4,
+    "o": 4,
+    "g": 1,
+    "a": 4,
+    "(": 8,
+    "{": 8,
+    "v": 1,
+}
+_FIXED_FORMATS = {
+    "y": "B",
+    "b": "I",
+    "n": "h",
+    "q": "H",
+    "i": "i",
+    "u": "I",
+    "x": "q",
+    "t": "Q",
+    "d": "d",
+    "h": "I",
+}
+
+
+def split_signature(signature: str) -> typing.List[str]:
+    """
+    Splits a D-Bus signature in its single complete types.
+    :param signature: The signature, i.e. "sa{sv}".
+    :return: The list of complete types, i.e. ["s", "a{sv}"].
+    """
+    types = []
+    pos = 0
+    while pos < len(signature):
+        end = __complete_type_end(signature, pos)
+        types.append(signature[pos:end])
+        pos = end
+    return types
+
+
+def __complete_type_end(signature: str, pos: int) -> int:
+    try:
+        type_code = signature[pos]
+        if type_code == "a":
+            return __complete_type_end(signature, pos + 1)
+        if type_code in "({":
+            closing = ")" if type_code == "(" else "}"
+            pos += 1
+            while signature[pos] != closing:
+                pos = __complete_type_end(signature, pos)
+            return pos + 1
+    except IndexError as err:
+        raise ValueError(f"Invalid D-Bus signature '{signature}'") from err
+    if type_code not in _ALIGNMENTS or type_code == "a":
+        raise ValueError(f"Invalid D-Bus signature '{signature}'")
+    return pos + 1
+
+
+class _Writer:
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def align(self, alignment: int):
+        self.buffer.extend(b"\0" * (-len(self.buffer) % alignment))
+
+    def write(self, type_signature: str, value: typing.Any):
+        type_code = type_signature[0]
+        self.align(_ALIGNMENTS[type_code])
+        if type_code in _FIXED_FORMATS:
+            self.buffer.extend(struct.pack("<" + _FIXED_FORMATS[type_code], value))
+        elif type_code in "so":
+            encoded = value.encode()
+            self.buffer.extend(struct.pack("<I", len(encoded)) + encoded + b"\0")
+        elif type_code == "g":
+            encoded = value.encode()
+            self.buffer.extend(struct.pack("<B", len(encoded)) + encoded + b"\0")
+        elif type_code == "v":
+            if not isinstance(value, DBusVariant):
+                raise ValueError(f"D-Bus variants must be DBusVariant, got {value!r}")
+            self.write("g", value.signature)
+            self.write(value.signature, value.value)
+        elif type_code == "(":
+            for field_signature, field_value in zip(
+                split_signature(type_signature[1:-1]), value
+            ):
+                self.write(field_signature, field_value)
+        else:
+            self.__write_array(type_signature[1:], value)
+
+    def __write_array(self, item_signature: str, value: typing.Any):
+        length_pos = len(self.buffer)
+        self.buffer.extend(b"\0\0\0\0")
+        self.align(_ALIGNMENTS[item_signature[0]])
+        start = len(self.buffer)
+        if item_signature == "y":
+            self.buffer.extend(bytes(value))
+        elif item_signature[0] == "{":
+            key_signature, value_signature = split_signature(item_signature[1:-1])
+            for key, item_value in value.items():
+                self.align(8)
+                self.write(key_signature, key)
+                self.write(value_signature, item_value)
+        else:
+            for item in value:
+                self.write(item_signature, item)
+        struct.pack_into("<I", self.buffer, length_pos, len(self.buffer) - start)
+
+
+class _Reader:
+    def __init__(self, data: bytes, endianness: str = "<", offset: int = 0):
+        self.data = data
+        self.endianness = endianness
+        self.pos = offset
+
+    def align(self, alignment: int):
+        self.pos += -self.pos % alignment
+
+    def read(self, type_signature: str) -> typing.Any:
+        type_code = type_signature[0]
+        self.align(_ALIGNMENTS[type_code])
+        if type_code in _FIXED_FORMATS:
+            fmt = self.endianness + _FIXED_FORMATS[type_code]
+            (value,) = struct.unpack_from(fmt, self.data, self.pos)
+            self.pos += struct.calcsize(fmt)
+            return bool(value) if type_code == "b" else value
+        if type_code in "so":
+            length = self.read("u")
+            value = bytes(self.data[self.pos : self.pos + length]).decode()
+            self.pos += length + 1
+            return value
+        if type_code == "g":
+            length = self.read("y")
+            value = bytes(self.data[self.pos : self.pos + length]).decode()
+            self.pos += length + 1
+            return value
+        if type_code == "v":
+            variant_signature = self.read("g")
+            return DBusVariant(variant_signature, self.read(variant_signature))
+        if type_code == "(":
+            return tuple(
+                self.read(field_signature)
+                for field_signature in split_signature(type_signature[1:-1])
+            )
+        return self.__read_array(type_signature[1:])
+
+    def __read_array(self, item_signature: str) -> typing.Any:
+        length = self.read("u")
+        self.align(_ALIGNMENTS[item_signature[0]])
+        end = self.pos + length
+        if item_signature == "y":
+            value = bytes(self.data[self.pos : end])
+            self.pos = end
+            return value
+        if item_signature[0] == "{":
+            key_signature, value_signature = split_signature(item_signature[1:-1])
+            items = {}
+            while self.pos < end:
+                self.align(8)
+                key = self.read(key_signature)
+                items[key] = self.read(value_signature)
+            return items
+        items = []
+        while self.pos < end:
+            items.append(self.read(item_signature))
+        return items
+
+
+def marshal(signature: str, values: typing.Sequence[typing.Any]) -> bytes:
+    """
+    Serializes values in the D-Bus wire format (little endian).
+    :param signature: The signature of the values.
+    :param values: The values, one for each complete type of the signature.
+    :return: The serialized values.
+    """
+    types = split_signature(signature)
+    if len(types) != len(values):
+        raise ValueError(
+            f"D-Bus signature '{signature}' expects {len(types)} values, got {len(values)}"
+        )
+    writer = _Writer()
+    for type_signature, value in zip(types, values):
+        writer.write(type_signature, value)
+    return bytes(writer.buffer)
+
+
+def unmarshal(
+    signature: str, data: bytes, endianness: str = "<"
+) -> typing.List[typing.Any]:
+    """
+    Deserializes values in the D-Bus wire format.
+    :param signature: The signature of the values.
+    :param data: The serialized values.
+    :param endianness: The struct byte order character of the data.
+    :return: The list of values.
+    """
+    reader = _Reader(data, endianness=endianness)
+    return [
+        reader.read(type_signature) for type_signature in split_signature(signature)
+    ]
+
+
+@dataclasses.dataclass
+class DBusMessage:
+    message_type: int
+    serial: int = 0
+    path: typing.Optional[str] = None
+    interface: typing.Optional[str] = None
+    member: typing.Optional[str] = None
+    error_name: typing.Optional[str] = None
+    reply_serial: typing.Optional[int] = None
+    destination: typing.Optional[str] = None
+    sender: typing.Optional[str] = None
+    signature: str = ""
+    body: typing.List[typing.Any] = dataclasses.field(default_factory=list)
+    flags: int = 0
+
+    __HEADER_FIELDS = (
+        # (code, attribute, signature)
+        (1, "path", "o"),
+        (2, "interface", "s"),
+        (3, "member", "s"),
+        (4, "error_name", "s"),
+        (5, "reply_serial", "u"),
+        (6, "destination", "s"),
+        (7, "sender", "s"),
+        (8, "signature", "g"),
+    )
+    __PROTOCOL_VERSION = 1
+    # Endianness, type, flags, version, body length, serial, fields length
+    __FIXED_HEADER_SIZE = 16
+
+    def encode(self) -> bytes:
+        body = marshal(self.signature, self.body) if self.signature else b""
+        header_fields = [
+            (code, DBusVariant(field_signature, getattr(self, attribute)))
+            for code, attribute, field_signature in self.__HEADER_FIELDS
+            if getattr(self, attribute)
+        ]
+        writer = _Writer()
+        for field_signature, value in (
+            ("y", ord("l")),
+            ("y", self.message_type),
+            ("y", self.flags),
+            ("y", self.__PROTOCOL_VERSION),
+            ("u", len(body)),
+            ("u", self.serial),
+            ("a(yv)", header_fields),
+        ):
+            writer.write(field_signature, value)
+        writer.align(8)
+        return bytes(writer.buffer) + body
+
+    @classmethod
+    def decode(cls, data: bytes) -> "DBusMessage":
+        endianness = "<" if data[0:1] == b"l" else ">"
+        reader = _Reader(data, endianness=endianness, offset=1)
+        message_type, flags, _ = (reader.read("y") for _ in range(3))
+        body_length = reader.read("u")
+        serial = reader.read("u")
+        fields = dict(reader.read("a(yv)"))
+        reader.align(8)
+        message = cls(message_type, serial=serial, flags=flags)
+        for code, attribute, _ in cls.__HEADER_FIELDS:
+            if code in fields:
+                setattr(message, attribute, fields[code].value)
+        if message.signature:
+            message.body = unmarshal(
+                message.signature,
+                data[reader.pos : reader.pos + body_length],
+                endianness=endianness,
+            )
+        return message
+
+    @classmethod
+    def read_from(cls, sock: socket.socket) -> "DBusMessage":
+        """
+        Reads a whole message from a connected D-Bus socket.
+        :param sock: The socket.
+        :return: The message.
+        """
+        fixed_header = cls.__recv_exactly(sock, cls.__FIXED_HEADER_SIZE)
+        endianness = "<" if fixed_header[0:1] == b"l" else ">"
+        body_length, _, fields_length = struct.unpack(
+            endianness + "III", fixed_header[4:]
+        )
+        header_length = cls.__FIXED_HEADER_SIZE + fields_length
+        header_length += -header_length % 8
+        return cls.decode(
+            fixed_header
+            + cls.__recv_exactly(
+                sock, header_length - cls.__FIXED_HEADER_SIZE + body_length
+            )
+        )
+
+    @staticmethod
+    def __recv_exactly(sock: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("D-Bus connection closed")
+            data.extend(chunk)
+        return bytes(data)
+
+
+class DBusConnection:
+    """
+    Minimal, blocking, D-Bus client connection, able to make method
+    calls through a unix socket using only the standard library.
+    Safe to share between threads, calls are serialized. A call that
+    fails halfway, i.e. timed out, closes the connection, as the rest of
+    its reply would be taken as the reply of the next call.
+    """
+
+    SYSTEM_BUS_DEFAULT_ADDRESS = "unix:path=/var/run/dbus/system_bus_socket"
+    __DBUS_BUS_NAME = "org.freedesktop.DBus"
+    __DBUS_PATH = "/org/freedesktop/DBus"
+    __DBUS_PROPERTIES_INTERFACE = "org.freedesktop.DBus.Properties"
+
+    def __init__(self, sock: socket.socket, timeout_secs: float = 25.0):
+        self.__sock = sock
+        self.__sock.settimeout(timeout_secs)
+        self.__lock = threading.Lock()
+        self.__serial = 0
+        self.__broken_error: typing.Optional[str] = None
+        self.__authenticate()
+        self.unique_name = self.call(
+            self.__DBUS_BUS_NAME, self.__DBUS_PATH, self.__DBUS_BUS_NAME, "Hello"
+        )[0]
+
+    @classmethod
+    def system_bus(cls, timeout_secs: float = 25.0) -> "DBusConnection":
+        """
+        Connects to the system bus.
+        :param timeout_secs: Max time to wait for each reply.
+        :return: The connection.
+        """
+        return cls.connect(
+            os.environ.get("DBUS_SYSTEM_BUS_ADDRESS", cls.SYSTEM_BUS_DEFAULT_ADDRESS),
+            timeout_secs=timeout_secs,
+        )
+
+    @classmethod
+    def connect(cls, address: str, timeout_secs: float = 25.0) -> "DBusConnection":
+        """
+        Connects to the bus of the given address. Only unix sockets are supported.
+        :param address: The D-Bus address, i.e. unix:path=/run/dbus/system_bus_socket.
+        :param timeout_secs: Max time to wait for each reply.
+        :return: The connection.
+        """
+        for address_entry in address.split(";"):
+            transport, _, params = address_entry.partition(":")
+            options = dict(
+                param.split("=", 1) for param in params.split(",") if "=" in param
+            )
+            if transport != "unix":
+                continue
+            if "path" in options:
+                sock_address = options["path"]
+            elif "abstract" in options:
+                sock_address = "\0" + options["abstract"]
+            else:
+                continue
+
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(sock_address)
+                return cls(sock, timeout_secs=timeout_secs)
+            except BaseException:
+                sock.close()
+                raise
+
+        raise ValueError(f"Unsupported D-Bus address {address}")
+
+    def close(self):
+        self.__sock.close()
+
+    def __enter__(self) -> "DBusConnection":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __authenticate(self):
+        uid_hex = str(os.getuid()).encode().hex()
+        self.__sock.sendall(b"\0AUTH EXTERNAL " + uid_hex.encode() + b"\r\n")
+        response = bytearray()
+        while not response.endswith(b"\r\n"):
+            chunk = self.__sock.recv(1)
+            if not chunk:
+                raise ConnectionError("D-Bus connection closed while authenticating")
+            response.extend(chunk)
+        if not response.startswith(b"OK"):
+            raise ConnectionError(
+                f"D-Bus authentication rejected: {response.decode().strip()}"
+            )
+        self.__sock.sendall(b"BEGIN\r\n")
+
+    def call(
+        self,
+        destination: str,
+        path: str,
+        interface: str,
+        member: str,
+        signature: str = "",
+        args: typing.Sequence[typing.Any] = (),
+    ) -> typing.List[typing.Any]:
+        """
+        Calls a method and waits for its reply.
+        :param destination: The bus name of the peer.
+        :param path: The path of the object.
+        :param interface: The interface of the method.
+        :param member: The method name.
+        :param signature: The signature of the arguments.
+        :param args: The arguments.
+        :return: The list of values returned by the method.
+        """
+        with self.__lock:
+            if self.__broken_error:
+                raise DBusCallException(
+                    "D-Bus connection closed by a previous failed call",
+                    error=self.__broken_error,
+                    destination=destination,
+                    path=path,
+                    member=member,
+                )
+            self.__serial += 1
+            serial = self.__serial
+            request = DBusMessage(
+                DBUS_MESSAGE_TYPE_METHOD_CALL,
+                serial=serial,
+                path=path,
+                interface=interface,
+                member=member,
+                destination=destination,
+                signature=signature,
+                body=list(args),
+            )
+            data = request.encode()
+            try:
+                self.__sock.sendall(data)
+                while True:
+                    reply = DBusMessage.read_from(self.__sock)
+                    # Skip signals and anything else not replying this call
+                    if reply.reply_serial == serial and reply.message_type in (
+                        DBUS_MESSAGE_TYPE_METHOD_RETURN,
+                        DBUS_MESSAGE_TYPE_ERROR,
+                    ):
+                        break
+            except (OSError, ValueError, struct.error) as err:
+                # The stream is out of sync, it cannot be used anymore
+                self.__broken_error = str(err) or type(err).__name__
+                self.__sock.close()
+                raise DBusCallException(
+                    "D-Bus call failed",
+                    error=self.__broken_error,
+                    destination=destination,
+                    path=path,
+                    member=member,
+                ) from err
+
+        if reply.message_type == DBUS_MESSAGE_TYPE_ERROR:
+            raise DBusCallException(
+                "D-Bus call returned an error",
+                name=reply.error_name,
+                error=(
+                    reply.body[0]
+                    if reply.body and isinstance(reply.body[0], str)
+                    else None
+                ),
+                destination=destination,
+                path=path,
+                member=member,
+            )
+        return reply.body
+
+    def get_property(
+        self, destination: str, path: str, interface: str, name: str
+    ) -> typing.Any:
+        return self.call(
+            destination,
+            path,
+            self.__DBUS_PROPERTIES_INTERFACE,
+            "Get",
+            signature="ss",
+            args=(interface, name),
+        )[0].value
+
+    def get_all_properties(
+        self, destination: str, path: str, interface: str
+    ) -> typing.Dict[str, typing.Any]:
+        return {
+            name: variant.value
+            for name, variant in self.call(
+                destination,
+                path,
+                self.__DBUS_PROPERTIES_INTERFACE,
+                "GetAll",
+                signature="s",
+                args=(interface,),
+            )[0].items()
+        }
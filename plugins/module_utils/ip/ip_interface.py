@@ -3,7 +3,10 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import collections.abc
+import dataclasses
 import json
+import threading
 import typing
 
 from ansible_collections.pbtn.common.plugins.module_utils import (
@@ -11,62 +14,271 @@ from ansible_collections.pbtn.common.plugins.module_utils import (
 )
 
 
-class IPAddrData(dict):
+class _SlottedRecord:
+    """
+    Copy and pickle support of frozen dataclasses with slots, see
+    _slotted. The default state restore assigns the fields, and frozen
+    dataclasses reject it.
+    """
+
+    __slots__ = ()
+
+    def __getstate__(self) -> typing.Tuple[typing.Any, ...]:
+        return tuple(getattr(self, field) for field in self.__slots__)
+
+    def __setstate__(self, state: typing.Tuple[typing.Any, ...]):
+        for field, value in zip(self.__slots__, state):
+            object.__setattr__(self, field, value)
+
+
+_RecordT = typing.TypeVar("_RecordT", bound=_SlottedRecord)
+
+
+def _slotted(cls: typing.Type[_RecordT]) -> typing.Type[_RecordT]:
+    # Backport of dataclass(slots=True), that needs Python 3.10: the class
+    # is built again with a slot per field, as slots cannot be added to an
+    # existing class. Fields are declared as usual, dataclasses.field too
+    field_names = tuple(field.name for field in dataclasses.fields(cls))
+    cls_dict = {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in field_names + ("__dict__", "__weakref__")
+    }
+    cls_dict["__slots__"] = field_names
+    cls_dict["__qualname__"] = cls.__qualname__
+    return typing.cast(
+        typing.Type[_RecordT], type(cls)(cls.__name__, cls.__bases__, cls_dict)
+    )
+
+
+@_slotted
+@dataclasses.dataclass(frozen=True)
+class IPAddrData(_SlottedRecord):
+    """
+    The fields of an `ip -j addr` element the collection uses. The
+    whole element is only kept, as raw, if asked to.
+    """
+
+    ADDR_DETAILS_IFINDEX = "ifindex"
     ADDR_DETAILS_IFNAME = "ifname"
     ADDR_DETAILS_LINK = "link"
     ADDR_DETAILS_ADDR_INFO = "addr_info"
+    ADDR_DETAILS_ADDR_INFO_FAMILY = "family"
     ADDR_DETAILS_ADDR_INFO_LOCAL_IP = "local"
+    ADDR_DETAILS_ADDR_INFO_PREFIX_LEN = "prefixlen"
+    __ADDR_INFO_FIELDS = (
+        ADDR_DETAILS_ADDR_INFO_FAMILY,
+        ADDR_DETAILS_ADDR_INFO_LOCAL_IP,
+        ADDR_DETAILS_ADDR_INFO_PREFIX_LEN,
+    )
 
-    @property
-    def if_name(self) -> str:
-        return self.get(self.ADDR_DETAILS_IFNAME, None)
+    if_name: str
+    link: typing.Optional[str]
+    # Compared, but not hashed, as lists and dicts cannot be
+    addr_info: typing.List[typing.Dict[str, typing.Any]] = dataclasses.field(hash=False)
+    # The same element, kept or not, gives equal records
+    raw: typing.Optional[typing.Dict[str, typing.Any]] = dataclasses.field(
+        compare=False, hash=False
+    )
+
+    @classmethod
+    def from_dict(
+        cls, data: typing.Dict[str, typing.Any], keep_raw: bool = False
+    ) -> "IPAddrData":
+        # Only the fields netlink decodes too, so both backends match
+        addr_info = data.get(cls.ADDR_DETAILS_ADDR_INFO, None)
+        return cls(
+            data.get(cls.ADDR_DETAILS_IFNAME, None),
+            data.get(cls.ADDR_DETAILS_LINK, None),
+            (
+                [
+                    {
+                        field: info[field]
+                        for field in cls.__ADDR_INFO_FIELDS
+                        if field in info
+                    }
+                    for info in addr_info
+                ]
+                if isinstance(addr_info, list)
+                else addr_info
+            ),
+            data if keep_raw else None,
+        )
 
-    @property
-    def link(self) -> str:
-        return self.get(self.ADDR_DETAILS_LINK, None)
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the record as an `ip -j addr` element, the raw one if kept.
+        :return: The element.
+        """
+        if self.raw is not None:
+            return self.raw
+        data = {self.ADDR_DETAILS_IFNAME: self.if_name}
+        if self.link:
+            data[self.ADDR_DETAILS_LINK] = self.link
+        data[self.ADDR_DETAILS_ADDR_INFO] = self.addr_info
+        return data
 
-    @property
-    def addr_info(self) -> typing.List[typing.Dict[str, typing.Any]]:
-        return self.get(self.ADDR_DETAILS_ADDR_INFO, None)
 
+@_slotted
+@dataclasses.dataclass(frozen=True)
+class IPLinkData(_SlottedRecord):
+    """
+    The fields of an `ip -detail -j link` element the collection uses.
+    The whole element, stats included, is only kept, as raw, if asked to.
+    """
 
-class IPLinkData(dict):
+    LINK_DETAILS_IFINDEX = "ifindex"
     LINK_DETAILS_IFNAME = "ifname"
     LINK_DETAILS_LINK = "link"
     LINK_DETAILS_ADDR = "address"
     LINK_DETAILS_LINK_INFO = "linkinfo"
     LINK_DETAILS_INFO_KIND = "info_kind"
 
-    @property
-    def if_name(self) -> str:
-        return self.get(self.LINK_DETAILS_IFNAME, None)
+    if_name: str
+    link: typing.Optional[str]
+    address: typing.Optional[str]
+    link_kind: typing.Optional[str]
+    # The same element, kept or not, gives equal records
+    raw: typing.Optional[typing.Dict[str, typing.Any]] = dataclasses.field(
+        compare=False, hash=False
+    )
 
-    @property
-    def link(self) -> str:
-        return self.get(self.LINK_DETAILS_LINK, None)
-
-    @property
-    def address(self) -> str:
-        addr = self.get(self.LINK_DETAILS_ADDR, None)
-        return addr.lower() if addr else addr
-
-    @property
-    def link_kind(self) -> str:
-        return self.get(self.LINK_DETAILS_LINK_INFO, {}).get(
-            self.LINK_DETAILS_INFO_KIND, None
+    @classmethod
+    def from_dict(
+        cls, data: typing.Dict[str, typing.Any], keep_raw: bool = False
+    ) -> "IPLinkData":
+        address = data.get(cls.LINK_DETAILS_ADDR, None)
+        return cls(
+            data.get(cls.LINK_DETAILS_IFNAME, None),
+            data.get(cls.LINK_DETAILS_LINK, None),
+            address.lower() if address else address,
+            (data.get(cls.LINK_DETAILS_LINK_INFO, None) or {}).get(
+                cls.LINK_DETAILS_INFO_KIND, None
+            ),
+            data if keep_raw else None,
         )
 
+    def to_dict(self) -> typing.Dict[str, typing.Any]:
+        """
+        Returns the record as an `ip -detail -j link` element, the raw
+        one if kept.
+        :return: The element.
+        """
+        if self.raw is not None:
+            return self.raw
+        data = {self.LINK_DETAILS_IFNAME: self.if_name}
+        if self.link:
+            data[self.LINK_DETAILS_LINK] = self.link
+        if self.address:
+            data[self.LINK_DETAILS_ADDR] = self.address
+        if self.link_kind:
+            data[self.LINK_DETAILS_LINK_INFO] = {
+                self.LINK_DETAILS_INFO_KIND: self.link_kind
+            }
+        return data
+
 
 class IPInterface:
     __FETCH_LINKS_CMD = ["ip", "-detail", "-j", "link"]
+    __FETCH_ADDRS_CMD = ["ip", "-j", "addr"]
 
-    def __init__(self, runner_fn: module_command_utils.CommandRunnerFn):
+    def __init__(
+        self, runner_fn: module_command_utils.CommandRunnerFn, keep_raw: bool = False
+    ):
         self.__runner_fn = runner_fn
+        self._keep_raw = keep_raw
 
     def get_ip_links(self) -> typing.List[IPLinkData]:
-        return [
-            IPLinkData(data)
-            for data in json.loads(
-                self.__runner_fn(self.__FETCH_LINKS_CMD, check=True).stdout
-            )
-        ]
+        return self.__fetch_records(
+            self.__FETCH_LINKS_CMD, IPLinkData.LINK_DETAILS_IFINDEX, IPLinkData
+        )
+
+    def get_ip_addrs(self) -> typing.List[IPAddrData]:
+        return self.__fetch_records(
+            self.__FETCH_ADDRS_CMD, IPAddrData.ADDR_DETAILS_IFINDEX, IPAddrData
+        )
+
+    def __fetch_records(
+        self,
+        cmd: typing.List[str],
+        key_field: str,
+        record_type: typing.Type[typing.Union[IPLinkData, IPAddrData]],
+    ) -> typing.List[typing.Any]:
+        keep_raw = self._keep_raw
+
+        def object_hook(data: typing.Dict[str, typing.Any]) -> typing.Any:
+            # Nested objects are decoded first; only the elements of the
+            # top level list carry the index. The rest of the element is
+            # dropped right away, unless raw is wanted
+            if key_field in data:
+                return record_type.from_dict(data, keep_raw=keep_raw)
+            return data
+
+        return json.loads(
+            self.__runner_fn(cmd, check=True).stdout, object_hook=object_hook
+        )
+
+
+class IPLinksTable(collections.abc.Sequence):
+    """
+    Cached view of the links of the host, fetched with a single ip call
+    the first time it's needed and indexed by interface name and MAC.
+    It must be invalidated each time an interface is created or deleted.
+    Safe to share between threads.
+    """
+
+    def __init__(self, ip_iface: IPInterface):
+        self.__ip_iface = ip_iface
+        self.__lock = threading.RLock()
+        self.__links: typing.Optional[typing.List[IPLinkData]] = None
+        self.__links_by_name: typing.Dict[str, IPLinkData] = {}
+        self.__links_by_address: typing.Dict[str, typing.List[IPLinkData]] = {}
+
+    def __load(self) -> typing.List[IPLinkData]:
+        with self.__lock:
+            if self.__links is None:
+                links = self.__ip_iface.get_ip_links()
+                links_by_address: typing.Dict[str, typing.List[IPLinkData]] = {}
+                for link in links:
+                    if link.address:
+                        links_by_address.setdefault(link.address, []).append(link)
+                self.__links_by_name = {link.if_name: link for link in links}
+                self.__links_by_address = links_by_address
+                self.__links = links
+            return self.__links
+
+    def get_by_name(self, if_name: str) -> typing.Optional[IPLinkData]:
+        """
+        Returns the link of the given interface.
+        :param if_name: The name of the interface.
+        :return: The link data or None if there is no such interface.
+        """
+        with self.__lock:
+            self.__load()
+            return self.__links_by_name.get(if_name, None)
+
+    def get_by_address(self, address: str) -> typing.List[IPLinkData]:
+        """
+        Returns the links with the given MAC. Child interfaces, like VLANs,
+        may share the MAC of their parent, so there may be more than one.
+        :param address: The MAC address, in any case.
+        :return: The list of links with the MAC, in the order ip reported them.
+        """
+        with self.__lock:
+            self.__load()
+            return self.__links_by_address.get(address.lower(), [])[:]
+
+    def invalidate(self):
+        """
+        Drops the cached links, so they are fetched again on the next read.
+        """
+        with self.__lock:
+            self.__links = None
+            self.__links_by_name = {}
+            self.__links_by_address = {}
+
+    def __getitem__(self, index):
+        return self.__load()[index]
+
+    def __len__(self) -> int:
+        return len(self.__load())
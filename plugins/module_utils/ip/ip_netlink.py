@@ -0,0 +1,419 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import socket
+import struct
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    module_command_utils,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_interface,
+)
+
+
+class NetlinkException(Exception):
+    pass
+
+
+NETLINK_ROUTE = 0
+
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+
+NLM_F_REQUEST = 0x1
+NLM_F_DUMP_INTR = 0x10
+NLM_F_DUMP = 0x300
+
+RTM_NEWLINK = 16
+RTM_GETLINK = 18
+RTM_NEWADDR = 20
+RTM_GETADDR = 22
+
+IFLA_ADDRESS = 1
+IFLA_IFNAME = 3
+IFLA_LINK = 5
+IFLA_LINKINFO = 18
+IFLA_LINK_NETNSID = 37
+
+IFLA_INFO_KIND = 1
+
+IFA_ADDRESS = 1
+IFA_LOCAL = 2
+
+NLMSG_HEADER = struct.Struct("=IHHII")
+IFINFOMSG = struct.Struct("=BxHiII")
+IFADDRMSG = struct.Struct("=BBBBI")
+RTATTR = struct.Struct("=HH")
+
+_NLMSG_ERROR_CODE = struct.Struct("=i")
+_U32 = struct.Struct("=I")
+
+# Types may carry the nested and byte order flags, the kernel sets them
+_NLA_TYPE_MASK = 0x3FFF
+
+# Tunnels whose link address is an IP, iproute2 prints it as such
+_IP_ADDRESS_LINK_TYPES = {
+    768: socket.AF_INET,  # ipip
+    769: socket.AF_INET6,  # tunnel6
+    776: socket.AF_INET,  # sit
+    778: socket.AF_INET,  # gre
+    823: socket.AF_INET6,  # ip6gre
+}
+
+_ADDR_FAMILIES = {
+    socket.AF_INET: "inet",
+    socket.AF_INET6: "inet6",
+}
+
+
+class NetlinkRouteSocket:
+    """
+    Minimal rtnetlink client, only able to dump the kernel tables.
+    Messages are returned without their header, as they come, so the
+    caller decodes only what it needs.
+    """
+
+    # The kernel fills dump datagrams up to 32KiB, or up to the size of
+    # the first read buffer if bigger
+    __RECV_BUFFER_SIZE = 64 * 1024
+    # Dumps are interrupted if the table changes while dumping it
+    __DUMP_ATTEMPTS = 3
+
+    def __init__(self, sock: socket.socket):
+        self.__sock = sock
+        self.__seq = 0
+        self.__recv_buffer = bytearray(self.__RECV_BUFFER_SIZE)
+
+    @classmethod
+    def open(cls) -> "NetlinkRouteSocket":
+        sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_ROUTE)
+        try:
+            sock.bind((0, 0))
+        except OSError:
+            sock.close()
+            raise
+        return cls(sock)
+
+    def close(self):
+        self.__sock.close()
+
+    def __enter__(self) -> "NetlinkRouteSocket":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def dump(
+        self, msg_type: int, family_header: bytes
+    ) -> typing.List[typing.Tuple[int, memoryview]]:
+        """
+        Dumps a kernel table.
+        :param msg_type: The RTM_GET* type of the table.
+        :param family_header: The family header of the request, i.e. an
+                              ifinfomsg for RTM_GETLINK.
+        :return: The type and the payload of each returned message.
+        """
+        for _ in range(self.__DUMP_ATTEMPTS):
+            self.__seq += 1
+            self.__sock.send(
+                NLMSG_HEADER.pack(
+                    NLMSG_HEADER.size + len(family_header),
+                    msg_type,
+                    NLM_F_REQUEST | NLM_F_DUMP,
+                    self.__seq,
+                    0,
+                )
+                + family_header
+            )
+            messages, interrupted = self.__read_dump(self.__seq)
+            if not interrupted:
+                return messages
+
+        raise NetlinkException(
+            f"Netlink dump of type {msg_type} interrupted {self.__DUMP_ATTEMPTS} times"
+        )
+
+    def __read_dump(
+        self, seq: int
+    ) -> typing.Tuple[typing.List[typing.Tuple[int, memoryview]], bool]:
+        messages = []
+        interrupted = False
+        while True:
+            data = self.__recv()
+            offset = 0
+            while offset + NLMSG_HEADER.size <= len(data):
+                msg_len, msg_type, flags, msg_seq, _ = NLMSG_HEADER.unpack_from(
+                    data, offset
+                )
+                if msg_len < NLMSG_HEADER.size or offset + msg_len > len(data):
+                    raise NetlinkException("Malformed netlink message received")
+
+                payload = data[offset + NLMSG_HEADER.size : offset + msg_len]
+                offset += _align(msg_len)
+                if msg_seq != seq:
+                    # Leftovers of a previous, interrupted, dump
+                    continue
+
+                interrupted = interrupted or bool(flags & NLM_F_DUMP_INTR)
+                if msg_type == NLMSG_DONE:
+                    return messages, interrupted
+                if msg_type == NLMSG_ERROR:
+                    (error,) = _NLMSG_ERROR_CODE.unpack_from(payload)
+                    if error:
+                        raise OSError(-error, os.strerror(-error))
+                    return messages, interrupted
+                messages.append((msg_type, payload))
+
+    def __recv(self) -> memoryview:
+        # MSG_TRUNC makes recv return the real size of the datagram
+        size = self.__sock.recv_into(self.__recv_buffer, 0, socket.MSG_TRUNC)
+        if size == 0:
+            raise NetlinkException("Netlink socket closed")
+        if size > len(self.__recv_buffer):
+            raise NetlinkException(
+                f"Netlink message of {size} bytes exceeds the receive buffer"
+            )
+        # Copied, as the buffer is reused by the next read
+        return memoryview(bytes(memoryview(self.__recv_buffer)[:size]))
+
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+
+def parse_attributes(data: memoryview, offset: int = 0) -> typing.Dict[int, memoryview]:
+    """
+    Parses the rtattr list that starts at the given offset.
+    :param data: The payload of the message or of a nested attribute.
+    :param offset: The offset of the first attribute.
+    :return: The value of each attribute, by type.
+    """
+    attributes = {}
+    while offset + RTATTR.size <= len(data):
+        attr_len, attr_type = RTATTR.unpack_from(data, offset)
+        if attr_len < RTATTR.size or offset + attr_len > len(data):
+            raise NetlinkException("Malformed netlink attribute received")
+        attributes[attr_type & _NLA_TYPE_MASK] = data[
+            offset + RTATTR.size : offset + attr_len
+        ]
+        offset += _align(attr_len)
+    return attributes
+
+
+def _attr_str(value: memoryview) -> str:
+    return bytes(value).split(b"\0", 1)[0].decode("utf-8", errors="replace")
+
+
+def _attr_link_address(value: memoryview, link_type: int) -> str:
+    family = _IP_ADDRESS_LINK_TYPES.get(link_type, None)
+    if family:
+        try:
+            return socket.inet_ntop(family, bytes(value))
+        except ValueError:
+            pass
+    return ":".join(f"{byte:02x}" for byte in value)
+
+
+def decode_links(
+    messages: typing.List[typing.Tuple[int, memoryview]],
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    Decodes an RTM_GETLINK dump to the `ip -detail -j link` fields
+    IPLinkData uses, with the same values iproute2 gives them.
+    :param messages: The messages of the dump.
+    :return: The links, in the order the kernel returned them.
+    """
+    links = []
+    names_by_index = {}
+    link_indexes = {}
+    for msg_type, payload in messages:
+        if msg_type != RTM_NEWLINK:
+            continue
+        _, ifi_type, ifi_index, _, _ = IFINFOMSG.unpack_from(payload)
+        attributes = parse_attributes(payload, IFINFOMSG.size)
+        link = {
+            ip_interface.IPLinkData.LINK_DETAILS_IFINDEX: ifi_index,
+            ip_interface.IPLinkData.LINK_DETAILS_IFNAME: (
+                _attr_str(attributes[IFLA_IFNAME])
+                if IFLA_IFNAME in attributes
+                else None
+            ),
+        }
+        # Like iproute2: null for 0 (i.e. tunnels) and not printed by
+        # name if the peer lives in another namespace
+        if IFLA_LINK in attributes and IFLA_LINK_NETNSID not in attributes:
+            link_index = _U32.unpack_from(attributes[IFLA_LINK])[0]
+            if link_index:
+                link_indexes[len(links)] = link_index
+            else:
+                link[ip_interface.IPLinkData.LINK_DETAILS_LINK] = None
+        if IFLA_ADDRESS in attributes:
+            link[ip_interface.IPLinkData.LINK_DETAILS_ADDR] = _attr_link_address(
+                attributes[IFLA_ADDRESS], ifi_type
+            )
+        if IFLA_LINKINFO in attributes:
+            link_info = parse_attributes(attributes[IFLA_LINKINFO])
+            link[ip_interface.IPLinkData.LINK_DETAILS_LINK_INFO] = (
+                {
+                    ip_interface.IPLinkData.LINK_DETAILS_INFO_KIND: _attr_str(
+                        link_info[IFLA_INFO_KIND]
+                    )
+                }
+                if IFLA_INFO_KIND in link_info
+                else {}
+            )
+
+        names_by_index[ifi_index] = link[ip_interface.IPLinkData.LINK_DETAILS_IFNAME]
+        links.append(link)
+
+    for position, link_index in link_indexes.items():
+        # Same names iproute2 gives to unknown indexes
+        links[position][ip_interface.IPLinkData.LINK_DETAILS_LINK] = names_by_index.get(
+            link_index, f"if{link_index}"
+        )
+    return links
+
+
+def decode_addresses(
+    messages: typing.List[typing.Tuple[int, memoryview]],
+) -> typing.Dict[int, typing.List[typing.Dict[str, typing.Any]]]:
+    """
+    Decodes an RTM_GETADDR dump to the addr_info fields of `ip -j addr`
+    IPAddrData keeps.
+    :param messages: The messages of the dump.
+    :return: The addresses of each link, by link index, in the order the
+             kernel returned them.
+    """
+    addresses = {}
+    for msg_type, payload in messages:
+        if msg_type != RTM_NEWADDR:
+            continue
+        family, prefix_len, _, _, index = IFADDRMSG.unpack_from(payload)
+        if family not in _ADDR_FAMILIES:
+            continue
+        attributes = parse_attributes(payload, IFADDRMSG.size)
+        local = attributes.get(IFA_LOCAL, attributes.get(IFA_ADDRESS, None))
+        if local is None:
+            continue
+        addresses.setdefault(index, []).append(
+            {
+                ip_interface.IPAddrData.ADDR_DETAILS_ADDR_INFO_FAMILY: _ADDR_FAMILIES[
+                    family
+                ],
+                ip_interface.IPAddrData.ADDR_DETAILS_ADDR_INFO_LOCAL_IP: socket.inet_ntop(
+                    family, bytes(local)
+                ),
+                ip_interface.IPAddrData.ADDR_DETAILS_ADDR_INFO_PREFIX_LEN: prefix_len,
+            }
+        )
+    return addresses
+
+
+class NetlinkIPInterface(ip_interface.IPInterface):
+    """
+    IPInterface that reads the links and the addresses straight from
+    the kernel, through an rtnetlink socket, without spawning ip and
+    decoding its JSON output. Records match the iproute2 ones. If
+    netlink cannot be used, i.e. not on Linux or restricted by a seccomp
+    profile, that call falls back to iproute2 and the failure is
+    reported through warn_fn.
+    """
+
+    def __init__(
+        self,
+        runner_fn: module_command_utils.CommandRunnerFn,
+        socket_factory: typing.Callable[
+            [], NetlinkRouteSocket
+        ] = NetlinkRouteSocket.open,
+        keep_raw: bool = False,
+        warn_fn: typing.Optional[typing.Callable[[str], None]] = None,
+    ):
+        super().__init__(runner_fn, keep_raw=keep_raw)
+        self.__socket_factory = socket_factory
+        self.__warn_fn = warn_fn
+
+    def get_ip_links(self) -> typing.List[ip_interface.IPLinkData]:
+        try:
+            with self.__open_socket() as netlink_socket:
+                links = decode_links(
+                    netlink_socket.dump(RTM_GETLINK, self.__build_link_request())
+                )
+        except (OSError, NetlinkException) as err:
+            self.__report_fallback(err)
+            return super().get_ip_links()
+        return [
+            ip_interface.IPLinkData.from_dict(link, keep_raw=self._keep_raw)
+            for link in links
+        ]
+
+    def get_ip_addrs(self) -> typing.List[ip_interface.IPAddrData]:
+        try:
+            with self.__open_socket() as netlink_socket:
+                links = decode_links(
+                    netlink_socket.dump(RTM_GETLINK, self.__build_link_request())
+                )
+                addresses = decode_addresses(
+                    netlink_socket.dump(
+                        RTM_GETADDR,
+                        IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0),
+                    )
+                )
+        except (OSError, NetlinkException) as err:
+            self.__report_fallback(err)
+            return super().get_ip_addrs()
+        return [
+            ip_interface.IPAddrData.from_dict(
+                {
+                    **link,
+                    ip_interface.IPAddrData.ADDR_DETAILS_ADDR_INFO: addresses.get(
+                        link[ip_interface.IPAddrData.ADDR_DETAILS_IFINDEX], []
+                    ),
+                },
+                keep_raw=self._keep_raw,
+            )
+            for link in links
+        ]
+
+    def __open_socket(self) -> NetlinkRouteSocket:
+        try:
+            return self.__socket_factory()
+        except AttributeError as err:
+            # Platforms without netlink don't define its socket constants
+            raise NetlinkException(f"Netlink is not supported: {err}") from err
+
+    def __report_fallback(self, err: Exception):
+        if self.__warn_fn:
+            self.__warn_fn(f"Cannot query netlink, falling back to iproute2: {err}")
+
+    @staticmethod
+    def __build_link_request() -> bytes:
+        return IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0)
+
+
+IP_BACKEND_IPROUTE2 = "iproute2"
+IP_BACKEND_NETLINK = "netlink"
+IP_BACKENDS = (IP_BACKEND_IPROUTE2, IP_BACKEND_NETLINK)
+
+
+def build_ip_interface(
+    runner_fn: module_command_utils.CommandRunnerFn,
+    backend: str = IP_BACKEND_IPROUTE2,
+    warn_fn: typing.Optional[typing.Callable[[str], None]] = None,
+) -> ip_interface.IPInterface:
+    """
+    Builds the IPInterface of the given backend, i.e. the one the modules
+    take as their ip_backend option.
+    :param runner_fn: The runner iproute2 is called with.
+    :param backend: The backend, iproute2 or netlink.
+    :param warn_fn: Where netlink reports its fallbacks to iproute2.
+    :return: The IPInterface.
+    """
+    if backend == IP_BACKEND_NETLINK:
+        # Falls back to iproute2 by itself, warning, if netlink fails
+        return NetlinkIPInterface(runner_fn, warn_fn=warn_fn)
+
+    return ip_interface.IPInterface(runner_fn)
@@ -3,10 +3,10 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 import collections.abc
+import dataclasses
 import ipaddress
 import re
 import typing
-import uuid
 
 from ansible_collections.pbtn.common.plugins.module_utils import (
     exceptions,
@@ -30,7 +30,12 @@ class NmcliLinkResolutionException(exceptions.BaseInfraException):
         candidates: typing.List[ip_interface.IPLinkData] = None,
     ) -> None:
         super().__init__(msg)
-        self.candidates = candidates
+        # Reported as the ip elements, with their keys
+        self.candidates = (
+            [candidate.to_dict() for candidate in candidates]
+            if candidates is not None
+            else None
+        )
 
 
 class IPRouteConfig(typing.Generic[TAdd, TNet]):
@@ -274,7 +279,7 @@ class InterfaceIdentifier:
     def __init__(
         self,
         str_identifier,
-        ip_links: typing.List[ip_interface.IPLinkData],
+        ip_links: typing.Sequence[ip_interface.IPLinkData],
     ):
         self.__str_identifier = str_identifier
         self.__ip_links = ip_links
@@ -298,11 +303,19 @@ class InterfaceIdentifier:
     def __resolve_from_mac(self) -> str:
         target_mac = self.__str_identifier.lower()
 
+        candidates = (
+            self.__ip_links.get_by_address(target_mac)
+            if isinstance(self.__ip_links, ip_interface.IPLinksTable)
+            else [
+                link_data
+                for link_data in self.__ip_links
+                if link_data.address == target_mac
+            ]
+        )
         results = [
             link_data
-            for link_data in self.__ip_links
-            if link_data.address == target_mac
-            and self.__is_mac_resolvable_link(link_data)
+            for link_data in candidates
+            if self.__is_mac_resolvable_link(link_data)
         ]
         if len(results) != 1:
             raise NmcliLinkResolutionException(
@@ -388,7 +401,7 @@ class BaseConnectionConfig:
 
     def __parse_config(
         self,
-        ip_links: typing.List[ip_interface.IPLinkData],
+        ip_links: typing.Sequence[ip_interface.IPLinkData],
     ):
         # There is no real constraint about the name, but some basic
         # rules seem correct:
@@ -527,7 +540,7 @@ class VlanBaseConnectionConfig(BaseConnectionConfig):
 
     def __parse_config(
         self,
-        ip_links: typing.List[ip_interface.IPLinkData],
+        ip_links: typing.Sequence[ip_interface.IPLinkData],
     ):
         vlan_config = self._raw_config.get(self.FIELD_VLAN, None)
         if not vlan_config:
@@ -646,8 +659,8 @@ class ConnectionConfigFactory:
         FIELD_TYPE_VAL_BRIDGE: BridgeConnectionConfig,
     }
 
-    def __init__(self, ip_iface: ip_interface.IPInterface):
-        self.__ip_links = ip_iface.get_ip_links()
+    def __init__(self, ip_links: ip_interface.IPLinksTable):
+        self.__ip_links = ip_links
 
     def build_slave_connection(
         self,
@@ -701,6 +714,22 @@ class ConnectionConfigFactory:
         )
 
 
+@dataclasses.dataclass(frozen=True)
+class ConnectionsDependencyGraph:
+    """
+    The dependency graph of the main connections of a configuration, by
+    connection name. It only depends on the configuration, so it's the same
+    between runs and it can be used as a key, i.e. to cache plans.
+    """
+
+    # Connection names, in the order they are configured
+    nodes: typing.Tuple[str, ...] = ()
+    # (dependency, dependant) connection name pairs
+    edges: typing.Tuple[typing.Tuple[str, str], ...] = ()
+    # Connection names of each level, see ConnectionsConfigurationHandler.levels
+    levels: typing.Tuple[typing.Tuple[str, ...], ...] = ()
+
+
 class ConnectionsConfigurationHandler:
     def __init__(
         self,
@@ -715,13 +744,20 @@ class ConnectionsConfigurationHandler:
 
         self.__connection_config_factory = connection_config_factory
         self.__conn_configs: typing.List[MainConnectionConfig] = []
+        self.__conn_levels: typing.List[typing.List[MainConnectionConfig]] = []
+        self.__dependency_graph = ConnectionsDependencyGraph()
 
     def parse(self):
         mapped_connections = [
             self.__connection_config_factory.build_connection(conn_name, conn_data)
             for conn_name, conn_data in self.__raw_config.items()
         ]
-        self.__conn_configs = self.__sort_connections(mapped_connections)
+        self.__conn_levels, self.__dependency_graph = self.__sort_connections_levels(
+            mapped_connections
+        )
+        self.__conn_configs = [
+            conn_config for level in self.__conn_levels for conn_config in level
+        ]
         self.__validate_connections()
 
     @property
@@ -729,89 +765,129 @@ class ConnectionsConfigurationHandler:
         # Return a copy of the list itself
         return self.__conn_configs[:]
 
-    @classmethod
-    def __sort_conn_ifaces(
-        cls, interfaces_dependencies_graph, graph_iface, visited, ifaces_stack
-    ):
-        visited.append(graph_iface)
-
-        for element in interfaces_dependencies_graph[graph_iface]:
-            if element not in visited:
-                cls.__sort_conn_ifaces(
-                    interfaces_dependencies_graph, element, visited, ifaces_stack
-                )
-        ifaces_stack.append(graph_iface)
+    @property
+    def levels(self) -> typing.List[typing.List[MainConnectionConfig]]:
+        """
+        Returns the sorted connections grouped in dependency levels.
+        Connections of a level only depend on connections of the
+        previous levels, so the ones in the same level are independent.
+        Each level keeps the order of the connections property.
+        :return: The list of levels
+        """
+        # Return a copy of the lists themselves
+        return [level[:] for level in self.__conn_levels]
 
-    @classmethod
-    def __sort_connections(cls, conn_configs: typing.List[MainConnectionConfig]):
-        # Prepare the dependency graph
-        interfaces_dependencies_graph = {}
-        graph_ifaces_set = set()
-        ifaces_to_conn_dict: typing.Dict[str, MainConnectionConfig] = {}
+    @property
+    def dependency_graph(self) -> ConnectionsDependencyGraph:
+        return self.__dependency_graph
 
+    @staticmethod
+    def __sort_connections_levels(
+        conn_configs: typing.List[MainConnectionConfig],
+    ) -> typing.Tuple[
+        typing.List[typing.List[MainConnectionConfig]], ConnectionsDependencyGraph
+    ]:
         # The interface field is the one used for computing dependency
         # It's not mandatory and, if not provided, that connection
         # cannot be used as a dependency, which is fine.
-        non_iface_connections = []
-        for conn_config in conn_configs:
-            # All connections that have no interface field neither dependencies are
-            # created at the end. The shorting algorithm doesn't apply to them
-            # If it has no interface and it contains dependencies (maybe from slaves),
-            # we will generate an ID.
-            if not conn_config.interface and not conn_config.depends_on:
-                non_iface_connections.append(conn_config)
-                continue
-
-            ifname = (
-                conn_config.interface.iface_name
-                if conn_config.interface
-                else str(uuid.uuid4())
-            )
-            if ifname not in interfaces_dependencies_graph:
-                interfaces_dependencies_graph[ifname] = []
-
-            # If the connection points to itself is not a dependency to other conn.
-            # It's safe to treat it as is an external provisioned one or like a connection
-            # that doesn't support dependencies like ethernet or wi-fi
-            if [ifname] != conn_config.depends_on:
-                interfaces_dependencies_graph[ifname].extend(conn_config.depends_on)
-                # This default to empty list is important, as interfaces like VLANs
-                # may reference a parent interface that is not part of this configuration
-                # because is managed outside
-                for iface_dependency in conn_config.depends_on:
-                    # Init the dependency to an empty list meaning it doesn't depend on anything
-                    if iface_dependency not in interfaces_dependencies_graph:
-                        interfaces_dependencies_graph[iface_dependency] = []
-
-                # As to apply the shorting algorithm, we need to know the
-                # list of elements to sort so, we save all the involved interfaces in a set
-                graph_ifaces_set.update(conn_config.depends_on)
-
-            graph_ifaces_set.add(ifname)
-            ifaces_to_conn_dict[ifname] = conn_config
-
-        visited = []
-        ifaces_stack = []
-        for graph_iface in graph_ifaces_set:
-            if graph_iface not in visited:
-                cls.__sort_conn_ifaces(
-                    interfaces_dependencies_graph,
-                    graph_iface,
-                    visited,
-                    ifaces_stack,
-                )
+        # All connections that have no interface field neither dependencies are
+        # created at the end, in their own level. The sorting doesn't apply to them
+        graph_conn_configs = [
+            conn_config
+            for conn_config in conn_configs
+            if conn_config.interface or conn_config.depends_on
+        ]
+        non_iface_connections = [
+            conn_config
+            for conn_config in conn_configs
+            if not conn_config.interface and not conn_config.depends_on
+        ]
 
-        sorted_conn_configs = [
-            ifaces_to_conn_dict[iface_name]
-            for iface_name in ifaces_stack
-            if iface_name in ifaces_to_conn_dict
+        # Each connection is a node, identified by its position. Slave
+        # interfaces are configured along with its main connection, so
+        # depending on them is depending on the main connection
+        iface_nodes: typing.Dict[str, int] = {}
+        for node, conn_config in enumerate(graph_conn_configs):
+            for conn_iface in [conn_config] + conn_config.slaves:
+                if conn_iface.interface:
+                    iface_nodes.setdefault(conn_iface.interface.iface_name, node)
+
+        # Dependencies not in the configuration are managed outside, and
+        # they don't delay the connection. The same applies to connections
+        # pointing to their own interfaces, like ethernet or bridges
+        node_dependencies = [
+            sorted(
+                {
+                    iface_nodes[iface_dependency]
+                    for iface_dependency in conn_config.depends_on
+                    if iface_dependency in iface_nodes
+                }
+                - {node},
+                key=lambda dependency: graph_conn_configs[dependency].name,
+            )
+            for node, conn_config in enumerate(graph_conn_configs)
+        ]
+        node_dependants: typing.List[typing.List[int]] = [
+            [] for _ in graph_conn_configs
         ]
+        pending_counts = []
+        for node, dependencies in enumerate(node_dependencies):
+            pending_counts.append(len(dependencies))
+            for dependency in dependencies:
+                node_dependants[dependency].append(node)
+
+        # Kahn's algorithm, a level at a time. The connections of a level only
+        # depend on the previous ones and keep the order of the configuration
+        levels: typing.List[typing.List[MainConnectionConfig]] = []
+        sorted_nodes: typing.List[int] = []
+        level_nodes = [node for node, count in enumerate(pending_counts) if not count]
+        while level_nodes:
+            levels.append([graph_conn_configs[node] for node in level_nodes])
+            sorted_nodes.extend(level_nodes)
+            next_level_nodes = []
+            for node in level_nodes:
+                for dependant in node_dependants[node]:
+                    pending_counts[dependant] -= 1
+                    if not pending_counts[dependant]:
+                        next_level_nodes.append(dependant)
+            level_nodes = sorted(next_level_nodes)
+
+        if len(sorted_nodes) != len(graph_conn_configs):
+            # Connections never released are in, or depend on, a cycle.
+            # Follow the unsorted dependencies till one repeats
+            cycle_path = []
+            path_positions: typing.Dict[int, int] = {}
+            node = next(node for node, count in enumerate(pending_counts) if count)
+            while node not in path_positions:
+                path_positions[node] = len(cycle_path)
+                cycle_path.append(node)
+                node = next(
+                    dependency
+                    for dependency in node_dependencies[node]
+                    if pending_counts[dependency]
+                )
+            cycle_names = [
+                graph_conn_configs[cycle_node].name
+                for cycle_node in cycle_path[path_positions[node] :] + [node]
+            ]
+            raise exceptions.ValueInfraException(
+                f"Connections dependency cycle detected: {' -> '.join(cycle_names)}",
+                value=cycle_names,
+            )
 
-        # Append interfaces/connections that doesn't need sorting
-        # at the end of the list. Those will be the last ones
-        # to be configured
-        sorted_conn_configs.extend(non_iface_connections)
-        return sorted_conn_configs
+        if non_iface_connections:
+            levels.append(non_iface_connections)
+        return levels, ConnectionsDependencyGraph(
+            nodes=tuple(conn_config.name for level in levels for conn_config in level),
+            edges=tuple(
+                (graph_conn_configs[dependency].name, graph_conn_configs[node].name)
+                for node in sorted_nodes
+                for dependency in node_dependencies[node]
+            ),
+            levels=tuple(
+                tuple(conn_config.name for conn_config in level) for level in levels
+            ),
+        )
 
     def __validate_connections(self):
         self.__validate_connection_names()
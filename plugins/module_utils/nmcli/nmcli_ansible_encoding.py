@@ -12,6 +12,8 @@ FIELD_CONN_RESULT_UUID = "uuid"
 FIELD_CONN_RESULT_CHANGED = "changed"
 FIELD_CONN_RESULT_STATUS = "status"
 FIELD_MAIN_CONN_RESULT_SLAVES = "slaves"
+FIELD_CONN_PLAN_COMMANDS = "commands"
+FIELD_CONN_PLAN_DIFF = "diff"
 
 
 def encode_connection_configuration_result(
@@ -22,7 +24,8 @@ def encode_connection_configuration_result(
         FIELD_CONN_RESULT_CHANGED: result.changed,
     }
     if result.status:
-        encoded_values[FIELD_CONN_RESULT_STATUS] = result.status
+        # Status may be a lazily decoded record, materialize it
+        encoded_values[FIELD_CONN_RESULT_STATUS] = dict(result.status)
 
     return encoded_values
 
@@ -54,3 +57,71 @@ def encode_configuration_session(
         changed = changed or conn_config_result.changed
 
     return result, changed
+
+
+def encode_unchanged_configuration_result(
+    result: typing.Dict[str, typing.Any],
+) -> typing.Dict[str, typing.Any]:
+    """
+    Copies an already encoded configuration result, as if it was
+    obtained from a run that didn't need to change anything.
+    :param result: The encoded configuration result.
+    :return: The copy, with all the changed flags unset.
+    """
+    return {
+        conn_name: conn_result
+        | {
+            FIELD_CONN_RESULT_CHANGED: False,
+            FIELD_MAIN_CONN_RESULT_SLAVES: {
+                slave_name: slave_result | {FIELD_CONN_RESULT_CHANGED: False}
+                for slave_name, slave_result in conn_result.get(
+                    FIELD_MAIN_CONN_RESULT_SLAVES, {}
+                ).items()
+            },
+        }
+        for conn_name, conn_result in result.items()
+    }
+
+
+def encode_connection_change(
+    change: nmcli_interface_types.ConnectionChange,
+    commands: typing.List[typing.List[str]],
+) -> typing.Dict[str, typing.Any]:
+    return {
+        FIELD_CONN_RESULT_UUID: change.uuid,
+        FIELD_CONN_RESULT_CHANGED: change.changed or bool(change.state_transition),
+        FIELD_CONN_PLAN_COMMANDS: commands,
+        FIELD_CONN_PLAN_DIFF: change.diff.to_dict(),
+    }
+
+
+def encode_connection_plan(
+    connection_plan: nmcli_interface_types.ConnectionPlan,
+    commands: typing.Dict[str, typing.List[typing.List[str]]],
+) -> typing.Dict[str, typing.Any]:
+    encoded_values = encode_connection_change(
+        connection_plan.main_change, commands.get(connection_plan.conn_config.name, [])
+    )
+    encoded_values[FIELD_MAIN_CONN_RESULT_SLAVES] = {
+        change.conn_config.name: encode_connection_change(
+            change, commands.get(change.conn_config.name, [])
+        )
+        for change in connection_plan.slave_changes
+    }
+
+    # Deleted connections count too
+    encoded_values[FIELD_CONN_RESULT_CHANGED] = connection_plan.changed
+    return encoded_values
+
+
+def encode_configuration_plan(
+    configuration_plan: nmcli_interface_types.ConfigurationPlan,
+    plan_commands: typing.Dict[str, typing.Dict[str, typing.List[typing.List[str]]]],
+) -> typing.Tuple[typing.Dict[str, typing.Any], bool]:
+    result = {
+        connection_plan.conn_config.name: encode_connection_plan(
+            connection_plan, plan_commands.get(connection_plan.conn_config.name, {})
+        )
+        for connection_plan in configuration_plan.connections
+    }
+    return result, configuration_plan.changed
@@ -0,0 +1,146 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import json
+import os
+import tempfile
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    exceptions,
+)
+
+
+class NmcliApplyStateFileException(exceptions.BaseInfraException):
+    def __init__(self, msg: str, path: str = None, error: str = None) -> None:
+        super().__init__(msg)
+        self.path = path
+        self.error = error
+
+
+def hash_connections_config(raw_config: typing.Any) -> str:
+    """
+    Computes a stable hash of a connections configuration, that doesn't
+    depend on the order of the keys.
+    :param raw_config: The configuration, as given to the module.
+    :return: The hash, as a hex digest.
+    """
+    return hashlib.sha256(
+        json.dumps(
+            raw_config, sort_keys=True, separators=(",", ":"), default=str
+        ).encode()
+    ).hexdigest()
+
+
+class NmcliApplyStateFile:
+    """
+    Small on-host file that keeps the hash of the last applied configuration,
+    the fingerprint of the connections it left and its result, so the next
+    run can skip the whole reconciliation if none of them changed.
+    """
+
+    __VERSION = 1
+    __FIELD_VERSION = "version"
+    __FIELD_CONFIG_HASH = "config_hash"
+    __FIELD_CONNECTIONS_FINGERPRINT = "connections_fingerprint"
+    __FIELD_RESULT = "result"
+
+    def __init__(self, path: str):
+        self.__path = path
+
+    def load_result(
+        self, config_hash: str, connections_fingerprint: str
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Returns the stored result if it was produced by the same configuration
+        and the connections are still the ones it left.
+        :param config_hash: The hash of the configuration to apply.
+        :param connections_fingerprint: The current connections fingerprint.
+        :return: The stored result, or None if it's not there or it's stale.
+        """
+        try:
+            with open(self.__path, "r", encoding="utf-8") as state_file:
+                state = json.load(state_file)
+        except (OSError, ValueError):
+            # Missing or corrupted files are just a miss
+            return None
+
+        if (
+            not isinstance(state, dict)
+            or state.get(self.__FIELD_VERSION, None) != self.__VERSION
+            or state.get(self.__FIELD_CONFIG_HASH, None) != config_hash
+            or state.get(self.__FIELD_CONNECTIONS_FINGERPRINT, None)
+            != connections_fingerprint
+        ):
+            return None
+
+        return state.get(self.__FIELD_RESULT, None)
+
+    def save(
+        self,
+        config_hash: str,
+        connections_fingerprint: str,
+        result: typing.Dict[str, typing.Any],
+    ):
+        """
+        Stores the state left by a successful run, replacing the
+        previous one atomically.
+        :param config_hash: The hash of the applied configuration.
+        :param connections_fingerprint: The fingerprint of the resulting connections.
+        :param result: The result of the run.
+        :raises NmcliApplyStateFileException: If the file cannot be written.
+        """
+        state_dir = os.path.dirname(os.path.abspath(self.__path))
+        try:
+            os.makedirs(state_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=state_dir)
+        except OSError as err:
+            raise NmcliApplyStateFileException(
+                f"Cannot save the state file {self.__path}: {err}",
+                path=self.__path,
+                error=str(err),
+            ) from err
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as state_file:
+                json.dump(
+                    {
+                        self.__FIELD_VERSION: self.__VERSION,
+                        self.__FIELD_CONFIG_HASH: config_hash,
+                        self.__FIELD_CONNECTIONS_FINGERPRINT: connections_fingerprint,
+                        self.__FIELD_RESULT: result,
+                    },
+                    state_file,
+                    default=str,
+                )
+            os.replace(tmp_path, self.__path)
+        except BaseException as err:
+            try:
+                os.unlink(tmp_path)
+            except OSError:
+                pass
+            if isinstance(err, OSError):
+                raise NmcliApplyStateFileException(
+                    f"Cannot save the state file {self.__path}: {err}",
+                    path=self.__path,
+                    error=str(err),
+                ) from err
+            raise
+
+    def invalidate(self):
+        """
+        Drops the stored state, i.e. before making changes, so an
+        interrupted run is never taken as converged.
+        :raises NmcliApplyStateFileException: If the file cannot be removed.
+        """
+        try:
+            os.unlink(self.__path)
+        except FileNotFoundError:
+            pass
+        except OSError as err:
+            raise NmcliApplyStateFileException(
+                f"Cannot invalidate the state file {self.__path}: {err}",
+                path=self.__path,
+                error=str(err),
+            ) from err
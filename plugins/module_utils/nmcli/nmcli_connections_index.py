@@ -0,0 +1,230 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import collections.abc
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_constants,
+)
+
+
+class NetworkManagerConnectionsIndex:
+    """
+    Ordered collection of connections with lookup buckets by UUID, id,
+    (id, type), interface name, VLAN parent and master.
+
+    It iterates, and all the lookups return, the connections in the
+    order they were added, so a lookup returns the same connections a
+    linear scan of the list would, but only touches the matching ones.
+    Connections can be added, replaced and removed incrementally.
+    """
+
+    __INDEXED_FIELDS = (
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME,
+        nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER,
+    )
+    __KEY_ID_TYPE = "id-type"
+
+    def __init__(
+        self,
+        connections: typing.Iterable[typing.Mapping[str, typing.Any]] = None,
+    ):
+        # Entries are keyed by an increasing sequence number, and not
+        # by UUID, so the order is known and nothing is lost if two
+        # connections share an UUID
+        self.__next_seq = 0
+        # The connections added and removed since the index was built, in
+        # order, so the values computed from them can be updated, instead
+        # of computed again, see changes_since
+        self.__changes: typing.List[typing.Mapping[str, typing.Any]] = []
+        self.__entries: typing.Dict[int, typing.Mapping[str, typing.Any]] = {}
+        self.__buckets: typing.Dict[
+            str, typing.Dict[typing.Hashable, typing.Dict[int, None]]
+        ] = {field: {} for field in self.__INDEXED_FIELDS + (self.__KEY_ID_TYPE,)}
+        self.__connections_list: typing.Optional[
+            typing.List[typing.Mapping[str, typing.Any]]
+        ] = None
+        for conn_data in connections or []:
+            self.__add_entry(self.__next_seq, conn_data)
+            self.__next_seq += 1
+        self.__changes.clear()
+
+    def __iter__(self) -> typing.Iterator[typing.Mapping[str, typing.Any]]:
+        return iter(self.connections)
+
+    def __len__(self) -> int:
+        return len(self.__entries)
+
+    @property
+    def version(self) -> int:
+        """
+        Number of changes made to the index since it was built. Allows
+        callers to cache values computed from the connections.
+        :return: The version of the index.
+        """
+        return len(self.__changes)
+
+    def changes_since(
+        self, version: int
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        """
+        Returns the connections added or removed since the given version,
+        the data they had when added or removed. Replaced connections are
+        returned twice, the old and the new data.
+        :param version: A version of the index, see version.
+        :return: The list of changed connections data, in order.
+        """
+        return self.__changes[version:]
+
+    @property
+    def connections(self) -> typing.List[typing.Mapping[str, typing.Any]]:
+        if self.__connections_list is None:
+            self.__connections_list = list(self.__entries.values())
+        return self.__connections_list
+
+    def get(self, conn_uuid: str) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        return next(iter(self.with_uuid(conn_uuid)), None)
+
+    def with_uuid(self, conn_uuid: str) -> typing.List[typing.Mapping[str, typing.Any]]:
+        return self.__lookup(
+            (nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,), [conn_uuid]
+        )
+
+    def with_id(self, conn_id: str) -> typing.List[typing.Mapping[str, typing.Any]]:
+        return self.__lookup(
+            (nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID,), [conn_id]
+        )
+
+    def with_id_and_type(
+        self, conn_id: str, conn_type: str
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        return self.__lookup((self.__KEY_ID_TYPE,), [(conn_id, conn_type)])
+
+    def with_interface_name(
+        self, iface_name: str
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        return self.__lookup(
+            (nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME,), [iface_name]
+        )
+
+    def with_related_interfaces(
+        self, iface_names: typing.Iterable[str]
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        """
+        Returns the connections bound to any of the given interfaces, the
+        ones with them as interface name or as VLAN parent.
+        :param iface_names: The names of the interfaces.
+        :return: The list of related connections, in order and without duplicates.
+        """
+        return self.__lookup(
+            (
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME,
+                nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT,
+            ),
+            iface_names,
+        )
+
+    def with_uuid_or_interface_name(
+        self, conn_reference: str
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        """
+        Returns the connections a reference, i.e. the master of a slave,
+        points to, the ones with it as UUID or as interface name.
+        :param conn_reference: The UUID or the interface name.
+        :return: The list of connections, in order and without duplicates.
+        """
+        return self.__lookup(
+            (
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME,
+            ),
+            [conn_reference],
+        )
+
+    def with_masters(
+        self, masters: typing.Iterable[str]
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        return self.__lookup(
+            (nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER,), masters
+        )
+
+    def put(self, conn_data: typing.Mapping[str, typing.Any]):
+        """
+        Replaces, in place, the connections with the same UUID as the given
+        one, or adds it at the end if there is none.
+        :param conn_data: The connection data.
+        """
+        conn_uuid = conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+        seqs = self.__lookup_seqs(
+            (nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,), [conn_uuid]
+        )
+        if not seqs:
+            self.__add_entry(self.__next_seq, conn_data)
+            self.__next_seq += 1
+        for seq in seqs:
+            self.__remove_entry(seq)
+            self.__add_entry(seq, conn_data)
+
+    def remove(self, conn_uuids: typing.Iterable[str]):
+        """
+        Removes the connections with the given UUIDs, if present.
+        :param conn_uuids: The UUIDs of the connections to remove.
+        """
+        for seq in self.__lookup_seqs(
+            (nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,), conn_uuids
+        ):
+            self.__remove_entry(seq)
+            self.__entries.pop(seq)
+
+    def __lookup(
+        self,
+        bucket_fields: typing.Sequence[str],
+        keys: typing.Iterable[typing.Hashable],
+    ) -> typing.List[typing.Mapping[str, typing.Any]]:
+        return [self.__entries[seq] for seq in self.__lookup_seqs(bucket_fields, keys)]
+
+    def __lookup_seqs(
+        self,
+        bucket_fields: typing.Sequence[str],
+        keys: typing.Iterable[typing.Hashable],
+    ) -> typing.List[int]:
+        buckets = [self.__buckets[bucket_field] for bucket_field in bucket_fields]
+        seqs = set()
+        for key in keys:
+            for bucket in buckets:
+                seqs.update(bucket.get(key, ()))
+        return sorted(seqs)
+
+    def __index_keys(
+        self, conn_data: typing.Mapping[str, typing.Any]
+    ) -> typing.Iterator[typing.Tuple[str, typing.Hashable]]:
+        for field in self.__INDEXED_FIELDS:
+            value = conn_data.get(field, None)
+            if value is not None and isinstance(value, collections.abc.Hashable):
+                yield field, value
+
+        yield self.__KEY_ID_TYPE, (
+            conn_data.get(nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID, None),
+            conn_data.get(nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE, None),
+        )
+
+    def __add_entry(self, seq: int, conn_data: typing.Mapping[str, typing.Any]):
+        self.__entries[seq] = conn_data
+        for field, key in self.__index_keys(conn_data):
+            self.__buckets[field].setdefault(key, {})[seq] = None
+        self.__connections_list = None
+        self.__changes.append(conn_data)
+
+    def __remove_entry(self, seq: int):
+        self.__changes.append(self.__entries[seq])
+        for field, key in self.__index_keys(self.__entries[seq]):
+            bucket = self.__buckets[field]
+            bucket[key].pop(seq, None)
+            if not bucket[key]:
+                bucket.pop(key)
+        self.__connections_list = None
@@ -0,0 +1,155 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import threading
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_index,
+    nmcli_querier,
+)
+
+
+class NetworkManagerConnectionsStore:
+    """
+    Session scoped view of the NetworkManager connections.
+
+    Starts from a single bulk snapshot of all the connections, fetched
+    the first time the whole list is needed, and it's kept up to date
+    by re-fetching or discarding only the connections that are touched
+    during the session, so all the reads are served without querying
+    the whole host again.
+    Safe to share between the threads of a single session.
+    """
+
+    def __init__(self, querier: nmcli_querier.NetworkManagerQuerier):
+        self.__querier = querier
+        self.__lock = threading.RLock()
+        self.__snapshot_loaded = False
+        self.__index = nmcli_connections_index.NetworkManagerConnectionsIndex()
+
+    @property
+    def index(self) -> nmcli_connections_index.NetworkManagerConnectionsIndex:
+        """
+        The index of all the known connections, in the order NetworkManager
+        reported them. Connections added during the session go last.
+        :return: The connections index.
+        """
+        with self.__lock:
+            if not self.__snapshot_loaded:
+                self.__index = nmcli_connections_index.NetworkManagerConnectionsIndex(
+                    self.__querier.get_connections()
+                )
+                self.__snapshot_loaded = True
+            return self.__index
+
+    def copy(self) -> "NetworkManagerConnectionsStore":
+        """
+        Returns a detached copy of the store, sharing the querier. Changes
+        made to the copy, i.e. to simulate a plan, don't affect this one.
+        :return: The store copy.
+        """
+        store_copy = NetworkManagerConnectionsStore(self.__querier)
+        with self.__lock:
+            store_copy.__index = nmcli_connections_index.NetworkManagerConnectionsIndex(
+                self.index
+            )
+        store_copy.__snapshot_loaded = True
+        return store_copy
+
+    @property
+    def connections(self) -> typing.List[typing.Mapping[str, typing.Any]]:
+        """
+        All the known connections, in the order NetworkManager reported them.
+        Connections added during the session go last.
+        :return: The list of connections data.
+        """
+        return self.index.connections
+
+    def get(
+        self, conn_uuid: str, check_exists: bool = True
+    ) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        """
+        Returns the data of the given connection from the snapshot,
+        loading it if needed, and fetching the connection only if it's
+        not in it.
+        :param conn_uuid: The UUID of the connection.
+        :param check_exists: Raise if the connection doesn't exist instead of returning None.
+        :return: The connection data or None if it doesn't exist and check_exists is False.
+        """
+        conn_data = self.index.get(conn_uuid)
+        return (
+            conn_data
+            if conn_data is not None
+            else self.refresh(conn_uuid, check_exists=check_exists)
+        )
+
+    def refresh(
+        self, conn_uuid: str, check_exists: bool = True
+    ) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        """
+        Re-fetches the data of the given connection and updates it in place.
+        :param conn_uuid: The UUID of the connection.
+        :param check_exists: Raise if the connection doesn't exist instead of returning None.
+        :return: The connection data or None if it doesn't exist and check_exists is False.
+        """
+        conn_data = self.__querier.get_connection_details(
+            conn_uuid, check_exists=check_exists
+        )
+        if conn_data is None:
+            self.discard([conn_uuid])
+            return None
+
+        with self.__lock:
+            self.__index.put(conn_data)
+        return conn_data
+
+    def fetch_fields(
+        self,
+        conn_uuid: str,
+        fields: typing.Sequence[str],
+        check_exists: bool = True,
+    ) -> typing.Optional[typing.Mapping[str, typing.Any]]:
+        """
+        Fetches only the given fields of a connection, i.e. to poll its state.
+        The partial result is not stored.
+        :param conn_uuid: The UUID of the connection.
+        :param fields: The sections or keys to fetch.
+        :param check_exists: Raise if the connection doesn't exist instead of returning None.
+        :return: The connection data or None if it doesn't exist and check_exists is False.
+        """
+        return self.__querier.get_connection_details(
+            conn_uuid, check_exists=check_exists, fields=fields
+        )
+
+    def update_from(
+        self,
+        source: "NetworkManagerConnectionsStore",
+        conn_uuids: typing.Iterable[str],
+    ):
+        """
+        Updates the given connections, in place, with the data another
+        store has for them, i.e. a copy with the real one once changes
+        are applied, without querying them again. Connections unknown
+        to the source are dropped.
+        :param source: The store to read the connections from.
+        :param conn_uuids: The UUIDs of the connections to update.
+        """
+        source_index = source.index
+        with self.__lock:
+            index = self.index
+            for conn_uuid in conn_uuids:
+                conn_data = source_index.get(conn_uuid)
+                if conn_data is None:
+                    index.remove([conn_uuid])
+                else:
+                    index.put(conn_data)
+
+    def discard(self, conn_uuids: typing.Iterable[str]):
+        """
+        Drops the given connections from the store, i.e. once deleted.
+        :param conn_uuids: The UUIDs of the connections to drop.
+        """
+        with self.__lock:
+            self.__index.remove(conn_uuids)
@@ -18,6 +18,9 @@ NMCLI_VALUE_FALSE = "no"
 NMCLI_VALUE_TRUE_ALT = "true"
 NMCLI_VALUE_FALSE_ALT = "false"
 
+# NMCLI Connection sections
+NMCLI_CONN_SECTION_CONNECTION = "connection"
+
 # NMCLI Connection General section fields
 NMCLI_CONN_FIELD_GENERAL_STATE = "general.state"
 NMCLI_CONN_FIELD_GENERAL_STATE_VAL_ACTIVATED = "activated"
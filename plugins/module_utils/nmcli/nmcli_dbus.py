@@ -0,0 +1,1071 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import ipaddress
+import subprocess
+import sys
+import time
+import typing
+import uuid
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
+    exceptions,
+    module_command_utils,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_constants,
+    nmcli_interface_exceptions,
+)
+
+NM_DBUS_BUS_NAME = "org.freedesktop.NetworkManager"
+NM_DBUS_PATH = "/org/freedesktop/NetworkManager"
+NM_DBUS_SETTINGS_PATH = "/org/freedesktop/NetworkManager/Settings"
+NM_DBUS_INTERFACE = "org.freedesktop.NetworkManager"
+NM_DBUS_INTERFACE_SETTINGS = "org.freedesktop.NetworkManager.Settings"
+NM_DBUS_INTERFACE_SETTINGS_CONNECTION = (
+    "org.freedesktop.NetworkManager.Settings.Connection"
+)
+NM_DBUS_INTERFACE_ACTIVE_CONNECTION = "org.freedesktop.NetworkManager.Connection.Active"
+NM_DBUS_INTERFACE_DEVICE = "org.freedesktop.NetworkManager.Device"
+NM_DBUS_ERROR_INVALID_CONNECTION = (
+    "org.freedesktop.NetworkManager.Settings.InvalidConnection"
+)
+NM_DBUS_ERROR_CONNECTION_NOT_ACTIVE = (
+    "org.freedesktop.NetworkManager.ConnectionNotActive"
+)
+NM_DBUS_ERROR_UNKNOWN_METHOD = "org.freedesktop.DBus.Error.UnknownMethod"
+NM_DBUS_ERROR_UNKNOWN_OBJECT = "org.freedesktop.DBus.Error.UnknownObject"
+NM_DBUS_NO_OBJECT_PATH = "/"
+
+NmDBusSettings = typing.Dict[str, typing.Dict[str, dbus_utils.DBusVariant]]
+
+# NMActiveConnectionState values, as nmcli names them
+__NM_ACTIVE_CONNECTION_STATES = {
+    0: "unknown",
+    1: "activating",
+    2: nmcli_constants.NMCLI_CONN_FIELD_GENERAL_STATE_VAL_ACTIVATED,
+    3: "deactivating",
+    4: "deactivated",
+}
+
+
+class NetworkManagerDBusClient:
+    """
+    Thin client of the NetworkManager D-Bus API, limited to the
+    settings and activation calls the nmcli modules need.
+    """
+
+    def __init__(self, connection: dbus_utils.DBusConnection):
+        self.__connection = connection
+
+    def __call(
+        self,
+        path: str,
+        interface: str,
+        member: str,
+        signature: str = "",
+        args: typing.Sequence[typing.Any] = (),
+    ) -> typing.List[typing.Any]:
+        return self.__connection.call(
+            NM_DBUS_BUS_NAME, path, interface, member, signature=signature, args=args
+        )
+
+    def list_connections(self) -> typing.List[str]:
+        return self.__call(
+            NM_DBUS_SETTINGS_PATH, NM_DBUS_INTERFACE_SETTINGS, "ListConnections"
+        )[0]
+
+    def get_connection_path(self, conn_uuid: str) -> typing.Optional[str]:
+        """
+        Resolves the object path of a connection profile.
+        :param conn_uuid: The UUID of the connection.
+        :return: The object path, or None if there is no connection with that UUID.
+        """
+        try:
+            return self.__call(
+                NM_DBUS_SETTINGS_PATH,
+                NM_DBUS_INTERFACE_SETTINGS,
+                "GetConnectionByUuid",
+                signature="s",
+                args=(conn_uuid,),
+            )[0]
+        except dbus_utils.DBusCallException as err:
+            if err.name == NM_DBUS_ERROR_INVALID_CONNECTION:
+                return None
+            raise
+
+    def get_settings(self, conn_path: str) -> NmDBusSettings:
+        return self.__call(
+            conn_path, NM_DBUS_INTERFACE_SETTINGS_CONNECTION, "GetSettings"
+        )[0]
+
+    def get_active_connections(
+        self,
+    ) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        """
+        Fetches the state of the active connections.
+        :return: The properties of each active connection, by connection
+                 UUID, with the names of its devices under "DeviceNames".
+        """
+        active_connections = {}
+        for active_path in self.__list_active_connections():
+            properties = self.__get_active_connection_properties(active_path)
+            if properties is not None:
+                active_connections[properties.get("Uuid", None)] = properties
+        return active_connections
+
+    def get_active_connection(
+        self, conn_uuid: str
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        """
+        Fetches the state of a single connection, only reading the
+        properties of its active connection.
+        :param conn_uuid: The UUID of the connection.
+        :return: The properties of the active connection, or None if not active.
+        """
+        for active_path in self.__list_active_connections():
+            try:
+                active_uuid = self.__connection.get_property(
+                    NM_DBUS_BUS_NAME,
+                    active_path,
+                    NM_DBUS_INTERFACE_ACTIVE_CONNECTION,
+                    "Uuid",
+                )
+            except dbus_utils.DBusCallException as err:
+                if err.name in (
+                    NM_DBUS_ERROR_UNKNOWN_METHOD,
+                    NM_DBUS_ERROR_UNKNOWN_OBJECT,
+                ):
+                    continue
+                raise
+            if active_uuid == conn_uuid:
+                return self.__get_active_connection_properties(active_path)
+        return None
+
+    def __list_active_connections(self) -> typing.List[str]:
+        return self.__connection.get_property(
+            NM_DBUS_BUS_NAME, NM_DBUS_PATH, NM_DBUS_INTERFACE, "ActiveConnections"
+        )
+
+    def __get_active_connection_properties(
+        self, active_path: str
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        try:
+            properties = self.__connection.get_all_properties(
+                NM_DBUS_BUS_NAME, active_path, NM_DBUS_INTERFACE_ACTIVE_CONNECTION
+            )
+            properties["DeviceNames"] = [
+                self.__connection.get_property(
+                    NM_DBUS_BUS_NAME,
+                    device_path,
+                    NM_DBUS_INTERFACE_DEVICE,
+                    "Interface",
+                )
+                for device_path in properties.get("Devices", [])
+            ]
+        except dbus_utils.DBusCallException as err:
+            # Deactivated while reading it
+            if err.name in (NM_DBUS_ERROR_UNKNOWN_METHOD, NM_DBUS_ERROR_UNKNOWN_OBJECT):
+                return None
+            raise
+        properties["Path"] = active_path
+        return properties
+
+    def add_connection(self, settings: NmDBusSettings) -> str:
+        return self.__call(
+            NM_DBUS_SETTINGS_PATH,
+            NM_DBUS_INTERFACE_SETTINGS,
+            "AddConnection",
+            signature="a{sa{sv}}",
+            args=(settings,),
+        )[0]
+
+    def update_connection(self, conn_path: str, settings: NmDBusSettings):
+        self.__call(
+            conn_path,
+            NM_DBUS_INTERFACE_SETTINGS_CONNECTION,
+            "Update",
+            signature="a{sa{sv}}",
+            args=(settings,),
+        )
+
+    def delete_connection(self, conn_path: str):
+        self.__call(conn_path, NM_DBUS_INTERFACE_SETTINGS_CONNECTION, "Delete")
+
+    def activate_connection(self, conn_path: str) -> str:
+        """
+        Requests the activation of a connection. NetworkManager returns as
+        soon as the activation starts, without waiting for it to finish.
+        :param conn_path: The object path of the connection.
+        :return: The object path of the active connection.
+        """
+        return self.__call(
+            NM_DBUS_PATH,
+            NM_DBUS_INTERFACE,
+            "ActivateConnection",
+            signature="ooo",
+            args=(conn_path, NM_DBUS_NO_OBJECT_PATH, NM_DBUS_NO_OBJECT_PATH),
+        )[0]
+
+    def deactivate_connection(self, active_path: str):
+        self.__call(
+            NM_DBUS_PATH,
+            NM_DBUS_INTERFACE,
+            "DeactivateConnection",
+            signature="o",
+            args=(active_path,),
+        )
+
+
+def __unwrap_section(
+    settings: NmDBusSettings, section: str
+) -> typing.Dict[str, typing.Any]:
+    return {key: variant.value for key, variant in settings.get(section, {}).items()}
+
+
+def __collapse_list(values: typing.List[typing.Any]) -> typing.Any:
+    # Same shape the nmcli querier gives to list fields
+    if not values:
+        return None
+    return values[0] if len(values) == 1 else values
+
+
+def __decode_ipv4_dns(value: int) -> str:
+    # IPv4 addresses are sent as integers in network byte order
+    return str(ipaddress.IPv4Address(value.to_bytes(4, sys.byteorder)))
+
+
+def __encode_ipv4_dns(value: str) -> int:
+    return int.from_bytes(ipaddress.IPv4Address(value).packed, sys.byteorder)
+
+
+def __decode_ip_section(
+    settings: NmDBusSettings, section: str, version: int
+) -> typing.Dict[str, typing.Any]:
+    ip_settings = __unwrap_section(settings, section)
+    fields = {
+        nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD[version]: ip_settings.get(
+            "method", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_GATEWAY[version]: ip_settings.get(
+            "gateway", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_NEVER_DEFAULT[version]: ip_settings.get(
+            "never-default", False
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_ADDRESSES[version]: __collapse_list(
+            [
+                f"{address['address'].value}/{address['prefix'].value}"
+                for address in ip_settings.get("address-data", [])
+            ]
+        ),
+    }
+
+    if "dns-data" in ip_settings:
+        dns_servers = list(ip_settings["dns-data"])
+    elif version == 4:
+        dns_servers = [__decode_ipv4_dns(dns) for dns in ip_settings.get("dns", [])]
+    else:
+        dns_servers = [
+            str(ipaddress.IPv6Address(dns)) for dns in ip_settings.get("dns", [])
+        ]
+    fields[nmcli_constants.NMCLI_CONN_FIELD_IP_DNS[version]] = __collapse_list(
+        dns_servers
+    )
+
+    routes = []
+    for route in ip_settings.get("route-data", []):
+        route_str = f"{route['dest'].value}/{route['prefix'].value}"
+        if "next-hop" in route:
+            route_str += f" {route['next-hop'].value}"
+        if "metric" in route:
+            route_str += f" {route['metric'].value}"
+        routes.append(route_str)
+    fields[nmcli_constants.NMCLI_CONN_FIELD_IP_ROUTES[version]] = __collapse_list(
+        routes
+    )
+    return fields
+
+
+def decode_connection_settings(
+    settings: NmDBusSettings,
+    active_connection: typing.Optional[typing.Mapping[str, typing.Any]] = None,
+) -> typing.Dict[str, typing.Any]:
+    """
+    Converts the D-Bus settings of a connection to the fields, and
+    values, the nmcli querier returns. Only the subset of fields the
+    collection reads is decoded: connection.id, connection.uuid,
+    connection.type, connection.interface-name, connection.autoconnect,
+    connection.master, connection.slave-type, the ipvX.method,
+    ipvX.addresses, ipvX.gateway, ipvX.dns, ipvX.routes and
+    ipvX.never-default ones, vlan.id, vlan.parent and, for active
+    connections, general.state and general.devices.
+    :param settings: The settings, as returned by GetSettings.
+    :param active_connection: The active connection properties, if active.
+    :return: The connection data.
+    """
+    connection_settings = __unwrap_section(settings, "connection")
+    conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID: connection_settings.get(
+            "id", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: connection_settings.get(
+            "uuid", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE: connection_settings.get(
+            "type", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: connection_settings.get(
+            "interface-name", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_AUTOCONNECT: connection_settings.get(
+            "autoconnect", True
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: connection_settings.get(
+            "master", None
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_SLAVE_TYPE: connection_settings.get(
+            "slave-type", None
+        ),
+    }
+    for section, version in (("ipv4", 4), ("ipv6", 6)):
+        if section in settings:
+            conn_data.update(__decode_ip_section(settings, section, version))
+
+    if "vlan" in settings:
+        vlan_settings = __unwrap_section(settings, "vlan")
+        conn_data[nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_ID] = vlan_settings.get(
+            "id", None
+        )
+        conn_data[nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT] = (
+            vlan_settings.get("parent", None)
+        )
+
+    # Like nmcli, only active connections have the general section
+    if active_connection:
+        conn_data[nmcli_constants.NMCLI_CONN_FIELD_GENERAL_STATE] = (
+            __NM_ACTIVE_CONNECTION_STATES.get(active_connection.get("State", 0))
+        )
+        conn_data[nmcli_constants.NMCLI_CONN_FIELD_GENERAL_DEVICES] = __collapse_list(
+            active_connection.get("DeviceNames", [])
+        )
+    return conn_data
+
+
+def __split_values(value: str) -> typing.List[str]:
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
+def __encode_string(value: str) -> typing.Optional[dbus_utils.DBusVariant]:
+    return dbus_utils.DBusVariant("s", value) if value else None
+
+
+def __encode_boolean(value: str) -> dbus_utils.DBusVariant:
+    # Empty values reset the property to its default, false for all of them
+    return dbus_utils.DBusVariant(
+        "b", bool(nmcli_constants.map_from_mcli_boolean_value(value))
+    )
+
+
+def __encode_addresses(value: str) -> dbus_utils.DBusVariant:
+    address_data = []
+    for address in __split_values(value):
+        ip_interface = ipaddress.ip_interface(address)
+        address_data.append(
+            {
+                "address": dbus_utils.DBusVariant("s", str(ip_interface.ip)),
+                "prefix": dbus_utils.DBusVariant("u", ip_interface.network.prefixlen),
+            }
+        )
+    return dbus_utils.DBusVariant("aa{sv}", address_data)
+
+
+def __encode_routes(value: str) -> dbus_utils.DBusVariant:
+    route_data = []
+    for route in __split_values(value):
+        route_parts = route.split()
+        destination = ipaddress.ip_network(route_parts[0], strict=False)
+        route_dict = {
+            "dest": dbus_utils.DBusVariant("s", str(destination.network_address)),
+            "prefix": dbus_utils.DBusVariant("u", destination.prefixlen),
+        }
+        if len(route_parts) > 1:
+            route_dict["next-hop"] = dbus_utils.DBusVariant("s", route_parts[1])
+        if len(route_parts) > 2:
+            route_dict["metric"] = dbus_utils.DBusVariant("u", int(route_parts[2]))
+        route_data.append(route_dict)
+    return dbus_utils.DBusVariant("aa{sv}", route_data)
+
+
+def __encode_dns(version: int, value: str) -> dbus_utils.DBusVariant:
+    if version == 4:
+        return dbus_utils.DBusVariant(
+            "au", [__encode_ipv4_dns(dns) for dns in __split_values(value)]
+        )
+    return dbus_utils.DBusVariant(
+        "aay", [ipaddress.IPv6Address(dns).packed for dns in __split_values(value)]
+    )
+
+
+def __build_ip_setting_encoders(section: str, version: int) -> typing.Dict[
+    str,
+    typing.Tuple[
+        str,
+        typing.Callable[[str], typing.Optional[dbus_utils.DBusVariant]],
+        typing.Tuple[str, ...],
+    ],
+]:
+    return {
+        nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD[version]: (
+            "method",
+            __encode_string,
+            (),
+        ),
+        # The deprecated, and ambiguous, properties are dropped
+        # so NetworkManager doesn't merge them with the new ones
+        nmcli_constants.NMCLI_CONN_FIELD_IP_ADDRESSES[version]: (
+            "address-data",
+            __encode_addresses,
+            ("addresses",),
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_GATEWAY[version]: (
+            "gateway",
+            __encode_string,
+            (),
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_DNS[version]: (
+            "dns",
+            lambda value: __encode_dns(version, value),
+            ("dns-data",),
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_ROUTES[version]: (
+            "route-data",
+            __encode_routes,
+            ("routes",),
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_IP_NEVER_DEFAULT[version]: (
+            "never-default",
+            __encode_boolean,
+            (),
+        ),
+    }
+
+
+# nmcli property -> (D-Bus key, encoder, D-Bus keys to drop)
+# The section of the D-Bus key is the same one of the nmcli property
+__SETTING_ENCODERS = {
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID: ("id", __encode_string, ()),
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: ("uuid", __encode_string, ()),
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE: ("type", __encode_string, ()),
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: (
+        "interface-name",
+        __encode_string,
+        (),
+    ),
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_AUTOCONNECT: (
+        "autoconnect",
+        __encode_boolean,
+        (),
+    ),
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: (
+        "master",
+        __encode_string,
+        (),
+    ),
+    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_SLAVE_TYPE: (
+        "slave-type",
+        __encode_string,
+        (),
+    ),
+    nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT: (
+        "parent",
+        __encode_string,
+        (),
+    ),
+    nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_ID: (
+        "id",
+        lambda value: dbus_utils.DBusVariant("u", int(value)),
+        (),
+    ),
+    **__build_ip_setting_encoders("ipv4", 4),
+    **__build_ip_setting_encoders("ipv6", 6),
+}
+
+
+def supports_builder_args(builder_args: typing.Sequence[str]) -> bool:
+    """
+    Tells if all the properties of the given builder args can be
+    translated to D-Bus settings by encode_builder_args.
+    :param builder_args: The builder args, as a flat property/value list.
+    :return: True if all of them are supported.
+    """
+    return all(
+        builder_args[index] in __SETTING_ENCODERS
+        for index in range(0, len(builder_args), 2)
+    )
+
+
+def encode_builder_args(
+    builder_args: typing.Sequence[str],
+    settings: typing.Optional[NmDBusSettings] = None,
+) -> NmDBusSettings:
+    """
+    Applies the property/value pairs the args builders generate for
+    nmcli to a D-Bus settings dictionary.
+    :param builder_args: The builder args, as a flat property/value list.
+    :param settings: The current settings of the connection, if it exists.
+    :return: A new settings dictionary, with the changes applied.
+    """
+    new_settings = {
+        section: dict(section_settings)
+        for section, section_settings in (settings or {}).items()
+    }
+    for index in range(0, len(builder_args), 2):
+        nmcli_property, value = builder_args[index], builder_args[index + 1]
+        encoder = __SETTING_ENCODERS.get(nmcli_property, None)
+        if not encoder:
+            raise exceptions.ValueInfraException(
+                f"Unsupported D-Bus setting {nmcli_property}",
+                field=nmcli_property,
+                value=value,
+            )
+
+        dbus_key, encode_fn, dropped_keys = encoder
+        section_settings = new_settings.setdefault(nmcli_property.split(".", 1)[0], {})
+        for dropped_key in dropped_keys:
+            section_settings.pop(dropped_key, None)
+        variant = encode_fn(value)
+        if variant is None:
+            section_settings.pop(dbus_key, None)
+        else:
+            section_settings[dbus_key] = variant
+
+        if nmcli_property == nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE:
+            # The type specific section is mandatory, even if empty
+            new_settings.setdefault(value, {})
+    return new_settings
+
+
+class NetworkManagerDBusQuerier:
+    """
+    Replacement of the NetworkManagerQuerier that reads the connections
+    through the NetworkManager D-Bus API instead of parsing the nmcli
+    output. It only returns the subset of the nmcli fields listed in
+    decode_connection_settings, with the same values nmcli gives them.
+    """
+
+    def __init__(self, client: NetworkManagerDBusClient):
+        self.__client = client
+
+    def get_connections(
+        self, fields: typing.Optional[typing.Sequence[str]] = None
+    ) -> typing.List[typing.Dict[str, typing.Any]]:
+        try:
+            active_connections = self.__client.get_active_connections()
+            conn_paths = self.__client.list_connections()
+        except dbus_utils.DBusCallException as err:
+            raise nmcli_interface_exceptions.NmcliExecuteCommandException(
+                "Failed to fetch NM object", error=str(err)
+            ) from err
+
+        connections = []
+        for conn_path in conn_paths:
+            settings = self.__get_settings(conn_path)
+            if settings is None:
+                # Vanished between the list and the settings calls
+                continue
+            conn_uuid = settings.get("connection", {}).get("uuid", None)
+            connections.append(
+                self.__filter_fields(
+                    decode_connection_settings(
+                        settings,
+                        active_connections.get(
+                            conn_uuid.value if conn_uuid else None, None
+                        ),
+                    ),
+                    fields,
+                )
+            )
+        return connections
+
+    def get_connection_details(
+        self,
+        conn_identifier: str,
+        check_exists: bool = False,
+        fields: typing.Optional[typing.Sequence[str]] = None,
+    ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+        try:
+            conn_path = self.__client.get_connection_path(conn_identifier)
+            settings = self.__get_settings(conn_path) if conn_path else None
+            if settings is None:
+                if check_exists:
+                    raise nmcli_interface_exceptions.NmcliExecuteCommandException(
+                        f"{conn_identifier} doesn't exist"
+                    )
+                return None
+
+            active_connection = self.__client.get_active_connection(conn_identifier)
+        except dbus_utils.DBusCallException as err:
+            raise nmcli_interface_exceptions.NmcliExecuteCommandException(
+                "Failed to fetch object details", error=str(err)
+            ) from err
+
+        return self.__filter_fields(
+            decode_connection_settings(settings, active_connection), fields
+        )
+
+    def get_connections_fingerprint(self) -> str:
+        """
+        Computes a fingerprint of the connections that changes if any of
+        their settings, or their activation state, changes.
+        :return: The fingerprint, as a hex digest.
+        """
+        digest = hashlib.sha256()
+        for conn_data in sorted(
+            self.get_connections(),
+            key=lambda conn_data: conn_data[
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID
+            ]
+            or "",
+        ):
+            digest.update(repr(sorted(conn_data.items())).encode())
+        return digest.hexdigest()
+
+    def __get_settings(self, conn_path: str) -> typing.Optional[NmDBusSettings]:
+        try:
+            return self.__client.get_settings(conn_path)
+        except dbus_utils.DBusCallException as err:
+            if err.name in (NM_DBUS_ERROR_UNKNOWN_METHOD, NM_DBUS_ERROR_UNKNOWN_OBJECT):
+                return None
+            raise nmcli_interface_exceptions.NmcliExecuteCommandException(
+                "Failed to fetch the connection settings",
+                error=err.error or err.name,
+            ) from err
+
+    @staticmethod
+    def __filter_fields(
+        conn_data: typing.Dict[str, typing.Any],
+        fields: typing.Optional[typing.Sequence[str]],
+    ) -> typing.Dict[str, typing.Any]:
+        if not fields:
+            return conn_data
+        # Same as nmcli, fields can be whole sections or single properties
+        normalized_fields = [field.strip().lower() for field in fields]
+        return {
+            key: value
+            for key, value in conn_data.items()
+            if any(
+                key == field or key.startswith(field + ".")
+                for field in normalized_fields
+            )
+        }
+
+
+class NmcliDBusCommandRunner:
+    """
+    CommandRunnerFn that serves the nmcli connection commands of the
+    NetworkManagerQuerier and the NetworkManagerConfigurator through a
+    single D-Bus connection, kept open for the whole module run, instead
+    of spawning nmcli for each one. It prints what nmcli prints, with the
+    fields decode_connection_settings decodes, and returns the same
+    return codes, so both work unchanged. Other commands, or changes of
+    properties encode_builder_args doesn't support, are run by the
+    fallback runner.
+    """
+
+    __NMCLI_RC_UNKNOWN_ERROR = 1
+    __NMCLI_RC_TIMEOUT_EXPIRED = 3
+    __NMCLI_RC_ACTIVATION_FAILED = 4
+    __NMCLI_RC_NOT_FOUND = 10
+    # nmcli waits 90 seconds for up/down if --wait is not given
+    __NMCLI_DEFAULT_WAIT_SECS = 90
+    __NMCLI_OPTIONS = {
+        "-t": ("terse", False),
+        "--terse": ("terse", False),
+        "-m": ("mode", True),
+        "--mode": ("mode", True),
+        "-f": ("fields", True),
+        "--fields": ("fields", True),
+        "-g": ("get-values", True),
+        "--get-values": ("get-values", True),
+        "-w": ("wait", True),
+        "--wait": ("wait", True),
+    }
+    __NMCLI_SELECTORS = ("uuid", "id")
+    __NM_ACTIVE_CONNECTION_STATE_ACTIVATED = 2
+    __NM_ACTIVE_CONNECTION_STATE_DEACTIVATED = 4
+
+    def __init__(
+        self,
+        client: NetworkManagerDBusClient,
+        fallback_fn: module_command_utils.CommandRunnerFn,
+        poll_secs: float = 0.1,
+    ):
+        self.__client = client
+        self.__querier = NetworkManagerDBusQuerier(client)
+        self.__fallback_fn = fallback_fn
+        self.__poll_secs = poll_secs
+        self.__handlers = {
+            "show": self.__show,
+            "delete": self.__delete,
+            "add": self.__add,
+            "modify": self.__modify,
+            "up": lambda options, args: self.__change_state(options, args, True),
+            "down": lambda options, args: self.__change_state(options, args, False),
+        }
+
+    def __call__(
+        self, cmd: typing.List[str], check: typing.Optional[bool] = True
+    ) -> subprocess.CompletedProcess:
+        parsed_cmd = self.__parse_cmd(cmd)
+        output = None
+        if parsed_cmd:
+            options, subcommand, args = parsed_cmd
+            handler = self.__handlers.get(subcommand, None)
+            output = handler(options, args) if handler else None
+        if output is None:
+            return self.__fallback_fn(cmd, check=check)
+
+        return_code, stdout, stderr = output
+        if check and return_code:
+            raise module_command_utils.CommandRunException(
+                stdout=stdout, stderr=stderr, return_code=return_code, cmd=cmd
+            )
+        return subprocess.CompletedProcess(cmd, return_code, stdout, stderr)
+
+    @classmethod
+    def __parse_cmd(
+        cls, cmd: typing.List[str]
+    ) -> typing.Optional[
+        typing.Tuple[typing.Dict[str, typing.Optional[str]], str, typing.List[str]]
+    ]:
+        # Splits the global options, the connection subcommand and its args
+        if not isinstance(cmd, list) or cmd[:1] != ["nmcli"]:
+            return None
+
+        options = {}
+        args = iter(cmd[1:])
+        for arg in args:
+            if arg == "connection":
+                # Like nmcli, show is the default subcommand
+                subcommand_args = list(args) or ["show"]
+                return options, subcommand_args[0], subcommand_args[1:]
+
+            option = cls.__NMCLI_OPTIONS.get(arg, None)
+            if not option:
+                return None
+            option_name, has_value = option
+            options[option_name] = next(args, None) if has_value else None
+        return None
+
+    @classmethod
+    def __parse_identifiers(
+        cls, args: typing.List[str]
+    ) -> typing.Optional[typing.List[typing.Tuple[typing.Optional[str], str]]]:
+        identifiers = []
+        args_iter = iter(args)
+        for arg in args_iter:
+            if arg in cls.__NMCLI_SELECTORS:
+                value = next(args_iter, None)
+                if value is None:
+                    return None
+                identifiers.append((arg, value))
+            elif arg.startswith("-") or arg in ("path", "apath"):
+                return None
+            else:
+                identifiers.append((None, arg))
+        return identifiers or None
+
+    @classmethod
+    def __split_identifier(
+        cls, args: typing.List[str]
+    ) -> typing.Tuple[
+        typing.Optional[typing.Tuple[typing.Optional[str], str]], typing.List[str]
+    ]:
+        # For the subcommands that take a single connection first
+        identifier_len = 2 if args[:1] and args[0] in cls.__NMCLI_SELECTORS else 1
+        identifiers = cls.__parse_identifiers(args[:identifier_len])
+        return (identifiers[0] if identifiers else None), args[identifier_len:]
+
+    def __resolve_uuids(
+        self, identifier: typing.Tuple[typing.Optional[str], str]
+    ) -> typing.List[str]:
+        # Like nmcli, a bare identifier is a UUID or, if not, a name
+        selector, value = identifier
+        if selector != "id" and self.__client.get_connection_path(value):
+            return [value]
+        if selector == "uuid":
+            return []
+        return [
+            conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+            for conn_data in self.__querier.get_connections(
+                fields=[
+                    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID,
+                    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,
+                ]
+            )
+            if conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID] == value
+        ]
+
+    @staticmethod
+    def __render_value(value: typing.Any) -> str:
+        if value is None:
+            return ""
+        if isinstance(value, bool):
+            return nmcli_constants.map_to_mcli_boolean_value(value)
+        return str(value)
+
+    @classmethod
+    def __render_terse_multiline(cls, conn_data: typing.Dict[str, typing.Any]) -> str:
+        lines = []
+        for key, value in conn_data.items():
+            if isinstance(value, list):
+                # As indexed keys, like nmcli prints the IP4 section
+                lines.extend(
+                    f"{key}[{index}]:{cls.__render_value(item)}"
+                    for index, item in enumerate(value, start=1)
+                )
+            else:
+                lines.append(f"{key}:{cls.__render_value(value)}")
+        return "".join(f"{line}\n" for line in lines)
+
+    def __run(
+        self, fn: typing.Callable[[], typing.Tuple[int, str, str]]
+    ) -> typing.Tuple[int, str, str]:
+        try:
+            return fn()
+        except (
+            dbus_utils.DBusCallException,
+            exceptions.ValueInfraException,
+        ) as err:
+            return self.__NMCLI_RC_UNKNOWN_ERROR, "", f"Error: {err}\n"
+        except nmcli_interface_exceptions.NmcliExecuteCommandException as err:
+            return self.__NMCLI_RC_UNKNOWN_ERROR, "", f"Error: {err}: {err.error}\n"
+
+    def __show(
+        self, options: typing.Dict[str, typing.Optional[str]], args: typing.List[str]
+    ) -> typing.Optional[typing.Tuple[int, str, str]]:
+        if not args:
+            # Only the UUID list, other listings are left to nmcli
+            if options != {"get-values": "uuid"}:
+                return None
+            return self.__run(
+                lambda: (
+                    0,
+                    "".join(
+                        f"{conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]}\n"
+                        for conn_data in self.__querier.get_connections(
+                            fields=[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                        )
+                    ),
+                    "",
+                )
+            )
+
+        identifiers = self.__parse_identifiers(args)
+        if (
+            not identifiers
+            or "terse" not in options
+            or options.get("mode", None) != "multiline"
+            or not options.keys() <= {"terse", "mode", "fields"}
+        ):
+            return None
+        fields = options["fields"].split(",") if options.get("fields", None) else None
+
+        def show_fn():
+            # Like nmcli, the existing ones are printed even if one is missing
+            stdout, stderr = "", ""
+            for identifier in identifiers:
+                conns_data = [
+                    self.__querier.get_connection_details(conn_uuid, fields=fields)
+                    for conn_uuid in self.__resolve_uuids(identifier)
+                ]
+                if not conns_data or None in conns_data:
+                    stderr += f"Error: {identifier[1]} - no such connection profile.\n"
+                stdout += "".join(
+                    self.__render_terse_multiline(conn_data)
+                    for conn_data in conns_data
+                    if conn_data is not None
+                )
+            return (self.__NMCLI_RC_NOT_FOUND if stderr else 0), stdout, stderr
+
+        return self.__run(show_fn)
+
+    def __delete(
+        self, options: typing.Dict[str, typing.Optional[str]], args: typing.List[str]
+    ) -> typing.Optional[typing.Tuple[int, str, str]]:
+        identifiers = self.__parse_identifiers(args)
+        if options or not identifiers:
+            return None
+
+        def delete_fn():
+            # Like nmcli, keep deleting the remaining connections if one fails
+            return_code, stdout, stderr = 0, "", ""
+            for identifier in identifiers:
+                conn_uuids = self.__resolve_uuids(identifier)
+                if not conn_uuids:
+                    return_code = self.__NMCLI_RC_NOT_FOUND
+                    stderr += f"Error: unknown connection '{identifier[1]}'.\n"
+                for conn_uuid in conn_uuids:
+                    try:
+                        conn_path = self.__client.get_connection_path(conn_uuid)
+                        conn_id = self.__client.get_settings(conn_path)["connection"][
+                            "id"
+                        ].value
+                        self.__client.delete_connection(conn_path)
+                    except dbus_utils.DBusCallException as err:
+                        return_code = return_code or self.__NMCLI_RC_UNKNOWN_ERROR
+                        stderr += f"Error: Connection deletion failed: {err}\n"
+                        continue
+                    stdout += (
+                        f"Connection '{conn_id}' ({conn_uuid}) successfully deleted.\n"
+                    )
+            return return_code, stdout, stderr
+
+        return self.__run(delete_fn)
+
+    def __add(
+        self, options: typing.Dict[str, typing.Optional[str]], args: typing.List[str]
+    ) -> typing.Optional[typing.Tuple[int, str, str]]:
+        if options or not args or len(args) % 2 or not supports_builder_args(args):
+            return None
+
+        def add_fn():
+            builder_args = list(args)
+            if nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID not in args[::2]:
+                # Like nmcli, the UUID of new connections is generated here
+                builder_args += [
+                    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID,
+                    str(uuid.uuid4()),
+                ]
+            settings = encode_builder_args(builder_args)
+            self.__client.add_connection(settings)
+            return (
+                0,
+                f"Connection '{settings['connection']['id'].value}' "
+                f"({settings['connection']['uuid'].value}) successfully added.\n",
+                "",
+            )
+
+        return self.__run(add_fn)
+
+    def __modify(
+        self, options: typing.Dict[str, typing.Optional[str]], args: typing.List[str]
+    ) -> typing.Optional[typing.Tuple[int, str, str]]:
+        identifier, builder_args = self.__split_identifier(args)
+        if (
+            options
+            or not identifier
+            or not builder_args
+            or len(builder_args) % 2
+            or not supports_builder_args(builder_args)
+        ):
+            return None
+
+        def modify_fn():
+            conn_uuids = self.__resolve_uuids(identifier)
+            conn_path = (
+                self.__client.get_connection_path(conn_uuids[0]) if conn_uuids else None
+            )
+            if not conn_path:
+                return (
+                    self.__NMCLI_RC_NOT_FOUND,
+                    "",
+                    f"Error: unknown connection '{identifier[1]}'.\n",
+                )
+            self.__client.update_connection(
+                conn_path,
+                encode_builder_args(
+                    builder_args, self.__client.get_settings(conn_path)
+                ),
+            )
+            # nmcli doesn't print anything on success
+            return 0, "", ""
+
+        return self.__run(modify_fn)
+
+    def __change_state(
+        self,
+        options: typing.Dict[str, typing.Optional[str]],
+        args: typing.List[str],
+        up: bool,
+    ) -> typing.Optional[typing.Tuple[int, str, str]]:
+        identifier, remaining_args = self.__split_identifier(args)
+        if not options.keys() <= {"wait"} or not identifier or remaining_args:
+            return None
+        try:
+            wait_secs = float(options.get("wait", self.__NMCLI_DEFAULT_WAIT_SECS))
+        except (TypeError, ValueError):
+            return None
+
+        def change_state_fn():
+            conn_uuids = self.__resolve_uuids(identifier)
+            conn_uuid = conn_uuids[0] if conn_uuids else None
+            if up:
+                conn_path = (
+                    self.__client.get_connection_path(conn_uuid) if conn_uuid else None
+                )
+                if not conn_path:
+                    return (
+                        self.__NMCLI_RC_NOT_FOUND,
+                        "",
+                        f"Error: unknown connection '{identifier[1]}'.\n",
+                    )
+                active_path = self.__client.activate_connection(conn_path)
+            else:
+                active_connection = (
+                    self.__client.get_active_connection(conn_uuid)
+                    if conn_uuid
+                    else None
+                )
+                if not active_connection:
+                    return (
+                        self.__NMCLI_RC_NOT_FOUND,
+                        "",
+                        f"Error: '{identifier[1]}' is not an active connection.\n",
+                    )
+                active_path = active_connection["Path"]
+                self.__client.deactivate_connection(active_path)
+            return self.__wait_state(conn_uuid, up, wait_secs, active_path)
+
+        return self.__run(change_state_fn)
+
+    def __wait_state(
+        self, conn_uuid: str, up: bool, wait_secs: float, active_path: str
+    ) -> typing.Tuple[int, str, str]:
+        # Like nmcli --wait, NetworkManager returns as soon as the
+        # activation/deactivation starts, so the state is polled
+        success_output = (
+            0,
+            f"Connection successfully "
+            f"{'activated' if up else 'deactivated'} "
+            f"(D-Bus active path: {active_path})\n",
+            "",
+        )
+        deadline = time.monotonic() + wait_secs
+        while wait_secs > 0:
+            active_connection = self.__client.get_active_connection(conn_uuid)
+            state = active_connection.get("State", None) if active_connection else None
+            if up and state == self.__NM_ACTIVE_CONNECTION_STATE_ACTIVATED:
+                return success_output
+            if state in (None, self.__NM_ACTIVE_CONNECTION_STATE_DEACTIVATED):
+                if not up:
+                    return success_output
+                return (
+                    self.__NMCLI_RC_ACTIVATION_FAILED,
+                    "",
+                    "Error: Connection activation failed.\n",
+                )
+
+            remaining_time_secs = deadline - time.monotonic()
+            if remaining_time_secs <= 0:
+                return (
+                    self.__NMCLI_RC_TIMEOUT_EXPIRED,
+                    "",
+                    f"Error: Timeout expired ({wait_secs:g} seconds)\n",
+                )
+            time.sleep(min(self.__poll_secs, remaining_time_secs))
+        return success_output
@@ -2,15 +2,22 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import functools
 import typing
 import uuid
 from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_index,
     nmcli_constants,
 )
 
+ConnectionsType = typing.Union[
+    typing.Sequence[typing.Mapping[str, typing.Any]],
+    nmcli_connections_index.NetworkManagerConnectionsIndex,
+]
+
 
 def is_connection_active(conn_data: typing.Dict[str, typing.Any]) -> bool:
     string_state = (
@@ -65,17 +72,79 @@ def is_main_connection_of(
     main_conn_id = candidate_slave_conn_data[
         nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER
     ]
-    select_field = nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID
+    select_field = (
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID
+        if __is_uuid_reference(main_conn_id)
+        else nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME
+    )
+
+    return main_conn_id == candidate_main_conn_data.get(select_field, None)
+
+
+@functools.lru_cache(maxsize=1024)
+def __is_uuid_reference(conn_reference: str) -> bool:
+    # Master references are, by far, repeated among slaves, so the
+    # classification is cached instead of parsing the value each time
     try:
-        uuid.UUID(main_conn_id)
+        uuid.UUID(conn_reference)
+        return True
     except ValueError:
-        select_field = nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME
+        return False
 
-    return main_conn_id == candidate_main_conn_data.get(select_field, None)
+
+def first_main_connection_of(
+    connections: ConnectionsType,
+    slave_conn_data: typing.Dict[str, typing.Any],
+    is_main_conn=None,
+) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    if not is_connection_slave(slave_conn_data):
+        return None
+
+    if isinstance(connections, nmcli_connections_index.NetworkManagerConnectionsIndex):
+        # The master field holds the UUID or the interface of the main connection
+        main_conn_id = slave_conn_data[
+            nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER
+        ]
+        # Same order a linear scan of the connections would find them
+        connections = connections.with_uuid_or_interface_name(main_conn_id)
+
+    return next(
+        (
+            conn_data
+            for conn_data in connections
+            if is_main_connection_of(conn_data, slave_conn_data)
+            and ((is_main_conn is None) or not is_connection_slave(conn_data))
+        ),
+        None,
+    )
+
+
+def all_slave_connections_of(
+    connections: ConnectionsType,
+    main_conn_data: typing.Dict[str, typing.Any],
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    if isinstance(connections, nmcli_connections_index.NetworkManagerConnectionsIndex):
+        # Slaves point to its main connection by UUID or by interface
+        connections = connections.with_masters(
+            main_conn_id
+            for main_conn_id in (
+                main_conn_data.get(nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID),
+                main_conn_data.get(
+                    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME
+                ),
+            )
+            if main_conn_id
+        )
+
+    return [
+        conn_data
+        for conn_data in connections
+        if is_main_connection_of(main_conn_data, conn_data)
+    ]
 
 
 def all_connections_without_uuids(
-    connections: typing.List[typing.Dict[str, typing.Any]], not_uuids: typing.Container
+    connections: ConnectionsType, not_uuids: typing.Container
 ) -> typing.List[typing.Dict[str, typing.Any]]:
     not_uuids = ([not_uuids] if isinstance(not_uuids, str) else not_uuids) or []
     return [
@@ -86,12 +155,15 @@ def all_connections_without_uuids(
 
 
 def first_connection_with_name_and_type(
-    connections: typing.List[typing.Dict[str, typing.Any]],
+    connections: ConnectionsType,
     conn_name: str,
     conn_type: str,
     is_main_conn=None,
     prio_active: bool = True,
 ) -> typing.Optional[typing.Dict[str, typing.Any]]:
+    if isinstance(connections, nmcli_connections_index.NetworkManagerConnectionsIndex):
+        connections = connections.with_id_and_type(conn_name, conn_type)
+
     results = [
         conn_data
         for conn_data in connections
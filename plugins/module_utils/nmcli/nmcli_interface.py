@@ -2,11 +2,15 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import concurrent.futures
+import math
 import re
 import time
 import typing
+import uuid
 
 from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
     exceptions,
 )
 from ansible_collections.pbtn.common.plugins.module_utils import (
@@ -16,12 +20,14 @@ from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
     nmcli_constants,
+    nmcli_dbus,
     nmcli_filters,
-    nmcli_querier,
     nmcli_interface_args_builders,
     nmcli_interface_exceptions,
     nmcli_interface_link_validator,
+    nmcli_interface_planner,
     nmcli_interface_target_connection,
     nmcli_interface_types,
 )
@@ -31,24 +37,29 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
     __NETWORK_MANAGER_CONFIGURATOR_REGEX_UUID = (
         r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
     )
+    # nmcli return code when the --wait timeout expires
+    __NMCLI_RC_TIMEOUT_EXPIRED = 3
 
     def __init__(
         self,
         command_fn: module_command_utils.CommandRunnerFn,
-        querier: nmcli_querier.NetworkManagerQuerier,
+        connections_store: nmcli_connections_store.NetworkManagerConnectionsStore,
         builder_factory: nmcli_interface_args_builders.NmcliArgsBuilderFactoryType,
         target_connection_data_factory: nmcli_interface_target_connection.TargetConnectionDataFactory,
         link_validator: nmcli_interface_link_validator.NmcliLinkValidator,
         options: nmcli_interface_types.NetworkManagerConfiguratorOptions = None,
     ):
         self._command_fn = command_fn
-        self._nmcli_querier = querier
+        self._connections_store = connections_store
         self._builder_factory = builder_factory
         self._options = (
             options or nmcli_interface_types.NetworkManagerConfiguratorOptions()
         )
         self._target_connection_data_factory = target_connection_data_factory
         self._link_validator = link_validator
+        self._planner = nmcli_interface_planner.NetworkManagerConnectionPlanner(
+            builder_factory, target_connection_data_factory
+        )
 
     @classmethod
     def _parse_connection_uuid_from_output(cls, output: str) -> str:
@@ -60,38 +71,131 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
 
         return uuid.group() if uuid else None
 
-    def __delete_connections(
+    @staticmethod
+    def build_delete_cmd(conn_uuids: typing.Sequence[str]) -> typing.List[str]:
+        # nmcli deletes as many connections as given in a single call
+        return ["nmcli", "connection", "delete"] + list(conn_uuids)
+
+    @staticmethod
+    def build_apply_cmd(
+        builder_args: typing.List[str], conn_uuid: str = None
+    ) -> typing.List[str]:
+        cmd = ["nmcli", "connection"]
+        if conn_uuid:
+            cmd.extend(("modify", conn_uuid))
+        else:
+            cmd.append("add")
+        cmd.extend(builder_args)
+        return cmd
+
+    def build_state_cmd(self, conn_uuid: str, up: bool) -> typing.List[str]:
+        # The --wait option makes nmcli block on NetworkManager's
+        # state change notifications till the connection is
+        # activated/deactivated
+        return [
+            "nmcli",
+            "--wait",
+            str(math.ceil(self._options.state_apply_timeout_secs)),
+            "connection",
+            "up" if up else "down",
+            conn_uuid,
+        ]
+
+    def plan_commands(
+        self, connection_plan: nmcli_interface_types.ConnectionPlan
+    ) -> typing.Dict[str, typing.List[typing.List[str]]]:
+        """
+        Returns the commands applying the given plan would run, without
+        running them. The UUIDs of the connections that don't exist yet
+        are replaced by placeholders.
+        :param connection_plan: The plan of the connection.
+        :return: The commands of each connection, by connection name. The
+                 deletion of the replaced connections goes with the main one.
+        """
+        delete_uuids = [
+            conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+            for conn_data in connection_plan.delete_connections
+        ]
+        commands = {
+            connection_plan.conn_config.name: (
+                [self.build_delete_cmd(delete_uuids)] if delete_uuids else []
+            )
+        }
+        for change in connection_plan.changes:
+            change_commands = commands.setdefault(change.conn_config.name, [])
+            if change.builder_args:
+                change_commands.append(
+                    self.build_apply_cmd(change.builder_args, conn_uuid=change.uuid)
+                )
+            if change.state_transition:
+                change_commands.append(
+                    self.build_state_cmd(
+                        change.uuid or nmcli_interface_types.PLANNED_CONN_UUID,
+                        change.state_transition
+                        == net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP,
+                    )
+                )
+
+        return commands
+
+    def delete_connections(
         self, connections: typing.List[typing.Dict[str, typing.Any]]
     ) -> int:
+        """
+        Deletes the given connections with a single nmcli call.
+        :param connections: The data of the connections to delete.
+        :return: The number of deleted connections.
+        """
         uuids = [
             conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
             for conn_data in connections
         ]
-        for conn_uuid in uuids:
-            self._command_fn(
-                [
-                    "nmcli",
-                    "connection",
-                    "delete",
-                    conn_uuid,
-                ]
-            )
-        return len(uuids)
+        if not uuids:
+            return 0
 
-    def _apply_connection_state(
-        self, conn_uuid: str, conn_name: str, up: bool
-    ) -> typing.Dict[str, typing.Any]:
-        # Command the state change
+        cmd = self.build_delete_cmd(uuids)
         try:
-            self._command_fn(
-                [
-                    "nmcli",
-                    "connection",
-                    "up" if up else "down",
-                    conn_uuid,
-                ]
+            self._command_fn(cmd)
+        except module_command_utils.CommandRunException as err:
+            # nmcli keeps deleting the remaining connections if one fails,
+            # and reports each one deleted successfully
+            deleted_uuids = self.__parse_deleted_uuids_from_output(err.stdout or "")
+            self._connections_store.discard(deleted_uuids)
+            self._link_validator.invalidate_links()
+            failed_uuids = [
+                conn_uuid for conn_uuid in uuids if conn_uuid not in deleted_uuids
+            ]
+            raise nmcli_interface_exceptions.NmcliInterfaceDeleteException(
+                f"Failed to delete connections {', '.join(failed_uuids)}",
+                error=(err.stderr or err.stdout),
+                cmd=cmd,
+                failed_uuids=failed_uuids,
+            ) from err
+
+        self._connections_store.discard(uuids)
+        # Deleting virtual connections deletes their interfaces too
+        self._link_validator.invalidate_links()
+        return len(uuids)
+
+    @classmethod
+    def __parse_deleted_uuids_from_output(cls, output: str) -> typing.Set[str]:
+        return {
+            conn_uuid
+            for conn_uuid in (
+                cls._parse_connection_uuid_from_output(line)
+                for line in output.splitlines()
+                if "successfully deleted" in line
             )
+            if conn_uuid
+        }
+
+    def _request_connection_state(self, conn_uuid: str, conn_name: str, up: bool):
+        # As nmcli waits for the state change, usually, no polling is required
+        try:
+            self._command_fn(self.build_state_cmd(conn_uuid, up))
         except module_command_utils.CommandRunException as err:
+            if err.return_code == self.__NMCLI_RC_TIMEOUT_EXPIRED:
+                raise self._build_state_timeout_exception(conn_uuid, conn_name) from err
             raise nmcli_interface_exceptions.NmcliInterfaceApplyException(
                 f"Cannot change the state of connection '{conn_name}'",
                 error=err.stderr or err.stdout,
@@ -100,30 +204,47 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
                 conn_name=conn_name,
             ) from err
 
-        remaining_time_secs = self._options.state_apply_timeout_secs
+    def _apply_connection_state(
+        self, conn_uuid: str, conn_name: str, up: bool
+    ) -> typing.Dict[str, typing.Any]:
+        deadline = time.monotonic() + self._options.state_apply_timeout_secs
+
+        self._request_connection_state(conn_uuid, conn_name, up)
+
+        # Fallback polling, as the request may return before the state field
+        # reflects the change. Only the state is fetched on each poll
+        poll_secs = min(
+            self._options.state_apply_poll_initial_secs,
+            self._options.state_apply_poll_secs,
+        )
         while True:
-            conn_data = self._nmcli_querier.get_connection_details(
-                conn_uuid, check_exists=True
+            conn_state = self._connections_store.fetch_fields(
+                conn_uuid,
+                [nmcli_constants.NMCLI_CONN_FIELD_GENERAL_STATE],
+                check_exists=True,
             )
-            if (up and nmcli_filters.is_connection_active(conn_data)) or (
-                (not up) and (not nmcli_filters.is_connection_active(conn_data))
-            ):
-                # Reached the desired state
-                # Note: down is not that "clear" as usually the state field is not even
-                # present as there is no explicit state saying state is "down"
-                return conn_data
-            elif remaining_time_secs <= 0:
-                raise nmcli_interface_exceptions.NmcliInterfaceApplyException(
-                    f"Cannot change the state of connection '{conn_name}' in "
-                    f"the given time ({self._options.state_apply_timeout_secs} secs)",
-                    conn_uuid=conn_uuid,
-                    conn_name=conn_name,
-                )
-            else:
-                remaining_time_secs = (
-                    remaining_time_secs - self._options.state_apply_poll_secs
-                )
-                time.sleep(self._options.state_apply_poll_secs)
+            # Note: down is not that "clear" as usually the state field is not even
+            # present as there is no explicit state saying state is "down"
+            if up == nmcli_filters.is_connection_active(conn_state):
+                # Reached the desired state, fetch it fully once
+                return self._connections_store.refresh(conn_uuid, check_exists=True)
+
+            remaining_time_secs = deadline - time.monotonic()
+            if remaining_time_secs <= 0:
+                raise self._build_state_timeout_exception(conn_uuid, conn_name)
+
+            time.sleep(min(poll_secs, remaining_time_secs))
+            poll_secs = min(poll_secs * 2, self._options.state_apply_poll_secs)
+
+    def _build_state_timeout_exception(
+        self, conn_uuid: str, conn_name: str
+    ) -> nmcli_interface_exceptions.NmcliInterfaceApplyException:
+        return nmcli_interface_exceptions.NmcliInterfaceApplyException(
+            f"Cannot change the state of connection '{conn_name}' in "
+            f"the given time ({self._options.state_apply_timeout_secs} secs)",
+            conn_uuid=conn_uuid,
+            conn_name=conn_name,
+        )
 
     def _apply_builder_args(
         self, builder_args: typing.List[str], conn_name: str, conn_uuid: str = None
@@ -132,19 +253,9 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
         if not builder_args:
             return conn_uuid, False
 
-        cmd = ["nmcli", "connection"]
-        if conn_uuid:
-            cmd.extend(("modify", conn_uuid))
-        else:
-            cmd.append("add")
-        cmd.extend(builder_args)
-
+        cmd = self.build_apply_cmd(builder_args, conn_uuid=conn_uuid)
         try:
             result = self._command_fn(cmd)
-            return (
-                conn_uuid or self._parse_connection_uuid_from_output(result.stdout),
-                True,
-            )
         except module_command_utils.CommandRunException as err:
             raise nmcli_interface_exceptions.NmcliInterfaceApplyException(
                 "Failed to apply connection configuration",
@@ -154,9 +265,19 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
                 conn_name=conn_name,
             ) from err
 
-    def __enforce_connection_states(
+        # The data of the connection is fetched once its state is enforced
+        return (
+            conn_uuid or self._parse_connection_uuid_from_output(result.stdout),
+            True,
+        )
+
+    def enforce_states(
         self, configuration_result: nmcli_interface_types.MainConfigurationResult
     ):
+        """
+        Brings the connections of a configuration result to their target state.
+        :param configuration_result: The result returned by configure.
+        """
         # Slave connections go first
         # i.e.: bridge slaves need to be activated before
         # the main connection is ready as doc examples suggest
@@ -169,64 +290,50 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
         self,
         connection_configuration_result: nmcli_interface_types.ConnectionConfigurationResult,
     ):
-        connection_configuration_result.status = (
-            self._nmcli_querier.get_connection_details(
+        changed = connection_configuration_result.changed
+        # Unchanged connections are served from the session snapshot. The
+        # just added/modified ones are always brought to their state, so
+        # they are fetched only once, after that
+        conn_status = (
+            None
+            if changed
+            else self._connections_store.get(
                 connection_configuration_result.uuid, check_exists=True
             )
         )
-
-        should_enforce_adopted = self.__enforce_connection_state_should_enforce_adopted(
-            connection_configuration_result
-        )
-        should_up = (
-            connection_configuration_result.applied_config.state
-            == net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP
-        ) or should_enforce_adopted
-        is_active = nmcli_filters.is_connection_active(
-            connection_configuration_result.status
-        )
-        in_target_state = (should_up and is_active) or (
-            (not should_up) and (not is_active)
+        state_transition = nmcli_interface_planner.resolve_state_transition(
+            connection_configuration_result.configurable_conn_data,
+            conn_status,
+            changed,
         )
+        if state_transition:
+            conn_status = self._apply_connection_state(
+                connection_configuration_result.uuid,
+                connection_configuration_result.applied_config.name,
+                state_transition == net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP,
+            )
+            connection_configuration_result.set_changed()
+            self._invalidate_virtual_links(
+                connection_configuration_result.applied_config
+            )
+        elif changed:
+            conn_status = self._connections_store.refresh(
+                connection_configuration_result.uuid, check_exists=True
+            )
 
-        # Important: If we modified the connection, we should always apply up/down it
-        # as some properties are applied only when the connection is explicitly activated/turn down
-        # Skip making any change if the state is not set -> State not set == do not handle it
-        # One exception to the previous statement -> If the interface has been adopted
-        if (
-            (not connection_configuration_result.applied_config.state)
-            and (not should_enforce_adopted)
-        ) or (in_target_state and not connection_configuration_result.changed):
-            return
-
-        conn_data = self._apply_connection_state(
-            connection_configuration_result.uuid,
-            connection_configuration_result.applied_config.name,
-            should_up,
-        )
-
-        connection_configuration_result.status = conn_data
-        connection_configuration_result.set_changed()
-
-    @staticmethod
-    def __enforce_connection_state_should_enforce_adopted(
-        connection_configuration_result: nmcli_interface_types.ConnectionConfigurationResult,
-    ) -> bool:
-        # If the connection is a main one, or it doesn't go up -> Skip
-        # Adopted conns are those that were "main ones" but
-        # now they are slaves of another connection
-        # Base on the docs, when a connection goes from a main one
-        # to a slave, an explicit up is needed before making the main
-        # connection up
-        if (not connection_configuration_result.main_conn_config_result) or (
-            connection_configuration_result.main_conn_config_result.applied_config.state
-            != net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP
+        connection_configuration_result.status = conn_status
+
+    def _invalidate_virtual_links(self, conn_config: net_config.BaseConnectionConfig):
+        # NM creates/deletes the interfaces of virtual connections when
+        # they are added, modified (autoconnect) or go up/down
+        if not isinstance(
+            conn_config,
+            (
+                net_config.EthernetConnectionConfig,
+                net_config.EthernetSlaveConnectionConfig,
+            ),
         ):
-            return False
-
-        return not nmcli_filters.is_connection_slave(
-            connection_configuration_result.configurable_conn_data.conn_data or {}
-        )
+            self._link_validator.invalidate_links()
 
     def _validate(
         self,
@@ -236,89 +343,69 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
             target_connection_data.conn_config
         )
 
-    def _configure_slave(
-        self,
-        slave_connection_data: nmcli_interface_types.ConfigurableConnectionData,
-        configuration_result: nmcli_interface_types.MainConfigurationResult,
-    ):
-        conn_config = typing.cast(
-            net_config.SlaveConnectionConfig,
-            slave_connection_data.conn_config,
-        )
-
-        builder_args = self._builder_factory(conn_config).build(
-            slave_connection_data.conn_data, configuration_result.result.uuid
-        )
-
-        uuid, changed = self._apply_builder_args(
-            builder_args,
-            conn_config.name,
-            conn_uuid=slave_connection_data.uuid,
-        )
-
-        configuration_result.update_slave_from_required_data(
-            uuid, changed, slave_connection_data
-        )
-
-    def _configure_main_connection(
-        self,
-        target_connection_data: nmcli_interface_types.TargetConnectionData,
+    def apply(
+        self, connection_plan: nmcli_interface_types.ConnectionPlan
     ) -> nmcli_interface_types.MainConfigurationResult:
-        builder_args = self._builder_factory(target_connection_data.conn_config).build(
-            target_connection_data.conn_data, None
-        )
+        """
+        Adds/modifies the connections of a plan. The connections to delete
+        and the states are not handled, see delete_connections and
+        enforce_states.
+        :param connection_plan: The plan of the connection to apply.
+        :return: The configuration result.
+        """
+        target_connection_data = connection_plan.target_connection_data
+
+        # Validation, at manager level, comes after deletion as some
+        # validations depends on the current connection to be dropped
+        # if a type change is needed
+        self._validate(target_connection_data)
 
         uuid, changed = self._apply_builder_args(
-            builder_args,
+            connection_plan.main_change.builder_args,
             target_connection_data.conn_config.name,
             conn_uuid=target_connection_data.uuid,
         )
-        return nmcli_interface_types.MainConfigurationResult.from_result_required_data(
-            uuid, changed, target_connection_data
-        )
-
-    def _configure(
-        self,
-        target_connection_data: nmcli_interface_types.TargetConnectionData,
-    ) -> nmcli_interface_types.MainConfigurationResult:
-        configuration_result = self._configure_main_connection(
-            target_connection_data,
+        configuration_result = (
+            nmcli_interface_types.MainConfigurationResult.from_result_required_data(
+                uuid, changed, target_connection_data
+            )
         )
-
-        for slave_connection_data in target_connection_data.slave_connections:
-            self._configure_slave(slave_connection_data, configuration_result)
+        if changed:
+            self._invalidate_virtual_links(target_connection_data.conn_config)
+
+        for slave_change in connection_plan.slave_changes:
+            builder_args = [
+                uuid if arg == nmcli_interface_types.PLANNED_MAIN_CONN_UUID else arg
+                for arg in slave_change.builder_args
+            ]
+            slave_uuid, slave_changed = self._apply_builder_args(
+                builder_args,
+                slave_change.conn_config.name,
+                conn_uuid=slave_change.uuid,
+            )
+            configuration_result.update_slave_from_required_data(
+                slave_uuid, slave_changed, slave_change.configurable_conn_data
+            )
+            if slave_changed:
+                self._invalidate_virtual_links(slave_change.conn_config)
 
         return configuration_result
 
     def configure(
         self,
         conn_config: net_config.MainConnectionConfig,
+        enforce_state: bool = True,
     ) -> nmcli_interface_types.MainConfigurationResult:
-        # Fetch the target connection data for the connection to configure
-        # That's the set of configurations with their already existing connection
-        # data if it exists.
-        target_connection_data = (
-            self._target_connection_data_factory.build_target_connection_data(
-                conn_config
-            )
-        )
+        connection_plan = self._planner.plan(conn_config)
 
-        # Calculate the connections, that for some reason, as duplication,
-        # inactivity, type change, etc. need to be removed before
-        # configuring the current connection.
-        delete_conn_list = self._target_connection_data_factory.build_delete_conn_list(
-            target_connection_data
-        )
+        delete_count = self.delete_connections(connection_plan.delete_connections)
 
-        delete_count = self.__delete_connections(delete_conn_list)
+        configuration_result = self.apply(connection_plan)
 
-        # Validation, at manager level, comes after deletion as some
-        # validations depends on the current connection to be dropped
-        # if a type change is needed
-        self._validate(target_connection_data)
-
-        configuration_result = self._configure(target_connection_data)
-        self.__enforce_connection_states(configuration_result)
+        # The state can be enforced later, by calling enforce_states,
+        # i.e. to activate independent connections concurrently
+        if enforce_state:
+            self.enforce_states(configuration_result)
 
         # Ensure to propagate the changed flag if connections were deleted
         if delete_count != 0:
@@ -327,6 +414,135 @@ class NetworkManagerConfigurator:  # pylint: disable=too-few-public-methods
         return configuration_result
 
 
+class NetworkManagerDBusConfigurator(NetworkManagerConfigurator):
+    """
+    NetworkManagerConfigurator that applies the changes through the
+    NetworkManager D-Bus API instead of running nmcli. The builder args
+    are translated to settings, so plans are shared by both backends.
+    Changes with properties that cannot be translated are applied with
+    nmcli.
+    """
+
+    def __init__(
+        self,
+        dbus_client: nmcli_dbus.NetworkManagerDBusClient,
+        command_fn: module_command_utils.CommandRunnerFn,
+        connections_store: nmcli_connections_store.NetworkManagerConnectionsStore,
+        builder_factory: nmcli_interface_args_builders.NmcliArgsBuilderFactoryType,
+        target_connection_data_factory: nmcli_interface_target_connection.TargetConnectionDataFactory,
+        link_validator: nmcli_interface_link_validator.NmcliLinkValidator,
+        options: nmcli_interface_types.NetworkManagerConfiguratorOptions = None,
+    ):
+        super().__init__(
+            command_fn,
+            connections_store,
+            builder_factory,
+            target_connection_data_factory,
+            link_validator,
+            options=options,
+        )
+        self.__dbus_client = dbus_client
+
+    def delete_connections(
+        self, connections: typing.List[typing.Dict[str, typing.Any]]
+    ) -> int:
+        uuids = [
+            conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+            for conn_data in connections
+        ]
+        deleted_uuids = []
+        failed_errors = {}
+        for conn_uuid in uuids:
+            # Keep deleting the remaining connections if one fails, as nmcli does
+            try:
+                conn_path = self.__dbus_client.get_connection_path(conn_uuid)
+                if conn_path:
+                    self.__dbus_client.delete_connection(conn_path)
+                deleted_uuids.append(conn_uuid)
+            except dbus_utils.DBusCallException as err:
+                failed_errors[conn_uuid] = str(err)
+
+        self._connections_store.discard(deleted_uuids)
+        if deleted_uuids:
+            self._link_validator.invalidate_links()
+        if failed_errors:
+            raise nmcli_interface_exceptions.NmcliInterfaceDeleteException(
+                f"Failed to delete connections {', '.join(failed_errors)}",
+                error="\n".join(failed_errors.values()),
+                failed_uuids=list(failed_errors),
+            )
+        return len(uuids)
+
+    def _apply_builder_args(
+        self, builder_args: typing.List[str], conn_name: str, conn_uuid: str = None
+    ) -> typing.Tuple[str, bool]:
+        if not builder_args:
+            return conn_uuid, False
+        if not nmcli_dbus.supports_builder_args(builder_args):
+            return super()._apply_builder_args(
+                builder_args, conn_name, conn_uuid=conn_uuid
+            )
+
+        try:
+            conn_path = (
+                self.__dbus_client.get_connection_path(conn_uuid) if conn_uuid else None
+            )
+            if conn_path:
+                self.__dbus_client.update_connection(
+                    conn_path,
+                    nmcli_dbus.encode_builder_args(
+                        builder_args, self.__dbus_client.get_settings(conn_path)
+                    ),
+                )
+            else:
+                # Like nmcli, the UUID of new connections is generated here
+                conn_uuid = conn_uuid or str(uuid.uuid4())
+                self.__dbus_client.add_connection(
+                    nmcli_dbus.encode_builder_args(
+                        builder_args
+                        + [nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID, conn_uuid]
+                    )
+                )
+        except (dbus_utils.DBusCallException, exceptions.ValueInfraException) as err:
+            raise nmcli_interface_exceptions.NmcliInterfaceApplyException(
+                "Failed to apply connection configuration",
+                error=str(err),
+                conn_uuid=conn_uuid,
+                conn_name=conn_name,
+            ) from err
+
+        return conn_uuid, True
+
+    def _request_connection_state(self, conn_uuid: str, conn_name: str, up: bool):
+        # NetworkManager returns as soon as the activation starts,
+        # the base implementation waits for the result by polling
+        try:
+            if up:
+                conn_path = self.__dbus_client.get_connection_path(conn_uuid)
+                if not conn_path:
+                    raise nmcli_interface_exceptions.NmcliInterfaceApplyException(
+                        f"Cannot change the state of connection '{conn_name}'",
+                        error=f"{conn_uuid} doesn't exist",
+                        conn_uuid=conn_uuid,
+                        conn_name=conn_name,
+                    )
+                self.__dbus_client.activate_connection(conn_path)
+                return
+
+            active_connection = self.__dbus_client.get_active_connection(conn_uuid)
+            if active_connection:
+                self.__dbus_client.deactivate_connection(active_connection["Path"])
+        except dbus_utils.DBusCallException as err:
+            if err.name == nmcli_dbus.NM_DBUS_ERROR_CONNECTION_NOT_ACTIVE:
+                return
+            raise nmcli_interface_exceptions.NmcliInterfaceApplyException(
+                f"Cannot change the state of connection '{conn_name}'",
+                error=str(err),
+                conn_uuid=conn_uuid,
+                conn_name=conn_name,
+            ) from err
+
+
 class NetworkManagerConfiguratorFactory:  # pylint: disable=too-few-public-methods
     __CONFIGURATORS_BY_CONFIG_TYPE: typing.Dict[
         type[net_config.MainConnectionConfig], type[NetworkManagerConfigurator]
@@ -339,16 +555,22 @@ class NetworkManagerConfiguratorFactory:  # pylint: disable=too-few-public-metho
     def __init__(
         self,
         runner_fn: module_command_utils.CommandRunnerFn,
-        querier: nmcli_querier.NetworkManagerQuerier,
+        connections_store: nmcli_connections_store.NetworkManagerConnectionsStore,
         builder_factory: nmcli_interface_args_builders.NmcliArgsBuilderFactoryType,
         target_connection_data_factory: nmcli_interface_target_connection.TargetConnectionDataFactory,
         link_validator: nmcli_interface_link_validator.NmcliLinkValidator,
+        dbus_client: typing.Optional[nmcli_dbus.NetworkManagerDBusClient] = None,
     ):
+        """
+        :param dbus_client: If given, the configurators apply the changes through
+                            the NetworkManager D-Bus API instead of running nmcli.
+        """
         self.__runner_fn = runner_fn
-        self.__nmcli_querier = querier
+        self.__connections_store = connections_store
         self.__builder_factory = builder_factory
         self.__target_connection_data_factory = target_connection_data_factory
         self.__link_validator = link_validator
+        self.__dbus_client = dbus_client
 
     def build_configurator(
         self,
@@ -364,11 +586,139 @@ class NetworkManagerConfiguratorFactory:  # pylint: disable=too-few-public-metho
                 f"Unsupported connection type {type(conn_config)} for connection {conn_config.name}"
             )
 
+        if self.__dbus_client:
+            return NetworkManagerDBusConfigurator(
+                self.__dbus_client,
+                self.__runner_fn,
+                self.__connections_store,
+                self.__builder_factory,
+                self.__target_connection_data_factory,
+                self.__link_validator,
+                options=options,
+            )
+
         return configurator_type(
             self.__runner_fn,
-            self.__nmcli_querier,
+            self.__connections_store,
             self.__builder_factory,
             self.__target_connection_data_factory,
             self.__link_validator,
             options=options,
         )
+
+
+class NetworkManagerSessionConfigurator:  # pylint: disable=too-few-public-methods
+    def __init__(
+        self,
+        configurator_factory: NetworkManagerConfiguratorFactory,
+        config_session: nmcli_interface_types.ConfigurationSession,
+        planner: nmcli_interface_planner.NetworkManagerConfigurationPlanner,
+        activation_workers: int = 1,
+    ):
+        self.__configurator_factory = configurator_factory
+        self.__config_session = config_session
+        self.__planner = planner
+        # Max number of connections activated at the same time
+        self.__activation_workers = activation_workers
+        # Sequentially, each connection is configured and activated before
+        # the next one. Concurrently, the connections of each dependency
+        # level, that are independent, are activated at the same time
+        self.__by_levels = activation_workers > 1
+
+    def configure(
+        self, conn_config_handler: net_config.ConnectionsConfigurationHandler
+    ):
+        # Each level is planned right before applying it, against the
+        # connections the previous levels left. Only check mode plans
+        # the whole configuration up front, see plan
+        for conn_configs in nmcli_interface_planner.get_config_levels(
+            conn_config_handler, by_levels=self.__by_levels
+        ):
+            connection_plans = self.__planner.plan_level(
+                conn_config_handler, conn_configs, self.__config_session
+            )
+            self.__apply_level(connection_plans)
+            self.__planner.update_level(connection_plans, self.__config_session)
+
+    def plan(
+        self, conn_config_handler: net_config.ConnectionsConfigurationHandler
+    ) -> nmcli_interface_types.ConfigurationPlan:
+        """
+        Plans the changes of the whole configuration without applying them.
+        :param conn_config_handler: The parsed configuration.
+        :return: The configuration plan.
+        """
+        return self.__planner.plan(conn_config_handler, by_levels=self.__by_levels)
+
+    def plan_commands(
+        self, configuration_plan: nmcli_interface_types.ConfigurationPlan
+    ) -> typing.Dict[str, typing.Dict[str, typing.List[typing.List[str]]]]:
+        """
+        Returns the commands applying the given plan would run, without
+        running them.
+        :param configuration_plan: The plan to report.
+        :return: The commands of each connection, see
+                 NetworkManagerConfigurator.plan_commands, by main connection name.
+        """
+        return {
+            connection_plan.conn_config.name: self.__configurator_factory.build_configurator(
+                connection_plan.conn_config
+            ).plan_commands(
+                connection_plan
+            )
+            for connection_plan in configuration_plan.connections
+        }
+
+    def apply(self, configuration_plan: nmcli_interface_types.ConfigurationPlan):
+        """
+        Applies a whole configuration plan, level by level.
+        :param configuration_plan: The plan to apply.
+        """
+        for connection_plans in configuration_plan.levels:
+            self.__apply_level(connection_plans)
+
+    def __apply_level(
+        self, connection_plans: typing.List[nmcli_interface_types.ConnectionPlan]
+    ):
+        configurators = [
+            self.__configurator_factory.build_configurator(connection_plan.conn_config)
+            for connection_plan in connection_plans
+        ]
+
+        # The connections of a level are independent, so the connections
+        # they replace are all deleted at once
+        delete_connections = {
+            conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]: conn_data
+            for connection_plan in connection_plans
+            for conn_data in connection_plan.delete_connections
+        }
+        if delete_connections:
+            configurators[0].delete_connections(list(delete_connections.values()))
+
+        # Results are added in order, so the session stays deterministic
+        configured = []
+        for configurator, connection_plan in zip(configurators, connection_plans):
+            configuration_result = configurator.apply(connection_plan)
+            # Ensure to propagate the changed flag if connections were deleted
+            if connection_plan.delete_connections:
+                configuration_result.set_changed()
+            self.__config_session.add_result(configuration_result)
+            configured.append((configurator, configuration_result))
+
+        if len(configured) == 1:
+            configurator, configuration_result = configured[0]
+            configurator.enforce_states(configuration_result)
+            return
+
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=min(self.__activation_workers, len(configured))
+        ) as executor:
+            # Consume the results to propagate the errors, if any
+            list(
+                executor.map(
+                    lambda configured_item: configured_item[0].enforce_states(
+                        configured_item[1]
+                    ),
+                    configured,
+                )
+            )
@@ -7,6 +7,7 @@ import typing
 
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
     nmcli_constants,
+    nmcli_interface_types,
     nmcli_interface_utils,
 )
 
@@ -19,68 +20,69 @@ class BaseBuilder(metaclass=abc.ABCMeta):
     def __init__(
         self,
         config: net_config.BaseConnectionConfig,
-        next_handler: "BaseBuilder" = None,
     ):
-        self.__next_handler = next_handler
         self._config = config
 
     @staticmethod
-    def _fold_builder_tuple_list(
-        tuple_list: typing.List[typing.Tuple[str, str]],
-        initial_list: typing.List[str] = None,
-    ) -> typing.List[str]:
-        folded_list = initial_list or []
-        for builder_tuple in tuple_list:
-            if builder_tuple and builder_tuple[0] is not None:
-                folded_list.append(builder_tuple[0])
-                folded_list.append(builder_tuple[1] if len(builder_tuple) > 1 else "")
-        return folded_list
+    def _change(
+        current_connection: typing.Optional[typing.Dict[str, typing.Any]],
+        field: str,
+        value: typing.Optional[str],
+    ) -> nmcli_interface_types.FieldChange:
+        return nmcli_interface_types.FieldChange(
+            field,
+            current_connection.get(field, None) if current_connection else None,
+            value,
+        )
 
     @abc.abstractmethod
     def _collect(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         main_conn_uuid: typing.Optional[str],
-    ) -> typing.List[typing.Tuple[str, str]]:
+    ) -> typing.List[typing.Optional[nmcli_interface_types.FieldChange]]:
         pass
 
-    @property
-    def next_handler(self) -> "BaseBuilder":
-        return self.__next_handler
+    def diff(
+        self,
+        current_connection: typing.Optional[typing.Dict[str, typing.Any]],
+        main_conn_uuid: typing.Optional[str],
+    ) -> nmcli_interface_types.ConnectionDiff:
+        return nmcli_interface_types.ConnectionDiff(
+            change
+            for change in self._collect(current_connection, main_conn_uuid)
+            if change is not None
+        )
 
     def build(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         main_conn_uuid: typing.Optional[str],
     ) -> typing.List[str]:
-        initial_list = (
-            self.__next_handler.build(current_connection, main_conn_uuid)
-            if self.__next_handler
-            else []
-        )
-        return self._fold_builder_tuple_list(
-            self._collect(current_connection, main_conn_uuid),
-            initial_list=initial_list,
-        )
+        return self.diff(current_connection, main_conn_uuid).to_args()
 
 
 class CommonConnectionArgsBuilder(BaseBuilder):
     def __build_connection_id(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         if (not current_connection) or (
             current_connection.get(nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID, None)
             != self._config.name
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID, self._config.name
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID,
+                self._config.name,
+            )
 
-        return None, None
+        return None
 
     def __build_connection_iface(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         # Some connection types don't require the interface to be set
         iface_name = (
             self._config.interface.iface_name if self._config.interface else None
@@ -94,17 +96,18 @@ class CommonConnectionArgsBuilder(BaseBuilder):
                 != iface_name
             )
         ):
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME,
                 iface_name,
             )
 
-        return None, None
+        return None
 
     def __build_autoconnect(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         current_value = (
             nmcli_constants.map_from_mcli_boolean_value(
                 current_connection.get(
@@ -117,30 +120,32 @@ class CommonConnectionArgsBuilder(BaseBuilder):
         if self._config.startup is not None and (
             (not current_connection) or current_value != self._config.startup
         ):
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_AUTOCONNECT,
                 nmcli_constants.map_to_mcli_boolean_value(self._config.startup),
             )
 
-        return None, None
+        return None
 
     def __build_connection_type(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         if not current_connection:
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE,
                 nmcli_constants.map_config_to_nmcli_type_field(type(self._config)),
             )
 
-        return None, None
+        return None
 
     def _collect(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         main_conn_uuid: typing.Optional[str],
-    ) -> typing.List[typing.Tuple[str, str]]:
+    ) -> typing.List[typing.Optional[nmcli_interface_types.FieldChange]]:
         return [
             self.__build_connection_type(current_connection),
             self.__build_connection_id(current_connection),
@@ -157,9 +162,8 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
         self,
         config: net_config.BaseConnectionConfig,
         version: int,
-        next_handler: "BaseBuilder" = None,
     ):
-        super().__init__(config, next_handler=next_handler)
+        super().__init__(config)
         if not isinstance(config, net_config.MainConnectionConfig):
             raise ValueError(f"unexpected configuration type {type(config)}")
         conn_config = typing.cast(net_config.MainConnectionConfig, self._config)
@@ -201,21 +205,24 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
     def __build_ip_method(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
-        target_method, change = self.__get_ip_target_method(current_connection)
-        if change:
-            return (
+        target_method: str,
+        method_change: bool,
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
+        if method_change:
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD[self.__version],
                 target_method,
             )
 
-        return None, None
+        return None
 
     def __build_ip_address(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
-        target_method, method_change = self.__get_ip_target_method(current_connection)
+        target_method: str,
+        method_change: bool,
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
 
         current_addresses = (
             nmcli_interface_utils.cast_as_list(
@@ -255,7 +262,11 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
                 != target_ip_str
             )
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_ADDRESSES[self.__version], ""
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_ADDRESSES[self.__version],
+                "",
+            )
 
         if (
             # Not current_connection: Do not compare to current_addresses
@@ -270,18 +281,20 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
             or len(current_addresses) > 1
             or (current_ip_str != target_ip_str)
         ):
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_IP_ADDRESSES[self.__version],
                 target_ip_str,
             )
 
-        return None, None
+        return None
 
     def __build_ip_default_route_disable(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
-        target_method, method_change = self.__get_ip_target_method(current_connection)
+        target_method: str,
+        method_change: bool,
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         # Setting defaults to false, as NM defaults to no/false (not to none).
         # There is no way to check if NM is returning the default "false" or a true set false.
         # The defaults must be consistent in both the target value and the current setting,
@@ -319,22 +332,28 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
             )
         ):
             # Set never-default to it's default value (empty forces nmcli to default)
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_NEVER_DEFAULT[self.__version], ""
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_NEVER_DEFAULT[self.__version],
+                "",
+            )
         if current_setting != target_value:
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_IP_NEVER_DEFAULT[self.__version],
                 nmcli_constants.map_to_mcli_boolean_value(
                     self.__ip_candidate_config.disable_default_route
                 ),
             )
 
-        return None, None
+        return None
 
     def __build_ip_gw(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
-        target_method, method_change = self.__get_ip_target_method(current_connection)
+        target_method: str,
+        method_change: bool,
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         current_gateway = (
             current_connection.get(
                 nmcli_constants.NMCLI_CONN_FIELD_IP_GATEWAY[self.__version], None
@@ -369,21 +388,27 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
                 != target_gw
             )
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_GATEWAY[self.__version], ""
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_GATEWAY[self.__version],
+                "",
+            )
 
         if current_gateway != target_gw:
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_IP_GATEWAY[self.__version],
                 target_gw,
             )
 
-        return None, None
+        return None
 
     def __build_ip_dns(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
-        target_method, method_change = self.__get_ip_target_method(current_connection)
+        target_method: str,
+        method_change: bool,
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         target_dns_servers = (
             [str(dns) for dns in self.__ip_candidate_config.dns]
             if self.__ip_candidate_config
@@ -413,20 +438,27 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
             and target_method == nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD_VAL_DISABLED
             and (target_dns_servers != current_dns_servers)
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_DNS[self.__version], ""
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_DNS[self.__version],
+                "",
+            )
 
         if target_dns_servers != current_dns_servers:
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_DNS[self.__version], ",".join(
-                target_dns_servers
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_DNS[self.__version],
+                ",".join(target_dns_servers),
             )
 
-        return None, None
+        return None
 
     def __build_ip_routes(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
-        target_method, method_change = self.__get_ip_target_method(current_connection)
+        target_method: str,
+        method_change: bool,
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         target_routes = (
             self.__convert_config_to_nmcli_routes(self.__ip_candidate_config)
             if self.__ip_candidate_config
@@ -455,26 +487,37 @@ class IPConnectionArgsBuilder(BaseBuilder, typing.Generic[TIp]):
             and target_method == nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD_VAL_DISABLED
             and target_routes != current_routes
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_ROUTES[self.__version], ""
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_ROUTES[self.__version],
+                "",
+            )
         if target_routes != current_routes:
-            return nmcli_constants.NMCLI_CONN_FIELD_IP_ROUTES[self.__version], ",".join(
-                target_routes
-            ).rstrip(",")
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_IP_ROUTES[self.__version],
+                ",".join(target_routes).rstrip(","),
+            )
 
-        return None, None
+        return None
 
     def _collect(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         __: typing.Optional[str],
-    ) -> typing.List[typing.Tuple[str, str]]:
+    ) -> typing.List[typing.Optional[nmcli_interface_types.FieldChange]]:
+        # All the fields depend on the target method, resolve it once
+        target_method, method_change = self.__get_ip_target_method(current_connection)
         return [
-            self.__build_ip_method(current_connection),
-            self.__build_ip_address(current_connection),
-            self.__build_ip_gw(current_connection),
-            self.__build_ip_dns(current_connection),
-            self.__build_ip_routes(current_connection),
-            self.__build_ip_default_route_disable(current_connection),
+            field_fn(current_connection, target_method, method_change)
+            for field_fn in (
+                self.__build_ip_method,
+                self.__build_ip_address,
+                self.__build_ip_gw,
+                self.__build_ip_dns,
+                self.__build_ip_routes,
+                self.__build_ip_default_route_disable,
+            )
         ]
 
 
@@ -482,27 +525,24 @@ class IPv4ConnectionArgsBuilder(IPConnectionArgsBuilder[net_config.IPv4Config]):
     def __init__(
         self,
         config: net_config.BaseConnectionConfig,
-        next_handler: "BaseBuilder" = None,
     ):
-        super().__init__(config, 4, next_handler=next_handler)
+        super().__init__(config, 4)
 
 
 class IPv6ConnectionArgsBuilder(IPConnectionArgsBuilder[net_config.IPv6Config]):
     def __init__(
         self,
         config: net_config.BaseConnectionConfig,
-        next_handler: "BaseBuilder" = None,
     ):
-        super().__init__(config, 6, next_handler=next_handler)
+        super().__init__(config, 6)
 
 
 class VlanConnectionArgsBuilder(BaseBuilder):
     def __init__(
         self,
         config: net_config.BaseConnectionConfig,
-        next_handler: "BaseBuilder" = None,
     ):
-        super().__init__(config, next_handler=next_handler)
+        super().__init__(config)
         if not isinstance(self._config, net_config.VlanBaseConnectionConfig):
             raise ValueError(f"unexpected configuration type {type(self._config)}")
         self.__vlan_config = typing.cast(
@@ -512,39 +552,42 @@ class VlanConnectionArgsBuilder(BaseBuilder):
     def __build_vlan_parent_iface(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         if (not current_connection) or (
             current_connection.get(
                 nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT, None
             )
             != self.__vlan_config.parent_interface.iface_name
         ):
-            return (
+            return self._change(
+                current_connection,
                 nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT,
                 self.__vlan_config.parent_interface.iface_name,
             )
 
-        return None, None
+        return None
 
     def __build_vlan_id(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         if (not current_connection) or (
             current_connection.get(nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_ID, None)
             != self.__vlan_config.vlan_id
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_ID, str(
-                self.__vlan_config.vlan_id
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_ID,
+                str(self.__vlan_config.vlan_id),
             )
 
-        return None, None
+        return None
 
     def _collect(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         main_conn_uuid: typing.Optional[str],
-    ) -> typing.List[typing.Tuple[str, str]]:
+    ) -> typing.List[typing.Optional[nmcli_interface_types.FieldChange]]:
         return [
             self.__build_vlan_parent_iface(current_connection),
             self.__build_vlan_id(current_connection),
@@ -555,9 +598,8 @@ class SlaveConnectionArgsBuilder(BaseBuilder):
     def __init__(
         self,
         config: net_config.BaseConnectionConfig,
-        next_handler: "BaseBuilder" = None,
     ):
-        super().__init__(config, next_handler=next_handler)
+        super().__init__(config)
         if not isinstance(self._config, net_config.SlaveConnectionConfig):
             raise ValueError(f"unexpected configuration type {type(self._config)}")
         self.__slave_config = typing.cast(
@@ -567,7 +609,7 @@ class SlaveConnectionArgsBuilder(BaseBuilder):
     def __build_slave_type(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         target_type = nmcli_constants.map_config_to_nmcli_type_field(
             type(self.__slave_config.main_connection_config)
         )
@@ -577,36 +619,76 @@ class SlaveConnectionArgsBuilder(BaseBuilder):
             )
             != target_type
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_SLAVE_TYPE, target_type
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_SLAVE_TYPE,
+                target_type,
+            )
 
-        return None, None
+        return None
 
-    @staticmethod
     def __build_main_conn_id(
+        self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         main_conn_uuid: typing.Optional[str],
-    ) -> typing.Tuple[typing.Optional[str], typing.Optional[str]]:
+    ) -> typing.Optional[nmcli_interface_types.FieldChange]:
         if (not current_connection) or (
             current_connection.get(
                 nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER, None
             )
             != main_conn_uuid
         ):
-            return nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER, main_conn_uuid
+            return self._change(
+                current_connection,
+                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER,
+                main_conn_uuid,
+            )
 
-        return None, None
+        return None
 
     def _collect(
         self,
         current_connection: typing.Optional[typing.Dict[str, typing.Any]],
         main_conn_uuid: typing.Optional[str],
-    ) -> typing.List[typing.Tuple[str, str]]:
+    ) -> typing.List[typing.Optional[nmcli_interface_types.FieldChange]]:
         return [
             self.__build_slave_type(current_connection),
             self.__build_main_conn_id(current_connection, main_conn_uuid),
         ]
 
 
+class ConnectionArgsBuilder(BaseBuilder):
+    """
+    Flat sequence of the builders that apply to a connection. The
+    changes are collected in order, i.e. the connection type first.
+    """
+
+    def __init__(
+        self,
+        config: net_config.BaseConnectionConfig,
+        builders: typing.Sequence[BaseBuilder],
+    ):
+        super().__init__(config)
+        self.__builders = tuple(builders)
+
+    @property
+    def builders(self) -> typing.Tuple[BaseBuilder, ...]:
+        return self.__builders
+
+    def _collect(
+        self,
+        current_connection: typing.Optional[typing.Dict[str, typing.Any]],
+        main_conn_uuid: typing.Optional[str],
+    ) -> typing.List[typing.Optional[nmcli_interface_types.FieldChange]]:
+        return [
+            change
+            for builder in self.__builders
+            for change in builder._collect(  # pylint: disable=protected-access
+                current_connection, main_conn_uuid
+            )
+        ]
+
+
 NmcliArgsBuilderFactoryType = typing.Callable[
     [
         net_config.BaseConnectionConfig,
@@ -614,22 +696,51 @@ NmcliArgsBuilderFactoryType = typing.Callable[
     BaseBuilder,
 ]
 
+# Builders of each family of configurations, in the order their
+# changes are collected
+__BUILDER_TYPES_BY_CONFIG_BASE_TYPE: typing.Tuple[
+    typing.Tuple[type, typing.Tuple[typing.Type[BaseBuilder], ...]], ...
+] = (
+    (net_config.BaseConnectionConfig, (CommonConnectionArgsBuilder,)),
+    (net_config.SlaveConnectionConfig, (SlaveConnectionArgsBuilder,)),
+    # Add IP builders always (main connections), even
+    # if the connection is configured to not use IP.
+    # They will add the needed args to disable IP if needed
+    (
+        net_config.MainConnectionConfig,
+        (IPv4ConnectionArgsBuilder, IPv6ConnectionArgsBuilder),
+    ),
+    (net_config.VlanBaseConnectionConfig, (VlanConnectionArgsBuilder,)),
+)
+
+# Resolved builders of each configuration type, filled on first use
+__BUILDER_TYPES_CACHE: typing.Dict[
+    type, typing.Tuple[typing.Type[BaseBuilder], ...]
+] = {}
+
+
+def __get_builder_types(
+    config_type: type,
+) -> typing.Tuple[typing.Type[BaseBuilder], ...]:
+    builder_types = __BUILDER_TYPES_CACHE.get(config_type, None)
+    if builder_types is None:
+        builder_types = tuple(
+            builder_type
+            for base_type, base_builder_types in __BUILDER_TYPES_BY_CONFIG_BASE_TYPE
+            if issubclass(config_type, base_type)
+            for builder_type in base_builder_types
+        )
+        __BUILDER_TYPES_CACHE[config_type] = builder_types
+    return builder_types
+
 
 def nmcli_args_builder_factory(
     conn_config: net_config.BaseConnectionConfig,
 ) -> BaseBuilder:
-    builder = CommonConnectionArgsBuilder(conn_config)
-    if isinstance(conn_config, net_config.SlaveConnectionConfig):
-        builder = SlaveConnectionArgsBuilder(conn_config, next_handler=builder)
-
-    if isinstance(conn_config, net_config.MainConnectionConfig):
-        # Add IP builders always (main connections), even
-        # if the connection is configured to not use IP.
-        # They will add the needed args to disable IP if needed
-        builder = IPv4ConnectionArgsBuilder(conn_config, next_handler=builder)
-        builder = IPv6ConnectionArgsBuilder(conn_config, next_handler=builder)
-
-    if isinstance(conn_config, net_config.VlanBaseConnectionConfig):
-        builder = VlanConnectionArgsBuilder(conn_config, next_handler=builder)
-
-    return builder
+    return ConnectionArgsBuilder(
+        conn_config,
+        [
+            builder_type(conn_config)
+            for builder_type in __get_builder_types(type(conn_config))
+        ],
+    )
@@ -41,3 +41,20 @@ class NmcliInterfaceApplyException(NmcliExecuteCommandException):
         super().__init__(msg, error=error, cmd=cmd)
         self.conn_uuid = conn_uuid
         self.conn_name = conn_name
+
+
+class NmcliInterfaceDeleteException(NmcliInterfaceApplyException):
+    def __init__(
+        self,
+        msg,
+        error: str = None,
+        cmd: typing.List[str] = None,
+        failed_uuids: typing.List[str] = None,
+    ) -> None:
+        super().__init__(
+            msg,
+            error=error,
+            cmd=cmd,
+            conn_uuid=failed_uuids[0] if failed_uuids else None,
+        )
+        self.failed_uuids = failed_uuids or []
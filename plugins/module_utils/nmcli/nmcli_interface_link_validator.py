@@ -18,9 +18,13 @@ from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
 class NmcliLinkValidator:
     def __init__(
         self,
-        ip_iface: ip_interface.IPInterface,
+        ip_links: ip_interface.IPLinksTable,
     ):
-        self.__ip_iface = ip_iface
+        self.__ip_links = ip_links
+
+    def invalidate_links(self):
+        # Interfaces were created or deleted, links must be fetched again
+        self.__ip_links.invalidate()
 
     def validate_mandatory_links(self, conn_config: net_config.BaseConnectionConfig):
         if isinstance(
@@ -65,11 +69,4 @@ class NmcliLinkValidator:
     def _get_link_by_iface_name(
         self, interface_name: str
     ) -> typing.Optional[ip_interface.IPLinkData]:
-        return next(
-            (
-                ip_link
-                for ip_link in self.__ip_iface.get_ip_links()
-                if ip_link.if_name == interface_name.lower()
-            ),
-            None,
-        )
+        return self.__ip_links.get_by_name(interface_name.lower())
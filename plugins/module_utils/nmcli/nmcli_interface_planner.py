@@ -0,0 +1,318 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils.net import (
+    net_config,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
+    nmcli_constants,
+    nmcli_filters,
+    nmcli_interface_args_builders,
+    nmcli_interface_target_connection,
+    nmcli_interface_types,
+)
+
+
+def resolve_state_transition(
+    configurable_conn_data: nmcli_interface_types.ConfigurableConnectionData,
+    conn_status: typing.Optional[typing.Mapping[str, typing.Any]],
+    changed: bool,
+) -> typing.Optional[str]:
+    """
+    Computes the state a connection needs to be brought to.
+    :param configurable_conn_data: The connection configuration and its original data.
+    :param conn_status: The current connection data, to read the state from.
+    :param changed: If the connection has been (or is going to be) added or modified.
+    :return: The target state, up or down, or None if no state change is needed.
+    """
+    conn_config = configurable_conn_data.conn_config
+    should_enforce_adopted = __should_enforce_adopted(configurable_conn_data)
+    should_up = (
+        conn_config.state == net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP
+    ) or should_enforce_adopted
+    is_active = nmcli_filters.is_connection_active(conn_status or {})
+    in_target_state = (should_up and is_active) or ((not should_up) and (not is_active))
+
+    # Important: If we modified the connection, we should always apply up/down it
+    # as some properties are applied only when the connection is explicitly activated/turn down
+    # Skip making any change if the state is not set -> State not set == do not handle it
+    # One exception to the previous statement -> If the interface has been adopted
+    if ((not conn_config.state) and (not should_enforce_adopted)) or (
+        in_target_state and not changed
+    ):
+        return None
+
+    return (
+        net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP
+        if should_up
+        else net_config.BaseConnectionConfig.FIELD_STATE_VAL_DOWN
+    )
+
+
+def get_config_levels(
+    conn_config_handler: net_config.ConnectionsConfigurationHandler,
+    by_levels: bool = True,
+) -> typing.List[typing.List[net_config.MainConnectionConfig]]:
+    """
+    Groups the connections of a configuration in the levels they are
+    planned and applied by.
+    :param conn_config_handler: The parsed configuration.
+    :param by_levels: Group the connections by dependency level. If not,
+                      each connection goes to its own level, in the order
+                      of the flattened dependency levels.
+    :return: The list of levels.
+    """
+    levels = conn_config_handler.levels
+    if by_levels:
+        return levels
+    return [[conn_config] for level in levels for conn_config in level]
+
+
+def __should_enforce_adopted(
+    configurable_conn_data: nmcli_interface_types.ConfigurableConnectionData,
+) -> bool:
+    # If the connection is a main one, or it doesn't go up -> Skip
+    # Adopted conns are those that were "main ones" but
+    # now they are slaves of another connection
+    # Base on the docs, when a connection goes from a main one
+    # to a slave, an explicit up is needed before making the main
+    # connection up
+    conn_config = configurable_conn_data.conn_config
+    if (not isinstance(conn_config, net_config.SlaveConnectionConfig)) or (
+        conn_config.main_connection_config.state
+        != net_config.BaseConnectionConfig.FIELD_STATE_VAL_UP
+    ):
+        return False
+
+    return not nmcli_filters.is_connection_slave(configurable_conn_data)
+
+
+class NetworkManagerConnectionPlanner:  # pylint: disable=too-few-public-methods
+    """
+    Computes the changes needed to bring a single main connection, and
+    its slaves, to the configured state. It doesn't run any command.
+    """
+
+    def __init__(
+        self,
+        builder_factory: nmcli_interface_args_builders.NmcliArgsBuilderFactoryType,
+        target_connection_data_factory: nmcli_interface_target_connection.TargetConnectionDataFactory,
+    ):
+        self.__builder_factory = builder_factory
+        self.__target_connection_data_factory = target_connection_data_factory
+
+    def plan(
+        self, conn_config: net_config.MainConnectionConfig
+    ) -> nmcli_interface_types.ConnectionPlan:
+        # Fetch the target connection data for the connection to configure
+        # That's the set of configurations with their already existing connection
+        # data if it exists.
+        target_connection_data = (
+            self.__target_connection_data_factory.build_target_connection_data(
+                conn_config
+            )
+        )
+
+        # Calculate the connections, that for some reason, as duplication,
+        # inactivity, type change, etc. need to be removed before
+        # configuring the current connection.
+        delete_conn_list = self.__target_connection_data_factory.build_delete_conn_list(
+            target_connection_data
+        )
+
+        main_change = self.__plan_change(target_connection_data, None)
+
+        # Slaves point to the main connection by UUID, that is not known
+        # till the main connection is added, if it doesn't exist yet
+        main_conn_uuid = (
+            target_connection_data.uuid or nmcli_interface_types.PLANNED_MAIN_CONN_UUID
+        )
+        slave_changes = [
+            self.__plan_change(slave_connection_data, main_conn_uuid)
+            for slave_connection_data in target_connection_data.slave_connections
+        ]
+
+        return nmcli_interface_types.ConnectionPlan(
+            target_connection_data=target_connection_data,
+            delete_connections=delete_conn_list,
+            main_change=main_change,
+            slave_changes=slave_changes,
+        )
+
+    def __plan_change(
+        self,
+        configurable_conn_data: nmcli_interface_types.ConfigurableConnectionData,
+        main_conn_uuid: typing.Optional[str],
+    ) -> nmcli_interface_types.ConnectionChange:
+        diff = self.__builder_factory(configurable_conn_data.conn_config).diff(
+            configurable_conn_data.conn_data, main_conn_uuid
+        )
+        return nmcli_interface_types.ConnectionChange(
+            configurable_conn_data=configurable_conn_data,
+            diff=diff,
+            state_transition=resolve_state_transition(
+                configurable_conn_data, configurable_conn_data, bool(diff)
+            ),
+        )
+
+
+class NetworkManagerConfigurationPlanner:
+    """
+    Computes the changes needed to apply a configuration, either the
+    whole one up front, from a single snapshot of the connections, or a
+    level at a time, right before applying it. Each connection is
+    planned as if the previous ones were already applied, i.e. the
+    connections deleted by them are not considered.
+    """
+
+    def __init__(
+        self,
+        connections_store: nmcli_connections_store.NetworkManagerConnectionsStore,
+        builder_factory: nmcli_interface_args_builders.NmcliArgsBuilderFactoryType,
+    ):
+        self.__connections_store = connections_store
+        self.__builder_factory = builder_factory
+        # The state planning a level at a time shares between levels,
+        # see plan_level, and the configuration it belongs to
+        self.__levels_conn_config_handler: typing.Optional[
+            net_config.ConnectionsConfigurationHandler
+        ] = None
+        self.__levels_planning_store: typing.Optional[
+            nmcli_connections_store.NetworkManagerConnectionsStore
+        ] = None
+        self.__levels_planning_session: typing.Optional[
+            nmcli_interface_types.ConfigurationSession
+        ] = None
+        self.__levels_connection_planner: typing.Optional[
+            NetworkManagerConnectionPlanner
+        ] = None
+
+    def plan(
+        self,
+        conn_config_handler: net_config.ConnectionsConfigurationHandler,
+        by_levels: bool = True,
+    ) -> nmcli_interface_types.ConfigurationPlan:
+        """
+        Plans the changes of all the connections of the given configuration.
+        :param conn_config_handler: The parsed configuration.
+        :param by_levels: Group the connections by dependency level. If not,
+                          each connection goes to its own level, in order.
+        :return: The configuration plan.
+        """
+        # Plans are computed against a copy of the store, so simulated
+        # changes are not seen by the real session
+        planning_store = self.__connections_store.copy()
+        planning_session = nmcli_interface_types.ConfigurationSession()
+        connection_planner = self.__build_connection_planner(
+            conn_config_handler, planning_store, planning_session
+        )
+        return nmcli_interface_types.ConfigurationPlan(
+            levels=[
+                self.__plan_level(
+                    connection_planner, conn_configs, planning_store, planning_session
+                )
+                for conn_configs in get_config_levels(
+                    conn_config_handler, by_levels=by_levels
+                )
+            ]
+        )
+
+    def plan_level(
+        self,
+        conn_config_handler: net_config.ConnectionsConfigurationHandler,
+        conn_configs: typing.List[net_config.MainConnectionConfig],
+        config_session: nmcli_interface_types.ConfigurationSession,
+    ) -> typing.List[nmcli_interface_types.ConnectionPlan]:
+        """
+        Plans the changes of a single level against the current connections,
+        i.e. right before applying it, once the previous levels are applied
+        and reported through update_level.
+        The copy of the connections the levels are planned against, and
+        the lookups computed from it, are kept for the whole configuration.
+        :param conn_config_handler: The parsed configuration.
+        :param conn_configs: The connections of the level.
+        :param config_session: The session the previous levels were applied to.
+        :return: The plans of the connections of the level, in order.
+        """
+        if self.__levels_conn_config_handler is not conn_config_handler:
+            self.__levels_conn_config_handler = conn_config_handler
+            self.__levels_planning_store = self.__connections_store.copy()
+            self.__levels_planning_session = (
+                nmcli_interface_types.ConfigurationSession()
+            )
+            self.__levels_connection_planner = self.__build_connection_planner(
+                conn_config_handler,
+                self.__levels_planning_store,
+                self.__levels_planning_session,
+            )
+        self.__levels_planning_session.add_uuids(config_session.uuids)
+        return self.__plan_level(
+            self.__levels_connection_planner,
+            conn_configs,
+            self.__levels_planning_store,
+            self.__levels_planning_session,
+        )
+
+    def update_level(
+        self,
+        connection_plans: typing.List[nmcli_interface_types.ConnectionPlan],
+        config_session: nmcli_interface_types.ConfigurationSession,
+    ):
+        """
+        Brings the connections the levels are planned against up to date
+        once a level returned by plan_level is applied, copying only the
+        connections the level touched from the real store.
+        :param connection_plans: The plans of the applied level.
+        :param config_session: The session the level was applied to.
+        """
+        if self.__levels_planning_store is None:
+            return
+        touched_uuids = {}
+        for connection_plan in connection_plans:
+            for conn_data in connection_plan.delete_connections:
+                touched_uuids[
+                    conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                ] = None
+            configuration_result = config_session.conn_config_results.get(
+                connection_plan.conn_config.name, None
+            )
+            if configuration_result:
+                touched_uuids.update(dict.fromkeys(configuration_result.get_uuids()))
+        self.__levels_planning_store.update_from(
+            self.__connections_store, touched_uuids
+        )
+
+    def __build_connection_planner(
+        self,
+        conn_config_handler: net_config.ConnectionsConfigurationHandler,
+        planning_store: nmcli_connections_store.NetworkManagerConnectionsStore,
+        planning_session: nmcli_interface_types.ConfigurationSession,
+    ) -> NetworkManagerConnectionPlanner:
+        return NetworkManagerConnectionPlanner(
+            self.__builder_factory,
+            nmcli_interface_target_connection.TargetConnectionDataFactory(
+                planning_store, conn_config_handler, planning_session
+            ),
+        )
+
+    @staticmethod
+    def __plan_level(
+        connection_planner: NetworkManagerConnectionPlanner,
+        conn_configs: typing.List[net_config.MainConnectionConfig],
+        planning_store: nmcli_connections_store.NetworkManagerConnectionsStore,
+        planning_session: nmcli_interface_types.ConfigurationSession,
+    ) -> typing.List[nmcli_interface_types.ConnectionPlan]:
+        level_plans = []
+        for conn_config in conn_configs:
+            connection_plan = connection_planner.plan(conn_config)
+            planning_store.discard(
+                conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                for conn_data in connection_plan.delete_connections
+            )
+            planning_session.add_uuids(connection_plan.target_connection_data.uuids)
+            level_plans.append(connection_plan)
+        return level_plans
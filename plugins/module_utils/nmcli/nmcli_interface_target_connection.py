@@ -9,8 +9,9 @@ from ansible_collections.pbtn.common.plugins.module_utils.net import (
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
     nmcli_constants,
+    nmcli_connections_index,
+    nmcli_connections_store,
     nmcli_filters,
-    nmcli_querier,
     nmcli_interface_types,
 )
 
@@ -18,15 +19,24 @@ from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
 class TargetConnectionDataFactory:
     def __init__(
         self,
-        querier: nmcli_querier.NetworkManagerQuerier,
+        connections_store: nmcli_connections_store.NetworkManagerConnectionsStore,
         conn_config_handler: net_config.ConnectionsConfigurationHandler,
         config_session: nmcli_interface_types.ConfigurationSession,
     ):
-        self.__connections = querier.get_connections()
+        self.__connections_store = connections_store
         self.__conn_config_handler: net_config.ConnectionsConfigurationHandler = (
             conn_config_handler
         )
         self.__config_session = config_session
+        # Slave UUIDs grouped by main connection UUID, the main connection
+        # UUIDs of each grouped slave, and the index and the version of it
+        # they are up to date with
+        self.__main_conns_dict: typing.Dict[str, typing.List[str]] = {}
+        self.__main_uuids_by_slave: typing.Dict[str, typing.List[str]] = {}
+        self.__main_conns_dict_index: typing.Optional[
+            nmcli_connections_index.NetworkManagerConnectionsIndex
+        ] = None
+        self.__main_conns_dict_version = 0
 
     def build_target_connection_data(
         self,
@@ -40,7 +50,7 @@ class TargetConnectionDataFactory:
         # ** Target connection should be of the expected type,
         #    if not, we will reject it as a candidate
         target_connection = nmcli_filters.first_connection_with_name_and_type(
-            self.__connections,
+            self.__connections_store.index,
             conn_config.name,
             nmcli_constants.map_config_to_nmcli_type_field(type(conn_config)),
             is_main_conn=True,
@@ -52,7 +62,9 @@ class TargetConnectionDataFactory:
                 next(
                     (
                         conn
-                        for conn in self.__connections
+                        for conn in self.__connections_store.index.with_interface_name(
+                            conn_config.interface.iface_name
+                        )
                         if self.__is_connection_for_target_active_type_iface(
                             conn, conn_config
                         )
@@ -75,7 +87,7 @@ class TargetConnectionDataFactory:
             #   1) Connection name matches
             #   2) An active connection for the interface exists
             target_slave_connection = nmcli_filters.first_connection_with_name_and_type(
-                self.__connections,
+                self.__connections_store.index,
                 conn_slave_config.name,
                 nmcli_constants.map_config_to_nmcli_type_field(type(conn_slave_config)),
                 prio_active=True,
@@ -84,7 +96,9 @@ class TargetConnectionDataFactory:
                 target_slave_connection = next(
                     (
                         slave_conn_data
-                        for slave_conn_data in self.__connections
+                        for slave_conn_data in self.__connections_store.index.with_interface_name(
+                            conn_slave_config.interface.iface_name
+                        )
                         if self.__is_connection_for_target_active_type_iface(
                             slave_conn_data, conn_slave_config
                         )
@@ -121,7 +135,7 @@ class TargetConnectionDataFactory:
         # Preserves the ones that are going to be configured after the current one
         to_preserve_uuids.update(self.__get_children_uuids(target_connection_data))
 
-        main_conns_dict = self.__build_main_conns_dict()
+        main_conns_dict = self.__get_main_conns_dict()
 
         # Compute the connections that use the same device as the targeted connections
         # (main and slaves) cause those may be removed to avoid interfering with the
@@ -142,10 +156,8 @@ class TargetConnectionDataFactory:
         #     a connection that is based on an interface like ethernet
         duplicated_conns = [
             conn_data
-            for conn_data in self.__connections
-            if (
-                conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID]
-                == target_connection_data.conn_config.name
+            for conn_data in self.__connections_store.index.with_id(
+                target_connection_data.conn_config.name
             )
             #  Important: The picked connections cannot be slaves, that's why
             #    we need to check that candidates are not target slaves, cause
@@ -153,7 +165,7 @@ class TargetConnectionDataFactory:
             #    Ethernet to a bridge with that connection interface as Ethernet
             #    slave without changing the connection name, we would like to
             #    preserve the connection
-            and (
+            if (
                 conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
                 not in to_preserve_uuids
             )
@@ -173,34 +185,86 @@ class TargetConnectionDataFactory:
         }
         return list(delete_candidates.values())
 
-    def __build_main_conns_dict(
+    def __get_main_conns_dict(
         self,
     ) -> typing.Dict[str, typing.List[str]]:
-        main_groups = {}
-        for conn_data in self.__connections:
-            # Discard all connections that are not slaves
-            if not nmcli_filters.is_connection_slave(conn_data):
-                continue
-
-            # Try to fetch its main connection
-            main_conn_data = next(
-                (
-                    main_conn_data
-                    for main_conn_data in self.__connections
-                    if (not nmcli_filters.is_connection_slave(main_conn_data))
-                    and nmcli_filters.is_main_connection_of(main_conn_data, conn_data)
-                ),
-                None,
-            )
-            if not main_conn_data:
-                continue
-            main_uuid = main_conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
-            if main_uuid not in main_groups:
-                main_groups[main_uuid] = []
-            main_groups[main_uuid].append(
+        # The grouping is computed once per snapshot. Then, as the
+        # connections change, only the slaves the changes may move
+        # from one main connection to another are grouped again
+        connections_index = self.__connections_store.index
+        if self.__main_conns_dict_index is not connections_index:
+            self.__main_conns_dict = {}
+            self.__main_uuids_by_slave = {}
+            regroup_uuids = [
                 conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                for conn_data in connections_index
+            ]
+        else:
+            regroup_uuids = self.__get_regroup_uuids(
+                connections_index,
+                connections_index.changes_since(self.__main_conns_dict_version),
             )
-        return main_groups
+        self.__group_slaves(connections_index, regroup_uuids)
+        self.__main_conns_dict_index = connections_index
+        self.__main_conns_dict_version = connections_index.version
+        return self.__main_conns_dict
+
+    @staticmethod
+    def __get_regroup_uuids(
+        connections_index: nmcli_connections_index.NetworkManagerConnectionsIndex,
+        changed_connections: typing.List[typing.Mapping[str, typing.Any]],
+    ) -> typing.List[str]:
+        # A slave main connection depends on the slave itself and on the
+        # connections its master points to, by UUID or by interface
+        regroup_uuids = {}
+        for conn_data in changed_connections:
+            conn_uuid = conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+            regroup_uuids[conn_uuid] = None
+            for slave_conn_data in connections_index.with_masters(
+                conn_reference
+                for conn_reference in (
+                    conn_uuid,
+                    conn_data.get(
+                        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME
+                    ),
+                )
+                if conn_reference
+            ):
+                regroup_uuids[
+                    slave_conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                ] = None
+        return list(regroup_uuids)
+
+    def __group_slaves(
+        self,
+        connections_index: nmcli_connections_index.NetworkManagerConnectionsIndex,
+        conn_uuids: typing.Iterable[str],
+    ):
+        for conn_uuid in dict.fromkeys(conn_uuids):
+            # Drop the previous grouping of the connection, if any
+            for main_uuid in self.__main_uuids_by_slave.pop(conn_uuid, []):
+                self.__main_conns_dict[main_uuid].remove(conn_uuid)
+                if not self.__main_conns_dict[main_uuid]:
+                    self.__main_conns_dict.pop(main_uuid)
+
+            for conn_data in connections_index.with_uuid(conn_uuid):
+                # Discard all connections that are not slaves
+                if not nmcli_filters.is_connection_slave(conn_data):
+                    continue
+
+                # Try to fetch its main connection
+                main_conn_data = nmcli_filters.first_main_connection_of(
+                    connections_index, conn_data, is_main_conn=True
+                )
+                if not main_conn_data:
+                    continue
+                main_uuid = main_conn_data[
+                    nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID
+                ]
+                if main_uuid not in self.__main_conns_dict:
+                    self.__main_conns_dict[main_uuid] = []
+                self.__main_conns_dict[main_uuid].append(conn_uuid)
+                self.__main_uuids_by_slave.setdefault(conn_uuid, []).append(main_uuid)
 
     def __fetch_owned_unknown_connections(
         self,
@@ -211,11 +275,15 @@ class TargetConnectionDataFactory:
         owned_interfaces_unknown_connections = []
 
         # Fetch the interfaces that targets/relates to an interface
-        # we manage, but are unknown connections
+        # we manage, but are unknown connections.
+        # The index resolves the candidates from the interface names,
+        # so only the connections bound to them are visited
+        related_interfaces = target_connection_data.conn_config.related_interfaces
         for conn_data in nmcli_filters.all_connections_without_uuids(
-            self.__connections, to_preserve_uuids
+            self.__connections_store.index.with_related_interfaces(related_interfaces),
+            to_preserve_uuids,
         ):
-            for managed_iface in target_connection_data.conn_config.related_interfaces:
+            for managed_iface in related_interfaces:
                 if self.__is_connection_related_to_interface(conn_data, managed_iface):
                     owned_interfaces_unknown_connections.append(conn_data)
 
@@ -225,26 +293,23 @@ class TargetConnectionDataFactory:
             for conn_data in owned_interfaces_unknown_connections
             if nmcli_filters.is_connection_slave(conn_data)
         ]
-        if to_delete_slave_uuids:
-            for main_uuid, slave_uuids in main_conns_dict.items():
-                # If all the interfaces from a main connection
-                # are about to be deleted and it's not a connection
-                # that must be preserved add it to the delete list
-                if (
-                    set(slave_uuids).issubset(to_delete_slave_uuids)
-                    and main_uuid not in to_preserve_uuids
-                ):
-                    main_conn_data = next(
-                        (
-                            conn_data
-                            for conn_data in self.__connections
-                            if main_uuid
-                            == conn_data[
-                                nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID
-                            ]
-                        ),
-                    )
-                    owned_interfaces_unknown_connections.append(main_conn_data)
+        # Only the main connections of those slaves can be left without
+        # slaves, in the order their first slave is found
+        for main_uuid in dict.fromkeys(
+            slave_main_uuid
+            for slave_uuid in to_delete_slave_uuids
+            for slave_main_uuid in self.__main_uuids_by_slave.get(slave_uuid, [])
+        ):
+            # If all the interfaces from a main connection
+            # are about to be deleted and it's not a connection
+            # that must be preserved add it to the delete list
+            if (
+                set(main_conns_dict[main_uuid]).issubset(to_delete_slave_uuids)
+                and main_uuid not in to_preserve_uuids
+            ):
+                owned_interfaces_unknown_connections.append(
+                    self.__connections_store.index.get(main_uuid)
+                )
 
         return owned_interfaces_unknown_connections
 
@@ -268,13 +333,10 @@ class TargetConnectionDataFactory:
                 slaves_related_conns.extend(
                     [
                         conn_data
-                        for conn_data in self.__connections
-                        if conn_data.get(
-                            nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME,
-                            None,
+                        for conn_data in self.__connections_store.index.with_interface_name(
+                            slave_iface_name
                         )
-                        == slave_iface_name
-                        and conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                        if conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
                         not in to_preserve_uuids
                     ]
                 )
@@ -295,11 +357,10 @@ class TargetConnectionDataFactory:
             slaves_related_conns.extend(
                 [
                     conn_data
-                    for conn_data in self.__connections
-                    if nmcli_filters.is_main_connection_of(
-                        target_connection_data, conn_data
+                    for conn_data in nmcli_filters.all_slave_connections_of(
+                        self.__connections_store.index, target_connection_data
                     )
-                    and conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                    if conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
                     not in to_preserve_uuids
                 ]
             )
@@ -323,13 +384,8 @@ class TargetConnectionDataFactory:
             )
         ):
             # Get the connection that it's now its main
-            current_main_conn = next(
-                (
-                    conn_data
-                    for conn_data in self.__connections
-                    if nmcli_filters.is_main_connection_of(conn_data, slave_conn_data)
-                ),
-                None,
+            current_main_conn = nmcli_filters.first_main_connection_of(
+                self.__connections_store.index, slave_conn_data
             )
             current_main_conn_uuid = (
                 current_main_conn[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
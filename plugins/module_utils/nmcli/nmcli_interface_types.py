@@ -21,7 +21,10 @@ from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
 @dataclasses.dataclass
 class NetworkManagerConfiguratorOptions:
     state_apply_timeout_secs: int = 180
+    # Max interval between state polls
     state_apply_poll_secs: float = 5
+    # First interval between state polls, doubled after each poll
+    state_apply_poll_initial_secs: float = 0.5
 
 
 class ConfigurableConnectionData(collections.abc.Mapping):
@@ -294,6 +297,14 @@ class ConfigurationSession:
         )
         self.__uuids.update(conn_config_result.get_uuids())
 
+    def add_uuids(self, uuids: typing.Iterable[str]):
+        """
+        Marks the given connections as owned by the session without a
+        result, i.e. the ones already planned, so they are preserved.
+        :param uuids: The UUIDs of the connections.
+        """
+        self.__uuids.update(uuids)
+
     @property
     def uuids(self) -> typing.Sequence[str]:
         return tuple(self.__uuids)
@@ -301,3 +312,119 @@ class ConfigurationSession:
     @property
     def conn_config_results(self) -> typing.Dict[str, MainConfigurationResult]:
         return self.__conn_config_results
+
+
+# Stands for the UUID of a main connection that doesn't exist yet in
+# the planned arguments of its slaves. Replaced once the main one is added
+PLANNED_MAIN_CONN_UUID = "<main-connection-uuid>"
+# Stands for the UUID of a connection that doesn't exist yet in the
+# commands reported for it, i.e. the state ones
+PLANNED_CONN_UUID = "<connection-uuid>"
+
+
+@dataclasses.dataclass(frozen=True)
+class FieldChange:
+    field: str
+    # The current value, None for new connections or unset fields
+    old: typing.Any
+    # The value to set, as nmcli takes it. Empty resets it to the default
+    new: typing.Optional[str]
+
+
+class ConnectionDiff(collections.abc.Mapping):
+    """
+    The fields a connection needs to change, by field, in the order
+    they were generated. It's backend agnostic, nmcli arguments can
+    be obtained from it with to_args.
+    """
+
+    def __init__(self, changes: typing.Iterable[FieldChange] = ()):
+        self.__changes: typing.Dict[str, FieldChange] = {
+            change.field: change for change in changes
+        }
+
+    def to_args(self) -> typing.List[str]:
+        args = []
+        for change in self.__changes.values():
+            args.append(change.field)
+            args.append(change.new if change.new is not None else "")
+        return args
+
+    def to_dict(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        return {
+            field: {"old": change.old, "new": change.new}
+            for field, change in self.__changes.items()
+        }
+
+    def __getitem__(self, key: str) -> FieldChange:
+        return self.__changes[key]
+
+    def __len__(self) -> int:
+        return len(self.__changes)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return self.__changes.__iter__()
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionChange:
+    configurable_conn_data: ConfigurableConnectionData
+    # Fields to add/modify. Empty if up-to-date
+    diff: ConnectionDiff
+    # The state the connection is expected to be brought to, if any
+    state_transition: typing.Optional[str] = None
+
+    @property
+    def conn_config(self) -> net_config.BaseConnectionConfig:
+        return self.configurable_conn_data.conn_config
+
+    @property
+    def uuid(self) -> typing.Optional[str]:
+        return self.configurable_conn_data.uuid
+
+    @property
+    def builder_args(self) -> typing.List[str]:
+        # Arguments of the nmcli add/modify command
+        return self.diff.to_args()
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.diff)
+
+
+@dataclasses.dataclass(frozen=True)
+class ConnectionPlan:
+    target_connection_data: TargetConnectionData
+    delete_connections: typing.List[typing.Dict[str, typing.Any]]
+    main_change: ConnectionChange
+    slave_changes: typing.List[ConnectionChange]
+
+    @property
+    def conn_config(self) -> net_config.MainConnectionConfig:
+        return typing.cast(
+            net_config.MainConnectionConfig, self.target_connection_data.conn_config
+        )
+
+    @property
+    def changes(self) -> typing.List[ConnectionChange]:
+        return [self.main_change] + self.slave_changes
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.delete_connections) or any(
+            change.changed or change.state_transition for change in self.changes
+        )
+
+
+@dataclasses.dataclass(frozen=True)
+class ConfigurationPlan:
+    # Connections of the same level are independent of each other
+    levels: typing.List[typing.List[ConnectionPlan]]
+
+    @property
+    def connections(self) -> typing.List[ConnectionPlan]:
+        return [connection_plan for level in self.levels for connection_plan in level]
+
+    @property
+    def changed(self) -> bool:
+        return any(connection_plan.changed for connection_plan in self.connections)
@@ -3,6 +3,12 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import collections.abc
+import concurrent.futures
+import dataclasses
+import functools
+import hashlib
+import os
 import re
 import subprocess
 import typing
@@ -15,9 +21,91 @@ from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
     nmcli_interface_exceptions,
 )
 
+_NMCLI_LIST_KEY_REGEX = re.compile(r"(.*)\[\d*\]$")
+
+
+@functools.lru_cache(maxsize=1024)
+def _parse_key_name(key: str) -> typing.Tuple[str, bool]:
+    # Keys are a small set that repeats in each object, so each
+    # one is resolved only once. Bounded, as the cache outlives
+    # the querier
+    match = _NMCLI_LIST_KEY_REGEX.match(key)
+    return (match.group(1).lower(), True) if match else (key.lower(), False)
+
+
+@dataclasses.dataclass
+class NetworkManagerQuerierOptions:
+    bulk_fetch: bool = False
+    # Max number of nmcli details calls run at the same time
+    max_workers: int = 1
+
+
+class NmcliConnectionData(collections.abc.Mapping):
+    """
+    Connection data record returned by the NetworkManagerQuerier.
+
+    Holds the tokenized nmcli output and decodes each value only when it's
+    read for the first time, caching the result. Most consumers only read
+    a handful of fields of each connection, so decoding every property of
+    every profile is wasted work. Convert it to a dict (dict(record)) to
+    fully materialize it, i.e. before returning it to Ansible.
+    """
+
+    def __init__(
+        self,
+        raw_fields: typing.Dict[str, typing.Union[str, typing.List[str]]],
+        decode_fn: typing.Callable[[typing.Union[str, typing.List[str]]], typing.Any],
+    ):
+        self.__raw_fields = raw_fields
+        self.__decode_fn = decode_fn
+        self.__decoded_fields: typing.Dict[str, typing.Any] = {}
+
+    def __getitem__(self, key: str) -> typing.Any:
+        try:
+            return self.__decoded_fields[key]
+        except KeyError:
+            value = self.__decode_fn(self.__raw_fields[key])
+            self.__decoded_fields[key] = value
+            return value
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__raw_fields
+
+    def __len__(self) -> int:
+        return len(self.__raw_fields)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(self.__raw_fields)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
 
 class NetworkManagerQuerier:
-    __NMCLI_PARSER_GET_CONNECTIONS_LIST = ["nmcli", "-g", "name", "connection"]
+    # Max number of objects requested in a single bulk nmcli call.
+    # Keeps the command line in a sane size for hosts with lots of profiles
+    __NMCLI_BULK_FETCH_CHUNK_SIZE = 64
+    __NMCLI_PARSER_GET_CONNECTIONS_LIST = ["nmcli", "-g", "uuid", "connection"]
+    __NMCLI_PARSER_UUID_SELECTOR = "uuid"
+    # The profile files are modified on each connection change, while
+    # the timestamp of the active connections is periodically refreshed
+    # by NetworkManager, so it cannot be part of the fingerprint
+    __NMCLI_GET_CONNECTIONS_FINGERPRINT = [
+        "nmcli",
+        "-t",
+        "-f",
+        "UUID,NAME,TYPE,DEVICE,ACTIVE,FILENAME",
+        "connection",
+        "show",
+    ]
+    # Same syntax int() accepts for base 10 numbers
+    __NMCLI_INT_REGEX = re.compile(r"\s*[+-]?\d+(?:_\d+)*\s*\Z")
+    __NMCLI_FALSE_VALUES = frozenset(
+        (nmcli_constants.NMCLI_VALUE_FALSE, nmcli_constants.NMCLI_VALUE_FALSE_ALT)
+    )
+    __NMCLI_TRUE_VALUES = frozenset(
+        (nmcli_constants.NMCLI_VALUE_TRUE, nmcli_constants.NMCLI_VALUE_TRUE_ALT)
+    )
     __NMCLI_PARSER_GET_CONNECTION_DETAILS = [
         "nmcli",
         "-t",
@@ -28,32 +116,139 @@ class NetworkManagerQuerier:
     ]
 
     def __init__(
-        self, command_fn: typing.Callable[[typing.List], subprocess.CompletedProcess]
+        self,
+        command_fn: typing.Callable[[typing.List], subprocess.CompletedProcess],
+        options: NetworkManagerQuerierOptions = None,
     ):
         self.__command_fn = command_fn
+        self.__options = options or NetworkManagerQuerierOptions()
 
-    def get_connection_details(self, conn_identifier, check_exists=False):
+    def get_connection_details(
+        self,
+        conn_identifier,
+        check_exists=False,
+        fields: typing.Optional[typing.Sequence[str]] = None,
+    ):
+        """
+        Fetches the details of a single connection.
+        :param conn_identifier: Connection name, UUID or any other identifier nmcli supports.
+        :param check_exists: Raise if the connection doesn't exist instead of returning None.
+        :param fields: Optional projection of the returned fields, as sections
+                       (like "connection" or "general") or explicit keys
+                       (like "general.state"). All fields are returned if not given.
+        :return: The connection data or None if it doesn't exist and check_exists is False.
+        """
         return self.__get_nm_object_details(
-            self.__NMCLI_PARSER_GET_CONNECTION_DETAILS,
+            self.__build_get_details_cmd(fields),
             conn_identifier,
             check_exists=check_exists,
         )
 
-    def get_connections(self) -> typing.List[typing.Dict[str, typing.Any]]:
+    def get_connections(
+        self, fields: typing.Optional[typing.Sequence[str]] = None
+    ) -> typing.List[NmcliConnectionData]:
+        """
+        Fetches the details of all the connections.
+        :param fields: Optional projection of the returned fields, as sections
+                       (like "connection" or "general") or explicit keys
+                       (like "general.state"). connection.uuid is always
+                       returned. All fields are returned if not given.
+        :return: The list of connections data.
+        """
         return self.__get_nm_object_list(
             self.__NMCLI_PARSER_GET_CONNECTIONS_LIST,
-            self.__NMCLI_PARSER_GET_CONNECTION_DETAILS,
+            self.__build_get_details_cmd(
+                self.__ensure_leading_uuid_field(fields) if fields else None
+            ),
         )
 
+    def get_connections_fingerprint(self) -> str:
+        """
+        Computes a cheap fingerprint of the connections, with a single nmcli
+        call. It changes if a connection is added, deleted, renamed,
+        activated or deactivated, or if its profile file is modified.
+        :return: The fingerprint, as a hex digest.
+        """
+        try:
+            output = self.__command_fn(self.__NMCLI_GET_CONNECTIONS_FINGERPRINT).stdout
+        except module_command_utils.CommandRunException as err:
+            raise nmcli_interface_exceptions.NmcliExecuteCommandException(
+                "Failed to fetch the connections fingerprint",
+                error=(err.stderr or err.stdout),
+                cmd=self.__NMCLI_GET_CONNECTIONS_FINGERPRINT,
+            ) from err
+
+        digest = hashlib.sha256()
+        for cmd_line in sorted(line for line in output.splitlines() if line):
+            profile_path = self.__split_terse_fields(cmd_line)[-1]
+            digest.update(
+                f"{cmd_line}\n{self.__get_file_mtime(profile_path)}\n".encode()
+            )
+        return digest.hexdigest()
+
+    @staticmethod
+    def __split_terse_fields(cmd_line: str) -> typing.List[str]:
+        # In terse mode, colons and backslashes in the values are escaped
+        fields = [""]
+        chars = iter(cmd_line)
+        for char in chars:
+            if char == "\\":
+                fields[-1] += next(chars, "")
+            elif char == ":":
+                fields.append("")
+            else:
+                fields[-1] += char
+        return fields
+
+    @staticmethod
+    def __get_file_mtime(path: str) -> typing.Optional[int]:
+        try:
+            return os.stat(path).st_mtime_ns if path else None
+        except OSError:
+            return None
+
+    @classmethod
+    def __build_get_details_cmd(
+        cls, fields: typing.Optional[typing.Sequence[str]]
+    ) -> typing.List[str]:
+        if not fields:
+            return list(cls.__NMCLI_PARSER_GET_CONNECTION_DETAILS)
+        # -f is a global nmcli option, so it needs to go before the object
+        return (
+            cls.__NMCLI_PARSER_GET_CONNECTION_DETAILS[:4]
+            + ["-f", ",".join(fields)]
+            + cls.__NMCLI_PARSER_GET_CONNECTION_DETAILS[4:]
+        )
+
+    @staticmethod
+    def __ensure_leading_uuid_field(
+        fields: typing.Sequence[str],
+    ) -> typing.List[str]:
+        # Every connection needs its UUID and, as objects in the output of
+        # a multi-object call are delimited by the first key, the first
+        # field needs to be one that all the connections print
+        # (sections like general are only printed for active connections)
+        normalized_fields = list(
+            dict.fromkeys(field.strip().lower() for field in fields)
+        )
+        leading_field = (
+            nmcli_constants.NMCLI_CONN_SECTION_CONNECTION
+            if nmcli_constants.NMCLI_CONN_SECTION_CONNECTION in normalized_fields
+            else nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID
+        )
+        return [leading_field] + [
+            field for field in normalized_fields if field != leading_field
+        ]
+
     def __get_nm_object_list(self, get_cmd, get_details_cmd):
         try:
-            # object_name is usually not unique, like the connection name
-            # thus why a list is returned, to allow id duplications that
-            # are totally fine in nmcli
-            return [
-                self.__get_nm_object_details(get_details_cmd, object_name)
-                for object_name in self.__command_fn(get_cmd).stdout.splitlines()
-            ]
+            # Objects are listed and fetched by UUID, as names are usually
+            # not unique (id duplications are totally fine in nmcli) and
+            # fetching by name would return and parse the same set of
+            # objects once per duplicated name
+            object_uuids = list(
+                dict.fromkeys(self.__command_fn(get_cmd).stdout.splitlines())
+            )
         except module_command_utils.CommandRunException as err:
             raise nmcli_interface_exceptions.NmcliExecuteCommandException(
                 "Failed to fetch NM object",
@@ -61,11 +256,76 @@ class NetworkManagerQuerier:
                 cmd=get_cmd,
             ) from err
 
+        if self.__options.bulk_fetch:
+            return self.__get_nm_object_details_bulk(get_details_cmd, object_uuids)
+
+        return self.__map_concurrently(
+            lambda object_uuid: self.__get_nm_object_details(
+                get_details_cmd + [self.__NMCLI_PARSER_UUID_SELECTOR], object_uuid
+            ),
+            object_uuids,
+        )
+
+    def __map_concurrently(self, fn, items: typing.List) -> typing.List:
+        # Each nmcli call is dominated by the process spawn and the D-Bus
+        # wait, so they can overlap. map() preserves the order of the results
+        # and re-raises the first failure as if calls were made sequentially
+        max_workers = min(self.__options.max_workers, len(items))
+        if max_workers <= 1:
+            return [fn(item) for item in items]
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(fn, items))
+
+    def __get_nm_object_details_bulk(self, get_details_cmd, object_uuids):
+        chunks = [
+            object_uuids[chunk_start : chunk_start + self.__NMCLI_BULK_FETCH_CHUNK_SIZE]
+            for chunk_start in range(
+                0, len(object_uuids), self.__NMCLI_BULK_FETCH_CHUNK_SIZE
+            )
+        ]
+        return [
+            conn_data
+            for chunk_results in self.__map_concurrently(
+                lambda chunk: self.__get_nm_object_details_chunk(
+                    get_details_cmd, chunk
+                ),
+                chunks,
+            )
+            for conn_data in chunk_results
+        ]
+
+    def __get_nm_object_details_chunk(self, get_details_cmd, object_uuids):
+        nmcli_cmd = list(get_details_cmd)
+        for object_uuid in object_uuids:
+            nmcli_cmd.extend((self.__NMCLI_PARSER_UUID_SELECTOR, object_uuid))
+        try:
+            output = self.__command_fn(nmcli_cmd).stdout
+        except module_command_utils.CommandRunException as err:
+            if err.return_code != 10:
+                raise nmcli_interface_exceptions.NmcliExecuteCommandException(
+                    "Failed to fetch objects details",
+                    error=(err.stderr or err.stdout),
+                    cmd=nmcli_cmd,
+                ) from err
+
+            # Some object vanished between the list and the show calls.
+            # Fetch the chunk one by one, so the missing one fails the
+            # same way it does when not fetching in bulk
+            return [
+                self.__get_nm_object_details(
+                    get_details_cmd + [self.__NMCLI_PARSER_UUID_SELECTOR], object_uuid
+                )
+                for object_uuid in object_uuids
+            ]
+
+        return self.__parse_nm_terse_output(output, multiple_objects=True)
+
     def __get_nm_object_details(self, get_details_cmd, object_name, check_exists=True):
         nmcli_cmd = get_details_cmd + [object_name]
         try:
             output = self.__command_fn(nmcli_cmd).stdout
-            return self.__parse_nm_terse_output(output)
+            return self.__parse_nm_terse_output(output)[0]
         except module_command_utils.CommandRunException as err:
             if (not check_exists) and err.return_code == 10:
                 return None
@@ -82,97 +342,119 @@ class NetworkManagerQuerier:
             ) from err
 
     @classmethod
-    def __parse_key_name(cls, key):
-        match = re.match(r"(.*)\[\d*\]$", key)
-        if not match:
-            return key.lower(), False
+    def __parse_scalar_value(cls, string_value: str, lower_value: str) -> typing.Any:
+        if lower_value == "":
+            # Empty field
+            return None
+        if lower_value in cls.__NMCLI_FALSE_VALUES:
+            # Negative boolean
+            return False
+        if lower_value in cls.__NMCLI_TRUE_VALUES:
+            # Positive boolean
+            return True
+        if cls.__NMCLI_INT_REGEX.match(lower_value):
+            return int(lower_value, 10)
 
-        return match.group(1).lower(), True
+        # Fallback to string
+        return string_value
 
     @classmethod
-    def __parse_value(cls, string_value):
-        lower_value = (string_value or "").lower()
+    def __parse_value(cls, string_value: str) -> typing.Any:
+        lower_value = string_value.lower()
+        if "," not in lower_value:
+            return cls.__parse_scalar_value(string_value, lower_value)
 
-        # Fallback to string
-        parsed_value = string_value
-
-        # Empty field
-        if lower_value == "":
-            parsed_value = None
-        elif lower_value in [
-            nmcli_constants.NMCLI_VALUE_FALSE,
-            nmcli_constants.NMCLI_VALUE_FALSE_ALT,
-        ]:
-            # Negative boolean
-            parsed_value = False
-        elif lower_value in [
-            nmcli_constants.NMCLI_VALUE_TRUE,
-            nmcli_constants.NMCLI_VALUE_TRUE_ALT,
-        ]:
-            # Positive boolean
-            parsed_value = True
-        elif "," in lower_value:
-            # A list or a dict
-            split_values = [item.strip() for item in lower_value.split(",")]
-            if all("=" in val for val in split_values):
-                # Is a dict
-                parsed_value = {}
-                for dict_str_kp in split_values:
-                    key_value_pair = dict_str_kp.split("=")
-                    key = key_value_pair[0].strip()
-                    parsed_value[key] = cls.__parse_value(key_value_pair[1].strip())
-            else:
-                # Return as a list
-                parsed_value = split_values
-        else:
-            # Try parse as a number
-            try:
-                parsed_value = int(lower_value, 10)
-            except ValueError:
-                pass
+        # A list or a dict
+        split_values = [item.strip() for item in lower_value.split(",")]
+        if not all("=" in val for val in split_values):
+            # Return as a list
+            return split_values
 
+        # Is a dict
+        parsed_value = {}
+        for dict_str_kp in split_values:
+            key_value_pair = dict_str_kp.split("=")
+            # Values cannot contain commas at this point, so they are scalars
+            item_value = key_value_pair[1].strip()
+            parsed_value[key_value_pair[0].strip()] = cls.__parse_scalar_value(
+                item_value, item_value
+            )
         return parsed_value
 
     @classmethod
-    def __remap_single_item_list_dicts(cls, fields):
-        # Search for items that are string list with "k = v" format of a single element in each one
-        candidate_fields = [
-            k
-            for k, v in fields.items()
-            if isinstance(v, list)
-            and all(
-                isinstance(list_item, str) and len(list_item.split(" = ")) == 2
-                for list_item in v
+    def __remap_single_item_list_dict(
+        cls, value: typing.List[typing.Any]
+    ) -> typing.Union[typing.List[typing.Any], typing.Dict[str, typing.Any]]:
+        # Lists whose items are all strings with a single "k = v" pair are dicts
+        if not all(
+            isinstance(list_item, str) and list_item.count(" = ") == 1
+            for list_item in value
+        ):
+            return value
+
+        field_dict = {}
+        for list_item in value:
+            item_key, item_value = list_item.split(" = ")
+            item_value = item_value.strip()
+            field_dict[item_key.strip()] = cls.__parse_scalar_value(
+                item_value, item_value.lower()
             )
-        ]
-        for field in candidate_fields:
-            field_dict = {}
-            for field_item in fields[field]:
-                field_split = field_item.split(" = ")
-                field_dict[field_split[0].strip()] = cls.__parse_value(
-                    field_split[1].strip()
-                )
+        return field_dict
 
-            fields[field] = field_dict
-        return fields
+    @classmethod
+    def __decode_raw_value(
+        cls, raw_value: typing.Union[str, typing.List[str]]
+    ) -> typing.Any:
+        if isinstance(raw_value, list):
+            # Indexed keys, like ip4.address[1]
+            value = [cls.__parse_value(raw_item) for raw_item in raw_value]
+        else:
+            value = cls.__parse_value(raw_value)
+        if isinstance(value, list):
+            return cls.__remap_single_item_list_dict(value)
+        return value
 
-    def __parse_nm_terse_output(self, cmd_stdout):
-        fields = {}
+    @classmethod
+    def __parse_nm_terse_output(
+        cls, cmd_stdout: str, multiple_objects: bool = False
+    ) -> typing.List[NmcliConnectionData]:
+        # Single pass tokenizer of nmcli terse multiline output.
+        # Values are decoded on demand by NmcliConnectionData.
+        # If the output contains more than one object (multiple_objects)
+        # nmcli prints the fields of each object in the same order, so
+        # each time the first key shows up again a new object starts
+        objects = []
+        raw_fields = {}
+        first_key = None
         for cmd_line in cmd_stdout.split("\n"):
-            if ":" in cmd_line:
-                line_split = cmd_line.split(":", 1)
-                key_name, is_list = self.__parse_key_name(line_split[0])
-                parsed_value = self.__parse_value(line_split[1])
-                if is_list and key_name not in fields:
-                    fields[key_name] = [parsed_value]
-                elif is_list:
-                    fields[key_name].append(parsed_value)
-                else:
-                    fields[key_name] = parsed_value
-            elif cmd_line != "" and ":" not in cmd_line:
+            if cmd_line == "":
+                continue
+            key, separator, raw_value = cmd_line.partition(":")
+            if not separator:
                 raise nmcli_interface_exceptions.NmcliInterfaceParseException(
                     f"nmcli output format not expected for line '{cmd_line}'."
                     " Missing colon"
                 )
 
-        return self.__remap_single_item_list_dicts(fields)
+            if multiple_objects:
+                if first_key is None:
+                    first_key = key
+                elif key == first_key:
+                    objects.append(
+                        NmcliConnectionData(raw_fields, cls.__decode_raw_value)
+                    )
+                    raw_fields = {}
+
+            key_name, is_list = _parse_key_name(key)
+            if is_list:
+                current_value = raw_fields.get(key_name, None)
+                if isinstance(current_value, list):
+                    current_value.append(raw_value)
+                else:
+                    raw_fields[key_name] = [raw_value]
+            else:
+                raw_fields[key_name] = raw_value
+
+        if raw_fields or not multiple_objects:
+            objects.append(NmcliConnectionData(raw_fields, cls.__decode_raw_value))
+        return objects
@@ -0,0 +1,65 @@
+#!/usr/bin/python
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible.module_utils.basic import AnsibleModule
+
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    exceptions,
+)
+
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_netlink,
+)
+
+from ansible_collections.pbtn.common.plugins.module_utils.module_command_utils import (
+    get_module_command_runner,
+)
+
+
+def main():
+    module = AnsibleModule(
+        argument_spec={
+            "ip_backend": {
+                "type": "str",
+                "default": ip_netlink.IP_BACKEND_IPROUTE2,
+                "choices": list(ip_netlink.IP_BACKENDS),
+            },
+        },
+        supports_check_mode=True,
+    )
+
+    module.run_command_environ_update = {
+        "LANG": "C",
+        "LC_ALL": "C",
+        "LC_MESSAGES": "C",
+        "LC_CTYPE": "C",
+    }
+
+    result = {
+        "changed": False,
+        "success": False,
+    }
+
+    ip_iface = ip_netlink.build_ip_interface(
+        get_module_command_runner(module),
+        backend=module.params.get("ip_backend", ip_netlink.IP_BACKEND_IPROUTE2),
+        warn_fn=module.warn,
+    )
+    try:
+        # Same elements `ip -j addr` outputs, with the fields the
+        # collection uses, whatever the backend is
+        ip_addrs = [ip_addr.to_dict() for ip_addr in ip_iface.get_ip_addrs()]
+        result["success"] = True
+        result["result"] = ip_addrs
+        module.exit_json(**result)
+    except exceptions.BaseInfraException as err:
+        result.update(err.to_dict())
+        module.fail_json(**result)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,10 +6,12 @@ __metaclass__ = type
 
 from ansible.module_utils.basic import AnsibleModule
 from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
     exceptions,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.ip import (
     ip_interface,
+    ip_netlink,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.module_command_utils import (
     get_module_command_runner,
@@ -19,9 +21,13 @@ from ansible_collections.pbtn.common.plugins.module_utils.net import (
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
     nmcli_ansible_encoding,
+    nmcli_apply_state,
+    nmcli_connections_store,
+    nmcli_dbus,
     nmcli_interface,
     nmcli_interface_args_builders,
     nmcli_interface_link_validator,
+    nmcli_interface_planner,
     nmcli_interface_target_connection,
     nmcli_querier,
     nmcli_interface_types,
@@ -40,8 +46,32 @@ def main():
     module = AnsibleModule(
         argument_spec={
             "connections": {"type": "raw", "required": True},
+            "bulk_query": {"type": "bool", "default": False},
+            "query_workers": {"type": "int", "default": 1},
+            "activation_workers": {"type": "int", "default": 1},
+            # Opt-in fast path of unchanged hosts, i.e.
+            # /var/lib/pbtn/nmcli_apply_state.json
+            "state_file": {"type": "path", "default": None},
+            "force": {"type": "bool", "default": False},
+            "backend": {
+                "type": "str",
+                "default": "nmcli",
+                "choices": ["nmcli", "dbus"],
+            },
+            # Serve the nmcli commands through a single, persistent,
+            # D-Bus connection instead of spawning nmcli for each one
+            "command_backend": {
+                "type": "str",
+                "default": "process",
+                "choices": ["process", "dbus"],
+            },
+            "ip_backend": {
+                "type": "str",
+                "default": ip_netlink.IP_BACKEND_IPROUTE2,
+                "choices": list(ip_netlink.IP_BACKENDS),
+            },
         },
-        supports_check_mode=False,
+        supports_check_mode=True,
     )
 
     module.run_command_environ_update = {
@@ -56,36 +86,126 @@ def main():
         "success": False,
     }
 
+    command_runner = get_module_command_runner(module)
+    nmcli_command_runner = command_runner
+    dbus_connection = None
     try:
-        command_runner = get_module_command_runner(module)
-        ip_iface = ip_interface.IPInterface(command_runner)
+        backend = module.params.get("backend", "nmcli")
+        command_backend = module.params.get("command_backend", "process")
+        if "dbus" in (backend, command_backend):
+            try:
+                dbus_connection = dbus_utils.DBusConnection.system_bus()
+            except OSError as err:
+                module.fail_json(msg=f"Cannot connect to the system D-Bus: {err}")
+        nm_dbus_client = (
+            nmcli_dbus.NetworkManagerDBusClient(dbus_connection)
+            if dbus_connection
+            else None
+        )
+        if command_backend == "dbus":
+            # The ip commands are still run by the module
+            nmcli_command_runner = nmcli_dbus.NmcliDBusCommandRunner(
+                nm_dbus_client, command_runner
+            )
+        if backend == "dbus":
+            dbus_client = nm_dbus_client
+            querier = nmcli_dbus.NetworkManagerDBusQuerier(dbus_client)
+        else:
+            dbus_client = None
+            querier = nmcli_querier.NetworkManagerQuerier(
+                nmcli_command_runner,
+                options=nmcli_querier.NetworkManagerQuerierOptions(
+                    bulk_fetch=module.params.get("bulk_query", False),
+                    max_workers=module.params.get("query_workers", 1),
+                ),
+            )
+        raw_connections = __parse_get_connections(module)
+        config_hash = nmcli_apply_state.hash_connections_config(raw_connections)
+        state_file = (
+            nmcli_apply_state.NmcliApplyStateFile(module.params["state_file"])
+            if module.params.get("state_file", None)
+            else None
+        )
+        if state_file and not module.params.get("force", False):
+            # Same config and untouched connections since the last
+            # run -> Nothing to do, skip querying and building them
+            stored_result = state_file.load_result(
+                config_hash, querier.get_connections_fingerprint()
+            )
+            if stored_result is not None:
+                result["success"] = True
+                result["result"] = (
+                    nmcli_ansible_encoding.encode_unchanged_configuration_result(
+                        stored_result
+                    )
+                )
+                module.exit_json(**result)
+
+        # A single ip link snapshot for both, parsing and validation
+        ip_links = ip_interface.IPLinksTable(
+            ip_netlink.build_ip_interface(
+                command_runner,
+                backend=module.params.get("ip_backend", ip_netlink.IP_BACKEND_IPROUTE2),
+                warn_fn=module.warn,
+            )
+        )
         config_handler = net_config.ConnectionsConfigurationHandler(
-            __parse_get_connections(module),
-            net_config.ConnectionConfigFactory(ip_iface),
+            raw_connections,
+            net_config.ConnectionConfigFactory(ip_links),
+        )
+        connections_store = nmcli_connections_store.NetworkManagerConnectionsStore(
+            querier
         )
-        querier = nmcli_querier.NetworkManagerQuerier(command_runner)
         config_session = nmcli_interface_types.ConfigurationSession()
         nmcli_factory = nmcli_interface.NetworkManagerConfiguratorFactory(
-            command_runner,
-            querier,
+            nmcli_command_runner,
+            connections_store,
             nmcli_interface_args_builders.nmcli_args_builder_factory,
             nmcli_interface_target_connection.TargetConnectionDataFactory(
-                querier,
+                connections_store,
                 config_handler,
                 config_session,
             ),
-            nmcli_interface_link_validator.NmcliLinkValidator(ip_iface),
+            nmcli_interface_link_validator.NmcliLinkValidator(ip_links),
+            dbus_client=dbus_client,
+        )
+
+        session_configurator = nmcli_interface.NetworkManagerSessionConfigurator(
+            nmcli_factory,
+            config_session,
+            nmcli_interface_planner.NetworkManagerConfigurationPlanner(
+                connections_store,
+                nmcli_interface_args_builders.nmcli_args_builder_factory,
+            ),
+            activation_workers=module.params.get("activation_workers", 1),
         )
 
         config_handler.parse()
-        for conn_config in config_handler.connections:
-            config_session.add_result(
-                nmcli_factory.build_configurator(conn_config).configure(conn_config)
+        if module.check_mode:
+            # Only report the commands the plan would run
+            configuration_plan = session_configurator.plan(config_handler)
+            session_result, changed = nmcli_ansible_encoding.encode_configuration_plan(
+                configuration_plan,
+                session_configurator.plan_commands(configuration_plan),
             )
-
-        session_result, changed = nmcli_ansible_encoding.encode_configuration_session(
-            config_session
-        )
+        else:
+            if state_file:
+                # Never leave a stale state behind if the run fails
+                state_file.invalidate()
+            session_configurator.configure(config_handler)
+            session_result, changed = (
+                nmcli_ansible_encoding.encode_configuration_session(config_session)
+            )
+            if state_file:
+                try:
+                    state_file.save(
+                        config_hash,
+                        querier.get_connections_fingerprint(),
+                        session_result,
+                    )
+                except exceptions.BaseInfraException as err:
+                    # The changes are already applied, never lose their result
+                    module.warn(f"{err}. The next run won't be skipped")
         result["success"] = True
         result["changed"] = changed
         result["result"] = session_result
@@ -93,6 +213,9 @@ def main():
     except exceptions.BaseInfraException as err:
         result.update(err.to_dict())
         module.fail_json(**result)
+    finally:
+        if dbus_connection:
+            dbus_connection.close()
 
 
 if __name__ == "__main__":
@@ -8,6 +8,7 @@ from ansible.module_utils.basic import AnsibleModule
 
 
 from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
     exceptions,
 )
 
@@ -16,6 +17,7 @@ from ansible_collections.pbtn.common.plugins.module_utils.module_command_utils i
 )
 
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_dbus,
     nmcli_querier,
 )
 
@@ -24,6 +26,16 @@ def main():
     module = AnsibleModule(
         argument_spec={
             "connection": {"type": "str"},
+            "bulk_query": {"type": "bool", "default": False},
+            "query_workers": {"type": "int", "default": 1},
+            "fields": {"type": "list", "elements": "str"},
+            # Serve the nmcli commands through a single, persistent,
+            # D-Bus connection instead of spawning nmcli for each one
+            "command_backend": {
+                "type": "str",
+                "default": "process",
+                "choices": ["process", "dbus"],
+            },
         },
         supports_check_mode=False,
     )
@@ -41,14 +53,38 @@ def main():
     }
 
     connection = module.params.get("connection", None)
+    fields = module.params.get("fields", None)
+    command_runner = get_module_command_runner(module)
+    dbus_connection = None
+    if module.params.get("command_backend", "process") == "dbus":
+        try:
+            dbus_connection = dbus_utils.DBusConnection.system_bus()
+        except OSError as err:
+            module.fail_json(msg=f"Cannot connect to the system D-Bus: {err}")
+        command_runner = nmcli_dbus.NmcliDBusCommandRunner(
+            nmcli_dbus.NetworkManagerDBusClient(dbus_connection), command_runner
+        )
     nmcli_interface = nmcli_querier.NetworkManagerQuerier(
-        get_module_command_runner(module)
+        command_runner,
+        options=nmcli_querier.NetworkManagerQuerierOptions(
+            bulk_fetch=module.params.get("bulk_query", False),
+            max_workers=module.params.get("query_workers", 1),
+        ),
     )
     try:
+        # Connection records are lazily decoded. Materialize them as
+        # plain dicts before handing them to Ansible
         nm_result = (
-            nmcli_interface.get_connection_details(connection, check_exists=True)
+            dict(
+                nmcli_interface.get_connection_details(
+                    connection, check_exists=True, fields=fields
+                )
+            )
             if connection
-            else nmcli_interface.get_connections()
+            else [
+                dict(conn_data)
+                for conn_data in nmcli_interface.get_connections(fields=fields)
+            ]
         )
         result["success"] = True
         result["result"] = nm_result
@@ -56,6 +92,9 @@ def main():
     except exceptions.BaseInfraException as err:
         result.update(err.to_dict())
         module.fail_json(**result)
+    finally:
+        if dbus_connection:
+            dbus_connection.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,213 @@
+"""
+Micro-benchmark of the NetworkManagerQuerier nmcli output parser.
+
+Replicates the captured connection_details_*.out fixtures of the querier
+unit tests into a single multi-object nmcli output, like a bulk show of
+a host with a big number of profiles, and times the parser directly on
+it. The parser before the single pass rewrite is kept below, frozen, as
+the baseline both timings are compared against.
+
+Usage (from the root of an ansible_collections tree):
+    python -m ansible_collections.pbtn.common.tests.benchmarks.nmcli_querier_parse_benchmark
+"""
+
+import argparse
+import pathlib
+import re
+import timeit
+
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_constants,
+    nmcli_querier,
+)
+
+__FIXTURES_PATH = (
+    pathlib.Path(__file__).parent.parent / "unit" / "module_utils" / "test_files"
+)
+
+__parse_nm_terse_output = (
+    nmcli_querier.NetworkManagerQuerier._NetworkManagerQuerier__parse_nm_terse_output
+)
+
+
+# Frozen copy of the parser the single pass one replaced. Do not change
+# it, it's the reference the current parser is measured against
+def __baseline_parse_key_name(key):
+    match = re.match(r"(.*)\[\d*\]$", key)
+    if not match:
+        return key.lower(), False
+
+    return match.group(1).lower(), True
+
+
+def __baseline_parse_value(string_value):
+    lower_value = (string_value or "").lower()
+
+    # Fallback to string
+    parsed_value = string_value
+
+    # Empty field
+    if lower_value == "":
+        parsed_value = None
+    elif lower_value in [
+        nmcli_constants.NMCLI_VALUE_FALSE,
+        nmcli_constants.NMCLI_VALUE_FALSE_ALT,
+    ]:
+        # Negative boolean
+        parsed_value = False
+    elif lower_value in [
+        nmcli_constants.NMCLI_VALUE_TRUE,
+        nmcli_constants.NMCLI_VALUE_TRUE_ALT,
+    ]:
+        # Positive boolean
+        parsed_value = True
+    elif "," in lower_value:
+        # A list or a dict
+        split_values = [item.strip() for item in lower_value.split(",")]
+        if all("=" in val for val in split_values):
+            # Is a dict
+            parsed_value = {}
+            for dict_str_kp in split_values:
+                key_value_pair = dict_str_kp.split("=")
+                key = key_value_pair[0].strip()
+                parsed_value[key] = __baseline_parse_value(key_value_pair[1].strip())
+        else:
+            # Return as a list
+            parsed_value = split_values
+    else:
+        # Try parse as a number
+        try:
+            parsed_value = int(lower_value, 10)
+        except ValueError:
+            pass
+
+    return parsed_value
+
+
+def __baseline_remap_single_item_list_dicts(fields):
+    # Search for items that are string list with "k = v" format of a single element in each one
+    candidate_fields = [
+        k
+        for k, v in fields.items()
+        if isinstance(v, list)
+        and all(
+            isinstance(list_item, str) and len(list_item.split(" = ")) == 2
+            for list_item in v
+        )
+    ]
+    for field in candidate_fields:
+        field_dict = {}
+        for field_item in fields[field]:
+            field_split = field_item.split(" = ")
+            field_dict[field_split[0].strip()] = __baseline_parse_value(
+                field_split[1].strip()
+            )
+
+        fields[field] = field_dict
+    return fields
+
+
+def __baseline_split_nm_terse_output(cmd_stdout):
+    # nmcli prints the fields of each object in the same order, so
+    # each time the first key shows up again a new object starts
+    blocks = []
+    block_lines = []
+    first_key = None
+    for cmd_line in cmd_stdout.split("\n"):
+        if cmd_line == "":
+            continue
+        key = cmd_line.split(":", 1)[0]
+        if first_key is None:
+            first_key = key
+        elif key == first_key:
+            blocks.append("\n".join(block_lines))
+            block_lines = []
+        block_lines.append(cmd_line)
+    if block_lines:
+        blocks.append("\n".join(block_lines))
+    return blocks
+
+
+def __baseline_parse_nm_terse_output(cmd_stdout):
+    fields = {}
+    for cmd_line in cmd_stdout.split("\n"):
+        if ":" in cmd_line:
+            line_split = cmd_line.split(":", 1)
+            key_name, is_list = __baseline_parse_key_name(line_split[0])
+            parsed_value = __baseline_parse_value(line_split[1])
+            if is_list and key_name not in fields:
+                fields[key_name] = [parsed_value]
+            elif is_list:
+                fields[key_name].append(parsed_value)
+            else:
+                fields[key_name] = parsed_value
+
+    return __baseline_remap_single_item_list_dicts(fields)
+
+
+def __baseline_parse_bulk_output(cmd_stdout):
+    return [
+        __baseline_parse_nm_terse_output(block_output)
+        for block_output in __baseline_split_nm_terse_output(cmd_stdout)
+    ]
+
+
+def __build_bulk_output(profiles_count: int) -> str:
+    fixtures = [
+        fixture_path.read_text(encoding="utf-8").strip("\n")
+        for fixture_path in sorted(
+            __FIXTURES_PATH.glob("test_nmcli_querier_parse_*/connection_details_*.out")
+        )
+    ]
+    return "\n".join(fixtures[index % len(fixtures)] for index in range(profiles_count))
+
+
+def __time_per_call(fn, args) -> float:
+    timings = timeit.repeat(fn, repeat=args.repeat, number=args.number)
+    return min(timings) / args.number
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=300)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    cmd_stdout = __build_bulk_output(args.profiles)
+    baseline_connections = __baseline_parse_bulk_output(cmd_stdout)
+    # Both parsers need to agree before comparing them
+    assert [
+        dict(conn_data)
+        for conn_data in __parse_nm_terse_output(cmd_stdout, multiple_objects=True)
+    ] == baseline_connections
+
+    timings = {
+        "baseline": __time_per_call(
+            lambda: __baseline_parse_bulk_output(cmd_stdout), args
+        ),
+        "single pass, lazy records": __time_per_call(
+            lambda: __parse_nm_terse_output(cmd_stdout, multiple_objects=True), args
+        ),
+        # The baseline decodes every value, the records decode on read
+        "single pass, all the fields read": __time_per_call(
+            lambda: [
+                dict(conn_data)
+                for conn_data in __parse_nm_terse_output(
+                    cmd_stdout, multiple_objects=True
+                )
+            ],
+            args,
+        ),
+    }
+    for name, best in timings.items():
+        print(
+            f"{name} parser, {args.profiles} profiles: "
+            f"best {best * 1000:.2f} ms per call "
+            f"({best * 1000000 / args.profiles:.1f} us per profile, "
+            f"speedup x{timings['baseline'] / best:.2f})"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""
+Micro-benchmark of the delete-candidates computation of the
+TargetConnectionDataFactory.
+
+Builds a host with a big number of synthetic profiles (Ethernets, VLANs
+on top of them and bridges with Ethernet slaves) and a configuration
+that manages a few of their interfaces, and times build_delete_conn_list()
+for all the configured connections. The related-interfaces pass is also
+timed alone, resolved with the connections index against a linear scan
+of the whole profile table.
+
+Usage (from the root of an ansible_collections tree):
+    python -m ansible_collections.pbtn.common.tests.benchmarks.nmcli_target_connection_benchmark
+"""
+
+import argparse
+import timeit
+
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_interface,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.net import (
+    net_config,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
+    nmcli_constants,
+    nmcli_interface_target_connection,
+    nmcli_interface_types,
+)
+
+
+class __FakeIPInterface:
+    @staticmethod
+    def get_ip_links():
+        return []
+
+
+class __FakeQuerier:
+    def __init__(self, connections):
+        self.__connections = connections
+
+    def get_connections(self, fields=None):
+        return self.__connections
+
+    def get_connection_details(self, conn_identifier, check_exists=False, fields=None):
+        return next(
+            (
+                conn_data
+                for conn_data in self.__connections
+                if conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                == conn_identifier
+            ),
+            None,
+        )
+
+
+def __build_conn_data(index: int, conn_type: str, iface_name: str, **extra_fields):
+    return {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID: f"{conn_type}-{index}",
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: f"00000000-0000-0000-0000-{index:012d}",
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE: conn_type,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: iface_name,
+    } | extra_fields
+
+
+def __build_profiles(profiles_count: int):
+    # Groups of 5 profiles: an Ethernet, a VLAN on top of it and
+    # a bridge with two Ethernet slaves
+    profiles = []
+    for group in range(profiles_count // 5):
+        base = group * 5
+        bridge_uuid = f"00000000-0000-0000-0000-{base + 2:012d}"
+        profiles += [
+            __build_conn_data(base, "802-3-ethernet", f"eth{group}"),
+            __build_conn_data(
+                base + 1,
+                "vlan",
+                f"eth{group}.10",
+                **{nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT: f"eth{group}"},
+            ),
+            __build_conn_data(base + 2, "bridge", f"br{group}"),
+            __build_conn_data(
+                base + 3,
+                "802-3-ethernet",
+                f"ens{group * 2}",
+                **{nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: bridge_uuid},
+            ),
+            __build_conn_data(
+                base + 4,
+                "802-3-ethernet",
+                f"ens{group * 2 + 1}",
+                **{nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: bridge_uuid},
+            ),
+        ]
+    return profiles
+
+
+def __build_config_handler(managed_count: int):
+    raw_config = {}
+    for group in range(managed_count):
+        raw_config[f"managed-ether-{group}"] = {
+            "type": "ethernet",
+            "iface": f"eth{group}",
+        }
+        raw_config[f"managed-bridge-{group}"] = {
+            "type": "bridge",
+            "iface": f"br{group}",
+            "slaves": {
+                f"managed-slave-{group}-{index}": {
+                    "type": "ethernet",
+                    "iface": f"ens{group * 2 + index}",
+                }
+                for index in range(2)
+            },
+        }
+    config_handler = net_config.ConnectionsConfigurationHandler(
+        raw_config,
+        net_config.ConnectionConfigFactory(
+            ip_interface.IPLinksTable(__FakeIPInterface())
+        ),
+    )
+    config_handler.parse()
+    return config_handler
+
+
+def __scan_related_connections(connections, related_interfaces):
+    return [
+        conn_data
+        for conn_data in connections
+        if conn_data.get(nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME)
+        in related_interfaces
+        or conn_data.get(nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT)
+        in related_interfaces
+    ]
+
+
+def __print_timing(label: str, timings, number: int, calls: int):
+    best = min(timings) / number
+    print(
+        f"{label}: best {best * 1000:.2f} ms ({best * 1000000 / calls:.1f} us per call)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--profiles", type=int, default=500)
+    parser.add_argument("--managed", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--number", type=int, default=3)
+    args = parser.parse_args()
+
+    store = nmcli_connections_store.NetworkManagerConnectionsStore(
+        __FakeQuerier(__build_profiles(args.profiles))
+    )
+    config_handler = __build_config_handler(args.managed)
+    factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
+        store, config_handler, nmcli_interface_types.ConfigurationSession()
+    )
+    targets = [
+        factory.build_target_connection_data(conn_config)
+        for conn_config in config_handler.connections
+    ]
+    related_interfaces = [target.conn_config.related_interfaces for target in targets]
+    print(f"{len(store.connections)} profiles, {len(targets)} configured connections")
+
+    __print_timing(
+        "build_delete_conn_list()",
+        timeit.repeat(
+            lambda: [factory.build_delete_conn_list(target) for target in targets],
+            repeat=args.repeat,
+            number=args.number,
+        ),
+        args.number,
+        len(targets),
+    )
+    __print_timing(
+        "related connections, indexed",
+        timeit.repeat(
+            lambda: [
+                store.index.with_related_interfaces(ifaces)
+                for ifaces in related_interfaces
+            ],
+            repeat=args.repeat,
+            number=args.number,
+        ),
+        args.number,
+        len(targets),
+    )
+    __print_timing(
+        "related connections, linear scan",
+        timeit.repeat(
+            lambda: [
+                __scan_related_connections(store.connections, ifaces)
+                for ifaces in related_interfaces
+            ],
+            repeat=args.repeat,
+            number=args.number,
+        ),
+        args.number,
+        len(targets),
+    )
+
+
+if __name__ == "__main__":
+    main()
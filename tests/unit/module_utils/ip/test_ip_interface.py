@@ -1,9 +1,12 @@
+import copy
+import pickle
 import typing
 
 from ansible_collections.pbtn.common.plugins.module_utils.ip.ip_interface import (
     IPAddrData,
     IPLinkData,
     IPInterface,
+    IPLinksTable,
 )
 
 from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils.command_mocker import (
@@ -99,6 +102,141 @@ def test_ip_interface_get_links_vlan_ok(command_mocker_builder, test_file_manage
     __validate_vlan_link(links, "eth2.100", "d2:55:ee:86:11:24")
 
 
+def test_ip_interface_get_links_raw_ok(command_mocker_builder):
+    """
+    Tests that the whole ip element is only kept if asked to, and
+    that the nested objects of the element are kept as they are.
+    """
+    command_mocker = command_mocker_builder.build()
+    for _ in range(2):
+        command_mocker.add_call_definition_with_file(
+            MockCall(["ip", "-detail", "-j", "link"], True),
+            stdout_file_name="basic_vlan_links.json",
+        )
+
+    links = IPInterface(command_mocker.run).get_ip_links()
+    assert all(link_data.raw is None for link_data in links)
+
+    links = IPInterface(command_mocker.run, keep_raw=True).get_ip_links()
+    assert [link_data.raw["ifname"] for link_data in links] == [
+        link_data.if_name for link_data in links
+    ]
+    vlan_link = next(link_data for link_data in links if link_data.if_name == "eth1.20")
+    assert isinstance(vlan_link.raw["linkinfo"], dict)
+    assert vlan_link.raw["linkinfo"]["info_kind"] == vlan_link.link_kind
+
+
+def test_ip_interface_records_copy_ok():
+    """
+    Tests that the frozen, slotted, records can be copied, deep copied
+    and pickled, and that they are reported with the ip element keys.
+    """
+    link_data = IPLinkData.from_dict(
+        {
+            "ifindex": 5,
+            "ifname": "eth1.20",
+            "link": "eth1",
+            "address": "52:54:00:40:6C:02",
+            "linkinfo": {"info_kind": "vlan", "info_data": {"id": 20}},
+        }
+    )
+    addr_data = IPAddrData.from_dict(
+        {
+            "ifindex": 5,
+            "ifname": "eth1.20",
+            "addr_info": [{"family": "inet", "local": "10.0.20.2", "prefixlen": 24}],
+        },
+        keep_raw=True,
+    )
+    for record in (link_data, addr_data):
+        for record_copy in (
+            copy.copy(record),
+            copy.deepcopy(record),
+            pickle.loads(pickle.dumps(record)),
+        ):
+            assert record_copy == record
+            assert type(record_copy) is type(record)
+    assert copy.deepcopy(addr_data).raw is not addr_data.raw
+
+    assert link_data.to_dict() == {
+        "ifname": "eth1.20",
+        "link": "eth1",
+        "address": "52:54:00:40:6c:02",
+        "linkinfo": {"info_kind": "vlan"},
+    }
+    assert addr_data.to_dict() is addr_data.raw
+
+
+def test_ip_interface_records_hash_ok():
+    """
+    Tests that the records can be hashed, i.e. used in sets and as dict
+    keys, with and without the raw element, and that keeping it doesn't
+    change how they compare.
+    """
+    link_element = {
+        "ifindex": 5,
+        "ifname": "eth1.20",
+        "link": "eth1",
+        "address": "52:54:00:40:6C:02",
+        "linkinfo": {"info_kind": "vlan", "info_data": {"id": 20}},
+    }
+    addr_element = {
+        "ifindex": 5,
+        "ifname": "eth1.20",
+        "addr_info": [{"family": "inet", "local": "10.0.20.2", "prefixlen": 24}],
+    }
+    for record_type, element in (
+        (IPLinkData, link_element),
+        (IPAddrData, addr_element),
+    ):
+        record = record_type.from_dict(element)
+        raw_record = record_type.from_dict(element, keep_raw=True)
+        assert raw_record.raw is element
+        assert raw_record == record
+        assert hash(raw_record) == hash(record)
+        assert {record, raw_record} == {record}
+        assert {raw_record: True}[record]
+        assert not hasattr(raw_record, "__dict__")
+
+    assert IPLinkData.from_dict(link_element) != IPLinkData.from_dict(
+        {**link_element, "ifname": "eth1.30"}
+    )
+    assert IPAddrData.from_dict(addr_element) != IPAddrData.from_dict(
+        {**addr_element, "addr_info": []}
+    )
+
+
+def test_ip_interface_ip_links_table_ok(command_mocker_builder):
+    """
+    Tests that the IPLinksTable fetches the links only once, until
+    invalidated, and that they can be looked up by name and by MAC.
+    The mocker fails if ip is called more times than queued.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition_with_file(
+        MockCall(["ip", "-detail", "-j", "link"], True),
+        stdout_file_name="basic_vlan_links.json",
+    )
+    links_table = IPLinksTable(IPInterface(command_mocker.run))
+
+    assert len(links_table) == 6
+    assert links_table[1].if_name == "eth0"
+    assert links_table.get_by_name("eth1.20").link_kind == "vlan"
+    assert not links_table.get_by_name("eth3")
+    assert [
+        link.if_name for link in links_table.get_by_address("52:54:00:40:6C:02")
+    ] == ["eth1", "eth1.20"]
+    assert not links_table.get_by_address("52:54:00:40:6c:ff")
+
+    command_mocker.add_call_definition_with_file(
+        MockCall(["ip", "-detail", "-j", "link"], True),
+        stdout_file_name="basic_vlan_links.json",
+    )
+    links_table.invalidate()
+    assert links_table.get_by_name("eth0")
+    assert links_table.get_by_name("eth2.100")
+
+
 def test_ip_interface_ip_link_data_fields_ok():
     """
     Tests that the IPLinkData class is able to
@@ -106,7 +244,7 @@ def test_ip_interface_ip_link_data_fields_ok():
     `ip link` element and that the constants to
     each field point to the proper values.
     """
-    ip_link_data = IPLinkData(
+    ip_link_data = IPLinkData.from_dict(
         {
             "ifname": "eth1.20",
             "link": "eth1",
@@ -122,6 +260,7 @@ def test_ip_interface_ip_link_data_fields_ok():
     assert ip_link_data.if_name == "eth1.20"
     assert ip_link_data.address == "25:ef:82:13:ec:3c"
     assert ip_link_data.link_kind == "veth"
+    assert ip_link_data.raw is None
 
     # Test that constants point to the expected values
     assert IPLinkData.LINK_DETAILS_IFNAME == "ifname"
@@ -140,7 +279,7 @@ def test_ip_interface_ip_addr_data_fields_ok():
     """
 
     # Check that the getters work as expected
-    ip_addr_data = IPAddrData(
+    ip_addr_data = IPAddrData.from_dict(
         {
             "ifname": "eth1.20",
             "link": "eth1",
@@ -150,6 +289,7 @@ def test_ip_interface_ip_addr_data_fields_ok():
     assert ip_addr_data.addr_info == [{"local": "192.168.122.100"}]
     assert ip_addr_data.link == "eth1"
     assert ip_addr_data.if_name == "eth1.20"
+    assert ip_addr_data.raw is None
 
     # Test that constants point to the expected values
     assert IPAddrData.ADDR_DETAILS_ADDR_INFO == "addr_info"
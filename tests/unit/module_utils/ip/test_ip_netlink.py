@@ -0,0 +1,295 @@
+import errno
+import json
+import socket
+import struct
+
+import pytest
+
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_interface,
+    ip_netlink,
+)
+from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils import (
+    netlink_mock,
+)
+from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils.command_mocker import (
+    MockCall,
+)
+
+
+@pytest.fixture
+def kernel_mock():
+    mock = netlink_mock.NetlinkRouteKernelMock()
+    yield mock
+    mock.close()
+
+
+def __add_testing_links(kernel_mock: netlink_mock.NetlinkRouteKernelMock):
+    kernel_mock.add_link(
+        1, "lo", address="00:00:00:00:00:00", flags=0x10049, link_type=772
+    )
+    kernel_mock.add_link(2, "eth0", address="52:54:00:AB:80:EE")
+    kernel_mock.add_link(3, "eth1", address="52:54:00:40:6c:02", master=5)
+    kernel_mock.add_link(
+        4,
+        "eth1.20",
+        address="52:54:00:40:6c:02",
+        link=3,
+        kind="vlan",
+        info_data={
+            netlink_mock.IFLA_VLAN_PROTOCOL: struct.pack("!H", 0x8100),
+            netlink_mock.IFLA_VLAN_ID: struct.pack("=H", 20),
+        },
+    )
+    kernel_mock.add_link(
+        5, "br0", address="7a:ec:10:5f:a6:ae", flags=0x1003, kind="bridge"
+    )
+    kernel_mock.add_link(
+        6, "tunl0", address="0.0.0.0", flags=0x80, link_type=768, link=0, kind="ipip"
+    )
+
+
+def test_ip_netlink_get_links_ok(kernel_mock):
+    __add_testing_links(kernel_mock)
+    ip_iface = ip_netlink.NetlinkIPInterface(
+        lambda *_: pytest.fail("iproute2 must not be used"),
+        socket_factory=kernel_mock.connect,
+        keep_raw=True,
+    )
+
+    links = ip_iface.get_ip_links()
+    assert all(isinstance(link, ip_interface.IPLinkData) for link in links)
+    assert [link.if_name for link in links] == [
+        "lo",
+        "eth0",
+        "eth1",
+        "eth1.20",
+        "br0",
+        "tunl0",
+    ]
+    assert links[1].address == "52:54:00:ab:80:ee"
+    assert not links[1].link
+    assert not links[1].link_kind
+    assert links[3].link == "eth1"
+    assert links[3].link_kind == "vlan"
+    assert links[4].link_kind == "bridge"
+    # Only the fields the records use are decoded, the rest is ignored
+    assert links[3].raw == {
+        "ifindex": 4,
+        "ifname": "eth1.20",
+        "link": "eth1",
+        "address": "52:54:00:40:6c:02",
+        "linkinfo": {"info_kind": "vlan"},
+    }
+    # Like iproute2, tunnels without a lower link have a null one
+    assert links[5].raw == {
+        "ifindex": 6,
+        "ifname": "tunl0",
+        "link": None,
+        "address": "0.0.0.0",
+        "linkinfo": {"info_kind": "ipip"},
+    }
+    assert kernel_mock.requests == [ip_netlink.RTM_GETLINK]
+
+
+def test_ip_netlink_get_addrs_ok(kernel_mock):
+    __add_testing_links(kernel_mock)
+    kernel_mock.add_address(1, "127.0.0.1", 8, scope=254, label="lo")
+    kernel_mock.add_address(2, "192.168.122.10", 24, flags=0x0, label="eth0")
+    kernel_mock.add_address(
+        2, "fe80::5054:ff:feab:80ee", 64, family=socket.AF_INET6, scope=253
+    )
+    ip_iface = ip_netlink.NetlinkIPInterface(
+        lambda *_: pytest.fail("iproute2 must not be used"),
+        socket_factory=kernel_mock.connect,
+    )
+
+    addrs = ip_iface.get_ip_addrs()
+    assert all(isinstance(addr, ip_interface.IPAddrData) for addr in addrs)
+    assert [addr.if_name for addr in addrs] == [
+        "lo",
+        "eth0",
+        "eth1",
+        "eth1.20",
+        "br0",
+        "tunl0",
+    ]
+    assert addrs[0].addr_info == [
+        {"family": "inet", "local": "127.0.0.1", "prefixlen": 8}
+    ]
+    assert addrs[1].addr_info == [
+        {"family": "inet", "local": "192.168.122.10", "prefixlen": 24},
+        {"family": "inet6", "local": "fe80::5054:ff:feab:80ee", "prefixlen": 64},
+    ]
+    assert addrs[3].link == "eth1"
+    assert addrs[3].addr_info == []
+    # Raw payloads are opt-in
+    assert all(addr.raw is None for addr in addrs)
+    assert kernel_mock.requests == [ip_netlink.RTM_GETLINK, ip_netlink.RTM_GETADDR]
+
+
+def test_ip_netlink_dump_interrupted_ok(kernel_mock):
+    __add_testing_links(kernel_mock)
+    kernel_mock.interrupted_dumps = 2
+    with kernel_mock.connect() as netlink_socket:
+        links = ip_netlink.decode_links(
+            netlink_socket.dump(
+                ip_netlink.RTM_GETLINK,
+                ip_netlink.IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0),
+            )
+        )
+    assert len(links) == 6
+    assert kernel_mock.requests == [ip_netlink.RTM_GETLINK] * 3
+
+
+def test_ip_netlink_dump_fail(kernel_mock):
+    kernel_mock.interrupted_dumps = 3
+    with kernel_mock.connect() as netlink_socket:
+        with pytest.raises(ip_netlink.NetlinkException) as err:
+            netlink_socket.dump(
+                ip_netlink.RTM_GETLINK,
+                ip_netlink.IFINFOMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0),
+            )
+    assert str(err.value) == "Netlink dump of type 18 interrupted 3 times"
+
+    kernel_mock.errors[ip_netlink.RTM_GETADDR] = errno.EPERM
+    with kernel_mock.connect() as netlink_socket:
+        with pytest.raises(OSError) as err:
+            netlink_socket.dump(
+                ip_netlink.RTM_GETADDR,
+                ip_netlink.IFADDRMSG.pack(socket.AF_UNSPEC, 0, 0, 0, 0),
+            )
+    assert err.value.errno == errno.EPERM
+
+
+def test_ip_netlink_iproute2_fallback_ok(command_mocker_builder, kernel_mock):
+    """
+    Tests that iproute2 is used, and the fallback reported, each time
+    netlink fails, and that netlink is tried again the next time.
+    """
+    kernel_mock.add_link(1, "eth0", address="52:54:00:AB:80:EE")
+    kernel_mock.errors[ip_netlink.RTM_GETLINK] = errno.EPERM
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["ip", "-detail", "-j", "link"], True),
+        stdout='[{"ifindex": 1, "ifname": "eth0", "address": "52:54:00:AB:80:EE"}]',
+    )
+    warnings = []
+    ip_iface = ip_netlink.NetlinkIPInterface(
+        command_mocker.run, socket_factory=kernel_mock.connect, warn_fn=warnings.append
+    )
+
+    fallback_links = ip_iface.get_ip_links()
+    assert len(warnings) == 1
+    assert warnings[0].startswith("Cannot query netlink, falling back to iproute2:")
+
+    # The error is gone, iproute2 is not called again
+    assert ip_iface.get_ip_links() == fallback_links
+    assert len(warnings) == 1
+    assert kernel_mock.requests == [ip_netlink.RTM_GETLINK] * 2
+
+
+def test_ip_netlink_unsupported_fallback_ok(command_mocker_builder, monkeypatch):
+    """
+    Tests that, on platforms without netlink, where its socket constants
+    are not defined, iproute2 is used instead of failing.
+    """
+    command_mocker = command_mocker_builder.build()
+    for cmd in (["ip", "-detail", "-j", "link"], ["ip", "-j", "addr"]):
+        command_mocker.add_call_definition(
+            MockCall(cmd, True),
+            stdout='[{"ifindex": 1, "ifname": "eth0", "addr_info": []}]',
+        )
+
+    def _raise_attribute_error():
+        raise AttributeError("module 'socket' has no attribute 'AF_NETLINK'")
+
+    warnings = []
+    ip_iface = ip_netlink.NetlinkIPInterface(
+        command_mocker.run,
+        socket_factory=_raise_attribute_error,
+        warn_fn=warnings.append,
+    )
+    assert [link.if_name for link in ip_iface.get_ip_links()] == ["eth0"]
+
+    # The default factory on a platform without AF_NETLINK
+    monkeypatch.delattr(socket, "AF_NETLINK", raising=False)
+    ip_iface = ip_netlink.NetlinkIPInterface(
+        command_mocker.run, warn_fn=warnings.append
+    )
+    assert [addr.if_name for addr in ip_iface.get_ip_addrs()] == ["eth0"]
+    assert len(warnings) == 2
+    assert all(
+        warning.startswith("Cannot query netlink, falling back to iproute2:")
+        for warning in warnings
+    )
+
+
+def test_ip_netlink_build_ip_interface_ok():
+    def _runner(*_):
+        pytest.fail("iproute2 must not be used")
+
+    ip_iface = ip_netlink.build_ip_interface(_runner)
+    assert type(ip_iface) is ip_interface.IPInterface
+    ip_iface = ip_netlink.build_ip_interface(
+        _runner, backend=ip_netlink.IP_BACKEND_NETLINK
+    )
+    assert isinstance(ip_iface, ip_netlink.NetlinkIPInterface)
+
+
+# iproute2 link types of the parity fixtures
+__LINK_TYPES = {"ether": 1, "ipip": 768, "loopback": 772}
+
+
+def test_ip_netlink_iproute2_parity_ok(
+    command_mocker_builder, test_file_manager, kernel_mock
+):
+    """
+    Tests that netlink and iproute2 build the same records for the same
+    host, given by `ip -detail -j link` and `ip -j addr` outputs.
+    """
+    ip_links = json.loads(test_file_manager.get_file_text_content("ip_links.json"))
+    ip_addrs = json.loads(test_file_manager.get_file_text_content("ip_addrs.json"))
+    indexes_by_name = {link["ifname"]: link["ifindex"] for link in ip_links}
+    for link in ip_links:
+        kernel_mock.add_link(
+            link["ifindex"],
+            link["ifname"],
+            address=link["address"],
+            link_type=__LINK_TYPES[link["link_type"]],
+            # A null link is a zero index
+            link=indexes_by_name.get(link["link"], 0) if "link" in link else None,
+            kind=link.get("linkinfo", {}).get("info_kind", None),
+        )
+    for addr in ip_addrs:
+        for addr_info in addr["addr_info"]:
+            kernel_mock.add_address(
+                addr["ifindex"],
+                addr_info["local"],
+                addr_info["prefixlen"],
+                family=(
+                    socket.AF_INET6
+                    if addr_info["family"] == "inet6"
+                    else socket.AF_INET
+                ),
+            )
+
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition_with_file(
+        MockCall(["ip", "-detail", "-j", "link"], True),
+        stdout_file_name="ip_links.json",
+    )
+    command_mocker.add_call_definition_with_file(
+        MockCall(["ip", "-j", "addr"], True),
+        stdout_file_name="ip_addrs.json",
+    )
+    iproute2_iface = ip_interface.IPInterface(command_mocker.run)
+    netlink_iface = ip_netlink.NetlinkIPInterface(
+        lambda *_: pytest.fail("iproute2 must not be used"),
+        socket_factory=kernel_mock.connect,
+    )
+
+    iproute2_links = iproute2_iface.get_ip_links()
+    assert netlink_iface.get_ip_links() == iproute2_links
+    assert next(link for link in iproute2_links if link.if_name == "tunl0").link is None
+    assert netlink_iface.get_ip_addrs() == iproute2_iface.get_ip_addrs()
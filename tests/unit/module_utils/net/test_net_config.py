@@ -77,7 +77,9 @@ def __build_testing_config_factory(
 ) -> net_config.ConnectionConfigFactory:
     mocked_ip_interface = mocker.Mock()
     mocked_ip_interface.get_ip_links.return_value = config_stub_data.TEST_IP_LINKS
-    return net_config.ConnectionConfigFactory(mocked_ip_interface)
+    return net_config.ConnectionConfigFactory(
+        ip_interface.IPLinksTable(mocked_ip_interface)
+    )
 
 
 def __build_config_helper(
@@ -131,6 +133,27 @@ def __validate_connection_is_after_connection(
     assert connections_list.index(conn_2) > connections_list.index(conn_1)
 
 
+def __validate_connection_levels(
+    handler: net_config.ConnectionsConfigurationHandler,
+    test_validation_tuples: typing.List[typing.Tuple[str, str]],
+):
+    levels = handler.levels
+    # Levels are just a grouping of the sorted list that keeps its order
+    connections = handler.connections
+    assert sum(len(level) for level in levels) == len(connections)
+    for level in levels:
+        assert level == [
+            conn_config for conn_config in connections if conn_config in level
+        ]
+    levels_by_name = {
+        conn_config.name: level_idx
+        for level_idx, level in enumerate(levels)
+        for conn_config in level
+    }
+    for first_connection, second_connection in test_validation_tuples:
+        assert levels_by_name[second_connection] > levels_by_name[first_connection]
+
+
 def __validate_util_generate_all_conn_dict_combinations(raw_conns_config):
     config_dicts = []
     for conn_names in itertools.permutations(
@@ -830,6 +853,131 @@ def test_net_config_ipx_route_list_type_fail(ip_version: int):
     assert err.value.field == "routes"
 
 
+def test_connection_config_handler_deep_chain_ok(mocker):
+    """
+    Tests that the ConnectionsConfigurationHandler sorts long chains of
+    dependencies, way deeper than the recursion limit, one per level.
+    """
+    chain_length = 3000
+    raw_config = {
+        "conn-ether": {"type": "ethernet", "iface": "eth0"},
+    }
+    for index in range(1, chain_length + 1):
+        raw_config[f"conn-vlan-{index}"] = {
+            "type": "vlan",
+            "iface": f"vlan{index}",
+            "vlan": {
+                "id": (index % 4094) + 1,
+                "parent": f"vlan{index - 1}" if index > 1 else "eth0",
+            },
+        }
+    # Configuration order is the inverse of the dependency one
+    handler = net_config.ConnectionsConfigurationHandler(
+        dict(reversed(list(raw_config.items()))),
+        __build_testing_config_factory(mocker),
+    )
+    handler.parse()
+
+    assert [conn_config.name for conn_config in handler.connections] == list(raw_config)
+    assert [
+        [conn_config.name for conn_config in level] for level in handler.levels
+    ] == [[conn_name] for conn_name in raw_config]
+
+
+def test_connection_config_handler_dependency_graph_ok(mocker):
+    """
+    Tests that the ConnectionsConfigurationHandler exports a dependency
+    graph that only depends on the configuration, with the independent
+    connections in configuration order.
+    """
+    raw_config = {
+        "conn-5": {"type": "bridge"},
+        "conn-abc": {
+            "type": "bridge",
+            "iface": "br0",
+            "slaves": {
+                "conn-sub-xyz": {
+                    "type": "vlan",
+                    "iface": "eth0.20",
+                    "vlan": {"id": 20, "parent": "eth0"},
+                },
+                "conn-sub-abc": {"type": "ethernet", "iface": "eth1"},
+            },
+        },
+        "conn-vlan": {
+            "type": "vlan",
+            "iface": "br0.30",
+            "vlan": {"id": 30, "parent": "br0"},
+        },
+        "conn-0": {"type": "ethernet", "iface": "eth3"},
+        "conn-2": {"type": "ethernet", "iface": "eth0"},
+    }
+    graphs = []
+    for _ in range(2):
+        handler = net_config.ConnectionsConfigurationHandler(
+            raw_config, __build_testing_config_factory(mocker)
+        )
+        handler.parse()
+        graphs.append(handler.dependency_graph)
+
+    assert graphs[0] == graphs[1]
+    assert hash(graphs[0]) == hash(graphs[1])
+    assert graphs[0] == net_config.ConnectionsDependencyGraph(
+        nodes=("conn-0", "conn-2", "conn-abc", "conn-vlan", "conn-5"),
+        edges=(("conn-2", "conn-abc"), ("conn-abc", "conn-vlan")),
+        levels=(("conn-0", "conn-2"), ("conn-abc",), ("conn-vlan",), ("conn-5",)),
+    )
+    assert graphs[0].nodes == tuple(
+        conn_config.name for conn_config in handler.connections
+    )
+
+
+def test_connection_config_handler_dependency_cycle_fail(mocker):
+    """
+    Tests that the ConnectionsConfigurationHandler reports the connections
+    involved in a dependency cycle instead of sorting them arbitrarily.
+    """
+    handler = net_config.ConnectionsConfigurationHandler(
+        {
+            "conn-ether": {"type": "ethernet", "iface": "eth0"},
+            "conn-vlan-1": {
+                "type": "vlan",
+                "iface": "vlan1",
+                "vlan": {"id": 1, "parent": "vlan3"},
+            },
+            "conn-vlan-2": {
+                "type": "vlan",
+                "iface": "vlan2",
+                "vlan": {"id": 2, "parent": "vlan1"},
+            },
+            "conn-vlan-3": {
+                "type": "vlan",
+                "iface": "vlan3",
+                "vlan": {"id": 3, "parent": "vlan2"},
+            },
+            # Not part of the cycle, but it depends on it
+            "conn-vlan-4": {
+                "type": "vlan",
+                "iface": "vlan4",
+                "vlan": {"id": 4, "parent": "vlan3"},
+            },
+        },
+        __build_testing_config_factory(mocker),
+    )
+    with pytest.raises(exceptions.ValueInfraException) as err:
+        handler.parse()
+    assert str(err.value) == (
+        "Connections dependency cycle detected: "
+        "conn-vlan-1 -> conn-vlan-3 -> conn-vlan-2 -> conn-vlan-1"
+    )
+    assert err.value.value == [
+        "conn-vlan-1",
+        "conn-vlan-3",
+        "conn-vlan-2",
+        "conn-vlan-1",
+    ]
+
+
 @pytest.mark.parametrize(
     "test_config_value",
     [
@@ -1284,7 +1432,7 @@ def test_net_config_interface_identifier_mac_ok(
     test_file_manager, target_mac, links_file, expected_iface
 ):
     ip_links = [
-        ip_interface.IPLinkData(data)
+        ip_interface.IPLinkData.from_dict(data)
         for data in test_file_manager.get_file_yaml_content(f"{links_file}.json")
     ]
     for _idx in range(len(ip_links)):
@@ -1318,6 +1466,7 @@ def test_connection_config_handler_ok(
             __validate_connection_is_after_connection(
                 handler.connections, validation_tuple[0], validation_tuple[1]
             )
+        __validate_connection_levels(handler, test_validation_tuples)
 
 
 @pytest.mark.parametrize(
@@ -1341,7 +1490,9 @@ def test_connection_config_handler_conns_type_fail(mocker, test_config_value):
 
 
 def test_connection_config_factory_build_invalid_types_fail(mocker):
-    factory = net_config.ConnectionConfigFactory(ip_iface=mocker.Mock())
+    factory = net_config.ConnectionConfigFactory(
+        ip_links=ip_interface.IPLinksTable(mocker.Mock())
+    )
     # Check that type is mandatory for main connections
     with pytest.raises(exceptions.ValueInfraException) as err:
         factory.build_connection("test-conn", {})
@@ -1388,7 +1539,7 @@ def test_net_config_interface_identifier_ok():
 
     # Test that if multiples links has the same mac
     # only the non-ethernet nor bridge is picked up
-    bridge_link = ip_interface.IPLinkData(
+    bridge_link = ip_interface.IPLinkData.from_dict(
         {
             "ifname": "br123",
             "address": "ca:20:f3:9f:eb:42",
@@ -1397,7 +1548,7 @@ def test_net_config_interface_identifier_ok():
             },
         }
     )
-    vlan_link = ip_interface.IPLinkData(
+    vlan_link = ip_interface.IPLinkData.from_dict(
         {
             "ifname": "eth1.20",
             "link": "eth1",
@@ -1407,7 +1558,7 @@ def test_net_config_interface_identifier_ok():
             },
         }
     )
-    eth_link = ip_interface.IPLinkData(
+    eth_link = ip_interface.IPLinkData.from_dict(
         {
             "ifname": "eth2",
             "address": "ca:20:f3:9f:eb:42",
@@ -1431,7 +1582,7 @@ def test_net_config_interface_identifier_ok():
         pytest.param(
             "ca:20:f3:9f:eb:42",
             [
-                ip_interface.IPLinkData(
+                ip_interface.IPLinkData.from_dict(
                     {
                         "ifname": "br123",
                         "address": "ca:20:f3:9f:eb:42",
@@ -1440,7 +1591,7 @@ def test_net_config_interface_identifier_ok():
                         },
                     }
                 ),
-                ip_interface.IPLinkData(
+                ip_interface.IPLinkData.from_dict(
                     {
                         "ifname": "eth1.20",
                         "link": "eth1",
@@ -1468,6 +1619,24 @@ def test_net_config_interface_identifier_mac_resolve_fail(
     assert target_mac in str(err.value)
 
 
+def test_net_config_interface_identifier_mac_resolve_candidates_fail():
+    """
+    Tests that the links a MAC resolves to are reported with the keys
+    of the ip elements.
+    """
+    target_links = [
+        ip_interface.IPLinkData.from_dict(
+            {"ifindex": index, "ifname": f"eth{index}", "address": "CA:20:F3:9F:EB:42"}
+        )
+        for index in (1, 2)
+    ]
+    with pytest.raises(net_config.NmcliLinkResolutionException) as err:
+        net_config.InterfaceIdentifier("ca:20:f3:9f:eb:42", target_links)
+    assert err.value.to_dict()["candidates"] == [
+        {"ifname": f"eth{index}", "address": "ca:20:f3:9f:eb:42"} for index in (1, 2)
+    ]
+
+
 @pytest.mark.parametrize(
     "test_identifier", ["aa:bb:cc:dd:ee", "aa:bb:cc:dd:ee:ff1", "eth0.1!"]
 )
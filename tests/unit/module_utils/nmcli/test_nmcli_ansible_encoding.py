@@ -22,6 +22,8 @@ def test_nmcli_ansible_encoding_const_values():
     assert nmcli_ansible_encoding.FIELD_CONN_RESULT_CHANGED == "changed"
     assert nmcli_ansible_encoding.FIELD_CONN_RESULT_STATUS == "status"
     assert nmcli_ansible_encoding.FIELD_MAIN_CONN_RESULT_SLAVES == "slaves"
+    assert nmcli_ansible_encoding.FIELD_CONN_PLAN_COMMANDS == "commands"
+    assert nmcli_ansible_encoding.FIELD_CONN_PLAN_DIFF == "diff"
 
 
 def __test_assert_conn_config_result(
@@ -214,3 +216,148 @@ def test_nmcli_ansible_encoding_encode_encode_configuration_session(mocker):
         result_data_1[main_result_2.result.applied_config.name],
         main_result_2,
     )
+
+
+def test_nmcli_ansible_encoding_encode_configuration_plan_ok(mocker):
+    """
+    Tests that encode_configuration_plan is able to encode a configuration
+    plan with the commands of each connection.
+    """
+    uuid_main_str = "803bc610-cc4c-11ee-8bae-a36cbb85431e"
+    uuid_slave_str = "925ba72c-cc4f-11ee-9c93-6f2977364042"
+    bridge_conn_config = net_config_stub.build_testing_ether_bridge_config(mocker)
+    ether_conn_config = net_config_stub.build_testing_ether_config(mocker, index=2)
+    bridge_conn_data = nmcli_interface_types.TargetConnectionData(
+        bridge_conn_config, [], connection_data={"connection.uuid": uuid_main_str}
+    )
+    slave_conn_data_1 = nmcli_interface_types.ConfigurableConnectionData(
+        {"connection.uuid": uuid_slave_str}, bridge_conn_config.slaves[0]
+    )
+    slave_conn_data_2 = nmcli_interface_types.ConfigurableConnectionData(
+        None, bridge_conn_config.slaves[1]
+    )
+    ether_conn_data = nmcli_interface_types.TargetConnectionData(ether_conn_config, [])
+    configuration_plan = nmcli_interface_types.ConfigurationPlan(
+        levels=[
+            [
+                nmcli_interface_types.ConnectionPlan(
+                    target_connection_data=bridge_conn_data,
+                    delete_connections=[],
+                    main_change=nmcli_interface_types.ConnectionChange(
+                        bridge_conn_data,
+                        nmcli_interface_types.ConnectionDiff(
+                            [
+                                nmcli_interface_types.FieldChange(
+                                    "connection.autoconnect", "no", "yes"
+                                )
+                            ]
+                        ),
+                    ),
+                    slave_changes=[
+                        nmcli_interface_types.ConnectionChange(
+                            slave_conn_data_1,
+                            nmcli_interface_types.ConnectionDiff(),
+                            "up",
+                        ),
+                        nmcli_interface_types.ConnectionChange(
+                            slave_conn_data_2, nmcli_interface_types.ConnectionDiff()
+                        ),
+                    ],
+                ),
+            ],
+            [
+                nmcli_interface_types.ConnectionPlan(
+                    target_connection_data=ether_conn_data,
+                    delete_connections=[],
+                    main_change=nmcli_interface_types.ConnectionChange(
+                        ether_conn_data, nmcli_interface_types.ConnectionDiff()
+                    ),
+                    slave_changes=[],
+                ),
+            ],
+        ]
+    )
+    slave_commands = [["nmcli", "connection", "up", uuid_slave_str]]
+
+    result, changed = nmcli_ansible_encoding.encode_configuration_plan(
+        configuration_plan,
+        {
+            bridge_conn_config.name: {
+                bridge_conn_config.name: [],
+                bridge_conn_config.slaves[0].name: slave_commands,
+            }
+        },
+    )
+
+    assert changed
+    assert result == {
+        bridge_conn_config.name: {
+            "uuid": uuid_main_str,
+            "changed": True,
+            "commands": [],
+            "diff": {"connection.autoconnect": {"old": "no", "new": "yes"}},
+            "slaves": {
+                bridge_conn_config.slaves[0].name: {
+                    "uuid": uuid_slave_str,
+                    "changed": True,
+                    "commands": slave_commands,
+                    "diff": {},
+                },
+                bridge_conn_config.slaves[1].name: {
+                    "uuid": None,
+                    "changed": False,
+                    "commands": [],
+                    "diff": {},
+                },
+            },
+        },
+        ether_conn_config.name: {
+            "uuid": None,
+            "changed": False,
+            "commands": [],
+            "diff": {},
+            "slaves": {},
+        },
+    }
+
+
+def test_nmcli_ansible_encoding_encode_unchanged_configuration_result_ok():
+    """
+    Tests that encode_unchanged_configuration_result unsets all the
+    changed flags of an encoded result without modifying the original.
+    """
+    encoded_result = {
+        "bridge-conn": {
+            "uuid": "803bc610-cc4c-11ee-8bae-a36cbb85431e",
+            "changed": True,
+            "status": {"general.state": "activated"},
+            "slaves": {
+                "ether-conn": {
+                    "uuid": "925ba72c-cc4f-11ee-9c93-6f2977364042",
+                    "changed": True,
+                    "status": {},
+                },
+            },
+        },
+    }
+
+    result = nmcli_ansible_encoding.encode_unchanged_configuration_result(
+        encoded_result
+    )
+
+    assert result == {
+        "bridge-conn": {
+            "uuid": "803bc610-cc4c-11ee-8bae-a36cbb85431e",
+            "changed": False,
+            "status": {"general.state": "activated"},
+            "slaves": {
+                "ether-conn": {
+                    "uuid": "925ba72c-cc4f-11ee-9c93-6f2977364042",
+                    "changed": False,
+                    "status": {},
+                },
+            },
+        },
+    }
+    assert encoded_result["bridge-conn"]["changed"]
+    assert encoded_result["bridge-conn"]["slaves"]["ether-conn"]["changed"]
@@ -0,0 +1,121 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+import pytest
+
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_apply_state,
+)
+
+
+def test_nmcli_apply_state_hash_connections_config_ok():
+    """
+    Tests that hash_connections_config only depends on the content
+    of the configuration, not on the order of its keys.
+    """
+    config_1 = {
+        "ether-conn": {"type": "ethernet", "iface": "eth0", "state": "up"},
+        "vlan-conn": {"type": "vlan", "iface": "eth0.10"},
+    }
+    config_2 = {
+        "vlan-conn": {"iface": "eth0.10", "type": "vlan"},
+        "ether-conn": {"state": "up", "iface": "eth0", "type": "ethernet"},
+    }
+
+    assert nmcli_apply_state.hash_connections_config(
+        config_1
+    ) == nmcli_apply_state.hash_connections_config(config_2)
+    assert nmcli_apply_state.hash_connections_config(
+        config_1
+    ) != nmcli_apply_state.hash_connections_config(
+        config_1 | {"ether-conn": {"type": "ethernet", "iface": "eth1"}}
+    )
+
+
+def test_nmcli_apply_state_file_ok(tmp_path):
+    """
+    Tests that NmcliApplyStateFile only returns the stored result
+    if both the config hash and the connections fingerprint match.
+    """
+    state_path = tmp_path / "state" / "nmcli_apply_state.json"
+    state_file = nmcli_apply_state.NmcliApplyStateFile(str(state_path))
+    result = {"ether-conn": {"uuid": "uuid-1", "changed": True}}
+
+    # Nothing stored yet
+    assert state_file.load_result("hash-1", "fingerprint-1") is None
+
+    state_file.save("hash-1", "fingerprint-1", result)
+    assert state_path.exists()
+    # The temporary file is renamed to the final path
+    assert list(state_path.parent.iterdir()) == [state_path]
+    assert state_file.load_result("hash-1", "fingerprint-1") == result
+    assert state_file.load_result("hash-2", "fingerprint-1") is None
+    assert state_file.load_result("hash-1", "fingerprint-2") is None
+
+    # A new save replaces the previous state
+    state_file.save("hash-2", "fingerprint-2", {})
+    assert state_file.load_result("hash-1", "fingerprint-1") is None
+    assert state_file.load_result("hash-2", "fingerprint-2") == {}
+
+    state_file.invalidate()
+    assert not state_path.exists()
+    assert state_file.load_result("hash-2", "fingerprint-2") is None
+    # Invalidating a missing state is not an error
+    state_file.invalidate()
+
+
+def test_nmcli_apply_state_file_corrupted_ok(tmp_path):
+    """
+    Tests that NmcliApplyStateFile takes corrupted or unknown
+    state files as a miss.
+    """
+    state_path = tmp_path / "nmcli_apply_state.json"
+    state_file = nmcli_apply_state.NmcliApplyStateFile(str(state_path))
+
+    state_path.write_text("{not json")
+    assert state_file.load_result("hash-1", "fingerprint-1") is None
+
+    state_path.write_text(json.dumps(["hash-1", "fingerprint-1"]))
+    assert state_file.load_result("hash-1", "fingerprint-1") is None
+
+    state_path.write_text(
+        json.dumps(
+            {
+                "version": 0,
+                "config_hash": "hash-1",
+                "connections_fingerprint": "fingerprint-1",
+                "result": {},
+            }
+        )
+    )
+    assert state_file.load_result("hash-1", "fingerprint-1") is None
+
+
+def test_nmcli_apply_state_file_fail(tmp_path):
+    """
+    Tests that NmcliApplyStateFile wraps the filesystem errors and
+    doesn't leave temporary files behind.
+    """
+    # A file where the state directory should be
+    blocker_path = tmp_path / "blocker"
+    blocker_path.write_text("")
+    state_file = nmcli_apply_state.NmcliApplyStateFile(
+        str(blocker_path / "nmcli_apply_state.json")
+    )
+    with pytest.raises(nmcli_apply_state.NmcliApplyStateFileException) as err:
+        state_file.save("hash-1", "fingerprint-1", {})
+    assert err.value.path == str(blocker_path / "nmcli_apply_state.json")
+    assert err.value.error
+
+    # A directory where the state file should be
+    state_path = tmp_path / "nmcli_apply_state.json"
+    state_path.mkdir()
+    state_file = nmcli_apply_state.NmcliApplyStateFile(str(state_path))
+    with pytest.raises(nmcli_apply_state.NmcliApplyStateFileException):
+        state_file.save("hash-1", "fingerprint-1", {})
+    assert sorted(tmp_path.iterdir()) == [blocker_path, state_path]
+    with pytest.raises(nmcli_apply_state.NmcliApplyStateFileException):
+        state_file.invalidate()
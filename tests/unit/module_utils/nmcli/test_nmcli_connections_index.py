@@ -0,0 +1,127 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_index,
+)
+
+
+def test_nmcli_connections_index_lookups_ok():
+    """
+    Tests that the NetworkManagerConnectionsIndex lookups return the same
+    connections, and in the same order, as scanning the list would.
+    """
+    conn_data_1 = {
+        "connection.id": "conn-1",
+        "connection.uuid": "uuid-1",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth0",
+        "general.devices": "eth0",
+    }
+    conn_data_2 = {
+        "connection.id": "conn-2",
+        "connection.uuid": "uuid-2",
+        "connection.type": "bridge",
+        "connection.interface-name": "br0",
+    }
+    conn_data_3 = {
+        "connection.id": "conn-1",
+        "connection.uuid": "uuid-3",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth0",
+        "connection.master": "br0",
+    }
+    conn_data_4 = {
+        "connection.id": "conn-1",
+        "connection.uuid": "uuid-4",
+        "connection.type": "vlan",
+        "connection.master": "uuid-2",
+        "vlan.parent": "eth0",
+    }
+    index = nmcli_connections_index.NetworkManagerConnectionsIndex(
+        [conn_data_1, conn_data_2, conn_data_3, conn_data_4]
+    )
+
+    assert len(index) == 4
+    assert list(index) == [conn_data_1, conn_data_2, conn_data_3, conn_data_4]
+    assert index.get("uuid-3") == conn_data_3
+    assert index.get("uuid-5") is None
+    assert index.with_id("conn-1") == [conn_data_1, conn_data_3, conn_data_4]
+    assert index.with_id_and_type("conn-1", "802-3-ethernet") == [
+        conn_data_1,
+        conn_data_3,
+    ]
+    assert index.with_id_and_type("conn-2", "802-3-ethernet") == []
+    assert index.with_interface_name("eth0") == [conn_data_1, conn_data_3]
+    assert index.with_uuid_or_interface_name("eth0") == [conn_data_1, conn_data_3]
+    assert index.with_uuid_or_interface_name("uuid-2") == [conn_data_2]
+    assert index.with_masters(["uuid-2", "br0"]) == [conn_data_3, conn_data_4]
+    assert index.with_related_interfaces(["eth0", "br0"]) == [
+        conn_data_1,
+        conn_data_2,
+        conn_data_3,
+        conn_data_4,
+    ]
+    assert index.with_related_interfaces(["eth1"]) == []
+
+
+def test_nmcli_connections_index_updates_ok():
+    """
+    Tests that the NetworkManagerConnectionsIndex keeps the order and the
+    lookups up to date when connections are replaced, added and removed.
+    """
+    conn_data_1 = {"connection.id": "conn-1", "connection.uuid": "uuid-1"}
+    conn_data_2 = {
+        "connection.id": "conn-2",
+        "connection.uuid": "uuid-2",
+        "connection.interface-name": "eth0",
+    }
+    conn_data_3 = {"connection.id": "conn-3", "connection.uuid": "uuid-3"}
+    index = nmcli_connections_index.NetworkManagerConnectionsIndex(
+        [conn_data_1, conn_data_2, conn_data_3]
+    )
+    connections = index.connections
+    version = index.version
+    assert index.changes_since(version) == []
+
+    # Replaced connections keep their position
+    conn_data_2_updated = {
+        "connection.id": "conn-2-renamed",
+        "connection.uuid": "uuid-2",
+        "connection.interface-name": "eth1",
+    }
+    index.put(conn_data_2_updated)
+    assert index.connections == [conn_data_1, conn_data_2_updated, conn_data_3]
+    assert index.with_id("conn-2") == []
+    assert index.with_id("conn-2-renamed") == [conn_data_2_updated]
+    assert index.with_interface_name("eth0") == []
+    assert index.with_interface_name("eth1") == [conn_data_2_updated]
+
+    assert index.version > version
+    # Both, the old and the new data, are reported as changed
+    assert index.changes_since(version) == [conn_data_2, conn_data_2_updated]
+
+    # Previously returned lists are not modified
+    assert connections == [conn_data_1, conn_data_2, conn_data_3]
+
+    # New connections go last
+    conn_data_4 = {
+        "connection.id": "conn-1",
+        "connection.uuid": "uuid-4",
+        "connection.interface-name": "eth1",
+    }
+    index.put(conn_data_4)
+    assert index.with_id("conn-1") == [conn_data_1, conn_data_4]
+    assert index.with_interface_name("eth1") == [conn_data_2_updated, conn_data_4]
+
+    version = index.version
+    index.remove(["uuid-5"])
+    assert index.version == version
+    index.remove(["uuid-1", "uuid-2", "uuid-5"])
+    assert index.version > version
+    assert index.changes_since(version) == [conn_data_1, conn_data_2_updated]
+    assert index.connections == [conn_data_3, conn_data_4]
+    assert index.get("uuid-1") is None
+    assert index.with_id("conn-1") == [conn_data_4]
+    assert index.with_interface_name("eth1") == [conn_data_4]
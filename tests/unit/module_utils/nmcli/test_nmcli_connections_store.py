@@ -0,0 +1,94 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
+)
+
+
+def __build_conn_data(conn_uuid, **extra_fields):
+    return {"connection.id": f"conn-{conn_uuid}", "connection.uuid": conn_uuid} | {
+        key.replace("_", "."): value for key, value in extra_fields.items()
+    }
+
+
+def test_nmcli_connections_store_snapshot_ok(mocker):
+    """
+    Tests that the NetworkManagerConnectionsStore fetches the bulk
+    snapshot only once, and only when the list of connections is needed.
+    """
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [
+        __build_conn_data("uuid-1"),
+        __build_conn_data("uuid-2"),
+    ]
+    store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    querier.get_connections.assert_not_called()
+
+    assert store.connections == querier.get_connections.return_value
+    assert store.connections == querier.get_connections.return_value
+    assert store.get("uuid-2") == __build_conn_data("uuid-2")
+    querier.get_connections.assert_called_once_with()
+    querier.get_connection_details.assert_not_called()
+
+
+def test_nmcli_connections_store_refresh_ok(mocker):
+    """
+    Tests that the NetworkManagerConnectionsStore updates the snapshot in
+    place, re-fetching only the touched connections and keeping the order.
+    """
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [
+        __build_conn_data("uuid-1"),
+        __build_conn_data("uuid-2"),
+        __build_conn_data("uuid-3"),
+    ]
+    store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    assert len(store.connections) == 3
+
+    # Modified connections keep their position
+    querier.get_connection_details.return_value = __build_conn_data(
+        "uuid-1", general_state="activated"
+    )
+    assert store.refresh("uuid-1") == __build_conn_data(
+        "uuid-1", general_state="activated"
+    )
+    querier.get_connection_details.assert_called_once_with("uuid-1", check_exists=True)
+
+    # New connections go last
+    querier.get_connection_details.return_value = __build_conn_data("uuid-4")
+    assert store.get("uuid-4") == __build_conn_data("uuid-4")
+
+    # Vanished connections are dropped
+    querier.get_connection_details.return_value = None
+    assert store.refresh("uuid-2", check_exists=False) is None
+
+    store.discard(["uuid-3", "uuid-unknown"])
+    assert store.connections == [
+        __build_conn_data("uuid-1", general_state="activated"),
+        __build_conn_data("uuid-4"),
+    ]
+    assert querier.get_connection_details.call_count == 3
+    querier.get_connections.assert_called_once_with()
+
+
+def test_nmcli_connections_store_get_ok(mocker):
+    """
+    Tests that the NetworkManagerConnectionsStore serves single connections
+    from the snapshot, loading it if needed, and that the ones not in it
+    are fetched only once.
+    """
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [__build_conn_data("uuid-1")]
+    querier.get_connection_details.return_value = __build_conn_data("uuid-2")
+    store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+
+    assert store.get("uuid-1") == __build_conn_data("uuid-1")
+    querier.get_connections.assert_called_once_with()
+    querier.get_connection_details.assert_not_called()
+
+    assert store.get("uuid-2") == __build_conn_data("uuid-2")
+    assert store.get("uuid-2") == __build_conn_data("uuid-2")
+    querier.get_connection_details.assert_called_once_with("uuid-2", check_exists=True)
+    querier.get_connections.assert_called_once_with()
@@ -0,0 +1,439 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import re
+import sys
+
+import pytest
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
+    exceptions,
+    module_command_utils,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_dbus,
+    nmcli_interface_exceptions,
+    nmcli_querier,
+)
+from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils import (
+    nm_dbus_mock,
+)
+from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils.command_mocker import (
+    MockCall,
+)
+
+
+def __variant(signature, value):
+    return dbus_utils.DBusVariant(signature, value)
+
+
+def __ipv4_int(*octets):
+    return int.from_bytes(bytes(octets), sys.byteorder)
+
+
+def __build_ethernet_settings(conn_uuid, conn_id, iface_name):
+    return {
+        "connection": {
+            "id": __variant("s", conn_id),
+            "uuid": __variant("s", conn_uuid),
+            "type": __variant("s", "802-3-ethernet"),
+            "interface-name": __variant("s", iface_name),
+        },
+        "802-3-ethernet": {},
+        "ipv4": {
+            "method": __variant("s", "manual"),
+            "address-data": __variant(
+                "aa{sv}",
+                [
+                    {
+                        "address": __variant("s", "10.0.0.10"),
+                        "prefix": __variant("u", 24),
+                    }
+                ],
+            ),
+            "addresses": __variant("aau", [[__ipv4_int(10, 0, 0, 10), 24, 0]]),
+            "gateway": __variant("s", "10.0.0.1"),
+            "dns": __variant("au", [__ipv4_int(1, 1, 1, 1), __ipv4_int(8, 8, 8, 8)]),
+            "route-data": __variant(
+                "aa{sv}",
+                [
+                    {
+                        "dest": __variant("s", "10.1.0.0"),
+                        "prefix": __variant("u", 16),
+                        "next-hop": __variant("s", "10.0.0.2"),
+                        "metric": __variant("u", 100),
+                    }
+                ],
+            ),
+        },
+        "ipv6": {
+            "method": __variant("s", "disabled"),
+            "never-default": __variant("b", True),
+            "dns": __variant("aay", [bytes.fromhex("20010db8" + "00" * 11 + "01")]),
+        },
+    }
+
+
+@pytest.fixture
+def nm_mock():
+    mock = nm_dbus_mock.NetworkManagerDBusMock()
+    yield mock
+    mock.close()
+
+
+def test_nmcli_dbus_decode_connection_settings_ok():
+    """
+    Test that the D-Bus settings are converted to the same fields, and
+    values, the nmcli querier returns.
+    """
+    conn_data = nmcli_dbus.decode_connection_settings(
+        __build_ethernet_settings("uuid-1", "conn-1", "eth0"),
+        {"State": 2, "DeviceNames": ["eth0"]},
+    )
+    assert conn_data == {
+        "connection.id": "conn-1",
+        "connection.uuid": "uuid-1",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth0",
+        "connection.autoconnect": True,
+        "connection.master": None,
+        "connection.slave-type": None,
+        "ipv4.method": "manual",
+        "ipv4.addresses": "10.0.0.10/24",
+        "ipv4.gateway": "10.0.0.1",
+        "ipv4.dns": ["1.1.1.1", "8.8.8.8"],
+        "ipv4.routes": "10.1.0.0/16 10.0.0.2 100",
+        "ipv4.never-default": False,
+        "ipv6.method": "disabled",
+        "ipv6.addresses": None,
+        "ipv6.gateway": None,
+        "ipv6.dns": "2001:db8::1",
+        "ipv6.routes": None,
+        "ipv6.never-default": True,
+        "general.state": "activated",
+        "general.devices": "eth0",
+    }
+
+    vlan_data = nmcli_dbus.decode_connection_settings(
+        {
+            "connection": {
+                "id": __variant("s", "vlan-conn"),
+                "uuid": __variant("s", "uuid-2"),
+                "type": __variant("s", "vlan"),
+                "autoconnect": __variant("b", False),
+                "master": __variant("s", "uuid-3"),
+                "slave-type": __variant("s", "bridge"),
+            },
+            "vlan": {"id": __variant("u", 20), "parent": __variant("s", "eth0")},
+        }
+    )
+    assert vlan_data == {
+        "connection.id": "vlan-conn",
+        "connection.uuid": "uuid-2",
+        "connection.type": "vlan",
+        "connection.interface-name": None,
+        "connection.autoconnect": False,
+        "connection.master": "uuid-3",
+        "connection.slave-type": "bridge",
+        "vlan.id": 20,
+        "vlan.parent": "eth0",
+    }
+
+
+def test_nmcli_dbus_encode_builder_args_ok():
+    """
+    Test that the builder args are applied to the current settings,
+    keeping the untouched ones and dropping the deprecated properties
+    that would conflict with the new values.
+    """
+    settings = __build_ethernet_settings("uuid-1", "conn-1", "eth0")
+    new_settings = nmcli_dbus.encode_builder_args(
+        [
+            "connection.id",
+            "conn-2",
+            "connection.autoconnect",
+            "no",
+            "ipv4.addresses",
+            "10.0.1.10/24",
+            "ipv4.gateway",
+            "",
+            "ipv4.dns",
+            "9.9.9.9",
+            "ipv4.routes",
+            "10.2.0.0/16 10.0.1.2 50, 10.3.0.0/16 10.0.1.3",
+            "ipv6.method",
+            "auto",
+            "ipv6.dns",
+            "2001:db8::2,2001:db8::3",
+            "ipv6.never-default",
+            "",
+        ],
+        settings,
+    )
+
+    # The given settings are not modified
+    assert settings == __build_ethernet_settings("uuid-1", "conn-1", "eth0")
+    assert new_settings["connection"] == {
+        "id": __variant("s", "conn-2"),
+        "uuid": __variant("s", "uuid-1"),
+        "type": __variant("s", "802-3-ethernet"),
+        "interface-name": __variant("s", "eth0"),
+        "autoconnect": __variant("b", False),
+    }
+    assert new_settings["ipv4"] == {
+        "method": __variant("s", "manual"),
+        "address-data": __variant(
+            "aa{sv}",
+            [{"address": __variant("s", "10.0.1.10"), "prefix": __variant("u", 24)}],
+        ),
+        "dns": __variant("au", [__ipv4_int(9, 9, 9, 9)]),
+        "route-data": __variant(
+            "aa{sv}",
+            [
+                {
+                    "dest": __variant("s", "10.2.0.0"),
+                    "prefix": __variant("u", 16),
+                    "next-hop": __variant("s", "10.0.1.2"),
+                    "metric": __variant("u", 50),
+                },
+                {
+                    "dest": __variant("s", "10.3.0.0"),
+                    "prefix": __variant("u", 16),
+                    "next-hop": __variant("s", "10.0.1.3"),
+                },
+            ],
+        ),
+    }
+    assert new_settings["ipv6"] == {
+        "method": __variant("s", "auto"),
+        "never-default": __variant("b", False),
+        "dns": __variant(
+            "aay",
+            [
+                bytes.fromhex("20010db8" + "00" * 11 + "02"),
+                bytes.fromhex("20010db8" + "00" * 11 + "03"),
+            ],
+        ),
+    }
+
+    # New connections get the type section
+    assert nmcli_dbus.encode_builder_args(
+        ["connection.type", "vlan", "vlan.parent", "eth0", "vlan.id", "20"]
+    ) == {
+        "connection": {"type": __variant("s", "vlan")},
+        "vlan": {"parent": __variant("s", "eth0"), "id": __variant("u", 20)},
+    }
+
+    with pytest.raises(exceptions.ValueInfraException) as err:
+        nmcli_dbus.encode_builder_args(["bond.options", "mode=active-backup"])
+    assert err.value.field == "bond.options"
+    assert not nmcli_dbus.supports_builder_args(
+        ["connection.id", "conn-1", "bond.options", "mode=active-backup"]
+    )
+    assert nmcli_dbus.supports_builder_args(["vlan.parent", "eth0", "vlan.id", "20"])
+
+
+def test_nmcli_dbus_querier_ok(nm_mock):
+    """
+    Test that the NetworkManagerDBusQuerier reads the connections,
+    and their state, through the D-Bus API.
+    """
+    nm_mock.add_connection(
+        __build_ethernet_settings("uuid-1", "conn-1", "eth0"), active=True
+    )
+    nm_mock.add_connection(__build_ethernet_settings("uuid-2", "conn-2", "eth1"))
+    querier = nmcli_dbus.NetworkManagerDBusQuerier(
+        nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+    )
+
+    connections = querier.get_connections()
+    assert [conn_data["connection.uuid"] for conn_data in connections] == [
+        "uuid-1",
+        "uuid-2",
+    ]
+    assert connections[0]["general.state"] == "activated"
+    assert connections[0]["general.devices"] == "eth0"
+    assert "general.state" not in connections[1]
+
+    assert querier.get_connections(fields=["connection.uuid", "general"]) == [
+        {
+            "connection.uuid": "uuid-1",
+            "general.state": "activated",
+            "general.devices": "eth0",
+        },
+        {"connection.uuid": "uuid-2"},
+    ]
+    assert querier.get_connection_details("uuid-2") == connections[1]
+    assert querier.get_connection_details(
+        "uuid-1", check_exists=True, fields=["general.state"]
+    ) == {"general.state": "activated"}
+
+    assert querier.get_connection_details("uuid-3") is None
+    with pytest.raises(nmcli_interface_exceptions.NmcliExecuteCommandException) as err:
+        querier.get_connection_details("uuid-3", check_exists=True)
+    assert str(err.value) == "uuid-3 doesn't exist"
+
+
+def test_nmcli_dbus_querier_fingerprint_ok(nm_mock):
+    """
+    Test that the NetworkManagerDBusQuerier fingerprint changes if
+    the settings, or the state, of a connection changes.
+    """
+    conn_path = nm_mock.add_connection(
+        __build_ethernet_settings("uuid-1", "conn-1", "eth0")
+    )
+    querier = nmcli_dbus.NetworkManagerDBusQuerier(
+        nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+    )
+
+    fingerprint_1 = querier.get_connections_fingerprint()
+    assert querier.get_connections_fingerprint() == fingerprint_1
+
+    nm_mock.connections[conn_path] = __build_ethernet_settings(
+        "uuid-1", "conn-1", "eth1"
+    )
+    fingerprint_2 = querier.get_connections_fingerprint()
+    assert fingerprint_2 != fingerprint_1
+
+    nm_mock.add_connection(__build_ethernet_settings("uuid-2", "conn-2", "eth2"))
+    assert querier.get_connections_fingerprint() not in (fingerprint_1, fingerprint_2)
+
+
+def test_nmcli_dbus_querier_fail(nm_mock):
+    querier = nmcli_dbus.NetworkManagerDBusQuerier(
+        nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+    )
+    nm_mock.errors["ListConnections"] = (
+        "org.freedesktop.NetworkManager.PermissionDenied",
+        "Not authorized",
+    )
+    with pytest.raises(nmcli_interface_exceptions.NmcliExecuteCommandException) as err:
+        querier.get_connections()
+    assert str(err.value) == "Failed to fetch NM object"
+    assert "Not authorized" in err.value.error
+
+
+def test_nmcli_dbus_command_runner_querier_ok(nm_mock, command_mocker_builder):
+    """
+    Test that the NetworkManagerQuerier, running its nmcli commands
+    through the NmcliDBusCommandRunner, returns the same connections
+    the NetworkManagerDBusQuerier reads, without spawning nmcli.
+    """
+    nm_mock.add_connection(
+        __build_ethernet_settings("uuid-1", "conn-1", "eth0"), active=True
+    )
+    nm_mock.add_connection(__build_ethernet_settings("uuid-2", "conn-2", "eth1"))
+    dbus_client = nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+    command_mocker = command_mocker_builder.build()
+    command_runner = nmcli_dbus.NmcliDBusCommandRunner(dbus_client, command_mocker.run)
+    expected_connections = nmcli_dbus.NetworkManagerDBusQuerier(
+        dbus_client
+    ).get_connections()
+
+    for bulk_fetch in (False, True):
+        querier = nmcli_querier.NetworkManagerQuerier(
+            command_runner,
+            options=nmcli_querier.NetworkManagerQuerierOptions(bulk_fetch=bulk_fetch),
+        )
+        assert [
+            dict(conn_data) for conn_data in querier.get_connections()
+        ] == expected_connections
+        assert [
+            dict(conn_data)
+            for conn_data in querier.get_connections(
+                fields=["connection.uuid", "general"]
+            )
+        ] == [
+            {
+                "connection.uuid": "uuid-1",
+                "general.state": "activated",
+                "general.devices": "eth0",
+            },
+            {"connection.uuid": "uuid-2"},
+        ]
+
+    assert dict(querier.get_connection_details("conn-2")) == expected_connections[1]
+    assert querier.get_connection_details("uuid-3") is None
+    with pytest.raises(nmcli_interface_exceptions.NmcliExecuteCommandException) as err:
+        querier.get_connection_details("uuid-3", check_exists=True)
+    assert str(err.value) == "uuid-3 doesn't exist"
+    assert err.value.error == "Error: uuid-3 - no such connection profile."
+
+    # Not served through D-Bus
+    fingerprint_cmd = [
+        "nmcli",
+        "-t",
+        "-f",
+        "UUID,NAME,TYPE,DEVICE,ACTIVE,FILENAME",
+        "connection",
+        "show",
+    ]
+    command_mocker.add_call_definition(MockCall(fingerprint_cmd, True), stdout="")
+    assert command_runner(fingerprint_cmd).stdout == ""
+
+
+def test_nmcli_dbus_command_runner_configurator_ok(nm_mock, command_mocker_builder):
+    """
+    Test that the NmcliDBusCommandRunner applies the connection changes
+    of the nmcli commands the NetworkManagerConfigurator runs, and prints
+    the same output nmcli does.
+    """
+    nm_mock.add_connection(__build_ethernet_settings("uuid-1", "conn-1", "eth0"))
+    command_mocker = command_mocker_builder.build()
+    command_runner = nmcli_dbus.NmcliDBusCommandRunner(
+        nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect()),
+        command_mocker.run,
+        poll_secs=0.01,
+    )
+
+    result = command_runner(
+        [
+            "nmcli",
+            "connection",
+            "add",
+            "connection.type",
+            "802-3-ethernet",
+            "connection.id",
+            "conn-2",
+            "connection.interface-name",
+            "eth1",
+            "ipv4.method",
+            "auto",
+        ]
+    )
+    conn_uuid = re.search(r"\(([0-9a-f-]{36})\)", result.stdout).group(1)
+    assert result.stdout == f"Connection 'conn-2' ({conn_uuid}) successfully added.\n"
+    assert nm_mock.get_connection(conn_uuid)["ipv4"]["method"].value == "auto"
+
+    result = command_runner(
+        ["nmcli", "connection", "modify", conn_uuid, "ipv4.method", "disabled"]
+    )
+    assert result.stdout == ""
+    assert nm_mock.get_connection(conn_uuid)["ipv4"]["method"].value == "disabled"
+    assert nm_mock.get_connection(conn_uuid)["connection"]["id"].value == "conn-2"
+
+    command_runner(["nmcli", "--wait", "5", "connection", "up", conn_uuid])
+    assert nm_mock.is_active(conn_uuid)
+    command_runner(["nmcli", "--wait", "5", "connection", "down", conn_uuid])
+    assert not nm_mock.is_active(conn_uuid)
+
+    with pytest.raises(module_command_utils.CommandRunException) as err:
+        command_runner(["nmcli", "connection", "delete", "uuid-1", "uuid-3"])
+    assert err.value.return_code == 10
+    assert err.value.stdout == "Connection 'conn-1' (uuid-1) successfully deleted.\n"
+    assert err.value.stderr == "Error: unknown connection 'uuid-3'.\n"
+    assert nm_mock.get_connection("uuid-1") is None
+
+    # Properties that cannot be translated to D-Bus settings are left to nmcli
+    bond_cmd = [
+        "nmcli",
+        "connection",
+        "modify",
+        conn_uuid,
+        "bond.options",
+        "mode=active-backup",
+    ]
+    command_mocker.add_call_definition(MockCall(bond_cmd, True), stdout="")
+    command_runner(bond_cmd)
@@ -5,10 +5,16 @@ from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_index,
     nmcli_constants,
     nmcli_filters,
 )
 
+__CONNECTIONS_BUILDERS = [
+    pytest.param(list, id="list"),
+    pytest.param(nmcli_connections_index.NetworkManagerConnectionsIndex, id="index"),
+]
+
 
 def test_nmcli_filters_is_connection_active_ok():
     """
@@ -155,10 +161,11 @@ def test_nmcli_filters_all_connections_without_uuids_ok():
     assert conn_data_3 in filtered_conns_3
 
 
-def test_nmcli_filters_first_connection_with_name_and_type_ok():
+@pytest.mark.parametrize("connections_builder", __CONNECTIONS_BUILDERS)
+def test_nmcli_filters_first_connection_with_name_and_type_ok(connections_builder):
     """
     Tests first_connection_with_name_and_type with all
-    possible inputs.
+    possible inputs, from plain lists and from indexes.
     """
     uuid_1 = "63f3b658-c778-11ee-80f6-9f9dcbb2a1b8"
     uuid_2 = "860fd076-c775-11ee-8e75-cbe4021908b4"
@@ -213,7 +220,9 @@ def test_nmcli_filters_first_connection_with_name_and_type_ok():
 
     assert (
         nmcli_filters.first_connection_with_name_and_type(
-            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+            connections_builder(
+                [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+            ),
             "conn-1",
             nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_ETHERNET,
         )
@@ -221,7 +230,9 @@ def test_nmcli_filters_first_connection_with_name_and_type_ok():
     )
     assert (
         nmcli_filters.first_connection_with_name_and_type(
-            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+            connections_builder(
+                [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+            ),
             "conn-1",
             nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_ETHERNET,
             prio_active=False,
@@ -230,7 +241,9 @@ def test_nmcli_filters_first_connection_with_name_and_type_ok():
     )
     assert (
         nmcli_filters.first_connection_with_name_and_type(
-            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+            connections_builder(
+                [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+            ),
             "conn-1",
             nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_ETHERNET,
             is_main_conn=True,
@@ -239,7 +252,9 @@ def test_nmcli_filters_first_connection_with_name_and_type_ok():
     )
     assert (
         nmcli_filters.first_connection_with_name_and_type(
-            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+            connections_builder(
+                [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+            ),
             "conn-2",
             nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_ETHERNET,
         )
@@ -247,19 +262,25 @@ def test_nmcli_filters_first_connection_with_name_and_type_ok():
     )
     assert (
         nmcli_filters.first_connection_with_name_and_type(
-            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+            connections_builder(
+                [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+            ),
             "conn-4",
             nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_VLAN,
         )
         == conn_data_5
     )
     assert not nmcli_filters.first_connection_with_name_and_type(
-        [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+        connections_builder(
+            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+        ),
         "conn-8",
         nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_VLAN,
     )
     assert not nmcli_filters.first_connection_with_name_and_type(
-        [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5],
+        connections_builder(
+            [conn_data_1, conn_data_2, conn_data_3, conn_data_4, conn_data_5]
+        ),
         "conn-8",
         nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_BRIDGE,
     )
@@ -274,3 +295,111 @@ def test_nmcli_filters_first_connection_with_name_and_type_ok():
         nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE_VAL_ETHERNET,
         is_main_conn=True,
     )
+
+
+@pytest.mark.parametrize("connections_builder", __CONNECTIONS_BUILDERS)
+def test_nmcli_filters_main_slave_connections_ok(connections_builder):
+    """
+    Tests first_main_connection_of and all_slave_connections_of with
+    masters given by UUID and by interface, from plain lists and from
+    indexes.
+    """
+    main_uuid = "63f3b658-c778-11ee-80f6-9f9dcbb2a1b8"
+    main_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: main_uuid,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: "br0",
+    }
+    main_slave_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: (
+            "5f0cb374-c778-11ee-8ba0-2314b1ed58a7"
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: "br0",
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: "bond0",
+    }
+    slave_by_uuid_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: (
+            "860fd076-c775-11ee-8e75-cbe4021908b4"
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: main_uuid,
+    }
+    slave_by_iface_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: (
+            "7ff41544-c77a-11ee-a342-df323ec245b6"
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: "br0",
+    }
+    connections = connections_builder(
+        [
+            slave_by_iface_conn_data,
+            main_slave_conn_data,
+            main_conn_data,
+            slave_by_uuid_conn_data,
+        ]
+    )
+
+    assert (
+        nmcli_filters.first_main_connection_of(connections, slave_by_uuid_conn_data)
+        == main_conn_data
+    )
+    assert (
+        nmcli_filters.first_main_connection_of(connections, slave_by_iface_conn_data)
+        == main_slave_conn_data
+    )
+    assert (
+        nmcli_filters.first_main_connection_of(
+            connections, slave_by_iface_conn_data, is_main_conn=True
+        )
+        == main_conn_data
+    )
+    assert not nmcli_filters.first_main_connection_of(connections, main_conn_data)
+    assert not nmcli_filters.first_main_connection_of(connections, main_slave_conn_data)
+    assert nmcli_filters.all_slave_connections_of(connections, main_conn_data) == [
+        slave_by_iface_conn_data,
+        slave_by_uuid_conn_data,
+    ]
+    assert not nmcli_filters.all_slave_connections_of(
+        connections, slave_by_uuid_conn_data
+    )
+
+
+@pytest.mark.parametrize("connections_builder", __CONNECTIONS_BUILDERS)
+def test_nmcli_filters_first_main_connection_order_ok(connections_builder):
+    """
+    Tests that first_main_connection_of picks the first main connection
+    in the connections order, from plain lists and from indexes, even if
+    other connections use the master reference in another field.
+    """
+    main_ref = "63f3b658-c778-11ee-80f6-9f9dcbb2a1b8"
+    iface_named_as_ref_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: (
+            "5f0cb374-c778-11ee-8ba0-2314b1ed58a7"
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: main_ref,
+    }
+    main_1_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: main_ref,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: "br0",
+    }
+    main_2_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: main_ref,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: "br1",
+    }
+    slave_conn_data = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID: (
+            "860fd076-c775-11ee-8e75-cbe4021908b4"
+        ),
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_MASTER: main_ref,
+    }
+
+    connections = connections_builder(
+        [
+            iface_named_as_ref_conn_data,
+            main_2_conn_data,
+            slave_conn_data,
+            main_1_conn_data,
+        ]
+    )
+    assert (
+        nmcli_filters.first_main_connection_of(connections, slave_conn_data)
+        == main_2_conn_data
+    )
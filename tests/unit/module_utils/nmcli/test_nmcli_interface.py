@@ -1,17 +1,25 @@
 import copy
 import dataclasses
+import itertools
+import threading
 import typing
 
 import pytest
 from ansible_collections.pbtn.common.plugins.module_utils import (
     exceptions,
 )
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_interface,
+)
 from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
+    nmcli_dbus,
     nmcli_interface,
     nmcli_interface_exceptions,
+    nmcli_interface_link_validator,
     nmcli_interface_target_connection,
     nmcli_interface_types,
 )
@@ -20,7 +28,9 @@ from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils.command_
 )
 
 from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils import (
+    config_stub_data,
     net_config_stub,
+    nm_dbus_mock,
 )
 
 
@@ -106,6 +116,13 @@ def __test_assert_configuration_result(
         )
 
 
+def __build_diff(args: typing.List[str]) -> nmcli_interface_types.ConnectionDiff:
+    return nmcli_interface_types.ConnectionDiff(
+        nmcli_interface_types.FieldChange(field, None, value)
+        for field, value in zip(args[::2], args[1::2])
+    )
+
+
 def __build_mocked_target_connection_data_factory(
     mocker,
     target_connection_data: nmcli_interface_types.TargetConnectionData,
@@ -130,11 +147,11 @@ class MockedBuilder:
         self.configurable_connection_data = configurable_connection_data
         self.connection_args = connection_args
 
-    def build(
+    def diff(
         self,
         current_connection: typing.Union[typing.Dict[str, typing.Any], None],
         main_conn_uuid: typing.Optional[str],
-    ) -> typing.List[str]:
+    ) -> nmcli_interface_types.ConnectionDiff:
         assert current_connection == self.configurable_connection_data.conn_data
         conn_config = self.configurable_connection_data.conn_config
         assert conn_config
@@ -145,7 +162,12 @@ class MockedBuilder:
             conn_config, net_config.SlaveConnectionConfig
         )
 
-        return self.connection_args
+        return nmcli_interface_types.ConnectionDiff(
+            nmcli_interface_types.FieldChange(field, None, value)
+            for field, value in zip(
+                self.connection_args[::2], self.connection_args[1::2]
+            )
+        )
 
 
 def __build_mocked_builder_factory(
@@ -184,25 +206,31 @@ class MockedNmcliQuerierStackEntry:
     exists: bool
 
 
-def __build_mocked_nmcli_querier(
+def __build_mocked_connections_store(
     mocker,
     returned_connections: typing.List[MockedNmcliQuerierStackEntry],
 ):
     mocked_querier = mocker.Mock()
-    index = 0
-
-    def _querier_side_effect(conn_identifier, check_exists=False):
-        nonlocal index
-        if index >= len(returned_connections):
+    # The snapshot is empty, so the store fetches each connection when
+    # it's touched, and the returned states are only ordered per connection
+    mocked_querier.get_connections.return_value = []
+    connections_by_uuid = {}
+    for connection in returned_connections:
+        connections_by_uuid.setdefault(
+            connection.conn_data["connection.uuid"], []
+        ).append(connection)
+
+    def _querier_side_effect(conn_identifier, check_exists=False, fields=None):
+        if not connections_by_uuid.get(conn_identifier, None):
             raise Exception("unexpected mocked nmcli querier call")
-        connection = returned_connections[index]
-        assert conn_identifier == connection.conn_data["connection.uuid"]
+        connection = connections_by_uuid[conn_identifier].pop(0)
         assert check_exists == connection.exists
-        index += 1
+        # Fields are only projected when polling the state
+        assert fields in (None, ["general.state"])
         return connection.conn_data
 
     mocked_querier.get_connection_details.side_effect = _querier_side_effect
-    return mocked_querier
+    return nmcli_connections_store.NetworkManagerConnectionsStore(mocked_querier)
 
 
 def __build_generate_mocked_nmcli_querier_list_entry(
@@ -228,7 +256,8 @@ def __build_generate_mocked_nmcli_querier_list_entry(
     # If the args builders returned no args the connection never
     # changes its state, so no need to emulate this behavior
     if connections_args.get(conn_data.conn_config.name, None):
-        for _ in range(wait_for_state + (1 if set_state else 0)):
+        # Changed connections are only fetched to poll their state
+        for _ in range(wait_for_state if set_state else 0):
             mocked_calls.append(
                 MockedNmcliQuerierStackEntry(
                     copy.deepcopy(original_conn_data),
@@ -238,15 +267,21 @@ def __build_generate_mocked_nmcli_querier_list_entry(
 
     if is_state_deactivating:
         original_conn_data.pop("general.state", None)
-    mocked_calls.append(
-        MockedNmcliQuerierStackEntry(
-            {
-                **copy.deepcopy(original_conn_data),
-                **last_state_update,
-            },
-            True,
-        ),
-    )
+    # Once the state is reached by polling it, the connection
+    # is fully fetched once more
+    last_state_count = (
+        2 if connections_args.get(conn_data.conn_config.name, None) and set_state else 1
+    )
+    for _ in range(last_state_count):
+        mocked_calls.append(
+            MockedNmcliQuerierStackEntry(
+                {
+                    **copy.deepcopy(original_conn_data),
+                    **last_state_update,
+                },
+                True,
+            ),
+        )
 
 
 def __build_generate_mocked_nmcli_querier_list(
@@ -338,21 +373,24 @@ def test_nmcli_interface_network_manager_configurator_single_conn_1_ok(
 
     nmcli_computed_args = ["nmcli-arg", "nmcli-value"]
     command_mocker = command_mocker_builder.build()
-    for delete_uuid in target_connection_data_factory_delete_uuids:
-        command_mocker.add_call_definition(
-            MockCall(["nmcli", "connection", "delete", delete_uuid], True),
-        )
+    command_mocker.add_call_definition(
+        MockCall(
+            ["nmcli", "connection", "delete"]
+            + target_connection_data_factory_delete_uuids,
+            True,
+        ),
+    )
     command_mocker.add_call_definition(
         MockCall(["nmcli", "connection", "add"] + nmcli_computed_args, True),
         stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_uuid], True)
     )
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data,
@@ -423,12 +461,12 @@ def test_nmcli_interface_network_manager_configurator_single_conn_2_ok(
         stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_uuid], True)
     )
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data, connections_args
@@ -493,7 +531,7 @@ def test_nmcli_interface_network_manager_configurator_single_conn_3_ok(
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data, connections_args
@@ -557,12 +595,12 @@ def test_nmcli_interface_network_manager_configurator_single_conn_4_ok(
         stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_uuid], True), rc=0
+        MockCall(["nmcli", "--wait", "2", "connection", "up", conn_uuid], True), rc=0
     )
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data,
@@ -637,7 +675,7 @@ def test_nmcli_interface_network_manager_configurator_single_conn_5_ok(
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data,
@@ -702,12 +740,12 @@ def test_nmcli_interface_network_manager_configurator_single_conn_6_ok(
         stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "down", conn_uuid], True), rc=0
+        MockCall(["nmcli", "--wait", "2", "connection", "down", conn_uuid], True), rc=0
     )
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data,
@@ -789,7 +827,7 @@ def test_nmcli_interface_network_manager_configurator_apply_args_fail(
 
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        # Querier isn't used in this test
+        # Connections store isn't used in this test
         mocker.Mock(),
         __build_mocked_builder_factory(
             mocker,
@@ -810,6 +848,69 @@ def test_nmcli_interface_network_manager_configurator_apply_args_fail(
     assert err.value.cmd == nmcli_expected_cmd
 
 
+def test_nmcli_interface_network_manager_configurator_delete_fail(
+    command_mocker_builder, mocker
+):
+    """
+    Tests that the NetworkManagerConfigurator deletes connections in a
+    single nmcli call and reports the ones that couldn't be deleted.
+
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    conn_config = net_config_stub.build_testing_ether_config(
+        mocker, index=0, config_patch={"state": "up"}
+    )
+    target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+        {},
+        conn_config,
+    ).build()
+    delete_uuids = [
+        "24a105ee-27bd-4075-9b2f-19cecb4fb26a",
+        "0942731a-c598-4e1f-9028-ab75492dc3c0",
+        "5b1ea6f0-60f2-4a61-9d0d-3d5a7e4ce2a7",
+    ]
+    target_connection_data_factory = __build_mocked_target_connection_data_factory(
+        mocker, target_connection_data, delete_uuids
+    )
+    nmcli_expected_cmd = ["nmcli", "connection", "delete"] + delete_uuids
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(nmcli_expected_cmd, True),
+        stdout=f"Connection 'conn-1' ({delete_uuids[0]}) successfully deleted.\n"
+        f"Connection 'conn-3' ({delete_uuids[2]}) successfully deleted.\n",
+        stderr="Error: Connection deletion failed: Insufficient privileges",
+        rc=1,
+    )
+    connections_store = mocker.Mock()
+    configurator = nmcli_interface.NetworkManagerConfigurator(
+        command_mocker.run,
+        connections_store,
+        # Args are planned before deleting anything
+        __build_mocked_builder_factory(
+            mocker, target_connection_data, {conn_config.name: []}
+        ),
+        target_connection_data_factory,
+        mocker.Mock(),
+    )
+
+    with pytest.raises(nmcli_interface_exceptions.NmcliInterfaceDeleteException) as err:
+        configurator.configure(conn_config)
+
+    assert err.value.failed_uuids == [delete_uuids[1]]
+    assert err.value.conn_uuid == delete_uuids[1]
+    assert (
+        err.value.error == "Error: Connection deletion failed: Insufficient privileges"
+    )
+    assert err.value.cmd == nmcli_expected_cmd
+    assert isinstance(
+        err.value, nmcli_interface_exceptions.NmcliInterfaceApplyException
+    )
+    connections_store.discard.assert_called_once_with(
+        {delete_uuids[0], delete_uuids[2]}
+    )
+
+
 def test_nmcli_interface_network_manager_configurator_state_timeout_fail(
     command_mocker_builder, mocker
 ):
@@ -844,12 +945,12 @@ def test_nmcli_interface_network_manager_configurator_state_timeout_fail(
         stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_uuid], True), rc=0
+        MockCall(["nmcli", "--wait", "1", "connection", "up", conn_uuid], True), rc=0
     )
     connections_args = {conn_config.name: nmcli_computed_args}
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data,
@@ -913,7 +1014,7 @@ def test_nmcli_interface_network_manager_configurator_activation_failure_fail(
         )
         for _ in range(2)
     ]
-    querier = __build_mocked_nmcli_querier(
+    connections_store = __build_mocked_connections_store(
         mocker,
         returned_mocked_connections,
     )
@@ -925,14 +1026,14 @@ def test_nmcli_interface_network_manager_configurator_activation_failure_fail(
         stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_uuid], True),
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_uuid], True),
         rc=1,
         stdout="Stdout text",
         stderr="Stderr text",
     )
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        querier,
+        connections_store,
         __build_mocked_builder_factory(
             mocker,
             target_connection_data,
@@ -953,6 +1054,69 @@ def test_nmcli_interface_network_manager_configurator_activation_failure_fail(
     )
 
 
+def test_nmcli_interface_network_manager_configurator_activation_timeout_fail(
+    command_mocker_builder, mocker
+):
+    """
+    Tests that the NetworkManagerConfigurator reports a timeout when nmcli
+    gives up waiting for the connection to become active.
+
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    conn_config = net_config_stub.build_testing_ether_config(
+        mocker, index=0, config_patch={"state": "up"}
+    )
+    target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+        {},
+        conn_config,
+    ).build()
+    target_connection_data_factory = __build_mocked_target_connection_data_factory(
+        mocker, target_connection_data, []
+    )
+    conn_uuid = "fb157a65-ad32-47ed-858c-102a48e064a2"
+    connections_store = __build_mocked_connections_store(
+        mocker,
+        [MockedNmcliQuerierStackEntry({"connection.uuid": conn_uuid}, True)],
+    )
+    nmcli_computed_args = ["nmcli-arg", "nmcli-value"]
+    connections_args = {conn_config.name: nmcli_computed_args}
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "connection", "add"] + nmcli_computed_args, True),
+        stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
+    )
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "--wait", "10", "connection", "up", conn_uuid], True),
+        rc=3,
+        stderr="Error: Timeout expired (10 seconds)",
+    )
+    configurator = nmcli_interface.NetworkManagerConfigurator(
+        command_mocker.run,
+        connections_store,
+        __build_mocked_builder_factory(
+            mocker,
+            target_connection_data,
+            connections_args,
+        ),
+        target_connection_data_factory,
+        mocker.Mock(),
+        options=nmcli_interface_types.NetworkManagerConfiguratorOptions(
+            state_apply_timeout_secs=10
+        ),
+    )
+
+    with pytest.raises(nmcli_interface_exceptions.NmcliInterfaceApplyException) as err:
+        configurator.configure(conn_config)
+
+    assert err.value.conn_uuid == conn_uuid
+    assert err.value.conn_name == conn_config.name
+    assert (
+        f"Cannot change the state of connection '{conn_config.name}' in the given time"
+        in err.value.msg
+    )
+
+
 def test_nmcli_interface_network_manager_configurator_link_validation_fail(
     command_mocker_builder, mocker
 ):
@@ -983,7 +1147,10 @@ def test_nmcli_interface_network_manager_configurator_link_validation_fail(
     configurator = nmcli_interface.NetworkManagerConfigurator(
         mocker.Mock(),
         mocker.Mock(),
-        __build_mocked_builder_factory(mocker, target_connection_data, {}),
+        # Args are planned before validating the links
+        __build_mocked_builder_factory(
+            mocker, target_connection_data, {conn_config.name: []}
+        ),
         target_connection_data_factory,
         link_validator_mock,
     )
@@ -1059,10 +1226,10 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_1_ok(
         stdout=f"Connection '{conn_config.slaves[0].name}' ({conn_ether_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_ether_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_ether_uuid], True)
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_bridge_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_bridge_uuid], True)
     )
     connections_args = {
         conn_config.name: bridge_conn_nmcli_args,
@@ -1070,7 +1237,7 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_1_ok(
     }
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data, connections_args
@@ -1174,10 +1341,10 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_2_ok(
         stdout=f"Connection '{conn_config.slaves[0].name}' ({conn_ether_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_ether_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_ether_uuid], True)
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_bridge_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_bridge_uuid], True)
     )
     connections_args = {
         conn_config.name: bridge_conn_nmcli_args,
@@ -1185,7 +1352,7 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_2_ok(
     }
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data, connections_args
@@ -1269,7 +1436,7 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_3_ok(
     command_mocker = command_mocker_builder.build()
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data, connections_args
@@ -1360,13 +1527,16 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_4_ok(
         conn_config.slaves[0].name: [],
     }
     command_mocker = command_mocker_builder.build()
-    for delete_uuid in target_connection_data_factory_delete_uuids:
-        command_mocker.add_call_definition(
-            MockCall(["nmcli", "connection", "delete", delete_uuid], True),
-        )
+    command_mocker.add_call_definition(
+        MockCall(
+            ["nmcli", "connection", "delete"]
+            + target_connection_data_factory_delete_uuids,
+            True,
+        ),
+    )
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data, connections_args
@@ -1502,10 +1672,10 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_5_ok(
         stdout=f"Connection '{conn_config.slaves[1].name}' ({conn_vlan_uuid}) successfully added.",
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_ether_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_ether_uuid], True)
     )
     command_mocker.add_call_definition(
-        MockCall(["nmcli", "connection", "up", conn_bridge_uuid], True)
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_bridge_uuid], True)
     )
     connections_args = {
         conn_config.name: bridge_conn_nmcli_args,
@@ -1514,7 +1684,7 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_5_ok(
     }
     configurator = nmcli_interface.NetworkManagerConfigurator(
         command_mocker.run,
-        __build_mocked_nmcli_querier(
+        __build_mocked_connections_store(
             mocker,
             __build_generate_mocked_nmcli_querier_list(
                 target_connection_data,
@@ -1553,6 +1723,254 @@ def test_nmcli_interface_network_manager_configurator_multiple_conns_5_ok(
     )
 
 
+def test_nmcli_interface_network_manager_configurator_apply_plan_ok(
+    command_mocker_builder, mocker
+):
+    """
+    Tests that the NetworkManagerConfigurator applies a plan of a new main
+    connection, replacing its planned UUID in the arguments of the slaves.
+
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    conn_config = net_config_stub.build_testing_ether_bridge_config(
+        mocker, slaves_count=1
+    )
+    slave_uuid = "1fe5a4f4-83a1-4d0a-8a2e-e7c3c6a2c7e1"
+    main_uuid = "ab0bf4d4-2f8a-4b1c-9b57-3e3e6e7c3a51"
+    slave_conn_data = nmcli_interface_types.ConfigurableConnectionData(
+        {"connection.uuid": slave_uuid}, conn_config.slaves[0]
+    )
+    target_connection_data = (
+        nmcli_interface_types.TargetConnectionData.Builder({}, conn_config)
+        .append_slave(slave_conn_data)
+        .build()
+    )
+    connection_plan = nmcli_interface_types.ConnectionPlan(
+        target_connection_data=target_connection_data,
+        delete_connections=[],
+        main_change=nmcli_interface_types.ConnectionChange(
+            target_connection_data, __build_diff(["connection.id", conn_config.name])
+        ),
+        slave_changes=[
+            nmcli_interface_types.ConnectionChange(
+                slave_conn_data,
+                __build_diff(
+                    [
+                        "connection.master",
+                        nmcli_interface_types.PLANNED_MAIN_CONN_UUID,
+                    ]
+                ),
+            )
+        ],
+    )
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(
+            ["nmcli", "connection", "add", "connection.id", conn_config.name], True
+        ),
+        stdout=f"Connection '{conn_config.name}' ({main_uuid}) successfully added.",
+    )
+    command_mocker.add_call_definition(
+        MockCall(
+            [
+                "nmcli",
+                "connection",
+                "modify",
+                slave_uuid,
+                "connection.master",
+                main_uuid,
+            ],
+            True,
+        ),
+    )
+    connections_store = mocker.Mock()
+    link_validator = mocker.Mock()
+    configurator = nmcli_interface.NetworkManagerConfigurator(
+        command_mocker.run,
+        connections_store,
+        mocker.Mock(),
+        mocker.Mock(),
+        link_validator,
+    )
+
+    result = configurator.apply(connection_plan)
+
+    link_validator.validate_mandatory_links.assert_called_once_with(conn_config)
+    assert result.result.uuid == main_uuid
+    assert result.result.changed
+    assert [slave_result.uuid for slave_result in result.slaves] == [slave_uuid]
+    assert result.slaves[0].main_conn_config_result == result.result
+    # Connections are fetched once their state is enforced
+    connections_store.refresh.assert_not_called()
+
+
+def test_nmcli_interface_network_manager_configurator_apply_virtual_links_ok(
+    command_mocker_builder, mocker
+):
+    """
+    Tests that the NetworkManagerConfigurator refreshes the links once
+    a virtual connection is added, so the link it creates is seen when
+    validating the next connection.
+
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    vlan_config = net_config_stub.build_testing_vlan_config(mocker)
+    qinq_config = net_config_stub.build_testing_vlan_config(
+        mocker,
+        conn_name="qinq-conn",
+        config_patch={
+            "iface": "eth0.10.20",
+            "vlan": {"id": 20, "parent": vlan_config.interface.iface_name},
+        },
+    )
+    vlan_link = ip_interface.IPLinkData.from_dict(
+        {
+            "ifname": vlan_config.interface.iface_name,
+            "link": "eth0",
+            "address": config_stub_data.TEST_IP_LINK_ETHER_0_MAC,
+            "linkinfo": {"info_kind": "vlan"},
+        }
+    )
+    ip_iface = mocker.Mock()
+    ip_iface.get_ip_links.side_effect = [
+        config_stub_data.TEST_IP_LINKS,
+        config_stub_data.TEST_IP_LINKS + [vlan_link],
+    ]
+    command_mocker = command_mocker_builder.build()
+    for conn_config, conn_uuid in (
+        (vlan_config, "2c6d1b2e-7a3a-4b8e-9a43-0d4f0c1b5a10"),
+        (qinq_config, "5e0c3b9a-1f2d-4c6e-8b7a-9d0e1f2a3b4c"),
+    ):
+        command_mocker.add_call_definition(
+            MockCall(
+                ["nmcli", "connection", "add", "connection.id", conn_config.name],
+                True,
+            ),
+            stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
+        )
+    configurator = nmcli_interface.NetworkManagerConfigurator(
+        command_mocker.run,
+        mocker.Mock(),
+        mocker.Mock(),
+        mocker.Mock(),
+        nmcli_interface_link_validator.NmcliLinkValidator(
+            ip_interface.IPLinksTable(ip_iface)
+        ),
+    )
+
+    for conn_config in (vlan_config, qinq_config):
+        target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+            {}, conn_config
+        ).build()
+        result = configurator.apply(
+            nmcli_interface_types.ConnectionPlan(
+                target_connection_data=target_connection_data,
+                delete_connections=[],
+                main_change=nmcli_interface_types.ConnectionChange(
+                    target_connection_data,
+                    __build_diff(["connection.id", conn_config.name]),
+                ),
+                slave_changes=[],
+            )
+        )
+        assert result.result.changed
+
+    assert ip_iface.get_ip_links.call_count == 2
+
+
+def test_nmcli_interface_network_manager_configurator_plan_commands_ok(
+    command_mocker_builder, mocker
+):
+    """
+    Tests that the NetworkManagerConfigurator reports the commands a plan
+    would run, by connection, without running any of them.
+
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    conn_config = net_config_stub.build_testing_ether_bridge_config(
+        mocker, slaves_count=2, config_patch={"state": "up"}
+    )
+    slave_uuid = "1fe5a4f4-83a1-4d0a-8a2e-e7c3c6a2c7e1"
+    delete_uuid = "ab0bf4d4-2f8a-4b1c-9b57-3e3e6e7c3a51"
+    slave_conn_data_1 = nmcli_interface_types.ConfigurableConnectionData(
+        {"connection.uuid": slave_uuid}, conn_config.slaves[0]
+    )
+    slave_conn_data_2 = nmcli_interface_types.ConfigurableConnectionData(
+        None, conn_config.slaves[1]
+    )
+    target_connection_data = (
+        nmcli_interface_types.TargetConnectionData.Builder({}, conn_config)
+        .append_slave(slave_conn_data_1)
+        .append_slave(slave_conn_data_2)
+        .build()
+    )
+    connection_plan = nmcli_interface_types.ConnectionPlan(
+        target_connection_data=target_connection_data,
+        delete_connections=[{"connection.uuid": delete_uuid}],
+        main_change=nmcli_interface_types.ConnectionChange(
+            target_connection_data,
+            __build_diff(["connection.id", conn_config.name]),
+            "up",
+        ),
+        slave_changes=[
+            nmcli_interface_types.ConnectionChange(
+                slave_conn_data_1, nmcli_interface_types.ConnectionDiff(), "up"
+            ),
+            nmcli_interface_types.ConnectionChange(
+                slave_conn_data_2,
+                __build_diff(
+                    [
+                        "connection.master",
+                        nmcli_interface_types.PLANNED_MAIN_CONN_UUID,
+                    ]
+                ),
+            ),
+        ],
+    )
+    # No command is expected to run
+    command_mocker = command_mocker_builder.build()
+    configurator = nmcli_interface.NetworkManagerConfigurator(
+        command_mocker.run,
+        mocker.Mock(),
+        mocker.Mock(),
+        mocker.Mock(),
+        mocker.Mock(),
+        options=nmcli_interface_types.NetworkManagerConfiguratorOptions(
+            state_apply_timeout_secs=10
+        ),
+    )
+
+    assert configurator.plan_commands(connection_plan) == {
+        conn_config.name: [
+            ["nmcli", "connection", "delete", delete_uuid],
+            ["nmcli", "connection", "add", "connection.id", conn_config.name],
+            [
+                "nmcli",
+                "--wait",
+                "10",
+                "connection",
+                "up",
+                nmcli_interface_types.PLANNED_CONN_UUID,
+            ],
+        ],
+        conn_config.slaves[0].name: [
+            ["nmcli", "--wait", "10", "connection", "up", slave_uuid],
+        ],
+        conn_config.slaves[1].name: [
+            [
+                "nmcli",
+                "connection",
+                "add",
+                "connection.master",
+                nmcli_interface_types.PLANNED_MAIN_CONN_UUID,
+            ],
+        ],
+    }
+
+
 @pytest.mark.parametrize(
     "test_config_type,test_config_raw",
     [
@@ -1657,3 +2075,514 @@ def test_nmcli_interface_network_manager_configurator_factory_fail(mocker):
             )
         )
     assert "unsupported connection type" in str(err.value).lower()
+
+
+def __build_mocked_session_configurator_factory(mocker, calls):
+    def _build_configurator(conn_config):
+        configurator = mocker.Mock()
+
+        def _delete_connections(connections):
+            calls.append(
+                ("delete", [conn_data["connection.uuid"] for conn_data in connections])
+            )
+            return len(connections)
+
+        def _apply(connection_plan):
+            assert connection_plan.conn_config == conn_config
+            calls.append(("apply", conn_config))
+            configuration_result = mocker.Mock()
+            configuration_result.name = f"{conn_config}-result"
+            return configuration_result
+
+        def _enforce_states(configuration_result):
+            assert configuration_result.name == f"{conn_config}-result"
+            calls.append(("enforce", conn_config))
+
+        configurator.delete_connections.side_effect = _delete_connections
+        configurator.apply.side_effect = _apply
+        configurator.enforce_states.side_effect = _enforce_states
+        return configurator
+
+    configurator_factory = mocker.Mock()
+    configurator_factory.build_configurator.side_effect = _build_configurator
+    return configurator_factory
+
+
+def __build_mocked_session_planner(mocker, config_handler, levels, delete_uuids):
+    # Both, sequential and concurrent, modes go by the levels
+    config_handler.levels = levels
+    config_handler.connections = None
+
+    def _build_connection_plan(conn_config):
+        connection_plan = mocker.Mock()
+        connection_plan.conn_config = conn_config
+        connection_plan.delete_connections = [
+            {"connection.uuid": conn_uuid}
+            for conn_uuid in delete_uuids.get(conn_config, [])
+        ]
+        return connection_plan
+
+    def _plan(conn_config_handler, by_levels=True):
+        assert conn_config_handler == config_handler
+        return nmcli_interface_types.ConfigurationPlan(
+            levels=[
+                [_build_connection_plan(conn_config) for conn_config in level]
+                for level in (
+                    levels
+                    if by_levels
+                    else [[conn_config] for conn_config in itertools.chain(*levels)]
+                )
+            ]
+        )
+
+    def _plan_level(conn_config_handler, conn_configs, config_session):
+        assert conn_config_handler == config_handler
+        return [_build_connection_plan(conn_config) for conn_config in conn_configs]
+
+    planner = mocker.Mock()
+    planner.plan.side_effect = _plan
+    planner.plan_level.side_effect = _plan_level
+    return planner
+
+
+def __session_results_names(config_session):
+    return [
+        call_args.args[0].name for call_args in config_session.add_result.call_args_list
+    ]
+
+
+def test_nmcli_interface_network_manager_session_configurator_sequential_ok(mocker):
+    """
+    Tests that the NetworkManagerSessionConfigurator plans, applies and
+    activates each connection before the next one by default, planning
+    each one right before applying it.
+
+    :param mocker: The pytest mocker fixture
+    """
+    calls = []
+    config_handler = mocker.Mock()
+    config_session = mocker.Mock()
+    planner = __build_mocked_session_planner(
+        mocker,
+        config_handler,
+        [["conn-1", "conn-2"], ["conn-3"]],
+        {"conn-2": ["uuid-1", "uuid-2"]},
+    )
+
+    nmcli_interface.NetworkManagerSessionConfigurator(
+        __build_mocked_session_configurator_factory(mocker, calls),
+        config_session,
+        planner,
+    ).configure(config_handler)
+
+    planner.plan.assert_not_called()
+    assert planner.plan_level.call_args_list == [
+        mocker.call(config_handler, [conn_name], config_session)
+        for conn_name in ("conn-1", "conn-2", "conn-3")
+    ]
+    assert calls == [
+        ("apply", "conn-1"),
+        ("enforce", "conn-1"),
+        ("delete", ["uuid-1", "uuid-2"]),
+        ("apply", "conn-2"),
+        ("enforce", "conn-2"),
+        ("apply", "conn-3"),
+        ("enforce", "conn-3"),
+    ]
+    assert __session_results_names(config_session) == [
+        "conn-1-result",
+        "conn-2-result",
+        "conn-3-result",
+    ]
+    results = [
+        call_args.args[0] for call_args in config_session.add_result.call_args_list
+    ]
+    results[0].set_changed.assert_not_called()
+    results[1].set_changed.assert_called_once_with()
+
+
+def test_nmcli_interface_network_manager_session_configurator_concurrent_ok(mocker):
+    """
+    Tests that the NetworkManagerSessionConfigurator activates the
+    connections of the same dependency level concurrently, deleting the
+    connections they replace at once and keeping the levels, and the
+    session results, in order.
+
+    :param mocker: The pytest mocker fixture
+    """
+    calls = []
+    # Both level 0 activations need to be running at the same time
+    # for the barrier to be passed
+    activation_barrier = threading.Barrier(2, timeout=5)
+    configurator_factory = __build_mocked_session_configurator_factory(mocker, calls)
+    build_configurator_side_effect = configurator_factory.build_configurator.side_effect
+
+    def _build_configurator(conn_config):
+        configurator = build_configurator_side_effect(conn_config)
+        enforce_states_side_effect = configurator.enforce_states.side_effect
+        if conn_config != "conn-2":
+
+            def _enforce_states(configuration_result):
+                activation_barrier.wait()
+                enforce_states_side_effect(configuration_result)
+
+            configurator.enforce_states.side_effect = _enforce_states
+        return configurator
+
+    configurator_factory.build_configurator.side_effect = _build_configurator
+    config_handler = mocker.Mock()
+    config_session = mocker.Mock()
+    planner = __build_mocked_session_planner(
+        mocker,
+        config_handler,
+        [["conn-1", "conn-3"], ["conn-2"]],
+        {"conn-1": ["uuid-1"], "conn-3": ["uuid-2", "uuid-1"]},
+    )
+
+    nmcli_interface.NetworkManagerSessionConfigurator(
+        configurator_factory,
+        config_session,
+        planner,
+        activation_workers=4,
+    ).configure(config_handler)
+
+    planner.plan.assert_not_called()
+    assert planner.plan_level.call_args_list == [
+        mocker.call(config_handler, ["conn-1", "conn-3"], config_session),
+        mocker.call(config_handler, ["conn-2"], config_session),
+    ]
+    assert calls[:3] == [
+        ("delete", ["uuid-1", "uuid-2"]),
+        ("apply", "conn-1"),
+        ("apply", "conn-3"),
+    ]
+    assert sorted(calls[3:5]) == [("enforce", "conn-1"), ("enforce", "conn-3")]
+    assert calls[5:] == [("apply", "conn-2"), ("enforce", "conn-2")]
+    assert __session_results_names(config_session) == [
+        "conn-1-result",
+        "conn-3-result",
+        "conn-2-result",
+    ]
+
+
+def test_nmcli_interface_network_manager_session_configurator_plan_ok(mocker):
+    """
+    Tests that the NetworkManagerSessionConfigurator plans a configuration,
+    and reports its commands, without applying anything.
+
+    :param mocker: The pytest mocker fixture
+    """
+    calls = []
+    conn_configs = {}
+    for conn_name in ("conn-1", "conn-2", "conn-3"):
+        conn_configs[conn_name] = mocker.Mock()
+        conn_configs[conn_name].name = conn_name
+    configurator_factory = __build_mocked_session_configurator_factory(mocker, calls)
+    build_configurator_side_effect = configurator_factory.build_configurator.side_effect
+
+    def _build_configurator(conn_config):
+        configurator = build_configurator_side_effect(conn_config)
+        configurator.plan_commands.side_effect = lambda connection_plan: {
+            conn_config.name: [["nmcli", "connection", "up", conn_config.name]]
+        }
+        return configurator
+
+    configurator_factory.build_configurator.side_effect = _build_configurator
+    config_handler = mocker.Mock()
+    config_session = mocker.Mock()
+    planner = __build_mocked_session_planner(
+        mocker,
+        config_handler,
+        [
+            [conn_configs["conn-1"], conn_configs["conn-3"]],
+            [conn_configs["conn-2"]],
+        ],
+        {},
+    )
+    session_configurator = nmcli_interface.NetworkManagerSessionConfigurator(
+        configurator_factory,
+        config_session,
+        planner,
+        activation_workers=2,
+    )
+
+    configuration_plan = session_configurator.plan(config_handler)
+
+    planner.plan.assert_called_once_with(config_handler, by_levels=True)
+    assert list(session_configurator.plan_commands(configuration_plan).items()) == [
+        (conn_name, {conn_name: [["nmcli", "connection", "up", conn_name]]})
+        for conn_name in ("conn-1", "conn-3", "conn-2")
+    ]
+    assert not calls
+    config_session.add_result.assert_not_called()
+
+
+def test_nmcli_interface_network_manager_dbus_configurator_ok(mocker):
+    """
+    Tests that the NetworkManagerDBusConfigurator deletes, adds and
+    activates the connections through the D-Bus API, using the same
+    builder args the nmcli configurator uses.
+    :param mocker: The pytest mocker fixture
+    """
+    nm_mock = nm_dbus_mock.NetworkManagerDBusMock()
+    try:
+        delete_uuid = "24a105ee-27bd-4075-9b2f-19cecb4fb26a"
+        nm_mock.add_connection(
+            {
+                "connection": {
+                    "id": nm_dbus_mock.dbus_utils.DBusVariant("s", "old-conn"),
+                    "uuid": nm_dbus_mock.dbus_utils.DBusVariant("s", delete_uuid),
+                    "type": nm_dbus_mock.dbus_utils.DBusVariant("s", "802-3-ethernet"),
+                }
+            },
+            active=True,
+        )
+        conn_config = net_config.EthernetConnectionConfig(
+            conn_name="new-conn-name",
+            raw_config={"type": "ethernet", "iface": "eth0", "state": "up"},
+            ip_links=[],
+            connection_config_factory=mocker.Mock(),
+        )
+        target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+            {},
+            conn_config,
+        ).build()
+        target_connection_data_factory = __build_mocked_target_connection_data_factory(
+            mocker, target_connection_data, [delete_uuid]
+        )
+        connections_args = {
+            conn_config.name: [
+                "connection.type",
+                "802-3-ethernet",
+                "connection.id",
+                conn_config.name,
+                "connection.interface-name",
+                "eth0",
+                "ipv4.method",
+                "disabled",
+            ]
+        }
+        dbus_client = nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+        factory = nmcli_interface.NetworkManagerConfiguratorFactory(
+            mocker.Mock(),
+            nmcli_connections_store.NetworkManagerConnectionsStore(
+                nmcli_dbus.NetworkManagerDBusQuerier(dbus_client)
+            ),
+            __build_mocked_builder_factory(
+                mocker,
+                target_connection_data,
+                connections_args,
+            ),
+            target_connection_data_factory,
+            mocker.Mock(),
+            dbus_client=dbus_client,
+        )
+        configurator = factory.build_configurator(conn_config)
+        assert isinstance(configurator, nmcli_interface.NetworkManagerDBusConfigurator)
+
+        result = configurator.configure(conn_config)
+
+        assert nm_mock.get_connection(delete_uuid) is None
+        assert not nm_mock.is_active(delete_uuid)
+        assert result.changed
+        assert result.result.applied_config == conn_config
+        conn_uuid = result.result.uuid
+        assert result.result.status["connection.id"] == conn_config.name
+        assert result.result.status["general.state"] == "activated"
+        assert result.result.status["general.devices"] == "eth0"
+        assert nm_mock.is_active(conn_uuid)
+        settings = nm_mock.get_connection(conn_uuid)
+        assert settings["connection"]["interface-name"].value == "eth0"
+        assert settings["ipv4"]["method"].value == "disabled"
+        assert "802-3-ethernet" in settings
+    finally:
+        nm_mock.close()
+
+
+def test_nmcli_interface_network_manager_dbus_configurator_nmcli_fallback_ok(
+    command_mocker_builder, mocker
+):
+    """
+    Tests that the NetworkManagerDBusConfigurator applies with nmcli the
+    changes whose properties cannot be translated to D-Bus settings.
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    nm_mock = nm_dbus_mock.NetworkManagerDBusMock()
+    try:
+        conn_uuid = "a2e5b0d3-4f43-4a3e-8f0a-3b4b2a7a9c51"
+        conn_config = net_config.EthernetConnectionConfig(
+            conn_name="new-conn-name",
+            raw_config={"type": "ethernet", "iface": "eth0"},
+            ip_links=[],
+            connection_config_factory=mocker.Mock(),
+        )
+        target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+            {},
+            conn_config,
+        ).build()
+        builder_args = [
+            "connection.type",
+            "802-3-ethernet",
+            "connection.id",
+            conn_config.name,
+            "802-3-ethernet.mtu",
+            "9000",
+        ]
+        command_mocker = command_mocker_builder.build()
+        command_mocker.add_call_definition(
+            MockCall(["nmcli", "connection", "add"] + builder_args, True),
+            stdout=f"Connection '{conn_config.name}' ({conn_uuid}) successfully added.",
+        )
+        dbus_client = nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+        factory = nmcli_interface.NetworkManagerConfiguratorFactory(
+            command_mocker.run,
+            nmcli_connections_store.NetworkManagerConnectionsStore(
+                nmcli_dbus.NetworkManagerDBusQuerier(dbus_client)
+            ),
+            __build_mocked_builder_factory(
+                mocker,
+                target_connection_data,
+                {conn_config.name: builder_args},
+            ),
+            __build_mocked_target_connection_data_factory(
+                mocker, target_connection_data, []
+            ),
+            mocker.Mock(),
+            dbus_client=dbus_client,
+        )
+
+        result = factory.build_configurator(conn_config).configure(
+            conn_config, enforce_state=False
+        )
+
+        assert result.changed
+        assert result.result.uuid == conn_uuid
+        assert not nm_mock.connections
+        assert ("/org/freedesktop/NetworkManager/Settings", "AddConnection") not in (
+            nm_mock.calls
+        )
+    finally:
+        nm_mock.close()
+
+
+def test_nmcli_interface_network_manager_dbus_configurator_delete_fail(mocker):
+    """
+    Tests that the NetworkManagerDBusConfigurator keeps deleting the
+    remaining connections if one fails and reports the failed ones.
+    :param mocker: The pytest mocker fixture
+    """
+    nm_mock = nm_dbus_mock.NetworkManagerDBusMock()
+    try:
+        conn_uuids = [
+            "24a105ee-27bd-4075-9b2f-19cecb4fb26a",
+            "0942731a-c598-4e1f-9028-ab75492dc3c0",
+        ]
+        for conn_uuid in conn_uuids:
+            nm_mock.add_connection(
+                {
+                    "connection": {
+                        "id": nm_dbus_mock.dbus_utils.DBusVariant("s", conn_uuid),
+                        "uuid": nm_dbus_mock.dbus_utils.DBusVariant("s", conn_uuid),
+                        "type": nm_dbus_mock.dbus_utils.DBusVariant(
+                            "s", "802-3-ethernet"
+                        ),
+                    }
+                }
+            )
+        nm_mock.errors["Delete"] = (
+            "org.freedesktop.NetworkManager.PermissionDenied",
+            "Not authorized",
+        )
+        dbus_client = nmcli_dbus.NetworkManagerDBusClient(nm_mock.connect())
+        configurator = nmcli_interface.NetworkManagerDBusConfigurator(
+            dbus_client,
+            mocker.Mock(),
+            nmcli_connections_store.NetworkManagerConnectionsStore(
+                nmcli_dbus.NetworkManagerDBusQuerier(dbus_client)
+            ),
+            mocker.Mock(),
+            mocker.Mock(),
+            mocker.Mock(),
+        )
+
+        with pytest.raises(
+            nmcli_interface_exceptions.NmcliInterfaceDeleteException
+        ) as err:
+            configurator.delete_connections(
+                [{"connection.uuid": conn_uuid} for conn_uuid in conn_uuids]
+            )
+        assert err.value.failed_uuids == [conn_uuids[0]]
+        assert "Not authorized" in err.value.error
+        assert nm_mock.get_connection(conn_uuids[0]) is not None
+        assert nm_mock.get_connection(conn_uuids[1]) is None
+    finally:
+        nm_mock.close()
+
+
+def test_nmcli_interface_network_manager_configurator_enforce_states_fetch_ok(
+    command_mocker_builder,
+    mocker,
+):
+    """
+    Tests that the NetworkManagerConfigurator serves the state of unchanged
+    connections from the session snapshot, and that changed connections
+    are only fetched to poll their state and once the state is reached.
+    :param command_mocker_builder: The pytest mocked command runner fixture
+    :param mocker: The pytest mocker fixture
+    """
+    conn_uuid = "fb157a65-ad32-47ed-858c-102a48e064a2"
+    conn_data = {
+        "connection.id": "ether-conn",
+        "connection.uuid": conn_uuid,
+        "connection.type": "802-3-ethernet",
+        "general.state": "activated",
+    }
+    conn_config = net_config_stub.build_testing_ether_config(
+        mocker, config_patch={"state": "up"}
+    )
+    target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+        conn_data, conn_config
+    ).build()
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [conn_data]
+    querier.get_connection_details.return_value = conn_data
+    connections_store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    assert connections_store.connections == [conn_data]
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "--wait", "180", "connection", "up", conn_uuid], True)
+    )
+    configurator = nmcli_interface.NetworkManagerConfigurator(
+        command_mocker.run,
+        connections_store,
+        mocker.Mock(),
+        mocker.Mock(),
+        mocker.Mock(),
+    )
+
+    # Unchanged and already up -> Nothing is fetched
+    unchanged_result = (
+        nmcli_interface_types.MainConfigurationResult.from_result_required_data(
+            conn_uuid, False, target_connection_data
+        )
+    )
+    configurator.enforce_states(unchanged_result)
+    assert not unchanged_result.changed
+    assert unchanged_result.result.status == conn_data
+    querier.get_connection_details.assert_not_called()
+
+    # Changed -> Brought up, polled and fetched once
+    changed_result = (
+        nmcli_interface_types.MainConfigurationResult.from_result_required_data(
+            conn_uuid, True, target_connection_data
+        )
+    )
+    configurator.enforce_states(changed_result)
+    assert changed_result.changed
+    assert changed_result.result.status == conn_data
+    assert querier.get_connection_details.call_args_list == [
+        mocker.call(conn_uuid, check_exists=True, fields=["general.state"]),
+        mocker.call(conn_uuid, check_exists=True),
+    ]
+    querier.get_connections.assert_called_once_with()
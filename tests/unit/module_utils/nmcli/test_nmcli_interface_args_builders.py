@@ -25,13 +25,9 @@ def __route_to_nmcli_string(route_data: typing.Dict[str, typing.Any]):
 
 
 def __get_builder_types_list(
-    builder: nmcli_interface_args_builders.BaseBuilder,
+    builder: nmcli_interface_args_builders.ConnectionArgsBuilder,
 ) -> typing.List[typing.Type[nmcli_interface_args_builders.BaseBuilder]]:
-    builder_list = []
-    while builder is not None:
-        builder_list.append(type(builder))
-        builder = builder.next_handler
-    return builder_list
+    return [type(child_builder) for child_builder in builder.builders]
 
 
 @pytest.mark.parametrize(
@@ -1433,7 +1429,7 @@ def test_nmcli_interface_args_builders_slave_connection_args_builder_ok(
 def test_nmcli_interface_args_builders_nmcli_args_builder_factory_ok(mocker):
     """
     Tests that the nmcli_args_builder_factory properly return the expected
-    chain of builders for the given connection.
+    builders for the given connection.
     """
     # Test basic Ether conn
     ether_builder_list = __get_builder_types_list(
@@ -1505,3 +1501,49 @@ def test_nmcli_interface_args_builders_nmcli_args_builder_factory_ok(mocker):
         nmcli_interface_args_builders.SlaveConnectionArgsBuilder in ether_builder_list
     )
     assert nmcli_interface_args_builders.VlanConnectionArgsBuilder in ether_builder_list
+
+
+def test_nmcli_interface_args_builders_nmcli_args_builder_factory_diff_ok(mocker):
+    """
+    Tests that the builders returned by nmcli_args_builder_factory
+    generate the diff of all the fields, with their current values,
+    in the same order as the nmcli args.
+    """
+    conn_config = net_config_stub.build_testing_vlan_config(mocker)
+    builder = nmcli_interface_args_builders.nmcli_args_builder_factory(conn_config)
+    current_connection = {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID: conn_config.name,
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: "old-iface",
+        nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_ID: conn_config.vlan_id,
+        nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT: "old-parent",
+        nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD[4]: "disabled",
+        nmcli_constants.NMCLI_CONN_FIELD_IP_METHOD[6]: "disabled",
+    }
+
+    diff = builder.diff(current_connection, None)
+    assert diff.to_dict() == {
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_INTERFACE_NAME: {
+            "old": "old-iface",
+            "new": conn_config.interface.iface_name,
+        },
+        nmcli_constants.NMCLI_CONN_FIELD_VLAN_VLAN_PARENT: {
+            "old": "old-parent",
+            "new": conn_config.parent_interface.iface_name,
+        },
+    }
+    assert diff.to_args() == builder.build(current_connection, None)
+    assert list(diff) == diff.to_args()[::2]
+
+    new_diff = builder.diff(None, None)
+    assert all(change.old is None for change in new_diff.values())
+    assert new_diff.to_args() == builder.build(None, None)
+    assert new_diff[
+        nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE
+    ].new == nmcli_constants.map_config_to_nmcli_type_field(type(conn_config))
+
+    # Builders are resolved once per configuration type
+    assert __get_builder_types_list(
+        nmcli_interface_args_builders.nmcli_args_builder_factory(
+            net_config_stub.build_testing_vlan_config(mocker, index=2)
+        )
+    ) == __get_builder_types_list(builder)
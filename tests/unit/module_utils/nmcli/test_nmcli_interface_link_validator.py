@@ -1,6 +1,9 @@
 import typing
 
 import pytest
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_interface,
+)
 from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
@@ -19,7 +22,9 @@ from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils import (
 def test_nmcli_link_validator_validate_mandatory_links_ok(mocker):
     ip_interface_mocker = mocker.Mock()
     ip_interface_mocker.get_ip_links.return_value = config_stub_data.TEST_IP_LINKS
-    validator = nmcli_interface_link_validator.NmcliLinkValidator(ip_interface_mocker)
+    validator = nmcli_interface_link_validator.NmcliLinkValidator(
+        ip_interface.IPLinksTable(ip_interface_mocker)
+    )
     validator.validate_mandatory_links(
         net_config_stub.build_testing_ether_config(mocker)
     )
@@ -29,12 +34,22 @@ def test_nmcli_link_validator_validate_mandatory_links_ok(mocker):
     validator.validate_mandatory_links(
         net_config_stub.build_testing_ether_bridge_config(mocker, slaves_count=2)
     )
+    # A single ip call, shared by all the validations
+    ip_interface_mocker.get_ip_links.assert_called_once()
+
+    validator.invalidate_links()
+    validator.validate_mandatory_links(
+        net_config_stub.build_testing_ether_config(mocker)
+    )
+    assert ip_interface_mocker.get_ip_links.call_count == 2
 
 
 def test_nmcli_link_validator_validate_mandatory_links_fail(mocker):
     ip_interface_mocker = mocker.Mock()
     ip_interface_mocker.get_ip_links.return_value = config_stub_data.TEST_IP_LINKS
-    validator = nmcli_interface_link_validator.NmcliLinkValidator(ip_interface_mocker)
+    validator = nmcli_interface_link_validator.NmcliLinkValidator(
+        ip_interface.IPLinksTable(ip_interface_mocker)
+    )
 
     # Basic test for an ethernet connection
     ether_config = net_config_stub.build_testing_ether_config(mocker, index=100)
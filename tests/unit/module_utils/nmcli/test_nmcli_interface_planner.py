@@ -0,0 +1,377 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ansible_collections.pbtn.common.plugins.module_utils.net import (
+    net_config,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
+    nmcli_filters,
+    nmcli_interface_args_builders,
+    nmcli_interface_planner,
+    nmcli_interface_types,
+)
+
+from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils import (
+    net_config_stub,
+)
+
+
+def __build_mocked_target_connection_data_factory(
+    mocker, target_connection_data, delete_connections=None
+):
+    target_connection_data_factory = mocker.Mock()
+    target_connection_data_factory.build_target_connection_data.return_value = (
+        target_connection_data
+    )
+    target_connection_data_factory.build_delete_conn_list.return_value = (
+        delete_connections or []
+    )
+    return target_connection_data_factory
+
+
+def test_nmcli_interface_planner_connection_new_main_ok(mocker):
+    """
+    Tests that the NetworkManagerConnectionPlanner plans the changes of
+    a new main connection, with an existing slave that is adopted, using
+    a placeholder for the not yet known main connection UUID.
+
+    :param mocker: The pytest mocker fixture
+    """
+    conn_config = net_config_stub.build_testing_ether_bridge_config(
+        mocker, slaves_count=2, config_patch={"state": "up"}
+    )
+    slave_conn_data = {
+        "connection.id": "ether-conn-0",
+        "connection.uuid": "1fe5a4f4-83a1-4d0a-8a2e-e7c3c6a2c7e1",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth0",
+        "general.state": "activated",
+    }
+    target_connection_data = (
+        nmcli_interface_types.TargetConnectionData.Builder({}, conn_config)
+        .append_slave(
+            nmcli_interface_types.ConfigurableConnectionData(
+                slave_conn_data, conn_config.slaves[0]
+            )
+        )
+        .append_slave(
+            nmcli_interface_types.ConfigurableConnectionData(
+                None, conn_config.slaves[1]
+            )
+        )
+        .build()
+    )
+    delete_connections = [{"connection.uuid": "ab0bf4d4-2f8a-4b1c-9b57-3e3e6e7c3a51"}]
+    target_connection_data_factory = __build_mocked_target_connection_data_factory(
+        mocker, target_connection_data, delete_connections
+    )
+
+    connection_plan = nmcli_interface_planner.NetworkManagerConnectionPlanner(
+        nmcli_interface_args_builders.nmcli_args_builder_factory,
+        target_connection_data_factory,
+    ).plan(conn_config)
+
+    target_connection_data_factory.build_target_connection_data.assert_called_once_with(
+        conn_config
+    )
+    target_connection_data_factory.build_delete_conn_list.assert_called_once_with(
+        target_connection_data
+    )
+    assert connection_plan.conn_config == conn_config
+    assert connection_plan.target_connection_data == target_connection_data
+    assert connection_plan.delete_connections == delete_connections
+    assert connection_plan.main_change.uuid is None
+    assert connection_plan.main_change.changed
+    assert connection_plan.main_change.state_transition == "up"
+    assert connection_plan.changed
+    assert len(connection_plan.slave_changes) == 2
+    for slave_change in connection_plan.slave_changes:
+        master_index = slave_change.builder_args.index("connection.master")
+        assert (
+            slave_change.builder_args[master_index + 1]
+            == nmcli_interface_types.PLANNED_MAIN_CONN_UUID
+        )
+        # The existing slave was a main connection, so it gets adopted
+        assert slave_change.state_transition == "up"
+    assert connection_plan.slave_changes[0].uuid == slave_conn_data["connection.uuid"]
+    assert connection_plan.slave_changes[1].uuid is None
+
+
+def test_nmcli_interface_planner_connection_state_transitions_ok(mocker):
+    """
+    Tests that the NetworkManagerConnectionPlanner only plans state
+    transitions for connections not in the target state, or changed.
+
+    :param mocker: The pytest mocker fixture
+    """
+    builder_args = {}
+
+    def _builder_factory(conn_config):
+        builder = mocker.Mock()
+        args = builder_args[conn_config.name]
+        builder.diff.return_value = nmcli_interface_types.ConnectionDiff(
+            nmcli_interface_types.FieldChange(field, None, value)
+            for field, value in zip(args[::2], args[1::2])
+        )
+        return builder
+
+    conn_data = {
+        "connection.id": "ether-conn",
+        "connection.uuid": "1fe5a4f4-83a1-4d0a-8a2e-e7c3c6a2c7e1",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth0",
+        "general.state": "activated",
+    }
+    for state, args, expected_transition in (
+        ("up", [], None),
+        ("up", ["ipv4.method", "auto"], "up"),
+        ("down", [], "down"),
+        (None, ["ipv4.method", "auto"], None),
+    ):
+        conn_config = net_config_stub.build_testing_ether_config(
+            mocker, config_patch={"state": state} if state else None
+        )
+        builder_args[conn_config.name] = args
+        target_connection_data = nmcli_interface_types.TargetConnectionData.Builder(
+            conn_data, conn_config
+        ).build()
+
+        connection_plan = nmcli_interface_planner.NetworkManagerConnectionPlanner(
+            _builder_factory,
+            __build_mocked_target_connection_data_factory(
+                mocker, target_connection_data
+            ),
+        ).plan(conn_config)
+
+        assert connection_plan.main_change.uuid == conn_data["connection.uuid"]
+        assert connection_plan.main_change.builder_args == args
+        assert connection_plan.main_change.state_transition == expected_transition
+        assert connection_plan.changed == bool(args or expected_transition)
+
+
+def test_nmcli_interface_planner_configuration_ok(mocker):
+    """
+    Tests that the NetworkManagerConfigurationPlanner plans each connection
+    as if the previous ones were applied, without touching the store.
+
+    :param mocker: The pytest mocker fixture
+    """
+    # Related to both configured connections interfaces
+    stale_conn_data = {
+        "connection.id": "stale-conn",
+        "connection.uuid": "ab0bf4d4-2f8a-4b1c-9b57-3e3e6e7c3a51",
+        "connection.type": "vlan",
+        "connection.interface-name": "eth0",
+        "vlan.parent": "eth1",
+    }
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [stale_conn_data]
+    connections_store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    config_handler = net_config.ConnectionsConfigurationHandler(
+        {
+            "ether-conn-1": {"type": "ethernet", "iface": "eth0", "state": "up"},
+            "ether-conn-2": {"type": "ethernet", "iface": "eth1", "state": "up"},
+        },
+        net_config_stub.build_testing_config_factory(mocker),
+    )
+    config_handler.parse()
+
+    planner = nmcli_interface_planner.NetworkManagerConfigurationPlanner(
+        connections_store,
+        nmcli_interface_args_builders.nmcli_args_builder_factory,
+    )
+    configuration_plan = planner.plan(config_handler)
+    sequential_plan = planner.plan(config_handler, by_levels=False)
+
+    # Both connections are independent
+    assert len(configuration_plan.levels) == 1
+    assert sorted(
+        connection_plan.conn_config.name
+        for connection_plan in configuration_plan.levels[0]
+    ) == ["ether-conn-1", "ether-conn-2"]
+    assert [len(level) for level in sequential_plan.levels] == [1, 1]
+
+    for plan in (configuration_plan, sequential_plan):
+        assert plan.changed
+        first_plan, second_plan = plan.connections
+        assert first_plan.target_connection_data.empty
+        assert second_plan.target_connection_data.empty
+        # The first planned connection deletes it, so the
+        # second one doesn't see it
+        assert first_plan.delete_connections == [stale_conn_data]
+        assert second_plan.delete_connections == []
+
+    assert connections_store.connections == [stale_conn_data]
+    querier.get_connections.assert_called_once_with()
+    querier.get_connection_details.assert_not_called()
+
+
+def test_nmcli_interface_planner_level_ok(mocker):
+    """
+    Tests that the NetworkManagerConfigurationPlanner plans a level
+    against the current connections, preserving the ones of the given
+    session, without touching the store.
+
+    :param mocker: The pytest mocker fixture
+    """
+    stale_conn_data = {
+        "connection.id": "stale-conn",
+        "connection.uuid": "ab0bf4d4-2f8a-4b1c-9b57-3e3e6e7c3a51",
+        "connection.type": "vlan",
+        "connection.interface-name": "eth0",
+        "vlan.parent": "eth1",
+    }
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [stale_conn_data]
+    connections_store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    config_handler = net_config.ConnectionsConfigurationHandler(
+        {
+            "ether-conn-1": {"type": "ethernet", "iface": "eth0", "state": "up"},
+            "ether-conn-2": {"type": "ethernet", "iface": "eth1", "state": "up"},
+        },
+        net_config_stub.build_testing_config_factory(mocker),
+    )
+    config_handler.parse()
+    conn_configs = config_handler.connections
+    planner = nmcli_interface_planner.NetworkManagerConfigurationPlanner(
+        connections_store,
+        nmcli_interface_args_builders.nmcli_args_builder_factory,
+    )
+
+    level_plans = planner.plan_level(
+        config_handler, conn_configs, nmcli_interface_types.ConfigurationSession()
+    )
+    assert [plan.conn_config for plan in level_plans] == conn_configs
+    assert level_plans[0].delete_connections == [stale_conn_data]
+    assert level_plans[1].delete_connections == []
+    assert connections_store.connections == [stale_conn_data]
+
+    # Connections of the session, i.e. applied by a previous level, are kept
+    config_session = nmcli_interface_types.ConfigurationSession()
+    config_session.add_uuids([stale_conn_data["connection.uuid"]])
+    level_plans = planner.plan_level(config_handler, conn_configs[1:], config_session)
+    assert level_plans[0].delete_connections == []
+
+    # Once deleted by a previous level, it's not seen anymore
+    connections_store.discard([stale_conn_data["connection.uuid"]])
+    level_plans = planner.plan_level(
+        config_handler, conn_configs, nmcli_interface_types.ConfigurationSession()
+    )
+    assert all(not plan.delete_connections for plan in level_plans)
+    querier.get_connections.assert_called_once_with()
+
+
+def test_nmcli_interface_planner_config_levels_ok(mocker):
+    """
+    Tests that, sequentially, the connections go in the order of the
+    flattened dependency levels, the same ones the concurrent mode uses.
+
+    :param mocker: The pytest mocker fixture
+    """
+    config_handler = mocker.Mock()
+    config_handler.levels = [["conn-1", "conn-3"], ["conn-2"]]
+    config_handler.connections = ["conn-3", "conn-2", "conn-1"]
+
+    assert nmcli_interface_planner.get_config_levels(config_handler) == [
+        ["conn-1", "conn-3"],
+        ["conn-2"],
+    ]
+    assert nmcli_interface_planner.get_config_levels(
+        config_handler, by_levels=False
+    ) == [["conn-1"], ["conn-3"], ["conn-2"]]
+
+
+def test_nmcli_interface_planner_levels_session_ok(mocker):
+    """
+    Tests that, planning a level at a time, the copy of the connections
+    and the master/slave grouping are built once for the whole session,
+    and that the applied levels are seen by the next ones.
+
+    :param mocker: The pytest mocker fixture
+    """
+    bridge_conn_data = {
+        "connection.id": "bridge-conn",
+        "connection.uuid": "5f0cb374-c778-11ee-8ba0-2314b1ed58a7",
+        "connection.type": "bridge",
+        "connection.interface-name": "br0",
+    }
+    slaves_conn_data = [
+        {
+            "connection.id": f"bridge-slave-{index}",
+            "connection.uuid": f"860fd076-c775-11ee-8e75-{index:012d}",
+            "connection.type": "802-3-ethernet",
+            "connection.interface-name": f"ens{index}",
+            "connection.master": bridge_conn_data["connection.uuid"],
+        }
+        for index in range(10)
+    ]
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [bridge_conn_data] + slaves_conn_data
+    connections_store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    mocker.patch.object(connections_store, "copy", wraps=connections_store.copy)
+    first_main_connection_of = mocker.patch.object(
+        nmcli_filters,
+        "first_main_connection_of",
+        wraps=nmcli_filters.first_main_connection_of,
+    )
+    config_handler = net_config.ConnectionsConfigurationHandler(
+        {
+            f"ether-conn-{index}": {
+                "type": "ethernet",
+                "iface": f"eth{index}",
+                "state": "up",
+            }
+            for index in range(3)
+        },
+        net_config_stub.build_testing_config_factory(mocker),
+    )
+    config_handler.parse()
+    planner = nmcli_interface_planner.NetworkManagerConfigurationPlanner(
+        connections_store,
+        nmcli_interface_args_builders.nmcli_args_builder_factory,
+    )
+
+    config_session = nmcli_interface_types.ConfigurationSession()
+    added_uuids = {}
+    for index, conn_configs in enumerate(
+        nmcli_interface_planner.get_config_levels(config_handler, by_levels=False)
+    ):
+        level_plans = planner.plan_level(config_handler, conn_configs, config_session)
+        assert level_plans[0].target_connection_data.empty
+
+        # Apply it, as the configurators do, adding the connection
+        conn_uuid = f"63f3b658-c778-11ee-80f6-{index:012d}"
+        querier.get_connection_details.return_value = {
+            "connection.id": conn_configs[0].name,
+            "connection.uuid": conn_uuid,
+            "connection.type": "802-3-ethernet",
+            "connection.interface-name": conn_configs[0].interface.iface_name,
+        }
+        connections_store.refresh(conn_uuid)
+        config_session.add_result(
+            nmcli_interface_types.MainConfigurationResult.from_result_required_data(
+                conn_uuid, True, level_plans[0].target_connection_data
+            )
+        )
+        planner.update_level(level_plans, config_session)
+        added_uuids[conn_configs[0].name] = conn_uuid
+
+    # The applied connections are seen by the next plans
+    level_plans = planner.plan_level(
+        config_handler, config_handler.connections, config_session
+    )
+    assert [plan.target_connection_data.uuid for plan in level_plans] == [
+        added_uuids[plan.conn_config.name] for plan in level_plans
+    ]
+
+    # A single copy of the snapshot, and each slave grouped once, even if
+    # the connections changed after each level
+    connections_store.copy.assert_called_once_with()
+    querier.get_connections.assert_called_once_with()
+    assert [
+        call.args[1]["connection.uuid"]
+        for call in first_main_connection_of.call_args_list
+        if call.kwargs.get("is_main_conn", None)
+    ] == [conn_data["connection.uuid"] for conn_data in slaves_conn_data]
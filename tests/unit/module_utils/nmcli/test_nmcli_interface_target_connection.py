@@ -7,6 +7,7 @@ from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_connections_store,
     nmcli_constants,
     nmcli_interface_target_connection,
     nmcli_interface_types,
@@ -29,19 +30,19 @@ def __check_slave_conn_id_not_present(
     ).empty
 
 
-def __prepare_permute_queriers(
+def __prepare_permute_stores(
     mocker, connections: typing.List[typing.Dict[str, typing.Any]]
 ):
-    queriers = []
+    stores = []
     for permutation in itertools.permutations(connections, len(connections)):
         querier = mocker.Mock()
         querier.get_connections.return_value = permutation
-        queriers.append(querier)
-    return queriers
+        stores.append(nmcli_connections_store.NetworkManagerConnectionsStore(querier))
+    return stores
 
 
 def __test_build_delete_conn_list_from_mocks(
-    querier,
+    store,
     mocker,
     target_connection_data: nmcli_interface_types.TargetConnectionData,
     expected_uuids: typing.List[str],
@@ -62,7 +63,7 @@ def __test_build_delete_conn_list_from_mocks(
         mocked_handler = net_config.ConnectionsConfigurationHandler({}, mocker.Mock())
         mocked_config_session = nmcli_interface_types.ConfigurationSession()
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocked_handler,
             mocked_config_session,
         )
@@ -91,7 +92,7 @@ def test_target_connection_data_factory_build_conn_data_ether_basic_1_ok(mocker)
     conn_config = net_config_stub.build_testing_ether_config(
         mocker, index=0, config_patch={"state": None}
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             {
@@ -123,9 +124,9 @@ def test_target_connection_data_factory_build_conn_data_ether_basic_1_ok(mocker)
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -153,7 +154,7 @@ def test_target_connection_data_factory_build_conn_data_ether_basic_2_ok(mocker)
     conn_config = net_config_stub.build_testing_ether_config(
         mocker, index=0, config_patch={"state": None}
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             {
@@ -179,9 +180,9 @@ def test_target_connection_data_factory_build_conn_data_ether_basic_2_ok(mocker)
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -203,7 +204,7 @@ def test_target_connection_data_factory_build_conn_data_ether_basic_3_ok(mocker)
     # Create a list of queries with all the possible combinations
     # of connections order to ensure the result is not order
     # dependant
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             # Tempt the logic to pick up this one. Wrong interface name.
@@ -249,9 +250,9 @@ def test_target_connection_data_factory_build_conn_data_ether_basic_3_ok(mocker)
         config_patch={"state": None},
         conn_name="non-existing-conn-name",
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -278,7 +279,7 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_1_ok(mocker
     ether_conn_uuid_1 = "079fbb68-bfee-40fd-8216-ef4d9b96e563"
     ether_conn_uuid_2 = "c692d26b-e3ff-40da-997a-7a3ae87ef428"
     bridge_conn_uuid = "055812f8-2f2a-4239-886d-0e4a16633186"
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             {
@@ -319,9 +320,9 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_1_ok(mocker
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -352,7 +353,7 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_2_ok(mocker
     conn_config = net_config_stub.build_testing_ether_bridge_config(
         mocker, slaves_count=2, start_index=1
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             # Tempt the factory with a non-matching main connection
@@ -392,9 +393,9 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_2_ok(mocker
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -424,7 +425,7 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_3_ok(mocker
     conn_config = net_config_stub.build_testing_ether_bridge_config(
         mocker, slaves_count=2, start_index=0
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             {
@@ -473,9 +474,9 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_3_ok(mocker
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -504,7 +505,7 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_4_ok(mocker
     ether_conn_uuid_1 = "079fbb68-bfee-40fd-8216-ef4d9b96e563"
     ether_conn_uuid_2 = "c692d26b-e3ff-40da-997a-7a3ae87ef428"
     bridge_conn_uuid = "055812f8-2f2a-4239-886d-0e4a16633186"
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             # Tempt the factory with a non-matching main connection
@@ -561,9 +562,9 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_4_ok(mocker
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -608,7 +609,7 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_5_ok(mocker
     conn_config = net_config_stub.build_testing_ether_bridge_config(
         mocker, slaves_count=2, start_index=0
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             {
@@ -642,9 +643,9 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_5_ok(mocker
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -671,7 +672,7 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_6_ok(mocker
     conn_config = net_config_stub.build_testing_ether_bridge_config(
         mocker, slaves_count=2, start_index=0
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             {
@@ -721,9 +722,9 @@ def test_target_connection_data_factory_build_conn_data_bridge_basic_6_ok(mocker
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
-            querier,
+            store,
             mocker.Mock(),
             mocker.Mock(),
         )
@@ -759,7 +760,7 @@ def test_target_connection_data_factory_build_delete_conn_list_1_ok(mocker):
     to_remove_uuid_1 = "b15bd50c-c613-4fca-9303-8db4cc14a876"
     to_remove_uuid_2 = "6ffd5837-4274-4d3f-b0d2-472400bbd3f3"
     to_remove_uuid_3 = "0e6ad240-f8ea-4fb2-82ea-e1737dad2556"
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw,
@@ -801,9 +802,9 @@ def test_target_connection_data_factory_build_delete_conn_list_1_ok(mocker):
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [to_remove_uuid_1, to_remove_uuid_2, to_remove_uuid_3],
@@ -870,7 +871,7 @@ def test_target_connection_data_factory_build_delete_conn_list_2_ok(mocker):
         .build()
     )
 
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_bridge,
@@ -887,9 +888,9 @@ def test_target_connection_data_factory_build_delete_conn_list_2_ok(mocker):
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [ether_uuid_2],
@@ -971,7 +972,7 @@ def test_target_connection_data_factory_build_delete_conn_list_3_ok(mocker):
             connection_data_raw_ether, conn_config_target
         )
     ).build()
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_bridge,
@@ -1000,9 +1001,9 @@ def test_target_connection_data_factory_build_delete_conn_list_3_ok(mocker):
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [ether_uuid_2, ether_uuid_3],
@@ -1052,7 +1053,7 @@ def test_target_connection_data_factory_build_delete_conn_list_4_ok(mocker):
             connection_data_raw_ether, conn_config_target
         )
     ).build()
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_vlan_slave,
@@ -1070,9 +1071,9 @@ def test_target_connection_data_factory_build_delete_conn_list_4_ok(mocker):
             },
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [ether_uuid_2],
@@ -1152,7 +1153,7 @@ def test_target_connection_data_factory_build_delete_conn_list_5_ok(mocker):
         )
         .build()
     )
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_bridge_1,
@@ -1162,9 +1163,9 @@ def test_target_connection_data_factory_build_delete_conn_list_5_ok(mocker):
             connection_data_raw_vlan_1,
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [bridge_uuid_2, ether_uuid_2, vlan_uuid_1],
@@ -1224,7 +1225,7 @@ def test_target_connection_data_factory_build_delete_conn_list_6_ok(mocker):
         .build()
     )
 
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_bridge_1,
@@ -1232,9 +1233,9 @@ def test_target_connection_data_factory_build_delete_conn_list_6_ok(mocker):
             connection_data_raw_ether_2,
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [ether_uuid_2],
@@ -1289,7 +1290,7 @@ def test_target_connection_data_factory_build_delete_conn_list_7_ok(mocker):
         .build()
     )
 
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_bridge_1,
@@ -1297,9 +1298,9 @@ def test_target_connection_data_factory_build_delete_conn_list_7_ok(mocker):
             connection_data_raw_ether_1,
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [bridge_uuid_2],
@@ -1376,7 +1377,7 @@ def test_target_connection_data_factory_build_delete_conn_list_8_ok(mocker):
         .build()
     )
 
-    queriers = __prepare_permute_queriers(
+    stores = __prepare_permute_stores(
         mocker,
         [
             connection_data_raw_bridge,
@@ -1384,10 +1385,94 @@ def test_target_connection_data_factory_build_delete_conn_list_8_ok(mocker):
             connection_data_raw_ether,
         ],
     )
-    for querier in queriers:
+    for store in stores:
         __test_build_delete_conn_list_from_mocks(
-            querier,
+            store,
             mocker,
             target_connection_data,
             [],
         )
+
+
+def test_target_connection_data_factory_build_delete_conn_list_updates_ok(mocker):
+    """
+    Tests that the master/slave grouping, reused while the connections
+    change, gives the same to-delete connections list a new factory would,
+    when the slaves of a main connection are removed and added back.
+    :param mocker: The pytest mocker fixture
+    """
+    bridge_uuid = "de92e85b-316f-425a-835c-5d4dc3169563"
+    slave_uuid_1 = "df5a3001-b57e-4aef-bb5d-29c1fe458315"
+    slave_uuid_2 = "a7c7f3b0-5e8e-4b63-b1e4-4e6e25a4cb53"
+    connection_data_raw_bridge = {
+        "connection.id": "bridge-conn-1",
+        "connection.type": "bridge",
+        "connection.interface-name": "br0",
+        "connection.uuid": bridge_uuid,
+    }
+    # Uses the interface of the configured connection
+    connection_data_raw_slave_1 = {
+        "connection.id": "slave-conn-1",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth0",
+        "connection.master": bridge_uuid,
+        "connection.uuid": slave_uuid_1,
+    }
+    # Points to the bridge by interface
+    connection_data_raw_slave_2 = {
+        "connection.id": "slave-conn-2",
+        "connection.type": "802-3-ethernet",
+        "connection.interface-name": "eth9",
+        "connection.master": "br0",
+        "connection.uuid": slave_uuid_2,
+    }
+    querier = mocker.Mock()
+    querier.get_connections.return_value = [
+        connection_data_raw_bridge,
+        connection_data_raw_slave_1,
+        connection_data_raw_slave_2,
+    ]
+    store = nmcli_connections_store.NetworkManagerConnectionsStore(querier)
+    conn_config = net_config_stub.build_testing_ether_config(mocker)
+    config_handler = net_config.ConnectionsConfigurationHandler({}, mocker.Mock())
+    factory = nmcli_interface_target_connection.TargetConnectionDataFactory(
+        store, config_handler, nmcli_interface_types.ConfigurationSession()
+    )
+
+    def _assert_delete_conn_uuids(expected_uuids: typing.List[str]):
+        target_connection_data = factory.build_target_connection_data(conn_config)
+        for delete_conn_list in (
+            factory.build_delete_conn_list(target_connection_data),
+            nmcli_interface_target_connection.TargetConnectionDataFactory(
+                store, config_handler, nmcli_interface_types.ConfigurationSession()
+            ).build_delete_conn_list(target_connection_data),
+        ):
+            assert [
+                conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+                for conn_data in delete_conn_list
+            ] == expected_uuids
+
+    # The bridge keeps a slave
+    _assert_delete_conn_uuids([slave_uuid_1])
+
+    # Without its last slave, the bridge goes too
+    store.discard([slave_uuid_2])
+    _assert_delete_conn_uuids([slave_uuid_1, bridge_uuid])
+
+    # The slave is back
+    querier.get_connection_details.return_value = connection_data_raw_slave_2
+    store.refresh(slave_uuid_2)
+    _assert_delete_conn_uuids([slave_uuid_1])
+
+    # Another bridge takes the interface, so the slave moves to it
+    connection_data_raw_bridge_2 = {
+        "connection.id": "bridge-conn-2",
+        "connection.type": "bridge",
+        "connection.interface-name": "br0",
+        "connection.uuid": "6f2b0c55-2b8f-4b1a-9f0a-8d0f1b2a3c4d",
+    }
+    querier.get_connection_details.return_value = connection_data_raw_bridge_2
+    store.discard([bridge_uuid])
+    store.refresh(connection_data_raw_bridge_2["connection.uuid"])
+    _assert_delete_conn_uuids([slave_uuid_1])
+    querier.get_connections.assert_called_once_with()
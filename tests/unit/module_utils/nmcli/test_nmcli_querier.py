@@ -2,10 +2,18 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import collections.abc
 import ipaddress
+import os
+import pathlib
+import subprocess
+import time
 import typing
 
 import pytest
+from ansible_collections.pbtn.common.plugins.module_utils.module_command_utils import (
+    CommandRunException,
+)
 from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
     nmcli_constants,
     nmcli_interface_exceptions,
@@ -20,6 +28,13 @@ from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils.file_man
     FileManager,
 )
 
+__NMCLI_QUERIER_PARSE_FIXTURES = [
+    "test_nmcli_querier_parse_basic_vlan_connection",
+    "test_nmcli_querier_parse_bridge_vlan_connection",
+    "test_nmcli_querier_parse_bridged_ipv6_connection",
+    "test_nmcli_querier_parse_ethernet_connection",
+]
+
 __MANDATORY_FIELDS_AND_TYPES = {
     nmcli_constants.NMCLI_CONN_FIELD_GENERAL_STATE: str,
     nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_ID: str,
@@ -47,7 +62,7 @@ def __check_field_types(conn_data: typing.Dict[str, typing.Any]):
 def __validate_connection_fields(
     conn_name: str, conn_data: typing.Dict[str, typing.Any]
 ):
-    assert isinstance(conn_data, dict)
+    assert isinstance(conn_data, collections.abc.Mapping)
     __check_field_types(conn_data)
     assert conn_data["general.name"] == conn_name
     connection_type = conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_TYPE]
@@ -59,15 +74,35 @@ def __validate_connection_fields(
     ]
 
 
-def __generate_connection_details_calls(command_mocker, connection_names):
+def __get_connection_details_file_name(conn_name: str) -> str:
+    conn_name_sanitized = conn_name.replace("-", "_").replace(" ", "_")
+    return f"connection_details_{conn_name_sanitized}.out"
+
+
+def __get_fixture_connection_uuid(
+    test_file_manager: FileManager, conn_name: str
+) -> str:
+    details = test_file_manager.get_file_text_content(
+        __get_connection_details_file_name(conn_name)
+    )
+    return next(
+        line.split(":", 1)[1]
+        for line in details.splitlines()
+        if line.startswith(f"{nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID}:")
+    )
+
+
+def __generate_connection_details_calls(
+    command_mocker, connection_names, uuids: typing.Dict[str, str] = None
+):
     for conn_name in connection_names:
-        conn_name_sanitized = conn_name.replace("-", "_").replace(" ", "_")
         command_mocker.add_call_definition_with_file(
             MockCall(
-                ["nmcli", "-t", "-m", "multiline", "connection", "show", conn_name],
+                ["nmcli", "-t", "-m", "multiline", "connection", "show"]
+                + (["uuid", uuids[conn_name]] if uuids else [conn_name]),
                 True,
             ),
-            stdout_file_name=f"connection_details_{conn_name_sanitized}.out",
+            stdout_file_name=__get_connection_details_file_name(conn_name),
         )
 
 
@@ -75,15 +110,20 @@ def __test_load_prepare_command_mocker(
     test_file_manager: FileManager, command_mocker: CommandMocker
 ) -> typing.List[str]:
     connections = test_file_manager.get_file_text_content("connections_out.out")
-    command_mocker.add_call_definition_with_file(
-        MockCall(["nmcli", "-g", "name", "connection"], True),
-        stdout_file_name="connections_out.out",
-    )
     connection_names = connections.splitlines()
+    uuids = {
+        conn_name: __get_fixture_connection_uuid(test_file_manager, conn_name)
+        for conn_name in connection_names
+    }
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "-g", "uuid", "connection"], True),
+        stdout="\n".join(uuids.values()),
+    )
     # We need to generate the calls twice. One for the global get_connections
-    # call, that is the one from where we will test all fields and another set
-    # of individual calls cause the get_connection_details method is tested too.
-    __generate_connection_details_calls(command_mocker, connection_names)
+    # call, that fetches connections by UUID and is the one from where we will
+    # test all fields and another set of individual calls, by name, cause the
+    # get_connection_details method is tested too.
+    __generate_connection_details_calls(command_mocker, connection_names, uuids=uuids)
     __generate_connection_details_calls(command_mocker, connection_names)
     return connection_names
 
@@ -530,7 +570,7 @@ def test_nmcli_querier_get_connections_error_handling_fail(
     format errors in case retrieving the list of connection.
     """
     command_mocker = command_mocker_builder.build()
-    retrieve_list_cmd = ["nmcli", "-g", "name", "connection"]
+    retrieve_list_cmd = ["nmcli", "-g", "uuid", "connection"]
     command_mocker.add_call_definition(
         MockCall(
             retrieve_list_cmd,
@@ -665,3 +705,496 @@ def test_nmcli_querier_get_connection_details_error_handling_fail(
         str(err.value)
         == f"nmcli output format not expected for line '{bad_line_str}'. Missing colon"
     )
+
+
+@pytest.mark.parametrize("fixture_name", __NMCLI_QUERIER_PARSE_FIXTURES)
+def test_nmcli_querier_get_connections_bulk_ok(command_mocker_builder, fixture_name):
+    """
+    Tests that the NetworkManagerQuerier bulk mode fetches all the connections
+    with a single nmcli call and that the returned data is exactly the same as
+    the one returned when fetching the connections one by one.
+    """
+    fixture_file_manager = FileManager(fixture_name, pathlib.Path(__file__).parent)
+    connection_names = fixture_file_manager.get_file_text_content(
+        "connections_out.out"
+    ).splitlines()
+    uuids = {
+        conn_name: __get_fixture_connection_uuid(fixture_file_manager, conn_name)
+        for conn_name in connection_names
+    }
+
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "-g", "uuid", "connection"], True),
+        stdout="\n".join(uuids.values()),
+    )
+    for conn_name in connection_names:
+        command_mocker.add_call_definition(
+            MockCall(
+                [
+                    "nmcli",
+                    "-t",
+                    "-m",
+                    "multiline",
+                    "connection",
+                    "show",
+                    "uuid",
+                    uuids[conn_name],
+                ],
+                True,
+            ),
+            stdout=fixture_file_manager.get_file_text_content(
+                __get_connection_details_file_name(conn_name)
+            ),
+        )
+    expected = nmcli_querier.NetworkManagerQuerier(command_mocker.run).get_connections()
+
+    bulk_cmd = ["nmcli", "-t", "-m", "multiline", "connection", "show"]
+    for conn_name in connection_names:
+        bulk_cmd.extend(("uuid", uuids[conn_name]))
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "-g", "uuid", "connection"], True),
+        stdout="\n".join(uuids.values()),
+    )
+    command_mocker.add_call_definition(
+        MockCall(bulk_cmd, True),
+        stdout="\n".join(
+            fixture_file_manager.get_file_text_content(
+                __get_connection_details_file_name(conn_name)
+            )
+            for conn_name in connection_names
+        ),
+    )
+    result = nmcli_querier.NetworkManagerQuerier(
+        command_mocker.run,
+        options=nmcli_querier.NetworkManagerQuerierOptions(bulk_fetch=True),
+    ).get_connections()
+    assert result == expected
+
+
+def test_nmcli_querier_get_connections_duplicated_names_ok(command_mocker_builder):
+    """
+    Tests that the NetworkManagerQuerier fetches each connection exactly once,
+    by UUID, even if more than one connection shares the same name.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "-g", "uuid", "connection"], True),
+        stdout="uuid-1\nuuid-2\n",
+    )
+    details_cmd = ["nmcli", "-t", "-m", "multiline", "connection", "show"]
+    for conn_uuid in ["uuid-1", "uuid-2"]:
+        command_mocker.add_call_definition(
+            MockCall(details_cmd + ["uuid", conn_uuid], True),
+            stdout=f"connection.id:conn-1\nconnection.uuid:{conn_uuid}\n",
+        )
+
+    result = nmcli_querier.NetworkManagerQuerier(command_mocker.run).get_connections()
+    assert result == [
+        {"connection.id": "conn-1", "connection.uuid": "uuid-1"},
+        {"connection.id": "conn-1", "connection.uuid": "uuid-2"},
+    ]
+
+
+def test_nmcli_querier_get_connections_bulk_vanished_fail(command_mocker_builder):
+    """
+    Tests that the NetworkManagerQuerier bulk mode fetches connections
+    one by one if any of them vanishes in the middle of the bulk call,
+    failing for the missing one the same way the non-bulk mode does.
+    """
+    details_cmd = ["nmcli", "-t", "-m", "multiline", "connection", "show"]
+    for bulk_fetch in (True, False):
+        command_mocker = command_mocker_builder.build()
+        command_mocker.add_call_definition(
+            MockCall(["nmcli", "-g", "uuid", "connection"], True),
+            stdout="uuid-1\nuuid-2\n",
+        )
+        if bulk_fetch:
+            command_mocker.add_call_definition(
+                MockCall(details_cmd + ["uuid", "uuid-1", "uuid", "uuid-2"], True),
+                rc=10,
+            )
+        command_mocker.add_call_definition(
+            MockCall(details_cmd + ["uuid", "uuid-1"], True),
+            stdout="connection.id:conn-1\nconnection.uuid:uuid-1\n",
+        )
+        command_mocker.add_call_definition(
+            MockCall(details_cmd + ["uuid", "uuid-2"], True),
+            rc=10,
+            stderr="Error: uuid-2 - no such connection profile.",
+        )
+
+        with pytest.raises(
+            nmcli_interface_exceptions.NmcliExecuteCommandException
+        ) as err:
+            nmcli_querier.NetworkManagerQuerier(
+                command_mocker.run,
+                options=nmcli_querier.NetworkManagerQuerierOptions(
+                    bulk_fetch=bulk_fetch
+                ),
+            ).get_connections()
+        assert str(err.value) == "uuid-2 doesn't exist"
+        assert err.value.error == "Error: uuid-2 - no such connection profile."
+        assert err.value.cmd == details_cmd + ["uuid", "uuid-2"]
+
+
+@pytest.mark.parametrize(
+    "fields,expected_fields",
+    [
+        (["general.state"], "connection.uuid,general.state"),
+        (["GENERAL", "connection.uuid"], "connection.uuid,general"),
+        (["general", "connection", "general"], "connection,general"),
+    ],
+)
+def test_nmcli_querier_get_connections_fields_ok(
+    command_mocker_builder, fields, expected_fields
+):
+    """
+    Tests that the NetworkManagerQuerier projects the fetched fields
+    when asked to, always fetching the connection UUID first so
+    multi-object outputs can be split.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "-g", "uuid", "connection"], True),
+        stdout="uuid-1\nuuid-2\n",
+    )
+    command_mocker.add_call_definition(
+        MockCall(
+            [
+                "nmcli",
+                "-t",
+                "-m",
+                "multiline",
+                "-f",
+                expected_fields,
+                "connection",
+                "show",
+                "uuid",
+                "uuid-1",
+                "uuid",
+                "uuid-2",
+            ],
+            True,
+        ),
+        stdout="connection.uuid:uuid-1\n"
+        "general.state:activated\n"
+        "connection.uuid:uuid-2\n",
+    )
+
+    result = nmcli_querier.NetworkManagerQuerier(
+        command_mocker.run,
+        options=nmcli_querier.NetworkManagerQuerierOptions(bulk_fetch=True),
+    ).get_connections(fields=fields)
+    assert result == [
+        {"connection.uuid": "uuid-1", "general.state": "activated"},
+        {"connection.uuid": "uuid-2"},
+    ]
+
+
+def test_nmcli_querier_get_connection_details_fields_ok(command_mocker_builder):
+    """
+    Tests that the NetworkManagerQuerier projects the fields of a single
+    connection fetch as given.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(
+            [
+                "nmcli",
+                "-t",
+                "-m",
+                "multiline",
+                "-f",
+                "general.state",
+                "connection",
+                "show",
+                "conn-1",
+            ],
+            True,
+        ),
+        stdout="GENERAL.STATE:activated\n",
+    )
+
+    result = nmcli_querier.NetworkManagerQuerier(
+        command_mocker.run
+    ).get_connection_details("conn-1", check_exists=True, fields=["general.state"])
+    assert result == {"general.state": "activated"}
+
+
+def test_nmcli_querier_get_connections_bulk_fail(command_mocker_builder):
+    """
+    Test that NetworkManagerQuerier bulk mode properly formats errors
+    that are not caused by a missing connection.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(["nmcli", "-g", "uuid", "connection"], True),
+        stdout="uuid-1\n",
+    )
+    details_cmd = [
+        "nmcli",
+        "-t",
+        "-m",
+        "multiline",
+        "connection",
+        "show",
+        "uuid",
+        "uuid-1",
+    ]
+    command_mocker.add_call_definition(
+        MockCall(details_cmd, True),
+        rc=5,
+        stderr="error details",
+    )
+
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(
+        command_mocker.run,
+        options=nmcli_querier.NetworkManagerQuerierOptions(bulk_fetch=True),
+    )
+    with pytest.raises(nmcli_interface_exceptions.NmcliExecuteCommandException) as err:
+        nmq_1.get_connections()
+    assert err.value.cmd == details_cmd
+    assert err.value.error == "error details"
+    assert str(err.value) == "Failed to fetch objects details"
+
+
+def test_nmcli_querier_get_connections_fingerprint_ok(command_mocker_builder, tmp_path):
+    """
+    Test that NetworkManagerQuerier connections fingerprint changes
+    if the connections list or their profile files change, and that
+    it doesn't depend on the order nmcli lists them.
+    """
+    fingerprint_cmd = [
+        "nmcli",
+        "-t",
+        "-f",
+        "UUID,NAME,TYPE,DEVICE,ACTIVE,FILENAME",
+        "connection",
+        "show",
+    ]
+    profile_1 = tmp_path / "conn-1.nmconnection"
+    profile_2 = tmp_path / "conn:2.nmconnection"
+    profile_1.write_text("[connection]")
+    profile_2.write_text("[connection]")
+    escaped_profile_2 = str(profile_2).replace(":", "\\:")
+    line_1 = f"uuid-1:conn-1:802-3-ethernet:eth0:yes:{profile_1}"
+    line_2 = f"uuid-2:conn-2:802-3-ethernet:::{escaped_profile_2}"
+    command_mocker = command_mocker_builder.build()
+    for stdout in (
+        f"{line_1}\n{line_2}\n",
+        f"{line_2}\n{line_1}\n",
+        f"{line_2}\n{line_1}\n",
+        f"{line_1.replace('yes', 'no')}\n{line_2}\n",
+    ):
+        command_mocker.add_call_definition(
+            MockCall(fingerprint_cmd, True), stdout=stdout
+        )
+
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(command_mocker.run)
+    fingerprint_1 = nmq_1.get_connections_fingerprint()
+    assert fingerprint_1 == nmq_1.get_connections_fingerprint()
+
+    # A profile modification, even with the same listing, is detected
+    profile_2_stat = profile_2.stat()
+    os.utime(
+        profile_2,
+        ns=(profile_2_stat.st_atime_ns, profile_2_stat.st_mtime_ns + 1000000000),
+    )
+    fingerprint_2 = nmq_1.get_connections_fingerprint()
+    assert fingerprint_2 != fingerprint_1
+
+    # Deactivations are detected too
+    assert nmq_1.get_connections_fingerprint() not in (fingerprint_1, fingerprint_2)
+
+
+def test_nmcli_querier_get_connections_fingerprint_fail(command_mocker_builder):
+    """
+    Test that NetworkManagerQuerier properly formats errors
+    when the connections fingerprint cannot be computed.
+    """
+    fingerprint_cmd = [
+        "nmcli",
+        "-t",
+        "-f",
+        "UUID,NAME,TYPE,DEVICE,ACTIVE,FILENAME",
+        "connection",
+        "show",
+    ]
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(fingerprint_cmd, True),
+        rc=5,
+        stderr="error details",
+    )
+
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(command_mocker.run)
+    with pytest.raises(nmcli_interface_exceptions.NmcliExecuteCommandException) as err:
+        nmq_1.get_connections_fingerprint()
+    assert err.value.cmd == fingerprint_cmd
+    assert err.value.error == "error details"
+    assert str(err.value) == "Failed to fetch the connections fingerprint"
+
+
+def __build_concurrent_runner(details: typing.Dict[str, typing.Optional[str]]):
+    def _run(cmd, check=True) -> subprocess.CompletedProcess:
+        if cmd == ["nmcli", "-g", "uuid", "connection"]:
+            return subprocess.CompletedProcess(cmd, 0, "\n".join(details.keys()), "")
+
+        conn_uuid = cmd[-1]
+        # Delay the first connections the most to force results
+        # to complete in the reverse order of the requests
+        time.sleep(0.01 * (len(details) - list(details.keys()).index(conn_uuid)))
+        if details[conn_uuid] is None:
+            raise CommandRunException(stderr="not found", return_code=10, cmd=cmd)
+        return subprocess.CompletedProcess(cmd, 0, details[conn_uuid], "")
+
+    return _run
+
+
+def test_nmcli_querier_get_connections_concurrent_ok():
+    """
+    Tests that the NetworkManagerQuerier, when running the details calls
+    concurrently, returns the connections in the same order they were listed.
+    """
+    details = {
+        f"uuid-{index}": f"connection.id:conn-{index}\nconnection.uuid:uuid-{index}"
+        for index in range(6)
+    }
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(
+        __build_concurrent_runner(details),
+        options=nmcli_querier.NetworkManagerQuerierOptions(max_workers=4),
+    )
+    result = nmq_1.get_connections()
+    assert [
+        conn_data[nmcli_constants.NMCLI_CONN_FIELD_CONNECTION_UUID]
+        for conn_data in result
+    ] == list(details.keys())
+
+
+def test_nmcli_querier_get_connections_concurrent_fail():
+    """
+    Tests that the NetworkManagerQuerier, when running the details calls
+    concurrently, maps errors the same way sequential calls do.
+    """
+    details = {
+        "uuid-0": "connection.id:conn-0\nconnection.uuid:uuid-0",
+        "uuid-1": None,
+        "uuid-2": "connection.id:conn-2\nconnection.uuid:uuid-2",
+    }
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(
+        __build_concurrent_runner(details),
+        options=nmcli_querier.NetworkManagerQuerierOptions(max_workers=3),
+    )
+    with pytest.raises(nmcli_interface_exceptions.NmcliExecuteCommandException) as err:
+        nmq_1.get_connections()
+    assert str(err.value) == "uuid-1 doesn't exist"
+    assert err.value.error == "not found"
+    assert err.value.cmd == [
+        "nmcli",
+        "-t",
+        "-m",
+        "multiline",
+        "connection",
+        "show",
+        "uuid",
+        "uuid-1",
+    ]
+
+
+@pytest.mark.parametrize(
+    "raw_output,expected",
+    [
+        pytest.param(
+            "a.bool-1:yes\na.bool-2:No\na.bool-3:TRUE\na.bool-4:false",
+            {"a.bool-1": True, "a.bool-2": False, "a.bool-3": True, "a.bool-4": False},
+            id="booleans",
+        ),
+        pytest.param(
+            "a.int-1:-1\na.int-2: 12 \na.int-3:+3\na.hex:0x0\na.float:1.5\na.empty:",
+            {
+                "a.int-1": -1,
+                "a.int-2": 12,
+                "a.int-3": 3,
+                "a.hex": "0x0",
+                "a.float": "1.5",
+                "a.empty": None,
+            },
+            id="numbers",
+        ),
+        pytest.param(
+            "A.List:First, Second\nA.Dict:x=1, Y = no\nA.Str:Mixed Case",
+            {
+                "a.list": ["first", "second"],
+                "a.dict": {"x": 1, "y": False},
+                "a.str": "Mixed Case",
+            },
+            id="lists-dicts",
+        ),
+        pytest.param(
+            "A.ITEMS[1]:10.0.0.1/24\nA.ITEMS[2]:10.0.0.2/24\n"
+            "A.OPTS[1]:Key1 = Value\nA.OPTS[2]:key2 = 2",
+            {
+                "a.items": ["10.0.0.1/24", "10.0.0.2/24"],
+                "a.opts": {"Key1": "Value", "key2": 2},
+            },
+            id="indexed-keys",
+        ),
+    ],
+)
+def test_nmcli_querier_parse_values_ok(
+    command_mocker_builder,
+    raw_output: str,
+    expected: typing.Dict[str, typing.Any],
+):
+    """
+    Tests that the NetworkManagerQuerier parser properly converts
+    nmcli values to their python types.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(
+            ["nmcli", "-t", "-m", "multiline", "connection", "show", "conn-1"],
+            True,
+        ),
+        stdout=raw_output,
+    )
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(command_mocker.run)
+    result = nmq_1.get_connection_details("conn-1")
+    assert result == expected
+    assert [type(value) for value in result.values()] == [
+        type(value) for value in expected.values()
+    ]
+
+
+def test_nmcli_querier_lazy_connection_data_ok(command_mocker_builder):
+    """
+    Tests that the connection data returned by the NetworkManagerQuerier is
+    decoded on demand, caching the decoded values, and that it can be
+    materialized as a plain dict.
+    """
+    command_mocker = command_mocker_builder.build()
+    command_mocker.add_call_definition(
+        MockCall(
+            ["nmcli", "-t", "-m", "multiline", "connection", "show", "conn-1"],
+            True,
+        ),
+        stdout="connection.id:conn-1\nipv4.dns:8.8.8.8,1.1.1.1\nipv4.method:auto",
+    )
+    nmq_1 = nmcli_querier.NetworkManagerQuerier(command_mocker.run)
+    result = nmq_1.get_connection_details("conn-1")
+    assert isinstance(result, nmcli_querier.NmcliConnectionData)
+    assert len(result) == 3
+    assert "ipv4.dns" in result
+    assert "ipv4.gateway" not in result
+    assert result.get("ipv4.gateway", None) is None
+    assert result["ipv4.dns"] == ["8.8.8.8", "1.1.1.1"]
+    assert result["ipv4.dns"] is result["ipv4.dns"]
+
+    materialized = dict(result)
+    assert type(materialized) is dict
+    assert materialized == {
+        "connection.id": "conn-1",
+        "ipv4.dns": ["8.8.8.8", "1.1.1.1"],
+        "ipv4.method": "auto",
+    }
@@ -0,0 +1,202 @@
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
+)
+from ansible_collections.pbtn.common.tests.unit.module_utils.test_utils import (
+    nm_dbus_mock,
+)
+
+
+def test_dbus_utils_split_signature_ok():
+    assert dbus_utils.split_signature("") == []
+    assert dbus_utils.split_signature("sa{sv}") == ["s", "a{sv}"]
+    assert dbus_utils.split_signature("a{sa{sv}}ao(iu)b") == [
+        "a{sa{sv}}",
+        "ao",
+        "(iu)",
+        "b",
+    ]
+    for signature in ("a", "(iu", "a{s", "z"):
+        with pytest.raises(ValueError):
+            dbus_utils.split_signature(signature)
+
+
+def test_dbus_utils_marshal_ok():
+    """
+    Test that the values are serialized with the D-Bus alignment rules
+    and that they are deserialized back to the same values.
+    """
+    # Byte, then an uint32 aligned to 4 and a string
+    assert dbus_utils.marshal("yus", [1, 2, "ab"]) == (
+        b"\x01\x00\x00\x00" b"\x02\x00\x00\x00" b"\x02\x00\x00\x00ab\x00"
+    )
+    # The array length doesn't count the padding of the first element
+    assert dbus_utils.marshal("at", [[7]]) == (
+        b"\x08\x00\x00\x00" b"\x00\x00\x00\x00" b"\x07\x00\x00\x00\x00\x00\x00\x00"
+    )
+
+    signature = "sa{sa{sv}}aoayaay(iu)bdx"
+    values = [
+        "conn",
+        {
+            "connection": {
+                "id": dbus_utils.DBusVariant("s", "eth0"),
+                "autoconnect": dbus_utils.DBusVariant("b", False),
+            },
+            "ipv4": {
+                "address-data": dbus_utils.DBusVariant(
+                    "aa{sv}",
+                    [
+                        {
+                            "address": dbus_utils.DBusVariant("s", "10.0.0.1"),
+                            "prefix": dbus_utils.DBusVariant("u", 24),
+                        }
+                    ],
+                ),
+                "dns": dbus_utils.DBusVariant("au", [16843009]),
+            },
+        },
+        ["/a", "/b/c"],
+        b"\x00\x01\x02",
+        [b"\xfe\x80", b""],
+        (-1, 5),
+        True,
+        1.5,
+        -(2**40),
+    ]
+    data = dbus_utils.marshal(signature, values)
+    assert dbus_utils.unmarshal(signature, data) == values
+
+    with pytest.raises(ValueError):
+        dbus_utils.marshal("ss", ["a"])
+    with pytest.raises(ValueError):
+        # Variants need an explicit signature
+        dbus_utils.marshal("v", ["a"])
+
+
+def test_dbus_utils_message_encode_decode_ok():
+    message = dbus_utils.DBusMessage(
+        dbus_utils.DBUS_MESSAGE_TYPE_METHOD_CALL,
+        serial=12,
+        path="/org/freedesktop/NetworkManager",
+        interface="org.freedesktop.NetworkManager",
+        member="ActivateConnection",
+        destination="org.freedesktop.NetworkManager",
+        signature="ooo",
+        body=["/a", "/", "/"],
+    )
+    encoded = message.encode()
+    # The body starts in an 8 bytes boundary
+    assert (len(encoded) - len(dbus_utils.marshal("ooo", message.body))) % 8 == 0
+    assert dbus_utils.DBusMessage.decode(encoded) == message
+
+
+def test_dbus_utils_connection_call_ok():
+    """
+    Test that DBusConnection authenticates, says hello to the bus and
+    makes calls, skipping the messages that don't reply them.
+    """
+    nm_mock = nm_dbus_mock.NetworkManagerDBusMock()
+    conn_path = nm_mock.add_connection(
+        {
+            "connection": {
+                "id": dbus_utils.DBusVariant("s", "conn-1"),
+                "uuid": dbus_utils.DBusVariant("s", "uuid-1"),
+            }
+        }
+    )
+    try:
+        with nm_mock.connect() as connection:
+            assert connection.unique_name == ":1.42"
+            assert connection.call(
+                "org.freedesktop.NetworkManager",
+                "/org/freedesktop/NetworkManager/Settings",
+                "org.freedesktop.NetworkManager.Settings",
+                "GetConnectionByUuid",
+                signature="s",
+                args=("uuid-1",),
+            ) == [conn_path]
+            assert nm_mock.calls == [
+                ("/org/freedesktop/DBus", "Hello"),
+                ("/org/freedesktop/NetworkManager/Settings", "GetConnectionByUuid"),
+            ]
+    finally:
+        nm_mock.close()
+
+
+def test_dbus_utils_connection_call_fail():
+    nm_mock = nm_dbus_mock.NetworkManagerDBusMock()
+    nm_mock.errors["ListConnections"] = (
+        "org.freedesktop.NetworkManager.PermissionDenied",
+        "Not authorized",
+    )
+    try:
+        with nm_mock.connect() as connection:
+            with pytest.raises(dbus_utils.DBusCallException) as err:
+                connection.call(
+                    "org.freedesktop.NetworkManager",
+                    "/org/freedesktop/NetworkManager/Settings",
+                    "org.freedesktop.NetworkManager.Settings",
+                    "ListConnections",
+                )
+            assert err.value.name == "org.freedesktop.NetworkManager.PermissionDenied"
+            assert err.value.error == "Not authorized"
+            assert err.value.member == "ListConnections"
+            assert "Not authorized" in str(err.value)
+
+        # Calls on a closed connection fail the same way
+        with pytest.raises(dbus_utils.DBusCallException):
+            connection.call(
+                "org.freedesktop.NetworkManager",
+                "/org/freedesktop/NetworkManager/Settings",
+                "org.freedesktop.NetworkManager.Settings",
+                "ListConnections",
+            )
+    finally:
+        nm_mock.close()
+
+
+def test_dbus_utils_connection_call_timeout_fail():
+    """
+    Test that a call that times out halfway its reply closes the
+    connection, instead of reading the rest of the reply as the reply
+    of the next call.
+    """
+    nm_mock = nm_dbus_mock.NetworkManagerDBusMock()
+    nm_mock.truncated_replies.add("ListConnections")
+    try:
+        connection = nm_mock.connect(timeout_secs=0.2)
+        with pytest.raises(dbus_utils.DBusCallException) as err:
+            connection.call(
+                "org.freedesktop.NetworkManager",
+                "/org/freedesktop/NetworkManager/Settings",
+                "org.freedesktop.NetworkManager.Settings",
+                "ListConnections",
+            )
+        assert err.value.error == "timed out"
+
+        with pytest.raises(dbus_utils.DBusCallException) as err:
+            connection.call(
+                "org.freedesktop.NetworkManager",
+                "/org/freedesktop/NetworkManager/Settings",
+                "org.freedesktop.NetworkManager.Settings",
+                "ListConnections",
+            )
+        assert err.value.error == "timed out"
+        assert "previous failed call" in str(err.value)
+        # Nothing else was sent through the broken connection
+        assert [member for _, member in nm_mock.calls] == ["Hello", "ListConnections"]
+    finally:
+        nm_mock.close()
+
+
+def test_dbus_utils_connection_connect_fail():
+    with pytest.raises(ValueError):
+        dbus_utils.DBusConnection.connect("tcp:host=localhost,port=1234")
+    with pytest.raises(OSError):
+        dbus_utils.DBusConnection.connect("unix:path=/non-existing/pbtn-bus-socket")
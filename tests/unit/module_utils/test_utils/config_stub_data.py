@@ -142,7 +142,7 @@ TEST_IP6_CONFIG_AUTO_4 = {
 }
 
 TEST_IP_LINK_ETHER_0_MAC = "52:54:00:ab:80:ee"
-TEST_IP_LINK_ETHER_0 = ip_interface.IPLinkData(
+TEST_IP_LINK_ETHER_0 = ip_interface.IPLinkData.from_dict(
     {
         "ifname": "eth0",
         "address": TEST_IP_LINK_ETHER_0_MAC,
@@ -150,7 +150,7 @@ TEST_IP_LINK_ETHER_0 = ip_interface.IPLinkData(
 )
 
 TEST_IP_LINK_ETHER_1_MAC = "52:54:00:e6:f8:db"
-TEST_IP_LINK_ETHER_1 = ip_interface.IPLinkData(
+TEST_IP_LINK_ETHER_1 = ip_interface.IPLinkData.from_dict(
     {
         "ifname": "eth1",
         "address": TEST_IP_LINK_ETHER_1_MAC,
@@ -158,7 +158,7 @@ TEST_IP_LINK_ETHER_1 = ip_interface.IPLinkData(
 )
 
 TEST_IP_LINK_ETHER_2_MAC = "d2:55:ee:86:11:24"
-TEST_IP_LINK_ETHER_2 = ip_interface.IPLinkData(
+TEST_IP_LINK_ETHER_2 = ip_interface.IPLinkData.from_dict(
     {
         "ifname": "eth2",
         "address": TEST_IP_LINK_ETHER_2_MAC,
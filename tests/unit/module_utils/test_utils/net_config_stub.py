@@ -1,6 +1,9 @@
 import collections.abc
 import typing
 
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_interface,
+)
 from ansible_collections.pbtn.common.plugins.module_utils.net import (
     net_config,
 )
@@ -37,7 +40,9 @@ def build_testing_config_factory(
 ) -> net_config.ConnectionConfigFactory:
     mocked_ip_interface = mocker.Mock()
     mocked_ip_interface.get_ip_links.return_value = config_stub_data.TEST_IP_LINKS
-    return net_config.ConnectionConfigFactory(mocked_ip_interface)
+    return net_config.ConnectionConfigFactory(
+        ip_interface.IPLinksTable(mocked_ip_interface)
+    )
 
 
 def build_testing_ether_bridge_config(
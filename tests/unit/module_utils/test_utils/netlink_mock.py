@@ -0,0 +1,185 @@
+import socket
+import struct
+import threading
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils.ip import (
+    ip_netlink,
+)
+
+# Sent by the kernel, but not decoded
+IFLA_MTU = 4
+IFLA_MASTER = 10
+IFLA_OPERSTATE = 16
+IFLA_INFO_DATA = 2
+IFLA_VLAN_ID = 1
+IFLA_VLAN_PROTOCOL = 5
+IFA_LABEL = 3
+IFA_FLAGS = 8
+
+
+def _align(data: bytes) -> bytes:
+    return data + b"\0" * (-len(data) % 4)
+
+
+def encode_attribute(attr_type: int, value: bytes) -> bytes:
+    return _align(
+        ip_netlink.RTATTR.pack(ip_netlink.RTATTR.size + len(value), attr_type) + value
+    )
+
+
+def encode_attributes(attributes: typing.Dict[int, bytes]) -> bytes:
+    return b"".join(
+        encode_attribute(attr_type, value) for attr_type, value in attributes.items()
+    )
+
+
+class NetlinkRouteKernelMock:
+    """
+    In-memory rtnetlink kernel side, served over a datagram socket pair,
+    so the real NetlinkRouteSocket can be tested against it. Dumps are
+    split in datagrams of a few messages, as the kernel does.
+    """
+
+    def __init__(self, messages_per_datagram: int = 2):
+        self.links: typing.List[bytes] = []
+        self.addresses: typing.List[bytes] = []
+        # Type of each received request
+        self.requests: typing.List[int] = []
+        # Request type -> errno to reply to the next request
+        self.errors: typing.Dict[int, int] = {}
+        # Number of dumps to flag as interrupted
+        self.interrupted_dumps = 0
+        self.__messages_per_datagram = messages_per_datagram
+        self.__threads: typing.List[threading.Thread] = []
+        self.__sockets: typing.List[socket.socket] = []
+
+    def add_link(
+        self,
+        index: int,
+        name: str,
+        address: str = None,
+        flags: int = 0x11043,
+        link_type: int = 1,
+        link: int = None,
+        master: int = None,
+        kind: str = None,
+        info_data: typing.Dict[int, bytes] = None,
+    ):
+        attributes = {ip_netlink.IFLA_IFNAME: name.encode() + b"\0"}
+        if address:
+            # Tunnels use IPs as link addresses
+            attributes[ip_netlink.IFLA_ADDRESS] = (
+                socket.inet_pton(socket.AF_INET, address)
+                if "." in address
+                else bytes.fromhex(address.replace(":", ""))
+            )
+        attributes[IFLA_MTU] = struct.pack("=I", 1500)
+        attributes[IFLA_OPERSTATE] = bytes([6])
+        if link is not None:
+            attributes[ip_netlink.IFLA_LINK] = struct.pack("=I", link)
+        if master:
+            attributes[IFLA_MASTER] = struct.pack("=I", master)
+        if kind:
+            link_info = {ip_netlink.IFLA_INFO_KIND: kind.encode() + b"\0"}
+            if info_data:
+                link_info[IFLA_INFO_DATA] = encode_attributes(info_data)
+            # Nested flag, the parser must ignore it
+            attributes[ip_netlink.IFLA_LINKINFO | 0x8000] = encode_attributes(link_info)
+        self.links.append(
+            ip_netlink.IFINFOMSG.pack(socket.AF_UNSPEC, link_type, index, flags, 0)
+            + encode_attributes(attributes)
+        )
+
+    def add_address(
+        self,
+        index: int,
+        address: str,
+        prefix_len: int,
+        family: int = socket.AF_INET,
+        scope: int = 0,
+        flags: int = 0x80,
+        label: str = None,
+    ):
+        attributes = {
+            ip_netlink.IFA_ADDRESS: socket.inet_pton(family, address),
+            ip_netlink.IFA_LOCAL: socket.inet_pton(family, address),
+        }
+        if label:
+            attributes[IFA_LABEL] = label.encode() + b"\0"
+        attributes[IFA_FLAGS] = struct.pack("=I", flags)
+        self.addresses.append(
+            ip_netlink.IFADDRMSG.pack(family, prefix_len, flags & 0xFF, scope, index)
+            + encode_attributes(attributes)
+        )
+
+    def connect(self) -> ip_netlink.NetlinkRouteSocket:
+        client_sock, server_sock = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.__sockets += [client_sock, server_sock]
+        thread = threading.Thread(target=self.__serve, args=(server_sock,), daemon=True)
+        thread.start()
+        self.__threads.append(thread)
+        return ip_netlink.NetlinkRouteSocket(client_sock)
+
+    def close(self):
+        for sock in self.__sockets:
+            # Closing a datagram socket doesn't wake up its blocked reads
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            sock.close()
+        for thread in self.__threads:
+            thread.join(timeout=5)
+
+    def __serve(self, sock: socket.socket):
+        try:
+            while True:
+                request = sock.recv(4096)
+                if not request:
+                    return
+                _, msg_type, _, seq, _ = ip_netlink.NLMSG_HEADER.unpack_from(request)
+                self.requests.append(msg_type)
+                for datagram in self.__reply(msg_type, seq):
+                    sock.send(datagram)
+        except OSError:
+            return
+
+    def __reply(self, msg_type: int, seq: int) -> typing.List[bytes]:
+        if msg_type in self.errors:
+            error = self.errors.pop(msg_type)
+            return [
+                self.__message(
+                    ip_netlink.NLMSG_ERROR, seq, 0, struct.pack("=i", -error)
+                )
+            ]
+
+        flags = 0x2
+        if self.interrupted_dumps:
+            self.interrupted_dumps -= 1
+            flags |= ip_netlink.NLM_F_DUMP_INTR
+        payloads = self.links if msg_type == ip_netlink.RTM_GETLINK else self.addresses
+        reply_type = (
+            ip_netlink.RTM_NEWLINK
+            if msg_type == ip_netlink.RTM_GETLINK
+            else ip_netlink.RTM_NEWADDR
+        )
+        messages = [
+            self.__message(reply_type, seq, flags, payload) for payload in payloads
+        ]
+        datagrams = [
+            b"".join(messages[index : index + self.__messages_per_datagram])
+            for index in range(0, len(messages), self.__messages_per_datagram)
+        ]
+        return datagrams + [
+            self.__message(ip_netlink.NLMSG_DONE, seq, flags, struct.pack("=i", 0))
+        ]
+
+    @staticmethod
+    def __message(msg_type: int, seq: int, flags: int, payload: bytes) -> bytes:
+        return _align(
+            ip_netlink.NLMSG_HEADER.pack(
+                ip_netlink.NLMSG_HEADER.size + len(payload), msg_type, flags, seq, 0
+            )
+            + payload
+        )
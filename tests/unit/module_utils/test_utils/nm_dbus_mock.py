@@ -0,0 +1,286 @@
+import socket
+import threading
+import typing
+
+from ansible_collections.pbtn.common.plugins.module_utils import (
+    dbus_utils,
+)
+from ansible_collections.pbtn.common.plugins.module_utils.nmcli import (
+    nmcli_dbus,
+)
+
+DBusSettings = typing.Dict[str, typing.Dict[str, dbus_utils.DBusVariant]]
+
+
+class NetworkManagerDBusMock:
+    """
+    In-memory NetworkManager that speaks the D-Bus wire protocol over
+    a socket pair, so the real DBusConnection can be tested against it.
+    It keeps the settings of each connection and activates them
+    synchronously, on the device named as their interface.
+    """
+
+    __INTERFACE_PROPERTIES = "org.freedesktop.DBus.Properties"
+    __INTERFACE_DBUS = "org.freedesktop.DBus"
+    __CONNECTION_PATH_PREFIX = "/org/freedesktop/NetworkManager/Settings/"
+    __ACTIVE_PATH_PREFIX = "/org/freedesktop/NetworkManager/ActiveConnection/"
+    __DEVICE_PATH_PREFIX = "/org/freedesktop/NetworkManager/Devices/"
+
+    def __init__(self):
+        self.connections: typing.Dict[str, DBusSettings] = {}
+        # Active path -> (Connection path, Device path)
+        self.active_connections: typing.Dict[str, typing.Tuple[str, str]] = {}
+        self.devices: typing.Dict[str, str] = {}
+        # (path, member) of each received call
+        self.calls: typing.List[typing.Tuple[str, str]] = []
+        # Member -> (error name, message) to reply to the next call
+        self.errors: typing.Dict[str, typing.Tuple[str, str]] = {}
+        # Members whose next reply is cut after its first bytes
+        self.truncated_replies: typing.Set[str] = set()
+        self.__next_id = 1
+        self.__threads: typing.List[threading.Thread] = []
+        self.__sockets: typing.List[socket.socket] = []
+
+    def add_connection(self, settings: DBusSettings, active: bool = False) -> str:
+        conn_path = self.__new_path(self.__CONNECTION_PATH_PREFIX)
+        self.connections[conn_path] = settings
+        if active:
+            self.__activate(conn_path)
+        return conn_path
+
+    def get_connection(self, conn_uuid: str) -> typing.Optional[DBusSettings]:
+        conn_path = self.__find_connection_path(conn_uuid)
+        return self.connections[conn_path] if conn_path else None
+
+    def is_active(self, conn_uuid: str) -> bool:
+        conn_path = self.__find_connection_path(conn_uuid)
+        return any(
+            active_conn_path == conn_path
+            for active_conn_path, _ in self.active_connections.values()
+        )
+
+    def connect(self, timeout_secs: float = 5) -> dbus_utils.DBusConnection:
+        client_sock, server_sock = socket.socketpair()
+        self.__sockets += [client_sock, server_sock]
+        thread = threading.Thread(target=self.__serve, args=(server_sock,), daemon=True)
+        thread.start()
+        self.__threads.append(thread)
+        return dbus_utils.DBusConnection(client_sock, timeout_secs=timeout_secs)
+
+    def close(self):
+        for sock in self.__sockets:
+            sock.close()
+        for thread in self.__threads:
+            thread.join(timeout=5)
+
+    def __new_path(self, prefix: str) -> str:
+        path = f"{prefix}{self.__next_id}"
+        self.__next_id += 1
+        return path
+
+    def __find_connection_path(self, conn_uuid: str) -> typing.Optional[str]:
+        return next(
+            (
+                conn_path
+                for conn_path, settings in self.connections.items()
+                if settings["connection"]["uuid"].value == conn_uuid
+            ),
+            None,
+        )
+
+    def __activate(self, conn_path: str) -> str:
+        active_path = self.__new_path(self.__ACTIVE_PATH_PREFIX)
+        iface_name = self.connections[conn_path]["connection"].get(
+            "interface-name", dbus_utils.DBusVariant("s", "")
+        )
+        device_path = self.__new_path(self.__DEVICE_PATH_PREFIX)
+        self.devices[device_path] = iface_name.value
+        self.active_connections[active_path] = (conn_path, device_path)
+        return active_path
+
+    def __serve(self, sock: socket.socket):
+        try:
+            auth_data = bytearray()
+            while not auth_data.endswith(b"\r\n"):
+                auth_data.extend(sock.recv(1))
+            sock.sendall(b"OK 0123456789abcdef0123456789abcdef\r\n")
+            begin_data = bytearray()
+            while not begin_data.endswith(b"\r\n"):
+                begin_data.extend(sock.recv(1))
+
+            while True:
+                request = dbus_utils.DBusMessage.read_from(sock)
+                self.calls.append((request.path, request.member))
+                reply = self.__dispatch(request).encode()
+                if request.member in self.truncated_replies:
+                    self.truncated_replies.remove(request.member)
+                    reply = reply[:8]
+                sock.sendall(reply)
+                if request.member == "Hello":
+                    # Like the bus does, clients must skip it
+                    sock.sendall(
+                        dbus_utils.DBusMessage(
+                            dbus_utils.DBUS_MESSAGE_TYPE_SIGNAL,
+                            serial=1,
+                            path="/org/freedesktop/DBus",
+                            interface=self.__INTERFACE_DBUS,
+                            member="NameAcquired",
+                            signature="s",
+                            body=[":1.42"],
+                        ).encode()
+                    )
+        except (ConnectionError, OSError):
+            return
+
+    def __dispatch(self, request: dbus_utils.DBusMessage) -> dbus_utils.DBusMessage:
+        if request.member in self.errors:
+            error_name, error_message = self.errors.pop(request.member)
+            return self.__error(request, error_name, error_message)
+
+        handler = {
+            (self.__INTERFACE_DBUS, "Hello"): lambda: ("s", [":1.42"]),
+            (self.__INTERFACE_PROPERTIES, "Get"): lambda: self.__get_property(
+                request.path, *request.body
+            ),
+            (self.__INTERFACE_PROPERTIES, "GetAll"): lambda: self.__get_all_properties(
+                request.path, *request.body
+            ),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE_SETTINGS,
+                "ListConnections",
+            ): lambda: ("ao", [list(self.connections)]),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE_SETTINGS,
+                "GetConnectionByUuid",
+            ): lambda: self.__get_connection_by_uuid(request.body[0]),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE_SETTINGS,
+                "AddConnection",
+            ): lambda: ("o", [self.add_connection(request.body[0])]),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE_SETTINGS_CONNECTION,
+                "GetSettings",
+            ): lambda: ("a{sa{sv}}", [self.__get_connection(request.path)]),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE_SETTINGS_CONNECTION,
+                "Update",
+            ): lambda: self.__update_connection(request.path, request.body[0]),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE_SETTINGS_CONNECTION,
+                "Delete",
+            ): lambda: self.__delete_connection(request.path),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE,
+                "ActivateConnection",
+            ): lambda: (
+                "o",
+                [self.__activate(self.__get_connection_path(request.body[0]))],
+            ),
+            (
+                nmcli_dbus.NM_DBUS_INTERFACE,
+                "DeactivateConnection",
+            ): lambda: self.__deactivate(request.body[0]),
+        }.get((request.interface, request.member), None)
+        if not handler:
+            return self.__error(
+                request, nmcli_dbus.NM_DBUS_ERROR_UNKNOWN_METHOD, request.member
+            )
+
+        try:
+            signature, body = handler()
+        except KeyError as err:
+            return self.__error(
+                request, nmcli_dbus.NM_DBUS_ERROR_UNKNOWN_OBJECT, str(err)
+            )
+        except _MockError as err:
+            return self.__error(request, err.name, err.message)
+
+        return dbus_utils.DBusMessage(
+            dbus_utils.DBUS_MESSAGE_TYPE_METHOD_RETURN,
+            serial=request.serial + 10000,
+            reply_serial=request.serial,
+            signature=signature,
+            body=body,
+        )
+
+    @staticmethod
+    def __error(
+        request: dbus_utils.DBusMessage, error_name: str, message: str
+    ) -> dbus_utils.DBusMessage:
+        return dbus_utils.DBusMessage(
+            dbus_utils.DBUS_MESSAGE_TYPE_ERROR,
+            serial=request.serial + 10000,
+            reply_serial=request.serial,
+            error_name=error_name,
+            signature="s",
+            body=[message],
+        )
+
+    def __get_connection(self, conn_path: str) -> DBusSettings:
+        return self.connections[conn_path]
+
+    def __get_connection_path(self, conn_path: str) -> str:
+        if conn_path not in self.connections:
+            raise KeyError(conn_path)
+        return conn_path
+
+    def __get_connection_by_uuid(self, conn_uuid: str):
+        conn_path = self.__find_connection_path(conn_uuid)
+        if not conn_path:
+            raise _MockError(
+                nmcli_dbus.NM_DBUS_ERROR_INVALID_CONNECTION,
+                "No connection with the UUID was found.",
+            )
+        return "o", [conn_path]
+
+    def __update_connection(self, conn_path: str, settings: DBusSettings):
+        self.__get_connection_path(conn_path)
+        self.connections[conn_path] = settings
+        return "", []
+
+    def __delete_connection(self, conn_path: str):
+        self.connections.pop(conn_path)
+        for active_path, (active_conn_path, _) in list(self.active_connections.items()):
+            if active_conn_path == conn_path:
+                self.active_connections.pop(active_path)
+        return "", []
+
+    def __deactivate(self, active_path: str):
+        if active_path not in self.active_connections:
+            raise _MockError(
+                nmcli_dbus.NM_DBUS_ERROR_CONNECTION_NOT_ACTIVE, "Not active"
+            )
+        self.active_connections.pop(active_path)
+        return "", []
+
+    def __active_connection_properties(
+        self, active_path: str
+    ) -> typing.Dict[str, dbus_utils.DBusVariant]:
+        conn_path, device_path = self.active_connections[active_path]
+        settings = self.connections[conn_path]["connection"]
+        return {
+            "Uuid": settings["uuid"],
+            "Id": settings["id"],
+            "State": dbus_utils.DBusVariant("u", 2),
+            "Connection": dbus_utils.DBusVariant("o", conn_path),
+            "Devices": dbus_utils.DBusVariant("ao", [device_path]),
+        }
+
+    def __get_property(self, path: str, interface: str, name: str):
+        if interface == nmcli_dbus.NM_DBUS_INTERFACE and name == "ActiveConnections":
+            value = dbus_utils.DBusVariant("ao", list(self.active_connections))
+        elif interface == nmcli_dbus.NM_DBUS_INTERFACE_DEVICE and name == "Interface":
+            value = dbus_utils.DBusVariant("s", self.devices[path])
+        else:
+            value = self.__active_connection_properties(path)[name]
+        return "v", [value]
+
+    def __get_all_properties(self, path: str, _: str):
+        return "a{sv}", [self.__active_connection_properties(path)]
+
+
+class _MockError(Exception):
+    def __init__(self, name: str, message: str):
+        super().__init__(message)
+        self.name = name
+        self.message = message